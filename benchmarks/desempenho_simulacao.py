@@ -0,0 +1,260 @@
+#!/usr/bin/env python3
+"""Mede a vazão de SimulacaoController.iniciar_simulacao contra um servidor LLM falso local.
+
+Cada combinação de tamanho de população e número de gerações roda em um
+interpretador novo (para medir o pico de memória de cada caso), em um diretório
+temporário, com GROQ_BASE_URL apontando para o servidor de servidor_llm_falso.
+O relatório traz gerações por segundo, chamadas à API por geração, latência
+p50/p95/p99 de cada fase e pico de RSS. Com --comparar, o script falha (código
+de saída 1) se algum caso piorar além da tolerância em relação a um resultado
+anterior salvo com --saida.
+
+Uso:
+    python benchmarks/desempenho_simulacao.py [--populacoes 5,10] [--geracoes 2,4]
+        [--latencia-ms 150] [--taxa-erro 0.02] [--taxa-429 0.05] [--limite-rpm 0]
+        [--saida resultado.json] [--comparar anterior.json] [--tolerancia 0.25] [--json]
+"""
+import argparse
+import json
+import os
+import platform
+import subprocess
+import sys
+import tempfile
+import time
+
+RAIZ = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+CODIGO_INICIAL = os.path.join(RAIZ, "utils", "algoritmo_original.py")
+
+# Métrica → True se valores maiores são melhores (usado na comparação com o resultado anterior)
+METRICAS_COMPARADAS = {
+    "geracoes_por_segundo": True,
+    "chamadas_por_geracao": False,
+    "rss_pico_mb": False,
+}
+
+def _rss_pico_mb():
+    """Pico de memória residente deste processo e dos filhos já encerrados (MB), se disponível."""
+    try:
+        import resource
+    except ImportError:
+        return None, None
+    # ru_maxrss é em KB no Linux e em bytes no macOS
+    divisor = 1024 * 1024 if sys.platform == "darwin" else 1024
+    proprio = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / divisor
+    filhos = resource.getrusage(resource.RUSAGE_CHILDREN).ru_maxrss / divisor
+    return round(proprio, 1), round(filhos, 1)
+
+
+def executar_caso(caso):
+    """Roda uma simulação no processo atual e retorna as métricas do caso.
+
+    Chamado no interpretador filho (--caso); o diretório atual já é o temporário.
+    """
+    sys.path.insert(0, RAIZ)
+    from controller.cliente_llm import obter_cliente_llm
+    from controller.operador_genetico import OperadorGenetico
+    from controller.simulacao_controller import SimulacaoController
+    from model.populacao import Populacao
+
+    # As durações das fases vêm do rastreamento da própria simulação
+    controller = SimulacaoController(
+        operador_genetico=OperadorGenetico(semente=caso["semente"]),
+        caminho_checkpoint=None,
+        caminho_rastreamento=None
+    )
+    cliente = obter_cliente_llm()
+
+    # Instantes e chamadas à API ao fim de cada geração (a inicial é a geração 0)
+    marcas = []
+    gerar_inicial = Populacao.gerar_populacao_inicial
+
+    def gerar_e_marcar(*args, **kwargs):
+        resultado = gerar_inicial(*args, **kwargs)
+        marcas.append((time.perf_counter(), cliente.requisicoes))
+        return resultado
+    Populacao.gerar_populacao_inicial = gerar_e_marcar
+
+    def progresso(geracao, total):
+        marcas.append((time.perf_counter(), cliente.requisicoes))
+
+    with open(CODIGO_INICIAL, encoding="utf-8") as arquivo:
+        codigo = arquivo.read()
+
+    inicio = time.perf_counter()
+    melhor, estatisticas, _ = controller.iniciar_simulacao(
+        codigo, "Python", tamanho_populacao=caso["populacao"], geracoes=caso["geracoes"],
+        callback_progresso=progresso
+    )
+    fim = time.perf_counter()
+
+    if melhor is None or not marcas:
+        raise RuntimeError("A simulação falhou; veja a saída acima")
+    fim_inicial, chamadas_iniciais = marcas[0]
+    geracoes = max(1, len(marcas) - 1)
+    rastreamento = estatisticas["rastreamento"]
+    rss, rss_filhos = _rss_pico_mb()
+    return {
+        "tempo_total_s": round(fim - inicio, 3),
+        "tempo_populacao_inicial_s": round(fim_inicial - inicio, 3),
+        "geracoes_por_segundo": round(geracoes / max(1e-9, fim - fim_inicial), 3),
+        "chamadas_populacao_inicial": chamadas_iniciais,
+        "chamadas_por_geracao": round((cliente.requisicoes - chamadas_iniciais) / geracoes, 2),
+        "chamadas_total": cliente.requisicoes,
+        "fases": rastreamento["fases"],
+        "llm": {campo: valor for campo, valor in rastreamento["llm"].items() if campo != "por_operacao"},
+        "melhor_fitness": melhor.get_fitness(),
+        "rss_pico_mb": rss,
+        "rss_pico_filhos_mb": rss_filhos,
+    }
+
+
+def _rodar_subprocesso(caso, url, args):
+    """Executa um caso em um interpretador novo, em um diretório temporário."""
+    ambiente = dict(os.environ)
+    ambiente.update({
+        "GROQ_API_KEY": "chave-do-benchmark",
+        "GROQ_BASE_URL": url,
+        # O benchmark mede o código, não a cota da conta: os limites vêm do servidor falso
+        "GROQ_LIMITE_RPM": str(args.rpm_cliente),
+        "GROQ_LIMITE_TPM": str(args.tpm_cliente),
+    })
+    # Sem cassete, para que todas as chamadas cheguem ao servidor
+    ambiente.pop("GROQ_CASSETE", None)
+    with tempfile.TemporaryDirectory(prefix="codegenix-benchmark-") as diretorio:
+        os.makedirs(os.path.join(diretorio, "utils"))
+        processo = subprocess.run(
+            [sys.executable, os.path.abspath(__file__), "--caso", json.dumps(caso)],
+            cwd=diretorio, env=ambiente, capture_output=True, text=True
+        )
+    linhas = processo.stdout.strip().splitlines()
+    if processo.returncode != 0 or not linhas or not linhas[-1].startswith("{"):
+        saida = (processo.stdout + processo.stderr).strip().splitlines()
+        raise RuntimeError("caso falhou:\n" + "\n".join(saida[-20:]))
+    return json.loads(linhas[-1])
+
+
+def _versao():
+    """Commit atual do repositório, se disponível."""
+    try:
+        return subprocess.run(["git", "rev-parse", "--short", "HEAD"], cwd=RAIZ,
+                              capture_output=True, text=True, check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def comparar(resultado, anterior, tolerancia):
+    """Lista as métricas que pioraram mais que a tolerância em relação ao resultado anterior."""
+    regressoes = []
+    for nome, caso in resultado["casos"].items():
+        base = anterior.get("casos", {}).get(nome)
+        if not base:
+            continue
+        for metrica, maior_melhor in METRICAS_COMPARADAS.items():
+            atual, antes = caso.get(metrica), base.get(metrica)
+            if not atual or not antes:
+                continue
+            variacao = (atual - antes) / antes
+            if (-variacao if maior_melhor else variacao) > tolerancia:
+                regressoes.append(f"{nome}: {metrica} {antes} → {atual} ({variacao:+.0%})")
+    return regressoes
+
+
+def _lista_inteiros(texto):
+    return [int(valor) for valor in texto.split(",") if valor.strip()]
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--populacoes", type=_lista_inteiros, default=[5, 10], help="ex.: 5,10,20")
+    parser.add_argument("--geracoes", type=_lista_inteiros, default=[2, 4], help="ex.: 2,4")
+    parser.add_argument("--semente", type=int, default=1, help="semente da seleção e do servidor")
+    parser.add_argument("--latencia-ms", type=float, default=150.0, help="mediana até o primeiro token")
+    parser.add_argument("--dispersao", type=float, default=0.5, help="desvio do log da latência")
+    parser.add_argument("--ms-por-token", type=float, default=1.0, help="velocidade de geração do servidor")
+    parser.add_argument("--taxa-erro", type=float, default=0.0, help="fração de respostas 500")
+    parser.add_argument("--taxa-429", type=float, default=0.0, help="fração de respostas 429")
+    parser.add_argument("--retry-after", type=float, default=1.0, help="Retry-After das respostas 429")
+    parser.add_argument("--limite-rpm", type=int, default=0, help="cota do servidor (0 = sem limite)")
+    parser.add_argument("--rpm-cliente", type=int, default=100000, help="GROQ_LIMITE_RPM dos casos")
+    parser.add_argument("--tpm-cliente", type=int, default=100000000, help="GROQ_LIMITE_TPM dos casos")
+    parser.add_argument("--saida", help="grava o resultado neste arquivo JSON")
+    parser.add_argument("--comparar", help="resultado JSON anterior para detectar regressões")
+    parser.add_argument("--tolerancia", type=float, default=0.25, help="piora relativa aceita")
+    parser.add_argument("--json", action="store_true", help="imprime o resultado em JSON")
+    parser.add_argument("--caso", help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.caso:
+        # Processo filho: a saída da aplicação vai para stderr e o resultado fica na última linha
+        saida_real, sys.stdout = sys.stdout, sys.stderr
+        resultado = executar_caso(json.loads(args.caso))
+        print(json.dumps(resultado), file=saida_real)
+        return 0
+
+    sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+    from servidor_llm_falso import ServidorLLMFalso
+
+    configuracao_servidor = {
+        "latencia_ms": args.latencia_ms, "dispersao": args.dispersao, "ms_por_token": args.ms_por_token,
+        "taxa_erro": args.taxa_erro, "taxa_429": args.taxa_429, "retry_after": args.retry_after,
+        "limite_rpm": args.limite_rpm, "semente": args.semente,
+    }
+    servidor = ServidorLLMFalso(**configuracao_servidor)
+    url = servidor.iniciar()
+
+    resultado = {
+        "versao": _versao(),
+        "data": time.strftime("%Y-%m-%dT%H:%M:%S"),
+        "python": platform.python_version(),
+        "servidor": configuracao_servidor,
+        "casos": {},
+    }
+    try:
+        for populacao in args.populacoes:
+            for geracoes in args.geracoes:
+                nome = f"p{populacao}_g{geracoes}"
+                if not args.json:
+                    print(f"[INFO] Caso {nome}...", flush=True)
+                servidor.zerar_estatisticas()
+                caso = _rodar_subprocesso(
+                    {"populacao": populacao, "geracoes": geracoes, "semente": args.semente}, url, args
+                )
+                caso["servidor"] = servidor.estatisticas()
+                resultado["casos"][nome] = caso
+    finally:
+        servidor.parar()
+
+    regressoes = []
+    if args.comparar:
+        with open(args.comparar, encoding="utf-8") as arquivo:
+            regressoes = comparar(resultado, json.load(arquivo), args.tolerancia)
+        resultado["regressoes"] = regressoes
+    if args.saida:
+        with open(args.saida, "w", encoding="utf-8") as arquivo:
+            json.dump(resultado, arquivo, indent=2, ensure_ascii=False)
+
+    if args.json:
+        print(json.dumps(resultado, indent=2, ensure_ascii=False))
+    else:
+        for nome, caso in resultado["casos"].items():
+            print(f"{nome}: {caso['geracoes_por_segundo']:.2f} ger/s, "
+                  f"{caso['chamadas_por_geracao']:.1f} chamadas/ger, "
+                  f"total {caso['tempo_total_s']:.1f} s, RSS {caso['rss_pico_mb']} MB "
+                  f"(filhos {caso['rss_pico_filhos_mb']} MB), 429: {caso['servidor']['respostas_429']}, "
+                  f"5xx: {caso['servidor']['erros_5xx']}")
+            print(f"    tokens: {caso['llm']['tokens_prompt']} prompt, {caso['llm']['tokens_completacao']} "
+                  f"resposta; {caso['llm']['novas_tentativas']} novas tentativas, "
+                  f"{caso['llm']['interrompidas']} respostas interrompidas")
+            for fase, p in caso["fases"].items():
+                print(f"    {fase:<20} n={p['ocorrencias']:<4} p50 {p['p50_ms']:8.1f}  "
+                      f"p95 {p['p95_ms']:8.1f}  p99 {p['p99_ms']:8.1f} ms")
+        for regressao in regressoes:
+            print(f"[REGRESSÃO] {regressao}")
+
+    return 1 if regressoes else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
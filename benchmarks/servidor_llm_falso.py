@@ -0,0 +1,375 @@
+#!/usr/bin/env python3
+"""Servidor local compatível com a API de chat da Groq/OpenAI, para benchmarks e testes.
+
+Responde aos prompts do CodeGenix sem rede: variações, cruzamentos e mutações
+recebem cópias do código do prompt com nomes locais trocados (o comportamento é
+preservado, então os filtros continuam valendo), e as avaliações recebem notas
+determinísticas por código. Latência, velocidade de geração, erros 5xx e 429
+são configuráveis. Suporta streaming (SSE), sequências de parada e max_tokens.
+
+Uso isolado (aponte a aplicação para ele com GROQ_BASE_URL=http://127.0.0.1:8765):
+    python benchmarks/servidor_llm_falso.py [--porta 8765] [--latencia-ms 150] [--taxa-429 0.05]
+"""
+import argparse
+import ast
+import builtins
+import hashlib
+import json
+import math
+import random
+import re
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+# Texto após o código, como um modelo real costuma escrever (e que o streaming deixa de ler)
+EXPLICACAO = (
+    "\n\nExplicação: a versão acima mantém o comportamento do original, com nomes mais "
+    "descritivos e a mesma complexidade. Os casos de borda, como a lista vazia, continuam "
+    "tratados da mesma forma, e nenhuma dependência externa foi adicionada."
+)
+
+
+class ServidorLLMFalso:
+    """Servidor HTTP em uma thread que imita a API de chat da Groq.
+
+    Responsabilidades:
+    - Gerar respostas plausíveis para cada tipo de prompt do CodeGenix
+    - Simular a latência até o primeiro token (log-normal) e a velocidade de geração
+    - Simular falhas 5xx, respostas 429 aleatórias e um limite de requisições por minuto
+    - Contar requisições, erros e tokens para os relatórios do benchmark
+    """
+    def __init__(self, latencia_ms=150.0, dispersao=0.5, ms_por_token=1.0, taxa_erro=0.0, taxa_429=0.0,
+                 retry_after=1.0, limite_rpm=0, semente=0, porta=0):
+        """
+        Args:
+            latencia_ms: Mediana do tempo até o primeiro token
+            dispersao: Desvio padrão do logaritmo da latência (0 torna a latência fixa)
+            ms_por_token: Tempo de geração de cada token da resposta
+            taxa_erro: Fração das requisições respondidas com erro 500
+            taxa_429: Fração das requisições respondidas com 429 (Retry-After: retry_after)
+            retry_after: Segundos informados no Retry-After das respostas 429 aleatórias
+            limite_rpm: Requisições por minuto aceitas antes de responder 429 (0 desativa)
+            semente: Semente dos sorteios de latência, erros e nomes
+            porta: Porta local (0 escolhe uma livre)
+        """
+        self.latencia_ms = latencia_ms
+        self.dispersao = dispersao
+        self.ms_por_token = ms_por_token
+        self.taxa_erro = taxa_erro
+        self.taxa_429 = taxa_429
+        self.retry_after = retry_after
+        self.limite_rpm = limite_rpm
+        self.porta = porta
+        self._rng = random.Random(semente)
+        self._lock = threading.Lock()
+        self._servidor = None
+        self._cota = float(limite_rpm)
+        self._ultima_recarga = time.monotonic()
+        self.zerar_estatisticas()
+
+    @property
+    def url(self):
+        """Endereço base para GROQ_BASE_URL."""
+        return f"http://127.0.0.1:{self._servidor.server_address[1]}"
+
+    def iniciar(self):
+        """Inicia o servidor em uma thread e retorna o endereço base."""
+        servidor = self
+
+        class Manipulador(_Manipulador):
+            pass
+        Manipulador.servidor = servidor
+
+        self._servidor = ThreadingHTTPServer(("127.0.0.1", self.porta), Manipulador)
+        self._servidor.daemon_threads = True
+        threading.Thread(target=self._servidor.serve_forever, name="servidor-llm-falso", daemon=True).start()
+        return self.url
+
+    def parar(self):
+        """Encerra o servidor."""
+        if self._servidor is not None:
+            self._servidor.shutdown()
+            self._servidor.server_close()
+            self._servidor = None
+
+    def zerar_estatisticas(self):
+        """Zera os contadores (ex.: entre os casos de um benchmark)."""
+        with self._lock:
+            self._estatisticas = {
+                "requisicoes": 0,
+                "por_tipo": {},
+                "erros_5xx": 0,
+                "respostas_429": 0,
+                "streams": 0,
+                "streams_interrompidos": 0,
+                "tokens_prompt": 0,
+                "tokens_completacao": 0
+            }
+
+    def estatisticas(self):
+        """Cópia dos contadores desde a última zerar_estatisticas."""
+        with self._lock:
+            return json.loads(json.dumps(self._estatisticas))
+
+    def _contar(self, chave, quantidade=1):
+        """Método privado que incrementa um contador."""
+        with self._lock:
+            self._estatisticas[chave] += quantidade
+
+    def _sortear_falha(self):
+        """Método privado que decide se a requisição falha; retorna (status, retry_after) ou None."""
+        with self._lock:
+            if self.limite_rpm:
+                agora = time.monotonic()
+                self._cota = min(self.limite_rpm,
+                                 self._cota + (agora - self._ultima_recarga) * self.limite_rpm / 60.0)
+                self._ultima_recarga = agora
+                if self._cota < 1:
+                    return 429, (1 - self._cota) * 60.0 / self.limite_rpm
+                self._cota -= 1
+            sorteio = self._rng.random()
+        if sorteio < self.taxa_429:
+            return 429, self.retry_after
+        if sorteio < self.taxa_429 + self.taxa_erro:
+            return 500, None
+        return None
+
+    def _sortear_latencia(self):
+        """Método privado que sorteia o tempo até o primeiro token, em segundos."""
+        with self._lock:
+            fator = math.exp(self._rng.gauss(0.0, self.dispersao)) if self.dispersao > 0 else 1.0
+        return self.latencia_ms * fator / 1000.0
+
+    def _nomes(self, semente):
+        """Método privado que cria um gerador de nomes reprodutível para uma resposta."""
+        with self._lock:
+            return random.Random(f"{semente}-{self._rng.random()}")
+
+    def responder(self, prompt):
+        """Gera (tipo, texto) da resposta para o prompt."""
+        if "Avalie cada um" in prompt:
+            blocos = re.split(r"### Código (\d+)", prompt)[1:]
+            notas = [
+                dict(id=int(numero), **_notas(codigo))
+                for numero, codigo in zip(blocos[0::2], blocos[1::2])
+            ]
+            return "avaliacao_lote", json.dumps(notas, ensure_ascii=False)
+        if "Avalie o código" in prompt:
+            codigo = prompt.split("Código:", 1)[-1]
+            return "avaliacao", json.dumps(_notas(codigo), ensure_ascii=False)
+        if "variações" in prompt:
+            quantidade = re.search(r"crie (\d+) variações", prompt)
+            quantidade = int(quantidade.group(1)) if quantidade else 5
+            codigo = _trecho(prompt, "Código base:")
+            linguagem = re.search(r"algoritmo em (\w+)", prompt)
+            linguagem = linguagem.group(1) if linguagem else "python"
+            rng = self._nomes(codigo)
+            blocos = [f"Variação {i + 1}:\n```{linguagem}\n{_variar(codigo, rng)}\n```"
+                      for i in range(quantidade)]
+            return "variacoes", "\n\n".join(blocos) + EXPLICACAO
+        if "Combine os dois algoritmos" in prompt:
+            codigo = _trecho(prompt, "Algoritmo 1:", "Algoritmo 2:")
+            return "cruzamento", f"```python\n{_variar(codigo, self._nomes(codigo))}\n```" + EXPLICACAO
+        codigo = _trecho(prompt, "Código:")
+        return "mutacao", f"```python\n{_variar(codigo, self._nomes(codigo))}\n```" + EXPLICACAO
+
+
+class _Manipulador(BaseHTTPRequestHandler):
+    """Atende POST .../chat/completions com o ServidorLLMFalso da classe."""
+    servidor = None
+    protocol_version = "HTTP/1.1"
+
+    def log_message(self, *args):
+        pass
+
+    def do_POST(self):
+        tamanho = int(self.headers.get("content-length", 0))
+        corpo = json.loads(self.rfile.read(tamanho) or b"{}")
+        servidor = self.servidor
+        servidor._contar("requisicoes")
+        if not self.path.endswith("/chat/completions"):
+            self._enviar_json(404, {"error": {"message": "rota desconhecida", "type": "not_found"}})
+            return
+
+        falha = servidor._sortear_falha()
+        if falha is not None:
+            status, espera = falha
+            if status == 429:
+                servidor._contar("respostas_429")
+                self._enviar_json(429, {"error": {"message": "Rate limit reached", "type": "rate_limit"}},
+                                  {"retry-after": f"{espera:.3f}"})
+            else:
+                servidor._contar("erros_5xx")
+                self._enviar_json(500, {"error": {"message": "falha simulada", "type": "server_error"}})
+            return
+
+        prompt = (corpo.get("messages") or [{}])[-1].get("content") or ""
+        tipo, texto = servidor.responder(prompt)
+        with servidor._lock:
+            servidor._estatisticas["por_tipo"][tipo] = servidor._estatisticas["por_tipo"].get(tipo, 0) + 1
+
+        texto, motivo = _aplicar_limites(texto, corpo.get("stop"), corpo.get("max_tokens"))
+        uso = {
+            "prompt_tokens": len(prompt) // 4 + 8,
+            "completion_tokens": len(texto) // 4 + 1,
+        }
+        uso["total_tokens"] = uso["prompt_tokens"] + uso["completion_tokens"]
+
+        time.sleep(servidor._sortear_latencia())
+        if corpo.get("stream"):
+            self._enviar_stream(corpo, texto, motivo, uso)
+        else:
+            time.sleep(uso["completion_tokens"] * servidor.ms_por_token / 1000.0)
+            servidor._contar("tokens_prompt", uso["prompt_tokens"])
+            servidor._contar("tokens_completacao", uso["completion_tokens"])
+            self._enviar_json(200, {
+                "id": "chatcmpl-falso",
+                "object": "chat.completion",
+                "created": int(time.time()),
+                "model": corpo.get("model", ""),
+                "choices": [{"index": 0, "message": {"role": "assistant", "content": texto},
+                             "finish_reason": motivo}],
+                "usage": uso
+            })
+
+    def _enviar_json(self, status, dados, headers=None):
+        """Método privado que envia uma resposta JSON completa."""
+        conteudo = json.dumps(dados, ensure_ascii=False).encode("utf-8")
+        self.send_response(status)
+        self.send_header("content-type", "application/json")
+        self.send_header("content-length", str(len(conteudo)))
+        for nome, valor in (headers or {}).items():
+            self.send_header(nome, valor)
+        self.end_headers()
+        self.wfile.write(conteudo)
+
+    def _enviar_stream(self, corpo, texto, motivo, uso):
+        """Método privado que envia a resposta em trechos SSE, no ritmo de geração configurado."""
+        servidor = self.servidor
+        servidor._contar("streams")
+        servidor._contar("tokens_prompt", uso["prompt_tokens"])
+        self.send_response(200)
+        self.send_header("content-type", "text/event-stream")
+        # Sem content-length: a conexão termina junto com o stream
+        self.send_header("connection", "close")
+        self.end_headers()
+        self.close_connection = True
+
+        base = {"id": "chatcmpl-falso", "object": "chat.completion.chunk",
+                "created": int(time.time()), "model": corpo.get("model", "")}
+        # Cerca de 4 tokens (16 caracteres) por trecho
+        trechos = [texto[i:i + 16] for i in range(0, len(texto), 16)]
+        try:
+            for trecho in trechos:
+                time.sleep(4 * servidor.ms_por_token / 1000.0)
+                evento = dict(base, choices=[{"index": 0, "delta": {"content": trecho}, "finish_reason": None}])
+                self.wfile.write(b"data: " + json.dumps(evento, ensure_ascii=False).encode("utf-8") + b"\n\n")
+                self.wfile.flush()
+                servidor._contar("tokens_completacao", max(1, len(trecho) // 4))
+            final = dict(base, choices=[{"index": 0, "delta": {}, "finish_reason": motivo}],
+                         x_groq={"id": "req-falso", "usage": uso})
+            self.wfile.write(b"data: " + json.dumps(final).encode("utf-8") + b"\n\ndata: [DONE]\n\n")
+            self.wfile.flush()
+        except (BrokenPipeError, ConnectionResetError):
+            # O cliente fechou o stream ao encontrar o que precisava
+            servidor._contar("streams_interrompidos")
+
+
+def _aplicar_limites(texto, parada, max_tokens):
+    """Corta o texto na primeira sequência de parada e em max_tokens; retorna (texto, finish_reason)."""
+    if isinstance(parada, str):
+        parada = [parada]
+    for sequencia in parada or []:
+        posicao = texto.find(sequencia)
+        if posicao != -1:
+            texto = texto[:posicao]
+    if max_tokens and len(texto) > max_tokens * 4:
+        return texto[:max_tokens * 4], "length"
+    return texto, "stop"
+
+
+def _trecho(prompt, inicio, fim="⚠️"):
+    """Extrai o código do prompt entre dois marcadores, sem as cercas ``` que houver."""
+    trecho = prompt.split(inicio, 1)[-1].split(fim, 1)[0]
+    # Filhos ainda não triados chegam com a resposta inteira do modelo
+    bloco = re.search(r"```[\w+-]*\n(.*?)```", trecho, re.DOTALL)
+    return (bloco.group(1) if bloco else trecho).strip()
+
+
+def _notas(codigo):
+    """Notas determinísticas por código: o mesmo código sempre recebe as mesmas notas."""
+    codigo = codigo.strip().strip("`").strip()
+    rng = random.Random(hashlib.sha256(codigo.encode("utf-8")).hexdigest())
+    linhas = max(1, len([l for l in codigo.splitlines() if l.strip()]))
+    return {
+        "eficiencia": max(10, min(100, 90 - linhas + rng.randint(-15, 10))),
+        "clareza": rng.randint(50, 95),
+        "boas_praticas": rng.randint(45, 95)
+    }
+
+
+def _variar(codigo, rng):
+    """Cópia do código com variáveis locais renomeadas e um comando inócuo a mais.
+
+    Códigos que não são Python válido voltam sem alterações.
+    """
+    try:
+        arvore = ast.parse(codigo)
+    except SyntaxError:
+        return codigo
+
+    reservados = set(dir(builtins))
+    locais = set()
+    for no in ast.walk(arvore):
+        if isinstance(no, ast.FunctionDef):
+            locais.update(a.arg for a in no.args.args)
+        elif isinstance(no, ast.Name) and isinstance(no.ctx, ast.Store):
+            locais.add(no.id)
+    novos = {}
+    for nome in sorted(locais - reservados):
+        novos[nome] = "".join(rng.choice("abcdefghijklmnopqrstuvwxyz") for _ in range(rng.randint(4, 9)))
+
+    for no in ast.walk(arvore):
+        if isinstance(no, ast.Name) and no.id in novos:
+            no.id = novos[no.id]
+        elif isinstance(no, ast.arg) and no.arg in novos:
+            no.arg = novos[no.arg]
+        elif isinstance(no, ast.FunctionDef) and no.body:
+            # Comando sem efeito após a docstring, com nome e valor sorteados
+            inocuo = ast.parse(f"_{rng.choice('xyzw')}{rng.randint(0, 999)} = {rng.randint(0, 10 ** 6)}").body[0]
+            posicao = 1 if isinstance(no.body[0], ast.Expr) and isinstance(
+                getattr(no.body[0], "value", None), ast.Constant) else 0
+            no.body.insert(posicao, inocuo)
+    return ast.unparse(ast.fix_missing_locations(arvore))
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--porta", type=int, default=8765)
+    parser.add_argument("--latencia-ms", type=float, default=150.0, help="mediana até o primeiro token")
+    parser.add_argument("--dispersao", type=float, default=0.5, help="desvio do log da latência")
+    parser.add_argument("--ms-por-token", type=float, default=1.0, help="velocidade de geração")
+    parser.add_argument("--taxa-erro", type=float, default=0.0, help="fração de respostas 500")
+    parser.add_argument("--taxa-429", type=float, default=0.0, help="fração de respostas 429")
+    parser.add_argument("--retry-after", type=float, default=1.0, help="Retry-After das respostas 429")
+    parser.add_argument("--limite-rpm", type=int, default=0, help="requisições por minuto (0 = sem limite)")
+    parser.add_argument("--semente", type=int, default=0)
+    args = parser.parse_args()
+
+    servidor = ServidorLLMFalso(
+        latencia_ms=args.latencia_ms, dispersao=args.dispersao, ms_por_token=args.ms_por_token,
+        taxa_erro=args.taxa_erro, taxa_429=args.taxa_429, retry_after=args.retry_after,
+        limite_rpm=args.limite_rpm, semente=args.semente, porta=args.porta
+    )
+    print(f"[INFO] Servidor falso em {servidor.iniciar()} (Ctrl+C para encerrar)")
+    try:
+        while True:
+            time.sleep(5)
+    except KeyboardInterrupt:
+        print(f"[INFO] Estatísticas: {json.dumps(servidor.estatisticas(), ensure_ascii=False)}")
+        servidor.parar()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,131 @@
+#!/usr/bin/env python3
+"""Mede o tempo de inicialização a frio dos pontos de entrada da aplicação.
+
+Cada caso roda em um interpretador novo com `python -X importtime`. O script
+falha (código de saída 1) se a mediana passar do limite do caso ou se algum
+módulo pesado for importado antes do primeiro uso.
+
+Uso:
+    python benchmarks/tempo_importacao.py [--repeticoes 5] [--escala 1.0] [--json]
+"""
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+
+RAIZ = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# nome → (código executado, módulos que não podem ser carregados, limite em ms)
+CASOS = {
+    # run.py só verifica o ambiente e inicia o servidor em outro processo
+    "run": (
+        "import run\nrun.verificar_ambiente()",
+        ["streamlit", "groq", "pandas", "matplotlib", "numpy"],
+        150
+    ),
+    # O que main.py carrega antes de desenhar a página
+    "pagina": (
+        "import streamlit\nimport view.streamlit_view\nimport controller.execucao_simulacao",
+        ["groq", "httpx", "pandas", "matplotlib", "controller.simulacao_controller"],
+        900
+    ),
+    # O controlador é importado ao iniciar a primeira simulação; o SDK, na primeira chamada
+    "controlador": (
+        "import controller.simulacao_controller",
+        ["groq", "httpx", "pandas", "matplotlib"],
+        300
+    ),
+}
+
+
+def _importacoes(stderr):
+    """Lê a saída de -X importtime; retorna [(nome, profundidade, µs cumulativos)]."""
+    registros = []
+    for linha in stderr.splitlines():
+        if not linha.startswith("import time:") or "cumulative" in linha:
+            continue
+        _, cumulativo, nome = linha[len("import time:"):].split("|")
+        profundidade = (len(nome) - len(nome.lstrip())) // 2
+        registros.append((nome.strip(), profundidade, int(cumulativo)))
+    return registros
+
+
+def _executar(codigo):
+    """Roda o código em um interpretador novo com -X importtime."""
+    return subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", codigo],
+        cwd=RAIZ, capture_output=True, text=True, check=True
+    )
+
+
+def medir(codigo, proibidos, importados_na_partida):
+    """Executa um caso; retorna (ms, maiores importações, proibidos carregados)."""
+    # json e sys são importados depois, para não entrarem na medição
+    script = (
+        "import time as _tempo\n"
+        "_inicio = _tempo.perf_counter()\n"
+        f"{codigo}\n"
+        "_ms = (_tempo.perf_counter() - _inicio) * 1000\n"
+        "import json, sys\n"
+        f"print(json.dumps({{'ms': _ms, 'carregados': [m for m in {proibidos!r} if m in sys.modules]}}))\n"
+    )
+    processo = _executar(script)
+    saida = json.loads(processo.stdout.strip().splitlines()[-1])
+
+    # Módulos de primeiro e segundo nível importados pelo caso (sem os da partida do interpretador)
+    maiores = sorted(
+        ((us, nome) for nome, profundidade, us in _importacoes(processo.stderr)
+         if profundidade <= 1 and nome not in importados_na_partida),
+        reverse=True
+    )[:5]
+    return saida["ms"], [(nome, us / 1000) for us, nome in maiores], saida["carregados"]
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--repeticoes", type=int, default=5, help="execuções por caso (usa a mediana)")
+    parser.add_argument("--escala", type=float, default=1.0, help="multiplica os limites (máquinas lentas)")
+    parser.add_argument("--json", action="store_true", help="imprime o resultado em JSON")
+    args = parser.parse_args()
+
+    importados_na_partida = {nome for nome, _, _ in _importacoes(_executar("import time, json, sys").stderr)}
+
+    resultados = {}
+    falhou = False
+    for nome, (codigo, proibidos, limite) in CASOS.items():
+        tempos = []
+        for _ in range(max(1, args.repeticoes)):
+            ms, maiores, carregados = medir(codigo, proibidos, importados_na_partida)
+            tempos.append(ms)
+        mediana = statistics.median(tempos)
+        limite_ms = limite * args.escala
+        ok = mediana <= limite_ms and not carregados
+        falhou = falhou or not ok
+        resultados[nome] = {
+            "mediana_ms": round(mediana, 1),
+            "minimo_ms": round(min(tempos), 1),
+            "limite_ms": round(limite_ms, 1),
+            "maiores_importacoes": [{"modulo": m, "ms": round(t, 1)} for m, t in maiores],
+            "proibidos_carregados": carregados,
+            "ok": ok
+        }
+
+    if args.json:
+        print(json.dumps(resultados, indent=2, ensure_ascii=False))
+    else:
+        for nome, r in resultados.items():
+            estado = "OK" if r["ok"] else "FALHOU"
+            print(f"[{estado}] {nome}: {r['mediana_ms']:.1f} ms (mín. {r['minimo_ms']:.1f}, "
+                  f"limite {r['limite_ms']:.0f})")
+            for item in r["maiores_importacoes"]:
+                print(f"    {item['ms']:8.1f} ms  {item['modulo']}")
+            if r["proibidos_carregados"]:
+                print(f"    carregados cedo demais: {', '.join(r['proibidos_carregados'])}")
+
+    return 1 if falhou else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
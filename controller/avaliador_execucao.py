@@ -0,0 +1,183 @@
+import asyncio
+import hashlib
+import math
+import threading
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from controller.avaliador_service import AvaliadorService
+from controller.sandbox import PoolSandbox, encontrar_funcao_alvo, gerar_entradas
+
+
+class AvaliadorExecucao(AvaliadorService):
+    """Avaliador que mede a eficiência executando o código candidato.
+
+    Responsabilidades:
+    - Executar cada candidato em um pool de workers isolados e com recursos limitados
+    - Converter tempo de parede e pico de memória na nota de eficiência
+    - Manter as notas de clareza e boas práticas do AvaliadorService
+
+    Sem um `pool`, o avaliador cria o seu na primeira medição e o encerra em
+    fechar(); se o sandbox não iniciar, a eficiência estimada pela API é mantida.
+    """
+    # Medições memorizadas; as menos usadas saem primeiro (LRU)
+    MAX_MEDICOES = 2048
+
+    def __init__(self, max_concorrencia=8, cache=None, pool=None,
+                 caminho_referencia="./utils/algoritmo_original.py", peso_tempo=0.8, repeticoes=5,
+                 caminho_historico="./utils/historico_avaliacoes.jsonl", num_workers=None):
+        super().__init__(max_concorrencia=max_concorrencia, cache=cache, caminho_historico=caminho_historico)
+        self.pool = pool
+        # Um pool recebido pertence a quem o criou e não é encerrado em fechar()
+        self._pool_proprio = pool is None
+        self.num_workers = num_workers
+        # Verdadeiro se o pool não pôde ser iniciado; a medição fica desativada
+        self.sandbox_indisponivel = False
+        self.caminho_referencia = caminho_referencia
+        self.peso_tempo = peso_tempo
+        self.repeticoes = repeticoes
+        self._medicoes = OrderedDict()
+        self._referencia = None
+        self._lock = threading.Lock()
+        self._lock_referencia = threading.Lock()
+
+    def _obter_notas_algoritmo(self, codigo):
+        """Substitui a eficiência estimada pela medida na execução, quando possível."""
+        notas = dict(super()._obter_notas_algoritmo(codigo))
+        return self._com_eficiencia_medida(notas, self.calcular_eficiencia(codigo))
+
+    async def _obter_notas_algoritmo_async(self, codigo):
+        """Versão assíncrona: a medição espera o pool em uma thread, fora do event loop."""
+        notas, eficiencia = await asyncio.gather(
+            super()._obter_notas_algoritmo_async(codigo),
+            asyncio.to_thread(self.calcular_eficiencia, codigo)
+        )
+        return self._com_eficiencia_medida(dict(notas), eficiencia)
+
+    def _obter_notas_lote(self, codigos):
+        """Versão em lote: mede cada código enquanto o lote é avaliado pela API."""
+        with ThreadPoolExecutor(max_workers=min(self.max_concorrencia, len(codigos))) as executor:
+            eficiencias = executor.map(self.calcular_eficiencia, codigos)
+            notas = super()._obter_notas_lote(codigos)
+            return [self._com_eficiencia_medida(dict(n), e) for n, e in zip(notas, eficiencias)]
+
+    async def _obter_notas_lote_async(self, codigos):
+        """Versão assíncrona em lote: as medições esperam o pool em threads."""
+        notas, *eficiencias = await asyncio.gather(
+            super()._obter_notas_lote_async(codigos),
+            *(asyncio.to_thread(self.calcular_eficiencia, c) for c in codigos)
+        )
+        return [self._com_eficiencia_medida(dict(n), e) for n, e in zip(notas, eficiencias)]
+
+    @staticmethod
+    def _com_eficiencia_medida(notas, eficiencia):
+        """Método privado que aplica a eficiência medida às notas, se houver."""
+        if eficiencia is not None:
+            print(f"[DEBUG] Eficiência medida na execução: {eficiencia}")
+            notas["eficiencia"] = eficiencia
+        return notas
+
+    def calcular_eficiencia(self, codigo):
+        """Retorna a nota de eficiência (0 a 100) medida na execução, ou None se não for possível."""
+        referencia = self._obter_referencia()
+        if referencia is not None:
+            nome_funcao, entradas, medicao_ref = referencia
+        else:
+            alvo = encontrar_funcao_alvo(codigo)
+            if alvo is None:
+                return None
+            nome_funcao, entradas, medicao_ref = alvo[0], gerar_entradas(alvo[1]), None
+
+        medicao = self.medir(codigo, entradas, nome_funcao)
+        if medicao is None or not medicao["ok"]:
+            return None if medicao is None else 0.0
+
+        total = len(medicao["saidas"])
+        sucessos = total - medicao["erros"]
+        if sucessos == 0:
+            return 0.0
+
+        if medicao_ref is not None and medicao_ref["ok"] and medicao_ref["tempo"] > 0:
+            nota_tempo = self._nota_relativa(medicao_ref["tempo"], medicao["tempo"])
+            nota_memoria = self._nota_relativa(medicao_ref["memoria_pico"] + 1, medicao["memoria_pico"] + 1)
+        else:
+            # Sem referência: escala absoluta pelo tempo médio por chamada (1µs → 100, 1s → 25)
+            tempo_medio_us = max(medicao["tempo"] / sucessos * 1e6, 1.0)
+            nota_tempo = 100 - 12.5 * math.log10(tempo_medio_us)
+            nota_memoria = 100 - 12.5 * math.log10(max(medicao["memoria_pico"], 1000) / 1000)
+
+        nota = self.peso_tempo * nota_tempo + (1 - self.peso_tempo) * nota_memoria
+        nota = max(0.0, min(100.0, nota))
+        # Entradas que quebram o candidato reduzem a nota proporcionalmente
+        return round(nota * sucessos / total, 1)
+
+    def medir(self, codigo, entradas, nome_funcao=None):
+        """Executa o código no sandbox e retorna a medição (memorizada por conteúdo)."""
+        if encontrar_funcao_alvo(codigo) is None:
+            return None
+
+        chave = hashlib.sha256(f"{nome_funcao}\0{entradas!r}\0{codigo}".encode("utf-8")).hexdigest()
+        with self._lock:
+            if chave in self._medicoes:
+                self._medicoes.move_to_end(chave)
+                return self._medicoes[chave]
+
+        pool = self._obter_pool()
+        if pool is None:
+            return None
+        medicao = pool.executar(
+            codigo, entradas, nome_funcao,
+            repeticoes=self.repeticoes, medir_memoria=True
+        )
+        with self._lock:
+            self._medicoes[chave] = medicao
+            while len(self._medicoes) > self.MAX_MEDICOES:
+                self._medicoes.popitem(last=False)
+        return medicao
+
+    def fechar(self):
+        """Encerra o pool de workers criado pelo avaliador."""
+        with self._lock:
+            # A próxima execução tenta iniciar o sandbox de novo
+            self.sandbox_indisponivel = False
+            if self.pool is not None and self._pool_proprio:
+                self.pool.fechar()
+                self.pool = None
+
+    def _obter_pool(self):
+        """Método privado que cria o pool de workers na primeira utilização; retorna None se ele não iniciar."""
+        with self._lock:
+            if self.pool is None and not self.sandbox_indisponivel:
+                try:
+                    self.pool = PoolSandbox(num_workers=self.num_workers)
+                except Exception as e:
+                    print(f"[ERRO] Não foi possível iniciar o sandbox de execução: {str(e)}. "
+                          f"A eficiência medida está desativada nesta execução")
+                    self.sandbox_indisponivel = True
+            return self.pool
+
+    def _obter_referencia(self):
+        """Método privado que mede o algoritmo original usado como referência."""
+        try:
+            with open(self.caminho_referencia, "r", encoding="utf-8") as f:
+                codigo_ref = f.read()
+        except OSError:
+            return None
+
+        # Apenas uma thread mede a referência; as demais aguardam o resultado
+        with self._lock_referencia:
+            if self._referencia is not None and self._referencia[0] == codigo_ref:
+                return self._referencia[1]
+
+            alvo = encontrar_funcao_alvo(codigo_ref)
+            if alvo is None:
+                return None
+            nome_funcao, parametros = alvo
+            entradas = gerar_entradas(parametros)
+            medicao = self.medir(codigo_ref, entradas, nome_funcao)
+            self._referencia = (codigo_ref, (nome_funcao, entradas, medicao))
+            return self._referencia[1]
+
+    @staticmethod
+    def _nota_relativa(referencia, candidato):
+        """Nota em escala log2: igual à referência → 50, 2x melhor → 75, 2x pior → 25."""
+        return 50 + 25 * math.log2(referencia / max(candidato, 1e-12))
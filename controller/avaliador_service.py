@@ -1,61 +1,452 @@
+import asyncio
+import contextvars
+import itertools
 import os
 import json
 import re
-import time
-from groq import Groq
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime
 from controller.interfaces import IAvaliador
+from controller.cache_avaliacoes import CacheAvaliacoes
+from controller.cliente_llm import obter_cliente_llm
+from controller.detector_resposta import DetectorJSON
+from model.historico import GravadorHistorico, iterar_historico
+from model.historico_colunar import HistoricoColunar
+from model.orcamento import OrcamentoEsgotado
 
 class AvaliadorService(IAvaliador):
-    def __init__(self):
+    # Incrementar sempre que o prompt de avaliação mudar, invalidando o cache.
+    # O prompt em lote pede os mesmos critérios e escala e compartilha a versão.
+    VERSAO_PROMPT = "1"
+    CRITERIOS = ("eficiencia", "clareza", "boas_praticas")
+    # Tokens de resposta por candidato no prompt em lote (um objeto JSON curto)
+    TOKENS_RESPOSTA_POR_CANDIDATO = 40
+    # Sequência de parada da avaliação individual: o servidor para de gerar ao
+    # fechar o objeto de notas (a própria "}" não é devolvida)
+    PARADA_AVALIACAO = ["}"]
+    # Registros do arquivo convertidos para colunas de cada vez em carregar_historico
+    BLOCO_CARREGAMENTO = 1000
+
+    def __init__(self, max_concorrencia=8, cache=None, caminho_historico="./utils/historico_avaliacoes.jsonl",
+                 max_candidatos_lote=8, orcamento_tokens_lote=3000):
         self.api_key = os.getenv("GROQ_API_KEY")
-        self.client = Groq(api_key=self.api_key) if self.api_key else None
+        cliente = obter_cliente_llm(self.api_key)
+        # Sem chave, a API só é usada se um cassete responder no lugar dela
+        self.cliente = cliente if self.api_key or cliente.reproduzindo else None
         self.model = "llama-3.1-8b-instant"
+        # Avaliações feitas por este avaliador; as carregadas de arquivo ficam só no colunar
         self.historico_avaliacoes = []
+        # Todas as avaliações em colunas NumPy, com o código, para agregações por geração
+        self.historico_colunar = HistoricoColunar()
+        self.caminho_historico = caminho_historico
+        # Caminho → (gravador, quantidade de historico_avaliacoes já gravadas)
+        self._gravadores = {}
+        # Registros que já estavam no arquivo carregado por carregar_historico
+        self._registros_carregados = 0
         self.geracao_atual = 0
-        self.modo_offline = self.api_key is None
+        self.modo_offline = self.cliente is None
+        # Tentativas extras apenas para respostas que não puderam ser interpretadas;
+        # falhas de rede e 429 são repetidas pelo ClienteLLM com backoff
         self.max_retries = 3
-        self.retry_delay = 2
+        # Número máximo de avaliações simultâneas em avaliar_lote
+        self.max_concorrencia = max(1, max_concorrencia)
+        # Candidatos avaliados na mesma requisição (1 desativa o prompt em lote)
+        self.max_candidatos_lote = max(1, max_candidatos_lote)
+        # Tokens estimados (prompt + resposta) de cada requisição em lote
+        self.orcamento_tokens_lote = orcamento_tokens_lote
+        self.cache = cache if cache is not None else self._criar_cache_padrao()
 
     def avaliar(self, algoritmo):
         """Avalia um algoritmo e atualiza seu fitness e métricas."""
         try:
             # Obtém as notas do algoritmo usando a API
             notas = self._obter_notas_algoritmo(algoritmo.codigo)
-            
-            # Calcula o fitness como média das notas
-            fitness = round((notas["eficiencia"] + notas["clareza"] + notas["boas_praticas"]) / 3)
-            
-            # Atualiza o algoritmo com as notas obtidas
-            algoritmo.set_fitness(fitness)
-            algoritmo.set_metricas({
-                "eficiencia": notas["eficiencia"],
-                "clareza": notas["clareza"],
-                "boas_praticas": notas["boas_praticas"]
-            })
+            self._aplicar_notas(algoritmo, notas)
+        except Exception as e:
+            self._aplicar_notas_minimas(algoritmo, e)
 
-            # Salva a avaliação no histórico
-            self._registrar_avaliacao(algoritmo)
+    async def avaliar_async(self, algoritmo):
+        """Versão assíncrona de avaliar, sem bloquear o event loop durante a chamada à API."""
+        try:
+            notas = await self._obter_notas_algoritmo_async(algoritmo.codigo)
+            self._aplicar_notas(algoritmo, notas)
+        except Exception as e:
+            self._aplicar_notas_minimas(algoritmo, e)
 
-            print(f"[DEBUG] Fitness calculado: {algoritmo.get_fitness()}")
+    def avaliar_lote(self, algoritmos):
+        """Avalia vários algoritmos em paralelo, limitado por max_concorrencia.
 
-        except Exception as e:
-            print(f"[Erro ao avaliar algoritmo]: {str(e)}")
-            print(f"[DEBUG] Código que causou erro: {algoritmo.codigo}")
-            # Define um fitness mínimo para evitar o erro de seleção
-            algoritmo.set_fitness(1)
-            algoritmo.set_metricas({
-                "eficiencia": 1,
-                "clareza": 1,
-                "boas_praticas": 1
-            })
+        As chamadas à API são dominadas por espera de rede, então um pool de
+        threads mantém várias requisições em andamento ao mesmo tempo e o
+        tempo total tende ao da chamada mais lenta, e não à soma de todas.
+        """
+        algoritmos = list(algoritmos)
+        if not algoritmos:
+            return algoritmos
+
+        if self._usar_prompt_em_lote(algoritmos):
+            notas = self._obter_notas_lote([a.codigo for a in algoritmos])
+            self._aplicar_notas_lote(algoritmos, notas)
+            return algoritmos
+
+        num_workers = min(self.max_concorrencia, len(algoritmos))
+        if num_workers == 1:
+            for algoritmo in algoritmos:
+                self.avaliar(algoritmo)
+            return algoritmos
+
+        print(f"[DEBUG] Avaliando {len(algoritmos)} algoritmos com {num_workers} requisições simultâneas")
+        with ThreadPoolExecutor(max_workers=num_workers) as executor:
+            # avaliar já trata seus próprios erros; result() apenas aguarda o término.
+            # Cada tarefa leva uma cópia do contexto, com o orçamento e o rastreador da execução
+            futuros = [executor.submit(contextvars.copy_context().run, self.avaliar, algoritmo)
+                       for algoritmo in algoritmos]
+            for futuro in futuros:
+                futuro.result()
+
+        return algoritmos
+
+    async def avaliar_lote_async(self, algoritmos):
+        """Avalia vários algoritmos no event loop, com no máximo max_concorrencia ao mesmo tempo."""
+        algoritmos = list(algoritmos)
+        if self._usar_prompt_em_lote(algoritmos):
+            notas = await self._obter_notas_lote_async([a.codigo for a in algoritmos])
+            self._aplicar_notas_lote(algoritmos, notas)
+            return algoritmos
+
+        semaforo = asyncio.Semaphore(self.max_concorrencia)
+
+        async def avaliar_limitado(algoritmo):
+            async with semaforo:
+                await self.avaliar_async(algoritmo)
+
+        await asyncio.gather(*(avaliar_limitado(a) for a in algoritmos))
+        return algoritmos
+
+    def tamanho_lote_preferido(self):
+        """Quantos candidatos convém reunir em cada chamada de avaliar_lote."""
+        return 1 if self.modo_offline else self.max_candidatos_lote
+
+    def lotes_reprodutiveis(self):
+        """Com um cassete, os lotes precisam ter a mesma composição ao gravar e ao reproduzir."""
+        return self.cliente is not None and self.cliente.cassete is not None
+
+    def _usar_prompt_em_lote(self, algoritmos):
+        """Método privado que decide se os algoritmos são avaliados com prompts em lote."""
+        return not self.modo_offline and self.max_candidatos_lote > 1 and len(algoritmos) > 1
+
+    def _aplicar_notas(self, algoritmo, notas):
+        """Método privado que calcula o fitness, atualiza o algoritmo e registra a avaliação."""
+        # Calcula o fitness como média das notas
+        fitness = round((notas["eficiencia"] + notas["clareza"] + notas["boas_praticas"]) / 3)
+
+        # Atualiza o algoritmo com as notas obtidas
+        algoritmo.set_fitness(fitness)
+        algoritmo.set_metricas({
+            "eficiencia": notas["eficiencia"],
+            "clareza": notas["clareza"],
+            "boas_praticas": notas["boas_praticas"]
+        })
+
+        # Salva a avaliação no histórico
+        self._registrar_avaliacao(algoritmo)
+
+        print(f"[DEBUG] Fitness calculado: {algoritmo.get_fitness()}")
+
+    def _aplicar_notas_lote(self, algoritmos, notas):
+        """Método privado que aplica as notas de um lote, algoritmo por algoritmo."""
+        for algoritmo, notas_algoritmo in zip(algoritmos, notas):
+            try:
+                self._aplicar_notas(algoritmo, notas_algoritmo)
+            except Exception as e:
+                self._aplicar_notas_minimas(algoritmo, e)
+
+    def _aplicar_notas_minimas(self, algoritmo, erro):
+        """Método privado que atribui notas mínimas a um algoritmo cuja avaliação falhou."""
+        print(f"[Erro ao avaliar algoritmo]: {str(erro)}")
+        print(f"[DEBUG] Código que causou erro: {algoritmo.codigo}")
+        # Define um fitness mínimo para evitar o erro de seleção
+        algoritmo.set_fitness(1)
+        algoritmo.set_metricas({
+            "eficiencia": 1,
+            "clareza": 1,
+            "boas_praticas": 1
+        })
             
+    def _criar_cache_padrao(self):
+        """Método privado que cria o cache em disco, se possível."""
+        if self.modo_offline:
+            # Notas offline são aleatórias e não devem ser reaproveitadas
+            return None
+        try:
+            return CacheAvaliacoes()
+        except Exception as e:
+            print(f"[AVISO] Cache de avaliações desativado: {str(e)}")
+            return None
+
     def _obter_notas_algoritmo(self, codigo):
-        """Método privado para obter as notas de um algoritmo usando a API."""
+        """Método privado para obter as notas de um algoritmo, consultando o cache antes da API."""
         if self.modo_offline:
             return self._gerar_notas_offline(codigo)
-            
-        prompt = f"""
+
+        try:
+            if self.cache is None:
+                return self._consultar_api(codigo)
+            return self.cache.obter_ou_calcular(
+                codigo, self.model, self.VERSAO_PROMPT,
+                lambda: self._consultar_api(codigo)
+            )
+        except Exception as e:
+            print(f"[AVISO] {str(e)}, usando modo offline")
+            return self._gerar_notas_offline(codigo)
+
+    async def _obter_notas_algoritmo_async(self, codigo):
+        """Método privado, versão assíncrona de _obter_notas_algoritmo."""
+        if self.modo_offline:
+            return self._gerar_notas_offline(codigo)
+
+        try:
+            if self.cache is None:
+                return await self._consultar_api_async(codigo)
+            return await self.cache.obter_ou_calcular_async(
+                codigo, self.model, self.VERSAO_PROMPT,
+                lambda: self._consultar_api_async(codigo)
+            )
+        except Exception as e:
+            print(f"[AVISO] {str(e)}, usando modo offline")
+            return self._gerar_notas_offline(codigo)
+
+    def _obter_notas_lote(self, codigos):
+        """Método privado, versão em lote de _obter_notas_algoritmo; retorna as notas na ordem dos códigos."""
+        try:
+            if self.cache is None:
+                notas = self._consultar_api_lote(codigos)
+            else:
+                notas = self.cache.obter_ou_calcular_lote(
+                    codigos, self.model, self.VERSAO_PROMPT, self._consultar_api_lote
+                )
+        except Exception as e:
+            print(f"[AVISO] {str(e)}, usando modo offline")
+            notas = [None] * len(codigos)
+        return [n if n is not None else self._gerar_notas_offline(c) for c, n in zip(codigos, notas)]
+
+    async def _obter_notas_lote_async(self, codigos):
+        """Método privado, versão assíncrona de _obter_notas_lote."""
+        try:
+            if self.cache is None:
+                notas = await self._consultar_api_lote_async(codigos)
+            else:
+                notas = await self.cache.obter_ou_calcular_lote_async(
+                    codigos, self.model, self.VERSAO_PROMPT, self._consultar_api_lote_async
+                )
+        except Exception as e:
+            print(f"[AVISO] {str(e)}, usando modo offline")
+            notas = [None] * len(codigos)
+        return [n if n is not None else self._gerar_notas_offline(c) for c, n in zip(codigos, notas)]
+
+    def _consultar_api_lote(self, codigos):
+        """Método privado que avalia os códigos em requisições com vários candidatos cada.
+
+        Retorna uma lista alinhada aos códigos, com None para os que não
+        puderam ser avaliados nem individualmente.
+        """
+        resultados = [None] * len(codigos)
+
+        def avaliar_grupo(indices):
+            notas = self._avaliar_grupo([codigos[i] for i in indices])
+            for indice, notas_codigo in zip(indices, notas):
+                resultados[indice] = notas_codigo
+
+        grupos = self._empacotar(codigos)
+        if len(grupos) == 1:
+            avaliar_grupo(grupos[0])
+        else:
+            with ThreadPoolExecutor(max_workers=min(self.max_concorrencia, len(grupos))) as executor:
+                futuros = [executor.submit(contextvars.copy_context().run, avaliar_grupo, grupo)
+                           for grupo in grupos]
+                for futuro in futuros:
+                    futuro.result()
+        return resultados
+
+    async def _consultar_api_lote_async(self, codigos):
+        """Método privado, versão assíncrona de _consultar_api_lote."""
+        resultados = [None] * len(codigos)
+        semaforo = asyncio.Semaphore(self.max_concorrencia)
+
+        async def avaliar_grupo(indices):
+            async with semaforo:
+                notas = await self._avaliar_grupo_async([codigos[i] for i in indices])
+            for indice, notas_codigo in zip(indices, notas):
+                resultados[indice] = notas_codigo
+
+        await asyncio.gather(*(avaliar_grupo(g) for g in self._empacotar(codigos)))
+        return resultados
+
+    def _avaliar_grupo(self, codigos):
+        """Método privado que avalia um grupo em uma única requisição.
+
+        Candidatos ausentes ou inválidos na resposta (JSON quebrado, resposta
+        cortada) são divididos em duas metades e avaliados de novo; um candidato
+        sozinho usa o prompt individual, com suas próprias novas tentativas.
+        """
+        if len(codigos) == 1:
+            try:
+                return [self._consultar_api(codigos[0])]
+            except Exception as e:
+                print(f"[AVISO] Avaliação individual falhou: {str(e)}")
+                return [None]
+
+        print(f"[DEBUG] Enviando requisição em lote com {len(codigos)} candidatos para a API da Groq...")
+        try:
+            resposta = self.cliente.completar(
+                mensagens=[{"role": "user", "content": self._montar_prompt_lote(codigos)}],
+                modelo=self.model,
+                temperatura=0.3,
+                max_tokens=self._max_tokens_lote(len(codigos)),
+                detector=DetectorJSON("["),
+                operacao="avaliacao_lote"
+            ).texto
+            notas = self._interpretar_resposta_lote(resposta, len(codigos))
+        except OrcamentoEsgotado as e:
+            # Dividir o grupo só geraria mais recusas
+            print(f"[AVISO] {str(e)}")
+            return [None] * len(codigos)
+        except Exception as e:
+            print(f"[AVISO] Avaliação em lote falhou: {str(e)}")
+            notas = {}
+
+        faltando = [i for i in range(len(codigos)) if i not in notas]
+        for metade in self._dividir(faltando, len(codigos)):
+            for indice, notas_codigo in zip(metade, self._avaliar_grupo([codigos[i] for i in metade])):
+                notas[indice] = notas_codigo
+        return [notas.get(i) for i in range(len(codigos))]
+
+    async def _avaliar_grupo_async(self, codigos):
+        """Método privado, versão assíncrona de _avaliar_grupo; as metades são avaliadas em paralelo."""
+        if len(codigos) == 1:
+            try:
+                return [await self._consultar_api_async(codigos[0])]
+            except Exception as e:
+                print(f"[AVISO] Avaliação individual falhou: {str(e)}")
+                return [None]
+
+        print(f"[DEBUG] Enviando requisição em lote com {len(codigos)} candidatos para a API da Groq...")
+        try:
+            resposta = (await self.cliente.completar_async(
+                mensagens=[{"role": "user", "content": self._montar_prompt_lote(codigos)}],
+                modelo=self.model,
+                temperatura=0.3,
+                max_tokens=self._max_tokens_lote(len(codigos)),
+                detector=DetectorJSON("["),
+                operacao="avaliacao_lote"
+            )).texto
+            notas = self._interpretar_resposta_lote(resposta, len(codigos))
+        except OrcamentoEsgotado as e:
+            # Dividir o grupo só geraria mais recusas
+            print(f"[AVISO] {str(e)}")
+            return [None] * len(codigos)
+        except Exception as e:
+            print(f"[AVISO] Avaliação em lote falhou: {str(e)}")
+            notas = {}
+
+        faltando = [i for i in range(len(codigos)) if i not in notas]
+        metades = self._dividir(faltando, len(codigos))
+        reavaliadas = await asyncio.gather(
+            *(self._avaliar_grupo_async([codigos[i] for i in metade]) for metade in metades)
+        )
+        for metade, notas_metade in zip(metades, reavaliadas):
+            for indice, notas_codigo in zip(metade, notas_metade):
+                notas[indice] = notas_codigo
+        return [notas.get(i) for i in range(len(codigos))]
+
+    @staticmethod
+    def _dividir(faltando, tamanho_grupo):
+        """Método privado que divide os candidatos sem notas em duas metades para nova tentativa."""
+        if not faltando:
+            return []
+        print(f"[AVISO] Resposta em lote sem notas válidas para {len(faltando)} de {tamanho_grupo} "
+              f"candidatos; dividindo o lote")
+        meio = (len(faltando) + 1) // 2
+        return [parte for parte in (faltando[:meio], faltando[meio:]) if parte]
+
+    def _empacotar(self, codigos):
+        """Método privado que agrupa os índices dos códigos respeitando o orçamento de tokens.
+
+        Cada grupo tem no máximo max_candidatos_lote códigos; um código que
+        sozinho passa do orçamento forma um grupo próprio.
+        """
+        base = len(self._montar_prompt_lote([])) // 4
+        grupos = []
+        grupo, custo = [], base
+        for indice, codigo in enumerate(codigos):
+            custo_codigo = len(codigo) // 4 + 20 + self.TOKENS_RESPOSTA_POR_CANDIDATO
+            if grupo and (len(grupo) >= self.max_candidatos_lote
+                          or custo + custo_codigo > self.orcamento_tokens_lote):
+                grupos.append(grupo)
+                grupo, custo = [], base
+            grupo.append(indice)
+            custo += custo_codigo
+        if grupo:
+            grupos.append(grupo)
+        return grupos
+
+    def _max_tokens_lote(self, quantidade):
+        """Método privado com o limite de tokens da resposta de um lote."""
+        return self.TOKENS_RESPOSTA_POR_CANDIDATO * quantidade + 20
+
+    def _consultar_api(self, codigo):
+        """Método privado que consulta a API; lança exceção se todas as tentativas falharem."""
+        prompt = self._montar_prompt(codigo)
+
+        # Implementação com retry para respostas mal formatadas
+        for tentativa in range(self.max_retries):
+            print("[DEBUG] Enviando requisição para a API da Groq...")
+            resposta = self.cliente.completar(
+                mensagens=[{"role": "user", "content": prompt}],
+                modelo=self.model,
+                temperatura=0.3,
+                max_tokens=200,
+                detector=DetectorJSON("{"),
+                operacao="avaliacao",
+                stop=self.PARADA_AVALIACAO
+            ).texto
+            print(f"[DEBUG] Resposta da API: {resposta}")
+
+            try:
+                return self._interpretar_resposta(resposta)
+            except (ValueError, AttributeError) as e:
+                print(f"[AVISO] Tentativa {tentativa+1}/{self.max_retries} falhou: {str(e)}")
+
+        raise RuntimeError("Todas as tentativas de avaliação pela API falharam")
+
+    async def _consultar_api_async(self, codigo):
+        """Método privado, versão assíncrona de _consultar_api."""
+        prompt = self._montar_prompt(codigo)
+
+        for tentativa in range(self.max_retries):
+            print("[DEBUG] Enviando requisição para a API da Groq...")
+            resposta = (await self.cliente.completar_async(
+                mensagens=[{"role": "user", "content": prompt}],
+                modelo=self.model,
+                temperatura=0.3,
+                max_tokens=200,
+                detector=DetectorJSON("{"),
+                operacao="avaliacao",
+                stop=self.PARADA_AVALIACAO
+            )).texto
+            print(f"[DEBUG] Resposta da API: {resposta}")
+
+            try:
+                return self._interpretar_resposta(resposta)
+            except (ValueError, AttributeError) as e:
+                print(f"[AVISO] Tentativa {tentativa+1}/{self.max_retries} falhou: {str(e)}")
+
+        raise RuntimeError("Todas as tentativas de avaliação pela API falharam")
+
+    @staticmethod
+    def _montar_prompt(codigo):
+        """Método privado que monta o prompt de avaliação."""
+        return f"""
         Avalie o código abaixo em três critérios: eficiência, clareza e boas práticas. Para cada critério, atribua uma nota de 0 a 100.
 
         ⚠️ Responda apenas no seguinte formato JSON e **sem explicações**:
@@ -70,44 +461,81 @@ class AvaliadorService(IAvaliador):
         {codigo}
         """
 
-        # Implementação com retry
-        for tentativa in range(self.max_retries):
+    @staticmethod
+    def _montar_prompt_lote(codigos):
+        """Método privado que monta o prompt de avaliação de vários códigos."""
+        blocos = "\n".join(
+            f"### Código {indice}\n```\n{codigo}\n```\n" for indice, codigo in enumerate(codigos, start=1)
+        )
+        return f"""
+        Avalie cada um dos {len(codigos)} códigos abaixo, de forma independente, em três critérios: eficiência, clareza e boas práticas. Para cada critério, atribua uma nota de 0 a 100.
+
+        ⚠️ Responda apenas com um array JSON, com um objeto por código, e **sem explicações**:
+
+        [
+        {{"id": <número do código>, "eficiencia": <nota>, "clareza": <nota>, "boas_praticas": <nota>}}
+        ]
+
+{blocos}
+        """
+
+    @classmethod
+    def _interpretar_resposta_lote(cls, resposta, quantidade):
+        """Método privado que extrai as notas de cada código da resposta em lote.
+
+        Retorna {índice do código (a partir de 0): notas} apenas para os objetos
+        completos e válidos; se o array estiver quebrado ou cortado, aproveita
+        os objetos que puderem ser lidos individualmente.
+        """
+        itens = None
+        inicio, fim = resposta.find("["), resposta.rfind("]")
+        if inicio != -1 and fim > inicio:
             try:
-                print("[DEBUG] Enviando requisição para a API da Groq...")
-                response = self.client.chat.completions.create(
-                    model=self.model,
-                    messages=[{"role": "user", "content": prompt}],
-                    temperature=0.3,
-                    max_tokens=200
-                )
+                itens = json.loads(resposta[inicio:fim + 1])
+            except ValueError:
+                itens = None
+        if not isinstance(itens, list):
+            itens = []
+            for trecho in re.findall(r'\{[^{}]*\}', resposta):
+                try:
+                    itens.append(json.loads(trecho))
+                except ValueError:
+                    continue
+
+        notas = {}
+        for item in itens:
+            if not isinstance(item, dict):
+                continue
+            try:
+                indice = int(item["id"]) - 1
+                notas_item = {criterio: float(item[criterio]) for criterio in cls.CRITERIOS}
+            except (KeyError, TypeError, ValueError):
+                continue
+            if 0 <= indice < quantidade:
+                notas[indice] = notas_item
+        return notas
 
-                resposta = response.choices[0].message.content.strip()
-                print(f"[DEBUG] Resposta da API: {resposta}")
+    @staticmethod
+    def _interpretar_resposta(resposta):
+        """Método privado que extrai as notas do JSON da resposta; lança ValueError se inválido."""
+        # A sequência de parada remove a "}" final do objeto
+        inicio = resposta.find("{")
+        if inicio != -1 and "}" not in resposta[inicio:]:
+            resposta = resposta + "}"
 
-                # Tenta extrair o JSON da resposta, mesmo se houver texto adicional
-                json_match = re.search(r'\{[^}]+\}', resposta)
-                if json_match:
-                    resposta = json_match.group(0)
+        # Tenta extrair o JSON da resposta, mesmo se houver texto adicional
+        json_match = re.search(r'\{[^}]+\}', resposta)
+        if json_match:
+            resposta = json_match.group(0)
 
-                # Extrai JSON da resposta
-                notas = json.loads(resposta)
+        # Extrai JSON da resposta
+        notas = json.loads(resposta)
 
-                # Garante que todas as notas são números
-                return {
-                    k: float(v) if isinstance(v, (int, float, str)) else 0
-                    for k, v in notas.items()
-                }
-                
-            except Exception as e:
-                print(f"[AVISO] Tentativa {tentativa+1}/{self.max_retries} falhou: {str(e)}")
-                if tentativa < self.max_retries - 1:
-                    time.sleep(self.retry_delay)  # Espera antes de tentar novamente
-                else:
-                    print("[AVISO] Todas as tentativas falharam, usando modo offline")
-                    return self._gerar_notas_offline(codigo)
-        
-        # Fallback final (não deveria chegar aqui, mas por segurança)
-        return self._gerar_notas_offline(codigo)
+        # Garante que todas as notas são números
+        return {
+            k: float(v) if isinstance(v, (int, float, str)) else 0
+            for k, v in notas.items()
+        }
         
     def _gerar_notas_offline(self, codigo):
         """Gera notas localmente quando a API não está disponível."""
@@ -151,62 +579,101 @@ class AvaliadorService(IAvaliador):
             "timestamp": datetime.now().isoformat()
         }
         self.historico_avaliacoes.append(avaliacao)
+        self.historico_colunar.adicionar(
+            avaliacao["geracao"], avaliacao["fitness"], avaliacao["metricas"], algoritmo.codigo
+        )
+
+    def salvar_historico(self, caminho=None):
+        """Anexa ao arquivo JSONL apenas as avaliações ainda não gravadas.
+
+        Na primeira gravação em um caminho o arquivo é reiniciado, de modo que
+        ele contenha somente o histórico da execução atual.
+        """
+        caminho = caminho or self.caminho_historico
+        gravador, gravados = self._gravadores.get(caminho, (None, 0))
+        if gravador is None:
+            gravador = GravadorHistorico(caminho)
+            gravador.reiniciar()
 
-    def salvar_historico(self, caminho="./utils/historico_avaliacoes.json"):
-        """Salva o histórico de avaliações em um arquivo JSON."""
-        with open(caminho, 'w', encoding='utf-8') as f:
-            json.dump(self.historico_avaliacoes, f, indent=2, ensure_ascii=False)
+        novos = self.historico_avaliacoes[gravados:]
+        gravador.anexar(novos)
+        gravador.descarregar()
+        self._gravadores[caminho] = (gravador, gravados + len(novos))
 
-    def carregar_historico(self, caminho="./utils/historico_avaliacoes.json"):
-        """Carrega o histórico de avaliações de um arquivo JSON."""
+    def carregar_historico(self, caminho=None):
+        """Carrega o histórico de avaliações de um arquivo (JSONL ou JSON antigo)."""
+        caminho = caminho or self.caminho_historico
+        historico_colunar = HistoricoColunar()
+        carregados = 0
+        registros = iterar_historico(caminho)
         try:
-            with open(caminho, 'r', encoding='utf-8') as f:
-                self.historico_avaliacoes = json.load(f)
+            # Em blocos: o arquivo vai direto para as colunas, sem uma lista com o histórico inteiro
+            while bloco := list(itertools.islice(registros, self.BLOCO_CARREGAMENTO)):
+                historico_colunar.adicionar_registros(bloco)
+                carregados += len(bloco)
         except FileNotFoundError:
             print(f"[AVISO] Arquivo de histórico não encontrado: {caminho}")
+            return
 
-    def set_geracao(self, geracao):
-        """Define a geração atual para as próximas avaliações."""
-        self.geracao_atual = geracao
+        self.historico_avaliacoes = []
+        self.historico_colunar = historico_colunar
+        self._registros_carregados = carregados
+        # Gravações seguintes continuam o arquivo em vez de reescrevê-lo
+        self._gravadores[caminho] = (GravadorHistorico(caminho), 0)
 
-    def get_metricas_geracao(self, geracao=None):
-        """Retorna as métricas médias de uma geração específica."""
-        if geracao is None:
-            geracao = self.geracao_atual
+    def reiniciar_historico(self):
+        """Esquece as avaliações anteriores para que uma nova execução comece do zero.
 
-        avaliacoes_geracao = [a for a in self.historico_avaliacoes if a['geracao'] == geracao]
-        
-        if not avaliacoes_geracao:
-            return None
+        A próxima gravação reinicia o arquivo de histórico; o cache de notas é mantido.
+        """
+        self.historico_avaliacoes = []
+        self.historico_colunar = HistoricoColunar()
+        self._gravadores = {}
+        self._registros_carregados = 0
+        self.geracao_atual = 0
 
-        num_avaliacoes = len(avaliacoes_geracao)
-        soma_metricas = {
-            'fitness': 0,
-            'eficiencia': 0,
-            'clareza': 0,
-            'boas_praticas': 0
-        }
+    def posicao_historico(self):
+        """Retorna o caminho e quantos registros e bytes do histórico já estão gravados."""
+        caminho = self.caminho_historico
+        gravador, gravados = self._gravadores.get(caminho, (None, 0))
+        tamanho = os.path.getsize(caminho) if gravador is not None and os.path.exists(caminho) else 0
+        return {"caminho": caminho, "registros": self._registros_carregados + gravados, "bytes": tamanho}
 
-        melhor_fitness = float('-inf')
-        melhor_codigo = None
+    def retomar_historico(self, posicao):
+        """Continua o histórico gravado até `posicao` (ver posicao_historico).
 
-        for av in avaliacoes_geracao:
-            soma_metricas['fitness'] += av['fitness']
-            soma_metricas['eficiencia'] += av['metricas']['eficiencia']
-            soma_metricas['clareza'] += av['metricas']['clareza']
-            soma_metricas['boas_praticas'] += av['metricas']['boas_praticas']
+        Registros gravados depois dessa posição pertencem a uma geração que não
+        chegou ao fim e são descartados do arquivo.
+        """
+        self.reiniciar_historico()
+        caminho = posicao.get("caminho") or self.caminho_historico
+        self.caminho_historico = caminho
+        if not posicao.get("bytes") or not os.path.exists(caminho):
+            return
 
-            if av['fitness'] > melhor_fitness:
-                melhor_fitness = av['fitness']
-                melhor_codigo = av['codigo']
+        tamanho = os.path.getsize(caminho)
+        if tamanho > posicao["bytes"]:
+            os.truncate(caminho, posicao["bytes"])
+        elif tamanho < posicao["bytes"]:
+            print(f"[AVISO] Histórico {caminho} menor que o esperado; continuando com os registros existentes")
+        self.carregar_historico(caminho)
 
-        return {
-            'geracao': geracao,
-            'num_avaliacoes': num_avaliacoes,
-            'media_fitness': round(soma_metricas['fitness'] / num_avaliacoes, 2),
-            'media_eficiencia': round(soma_metricas['eficiencia'] / num_avaliacoes, 2),
-            'media_clareza': round(soma_metricas['clareza'] / num_avaliacoes, 2),
-            'media_boas_praticas': round(soma_metricas['boas_praticas'] / num_avaliacoes, 2),
-            'melhor_fitness': melhor_fitness,
-            'melhor_codigo': melhor_codigo
-        }
+    def get_estatisticas_cache(self):
+        """Retorna os contadores de acerto do cache de avaliações."""
+        if self.cache is None:
+            return None
+        return self.cache.get_estatisticas()
+
+    def set_geracao(self, geracao):
+        """Define a geração atual para as próximas avaliações."""
+        self.geracao_atual = geracao
+
+    def get_metricas_geracao(self, geracao=None):
+        """Retorna as métricas médias de uma geração específica.
+
+        A consulta usa o índice de gerações do histórico colunar, sem
+        percorrer as avaliações das demais gerações.
+        """
+        if geracao is None:
+            geracao = self.geracao_atual
+        return self.historico_colunar.metricas_geracao(geracao)
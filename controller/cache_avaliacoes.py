@@ -0,0 +1,298 @@
+import asyncio
+import hashlib
+import json
+import os
+import sqlite3
+import threading
+import time
+from concurrent.futures import Future
+
+
+class CacheAvaliacoes:
+    """Cache persistente de avaliações, endereçado pelo conteúdo do código.
+
+    Responsabilidades:
+    - Guardar as notas já obtidas da API em um arquivo SQLite
+    - Gerar chaves a partir do código normalizado, do modelo e da versão do prompt
+    - Aplicar expiração (TTL) e remoção LRU quando o limite de entradas é atingido
+    - Agrupar requisições idênticas simultâneas em uma única chamada
+    """
+    def __init__(self, caminho="./utils/cache_avaliacoes.sqlite3", max_entradas=5000,
+                 ttl_segundos=7 * 24 * 3600):
+        self.caminho = caminho
+        self.max_entradas = max(1, max_entradas)
+        self.ttl_segundos = ttl_segundos
+        self.hits = 0
+        self.misses = 0
+        self.coalescidas = 0
+        self._lock = threading.Lock()
+        self._em_andamento = {}
+
+        diretorio = os.path.dirname(caminho)
+        if diretorio:
+            os.makedirs(diretorio, exist_ok=True)
+
+        self._conexao = sqlite3.connect(caminho, check_same_thread=False)
+        self._conexao.execute("PRAGMA journal_mode=WAL")
+        self._conexao.execute(
+            """CREATE TABLE IF NOT EXISTS avaliacoes (
+                chave TEXT PRIMARY KEY,
+                notas TEXT NOT NULL,
+                criado_em REAL NOT NULL,
+                ultimo_acesso REAL NOT NULL
+            )"""
+        )
+        self._conexao.execute(
+            "CREATE INDEX IF NOT EXISTS idx_ultimo_acesso ON avaliacoes (ultimo_acesso)"
+        )
+        self._conexao.commit()
+        self._remover_expiradas()
+
+    @staticmethod
+    def normalizar_codigo(codigo):
+        """Normaliza o código para que diferenças de espaçamento gerem a mesma chave."""
+        linhas = codigo.replace("\r\n", "\n").replace("\r", "\n").split("\n")
+        linhas = [linha.rstrip() for linha in linhas]
+        return "\n".join(linha for linha in linhas if linha).strip()
+
+    def gerar_chave(self, codigo, modelo, versao_prompt):
+        """Gera a chave do cache a partir do código normalizado, modelo e versão do prompt."""
+        conteudo = f"{modelo}\0{versao_prompt}\0{self.normalizar_codigo(codigo)}"
+        return hashlib.sha256(conteudo.encode("utf-8")).hexdigest()
+
+    def obter(self, chave):
+        """Retorna as notas armazenadas para a chave ou None se não houver entrada válida."""
+        agora = time.time()
+        with self._lock:
+            linha = self._conexao.execute(
+                "SELECT notas, criado_em FROM avaliacoes WHERE chave = ?", (chave,)
+            ).fetchone()
+            if linha is None:
+                return None
+
+            notas, criado_em = linha
+            if self.ttl_segundos is not None and agora - criado_em > self.ttl_segundos:
+                self._conexao.execute("DELETE FROM avaliacoes WHERE chave = ?", (chave,))
+                self._conexao.commit()
+                return None
+
+            self._conexao.execute(
+                "UPDATE avaliacoes SET ultimo_acesso = ? WHERE chave = ?", (agora, chave)
+            )
+            self._conexao.commit()
+        return json.loads(notas)
+
+    def guardar(self, chave, notas):
+        """Armazena as notas para a chave e aplica a remoção LRU se necessário."""
+        agora = time.time()
+        with self._lock:
+            self._conexao.execute(
+                "INSERT OR REPLACE INTO avaliacoes (chave, notas, criado_em, ultimo_acesso) "
+                "VALUES (?, ?, ?, ?)",
+                (chave, json.dumps(notas), agora, agora)
+            )
+            total = self._conexao.execute("SELECT COUNT(*) FROM avaliacoes").fetchone()[0]
+            excedente = total - self.max_entradas
+            if excedente > 0:
+                self._conexao.execute(
+                    "DELETE FROM avaliacoes WHERE chave IN ("
+                    "SELECT chave FROM avaliacoes ORDER BY ultimo_acesso ASC LIMIT ?)",
+                    (excedente,)
+                )
+            self._conexao.commit()
+
+    def obter_ou_calcular(self, codigo, modelo, versao_prompt, calcular):
+        """Retorna as notas do cache ou as calcula com a função informada.
+
+        Se outra thread já estiver calculando as notas do mesmo código, aguarda
+        o resultado dela em vez de fazer uma nova chamada à API. Exceções de
+        `calcular` são propagadas e nada é armazenado.
+        """
+        chave = self.gerar_chave(codigo, modelo, versao_prompt)
+        notas, futuro, lider = self._reservar(chave)
+        if notas is not None:
+            return notas
+        if not lider:
+            return dict(futuro.result())
+
+        try:
+            notas = calcular()
+        except Exception as e:
+            self._concluir(chave, futuro, erro=e)
+            raise
+        self._concluir(chave, futuro, notas=notas)
+        return dict(notas)
+
+    async def obter_ou_calcular_async(self, codigo, modelo, versao_prompt, calcular):
+        """Versão assíncrona de obter_ou_calcular; `calcular` é uma função async.
+
+        O agrupamento vale também entre chamadas síncronas e assíncronas.
+        """
+        chave = self.gerar_chave(codigo, modelo, versao_prompt)
+        notas, futuro, lider = self._reservar(chave)
+        if notas is not None:
+            return notas
+        if not lider:
+            return dict(await asyncio.wrap_future(futuro))
+
+        try:
+            notas = await calcular()
+        except BaseException as e:
+            # Inclui o cancelamento, para que quem aguarda este cálculo não fique preso
+            self._concluir(chave, futuro, erro=e)
+            raise
+        self._concluir(chave, futuro, notas=notas)
+        return dict(notas)
+
+    def obter_ou_calcular_lote(self, codigos, modelo, versao_prompt, calcular):
+        """Versão em lote de obter_ou_calcular.
+
+        `calcular` recebe só os códigos sem notas no cache nem em cálculo por
+        outra chamada, e retorna uma lista alinhada a eles com as notas de cada
+        um (None se não foi possível avaliá-lo). Retorna as notas na ordem de
+        `codigos`, com None para os que falharam.
+        """
+        resultados, lideres, esperando = self._reservar_lote(codigos, modelo, versao_prompt)
+        if lideres:
+            try:
+                calculadas = calcular([codigos[indices[0]] for _, indices in lideres.values()])
+            except Exception as e:
+                self._concluir_lote(lideres, resultados, erro=e)
+                raise
+            self._concluir_lote(lideres, resultados, calculadas)
+
+        for indice, futuro in esperando:
+            try:
+                resultados[indice] = dict(futuro.result())
+            except Exception:
+                resultados[indice] = None
+        return resultados
+
+    async def obter_ou_calcular_lote_async(self, codigos, modelo, versao_prompt, calcular):
+        """Versão assíncrona de obter_ou_calcular_lote; `calcular` é uma função async."""
+        resultados, lideres, esperando = self._reservar_lote(codigos, modelo, versao_prompt)
+        if lideres:
+            try:
+                calculadas = await calcular([codigos[indices[0]] for _, indices in lideres.values()])
+            except BaseException as e:
+                self._concluir_lote(lideres, resultados, erro=e)
+                raise
+            self._concluir_lote(lideres, resultados, calculadas)
+
+        for indice, futuro in esperando:
+            try:
+                resultados[indice] = dict(await asyncio.wrap_future(futuro))
+            except Exception:
+                resultados[indice] = None
+        return resultados
+
+    def _reservar_lote(self, codigos, modelo, versao_prompt):
+        """Método privado que reserva cada código do lote.
+
+        Retorna (resultados já conhecidos, {chave: (futuro, índices)} dos que
+        este lote calcula, [(índice, futuro)] dos calculados por outra chamada).
+        """
+        resultados = [None] * len(codigos)
+        lideres = {}
+        esperando = []
+        for indice, codigo in enumerate(codigos):
+            chave = self.gerar_chave(codigo, modelo, versao_prompt)
+            if chave in lideres:
+                # Código repetido no próprio lote: uma única avaliação serve aos dois
+                lideres[chave][1].append(indice)
+                with self._lock:
+                    self.coalescidas += 1
+                continue
+            notas, futuro, lider = self._reservar(chave)
+            if notas is not None:
+                resultados[indice] = notas
+            elif lider:
+                lideres[chave] = (futuro, [indice])
+            else:
+                esperando.append((indice, futuro))
+        return resultados, lideres, esperando
+
+    def _concluir_lote(self, lideres, resultados, calculadas=None, erro=None):
+        """Método privado que conclui as reservas do lote e preenche os resultados."""
+        if erro is not None:
+            for chave, (futuro, _) in lideres.items():
+                self._concluir(chave, futuro, erro=erro)
+            return
+
+        for (chave, (futuro, indices)), notas in zip(lideres.items(), calculadas):
+            if notas is None:
+                self._concluir(chave, futuro, erro=RuntimeError("Candidato sem notas na avaliação em lote"))
+                continue
+            self._concluir(chave, futuro, notas=notas)
+            for indice in indices:
+                resultados[indice] = dict(notas)
+
+    def _reservar(self, chave):
+        """Método privado que retorna (notas do cache, futuro em andamento, se é o líder)."""
+        notas = self.obter(chave)
+        if notas is not None:
+            with self._lock:
+                self.hits += 1
+            return dict(notas), None, False
+
+        with self._lock:
+            futuro = self._em_andamento.get(chave)
+            lider = futuro is None
+            if lider:
+                futuro = Future()
+                self._em_andamento[chave] = futuro
+                self.misses += 1
+            else:
+                self.coalescidas += 1
+        return None, futuro, lider
+
+    def _concluir(self, chave, futuro, notas=None, erro=None):
+        """Método privado que guarda o resultado do líder e libera quem o aguarda."""
+        try:
+            if erro is None:
+                try:
+                    self.guardar(chave, notas)
+                except sqlite3.Error as e:
+                    print(f"[AVISO] Não foi possível gravar no cache: {str(e)}")
+                futuro.set_result(notas)
+            elif isinstance(erro, Exception):
+                futuro.set_exception(erro)
+            else:
+                futuro.set_exception(RuntimeError("Cálculo das notas foi cancelado"))
+        finally:
+            with self._lock:
+                self._em_andamento.pop(chave, None)
+
+    def get_estatisticas(self):
+        """Retorna os contadores de uso do cache."""
+        with self._lock:
+            entradas = self._conexao.execute("SELECT COUNT(*) FROM avaliacoes").fetchone()[0]
+            consultas = self.hits + self.misses + self.coalescidas
+            return {
+                "hits": self.hits,
+                "misses": self.misses,
+                "coalescidas": self.coalescidas,
+                "chamadas_economizadas": self.hits + self.coalescidas,
+                "taxa_acerto": round((self.hits + self.coalescidas) / consultas, 4) if consultas else 0.0,
+                "entradas": entradas
+            }
+
+    def limpar(self):
+        """Remove todas as entradas do cache."""
+        with self._lock:
+            self._conexao.execute("DELETE FROM avaliacoes")
+            self._conexao.commit()
+
+    def fechar(self):
+        """Fecha a conexão com o arquivo do cache."""
+        with self._lock:
+            self._conexao.close()
+
+    def _remover_expiradas(self):
+        """Método privado que remove as entradas com TTL vencido."""
+        if self.ttl_segundos is None:
+            return
+        limite = time.time() - self.ttl_segundos
+        with self._lock:
+            self._conexao.execute("DELETE FROM avaliacoes WHERE criado_em < ?", (limite,))
+            self._conexao.commit()
@@ -0,0 +1,216 @@
+import asyncio
+import atexit
+import gzip
+import hashlib
+import json
+import os
+import threading
+import time
+from controller.cliente_llm import RespostaLLM
+
+
+class RespostaNaoGravada(LookupError):
+    """A requisição não está no cassete em reprodução."""
+
+
+class CasseteLLM:
+    """Grava as chamadas ao modelo de linguagem e as reproduz depois, sem rede.
+
+    Responsabilidades:
+    - Identificar cada requisição por um hash do prompt e dos parâmetros
+    - Gravar as respostas, com tokens e latência, em JSONL compactado com gzip
+    - Reproduzir as respostas de cada requisição na ordem em que foram gravadas
+    - Opcionalmente, esperar a latência gravada (ou uma fração dela) a cada resposta
+
+    O arquivo é uma sequência de membros gzip: cada descarga acrescenta um
+    membro ao final, e a leitura com gzip os concatena. Vários processos (ex.:
+    ilhas) podem gravar no mesmo cassete.
+    """
+    MODOS = ("gravar", "reproduzir")
+    # Versão do formato das linhas e da chave; cassetes de outra versão não são lidos
+    VERSAO = 1
+
+    def __init__(self, caminho, modo="reproduzir", fator_latencia=0.0, tamanho_bloco=32,
+                 intervalo_descarga=5.0):
+        """
+        Args:
+            caminho: Arquivo do cassete (ex.: ./utils/cassete.jsonl.gz)
+            modo: "gravar" acrescenta as chamadas feitas à API; "reproduzir" responde
+                apenas com as gravadas
+            fator_latencia: Na reprodução, fração da latência gravada a esperar
+                (0 responde imediatamente, 1 reproduz a latência original)
+            tamanho_bloco: Respostas acumuladas antes de gravar um membro no arquivo
+            intervalo_descarga: Segundos máximos entre gravações no arquivo
+        """
+        if modo not in self.MODOS:
+            raise ValueError(f"Modo de cassete inválido: {modo}. Use um de {self.MODOS}")
+        self.caminho = caminho
+        self.modo = modo
+        self.fator_latencia = max(0.0, fator_latencia)
+        self.tamanho_bloco = max(1, tamanho_bloco)
+        self.intervalo_descarga = intervalo_descarga
+        self._lock = threading.Lock()
+        self._pendentes = []
+        self._ultima_descarga = time.monotonic()
+        self._respostas = {}
+        self._proximas = {}
+        self.gravadas = 0
+        self.acertos = 0
+        self.faltas = 0
+
+        if self.reproduzindo:
+            self._carregar()
+        else:
+            atexit.register(self.descarregar)
+
+    @property
+    def reproduzindo(self):
+        """Indica se o cassete responde no lugar da API."""
+        return self.modo == "reproduzir"
+
+    @classmethod
+    def chave(cls, mensagens, modelo, temperatura, max_tokens, detector=None, extra=None):
+        """Hash que identifica a requisição: prompt, modelo e parâmetros de geração."""
+        requisicao = {
+            "versao": cls.VERSAO,
+            "modelo": modelo,
+            "mensagens": mensagens,
+            "temperatura": temperatura,
+            "max_tokens": max_tokens,
+            # O detector decide onde a resposta é cortada, então faz parte da chave
+            "detector": detector.assinatura if detector is not None else None,
+            "extra": extra or {}
+        }
+        texto = json.dumps(requisicao, sort_keys=True, ensure_ascii=False, default=str)
+        return hashlib.sha256(texto.encode("utf-8")).hexdigest()
+
+    def gravar(self, chave, resposta):
+        """Acrescenta a resposta de uma chamada à API ao cassete."""
+        linha = {
+            "chave": chave,
+            "texto": resposta.texto,
+            "tokens_prompt": resposta.tokens_prompt,
+            "tokens_completacao": resposta.tokens_completacao,
+            "latencia": round(resposta.latencia, 4),
+            "interrompida": resposta.interrompida
+        }
+        with self._lock:
+            self._pendentes.append(linha)
+            self.gravadas += 1
+            descarregar = (len(self._pendentes) >= self.tamanho_bloco
+                           or time.monotonic() - self._ultima_descarga >= self.intervalo_descarga)
+        if descarregar:
+            self.descarregar()
+
+    def descarregar(self):
+        """Grava no arquivo as respostas ainda em memória, como um novo membro gzip."""
+        with self._lock:
+            pendentes, self._pendentes = self._pendentes, []
+            self._ultima_descarga = time.monotonic()
+            if not pendentes:
+                return
+            cabecalho = {"versao": self.VERSAO} if not os.path.exists(self.caminho) else None
+            linhas = ([cabecalho] if cabecalho else []) + pendentes
+            dados = "".join(json.dumps(l, ensure_ascii=False) + "\n" for l in linhas).encode("utf-8")
+            diretorio = os.path.dirname(self.caminho)
+            if diretorio:
+                os.makedirs(diretorio, exist_ok=True)
+            # Uma única escrita por membro, para não intercalar com outros processos
+            with open(self.caminho, "ab") as arquivo:
+                arquivo.write(gzip.compress(dados, mtime=0))
+
+    def reproduzir(self, chave):
+        """Retorna a próxima resposta gravada para a chave, esperando a latência configurada."""
+        resposta = self._proxima(chave)
+        if self.fator_latencia and resposta.latencia:
+            time.sleep(resposta.latencia * self.fator_latencia)
+        return resposta
+
+    async def reproduzir_async(self, chave):
+        """Versão assíncrona de reproduzir: a espera não bloqueia o event loop."""
+        resposta = self._proxima(chave)
+        if self.fator_latencia and resposta.latencia:
+            await asyncio.sleep(resposta.latencia * self.fator_latencia)
+        return resposta
+
+    def estatisticas(self):
+        """Resumo de uso do cassete."""
+        with self._lock:
+            return {
+                "modo": self.modo,
+                "requisicoes_gravadas": sum(len(r) for r in self._respostas.values()) + self.gravadas,
+                "acertos": self.acertos,
+                "faltas": self.faltas
+            }
+
+    def _proxima(self, chave):
+        """Método privado que escolhe a resposta gravada seguinte para a chave.
+
+        Requisições idênticas recebem as respostas na ordem da gravação; depois
+        da última, a sequência recomeça.
+        """
+        with self._lock:
+            respostas = self._respostas.get(chave)
+            if not respostas:
+                self.faltas += 1
+                raise RespostaNaoGravada(f"Requisição {chave[:12]} não gravada no cassete {self.caminho}")
+            indice = self._proximas.get(chave, 0)
+            self._proximas[chave] = indice + 1
+            self.acertos += 1
+            linha = respostas[indice % len(respostas)]
+        return RespostaLLM(
+            texto=linha["texto"],
+            tokens_prompt=linha.get("tokens_prompt", 0),
+            tokens_completacao=linha.get("tokens_completacao", 0),
+            latencia=linha.get("latencia", 0.0),
+            interrompida=linha.get("interrompida", False)
+        )
+
+    def _carregar(self):
+        """Método privado que lê o cassete para a reprodução."""
+        try:
+            with gzip.open(self.caminho, "rt", encoding="utf-8") as arquivo:
+                linhas = [json.loads(l) for l in arquivo if l.strip()]
+        except FileNotFoundError:
+            print(f"[AVISO] Cassete {self.caminho} não encontrado; nenhuma resposta para reproduzir")
+            return
+        except (OSError, EOFError, ValueError) as e:
+            # Um membro cortado (ex.: processo interrompido) invalida o restante do arquivo
+            print(f"[AVISO] Cassete {self.caminho} ilegível: {str(e)}")
+            return
+
+        versao = linhas[0].get("versao") if linhas else None
+        if versao != self.VERSAO:
+            print(f"[AVISO] Cassete {self.caminho} de outra versão ({versao}), ignorando")
+            return
+        for linha in linhas:
+            if "chave" in linha:
+                self._respostas.setdefault(linha["chave"], []).append(linha)
+        print(f"[INFO] Cassete {self.caminho}: {sum(len(r) for r in self._respostas.values())} "
+              f"respostas para reproduzir")
+
+
+_cassetes = {}
+_cassetes_lock = threading.Lock()
+
+
+def obter_cassete_configurado():
+    """Retorna o cassete definido pelas variáveis de ambiente, ou None.
+
+    GROQ_CASSETE indica o arquivo, GROQ_CASSETE_MODO o modo ("gravar" ou
+    "reproduzir", padrão) e GROQ_CASSETE_LATENCIA a fração da latência gravada
+    a reproduzir (padrão 0). O mesmo arquivo é compartilhado no processo.
+    """
+    caminho = os.getenv("GROQ_CASSETE")
+    if not caminho:
+        return None
+    with _cassetes_lock:
+        cassete = _cassetes.get(caminho)
+        if cassete is None:
+            cassete = CasseteLLM(
+                caminho,
+                modo=os.getenv("GROQ_CASSETE_MODO", "reproduzir"),
+                fator_latencia=float(os.getenv("GROQ_CASSETE_LATENCIA", "0"))
+            )
+            _cassetes[caminho] = cassete
+        return cassete
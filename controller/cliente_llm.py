@@ -0,0 +1,558 @@
+import asyncio
+import os
+import random
+import re
+import threading
+import time
+import weakref
+from model.orcamento import obter_orcamento
+from model.rastreamento import obter_rastreador
+
+
+class RespostaLLM:
+    """Resultado de uma chamada ao modelo de linguagem."""
+    def __init__(self, texto, tokens_prompt=0, tokens_completacao=0, latencia=0.0, tentativas=1,
+                 interrompida=False):
+        self.texto = texto
+        self.tokens_prompt = tokens_prompt
+        self.tokens_completacao = tokens_completacao
+        self.latencia = latencia
+        self.tentativas = tentativas
+        # True quando a leitura por streaming parou antes do fim da geração
+        self.interrompida = interrompida
+
+
+class LimitadorTaxa:
+    """Token bucket duplo que controla requisições/min e tokens/min.
+
+    Responsabilidades:
+    - Bloquear a chamada até haver requisição e tokens disponíveis
+    - Reembolsar a diferença entre os tokens estimados e os realmente gastos
+    - Suspender todas as chamadas quando o servidor pede para esperar
+    """
+    def __init__(self, requisicoes_por_minuto=30, tokens_por_minuto=6000, relogio=time.monotonic,
+                 dormir=time.sleep):
+        self.capacidade_requisicoes = float(requisicoes_por_minuto)
+        self.capacidade_tokens = float(tokens_por_minuto)
+        self.requisicoes = self.capacidade_requisicoes
+        self.tokens = self.capacidade_tokens
+        self.pausado_ate = 0.0
+        # Relógio e espera da versão síncrona, substituíveis (ex.: em testes)
+        self._relogio = relogio
+        self._dormir = dormir
+        self._ultima_recarga = relogio()
+        self._lock = threading.Lock()
+
+    def adquirir(self, tokens):
+        """Aguarda até que uma requisição com a quantidade de tokens possa ser enviada."""
+        tokens = min(float(tokens), self.capacidade_tokens)
+        while True:
+            with self._lock:
+                espera = self._tempo_de_espera(tokens)
+                if espera <= 0:
+                    self.requisicoes -= 1
+                    self.tokens -= tokens
+                    return
+            self._dormir(espera)
+
+    async def adquirir_async(self, tokens):
+        """Versão assíncrona de adquirir: aguarda sem bloquear o event loop."""
+        tokens = min(float(tokens), self.capacidade_tokens)
+        while True:
+            with self._lock:
+                espera = self._tempo_de_espera(tokens)
+                if espera <= 0:
+                    self.requisicoes -= 1
+                    self.tokens -= tokens
+                    return
+            await asyncio.sleep(espera)
+
+    def reembolsar(self, tokens_estimados, tokens_reais):
+        """Ajusta o balde de tokens com o consumo real informado pela API."""
+        with self._lock:
+            self._recarregar()
+            diferenca = tokens_estimados - tokens_reais
+            self.tokens = min(self.capacidade_tokens, self.tokens + diferenca)
+
+    def pausar(self, segundos):
+        """Suspende novas requisições pelo tempo indicado pelo servidor."""
+        with self._lock:
+            self.pausado_ate = max(self.pausado_ate, self._relogio() + segundos)
+
+    def sincronizar_tokens(self, tokens_restantes):
+        """Reduz o balde de tokens ao valor restante informado pelo servidor."""
+        with self._lock:
+            self._recarregar()
+            self.tokens = min(self.tokens, float(tokens_restantes))
+
+    def _tempo_de_espera(self, tokens):
+        """Método privado que calcula quanto falta para a requisição ser liberada."""
+        self._recarregar()
+        agora = self._relogio()
+        if self.pausado_ate > agora:
+            return self.pausado_ate - agora
+
+        falta_requisicoes = max(0.0, 1 - self.requisicoes)
+        falta_tokens = max(0.0, tokens - self.tokens)
+        return max(
+            falta_requisicoes * 60.0 / self.capacidade_requisicoes,
+            falta_tokens * 60.0 / self.capacidade_tokens
+        )
+
+    def _recarregar(self):
+        """Método privado que repõe os baldes proporcionalmente ao tempo decorrido."""
+        agora = self._relogio()
+        decorrido = agora - self._ultima_recarga
+        self._ultima_recarga = agora
+        self.requisicoes = min(
+            self.capacidade_requisicoes,
+            self.requisicoes + decorrido * self.capacidade_requisicoes / 60.0
+        )
+        self.tokens = min(
+            self.capacidade_tokens,
+            self.tokens + decorrido * self.capacidade_tokens / 60.0
+        )
+
+
+class ClienteLLM:
+    """Cliente compartilhado para a API da Groq.
+
+    Responsabilidades:
+    - Reutilizar um pool de conexões HTTP keep-alive entre todos os serviços
+    - Respeitar os limites de requisições e tokens por minuto
+    - Repetir chamadas com falhas temporárias, respeitando o Retry-After do servidor
+    - Gravar as chamadas em um cassete, ou responder com as gravadas sem acessar a rede
+    - Registrar tokens, latência e novas tentativas de cada chamada no rastreador ativo
+    - Recusar as requisições que não cabem no orçamento da execução em andamento
+    """
+    def __init__(self, api_key=None, requisicoes_por_minuto=None, tokens_por_minuto=None,
+                 max_conexoes=20, max_tentativas=5, timeout=60.0):
+        self.api_key = api_key
+        self.max_tentativas = max_tentativas
+        self.atraso_base = 1.0
+        self.atraso_maximo = 30.0
+        self.limitador = LimitadorTaxa(
+            requisicoes_por_minuto or int(os.getenv("GROQ_LIMITE_RPM", "30")),
+            tokens_por_minuto or int(os.getenv("GROQ_LIMITE_TPM", "6000"))
+        )
+        self.max_conexoes = max_conexoes
+        self.timeout = timeout
+        # Requisições HTTP enviadas, incluindo novas tentativas
+        self.requisicoes = 0
+        self._lock_contador = threading.Lock()
+        # Criado na primeira chamada: importar o SDK da Groq é a parte mais lenta da inicialização
+        self.client = None
+        self._lock_cliente = threading.Lock()
+        # Um cliente assíncrono por event loop, pois as conexões pertencem ao loop que as criou
+        self._clientes_async = weakref.WeakKeyDictionary()
+        # CasseteLLM que grava ou reproduz as chamadas; None usa sempre a API
+        self.cassete = None
+
+    @property
+    def reproduzindo(self):
+        """Indica se as respostas vêm de um cassete, sem acessar a API."""
+        return self.cassete is not None and self.cassete.reproduzindo
+
+    def completar(self, mensagens, modelo, temperatura=0.7, max_tokens=300, detector=None, operacao=None,
+                  **extra):
+        """Envia uma requisição de chat e retorna um RespostaLLM.
+
+        Com um `detector` (ver detector_resposta), a resposta é lida por streaming
+        e a conexão é encerrada assim que a parte útil do texto chega. `operacao`
+        (ex.: "mutacao") apenas rotula a chamada no rastreamento; não vai à API.
+        """
+        if self.cassete is None:
+            return self._completar_api(mensagens, modelo, temperatura, max_tokens, detector, operacao, extra)
+
+        chave = self.cassete.chave(mensagens, modelo, temperatura, max_tokens, detector, extra)
+        if self.cassete.reproduzindo:
+            # A reprodução consome o orçamento como a gravação, para cortar nos mesmos pontos
+            orcamento, tokens_estimados = obter_orcamento(), self.estimar_tokens(mensagens) + max_tokens
+            orcamento.reservar(tokens_estimados)
+            try:
+                resposta = self.cassete.reproduzir(chave)
+            except Exception:
+                orcamento.confirmar(tokens_estimados, 0)
+                raise
+            self._confirmar_orcamento(orcamento, tokens_estimados, resposta)
+            self._registrar(operacao, modelo, resposta, origem="cassete")
+            return resposta
+        resposta = self._completar_api(mensagens, modelo, temperatura, max_tokens, detector, operacao, extra)
+        self.cassete.gravar(chave, resposta)
+        return resposta
+
+    async def completar_async(self, mensagens, modelo, temperatura=0.7, max_tokens=300, detector=None,
+                              operacao=None, **extra):
+        """Versão assíncrona de completar, com as mesmas regras de limite e novas tentativas."""
+        if self.cassete is None:
+            return await self._completar_api_async(
+                mensagens, modelo, temperatura, max_tokens, detector, operacao, extra
+            )
+
+        chave = self.cassete.chave(mensagens, modelo, temperatura, max_tokens, detector, extra)
+        if self.cassete.reproduzindo:
+            orcamento, tokens_estimados = obter_orcamento(), self.estimar_tokens(mensagens) + max_tokens
+            orcamento.reservar(tokens_estimados)
+            try:
+                resposta = await self.cassete.reproduzir_async(chave)
+            except Exception:
+                orcamento.confirmar(tokens_estimados, 0)
+                raise
+            self._confirmar_orcamento(orcamento, tokens_estimados, resposta)
+            self._registrar(operacao, modelo, resposta, origem="cassete")
+            return resposta
+        resposta = await self._completar_api_async(
+            mensagens, modelo, temperatura, max_tokens, detector, operacao, extra
+        )
+        self.cassete.gravar(chave, resposta)
+        return resposta
+
+    def _completar_api(self, mensagens, modelo, temperatura, max_tokens, detector, operacao, extra):
+        """Método privado que faz a chamada à API, com limite de taxa e novas tentativas."""
+        cliente = self._obter_cliente()
+        tokens_estimados = self.estimar_tokens(mensagens) + max_tokens
+        orcamento = obter_orcamento()
+        ultimo_erro = None
+
+        for tentativa in range(1, self.max_tentativas + 1):
+            # Cada tentativa é uma requisição a mais no orçamento; se não couber, desiste sem enviar
+            orcamento.reservar(tokens_estimados)
+            self.limitador.adquirir(tokens_estimados)
+            self._contar_requisicao()
+            inicio = time.perf_counter()
+            try:
+                bruto = cliente.chat.completions.with_raw_response.create(
+                    model=modelo,
+                    messages=mensagens,
+                    temperature=temperatura,
+                    max_tokens=max_tokens,
+                    stream=detector is not None,
+                    **extra
+                )
+                if detector is None:
+                    response = bruto.parse()
+                    texto, uso, interrompida = self._conteudo(response), getattr(response, "usage", None), False
+                else:
+                    texto, uso, interrompida = self._ler_stream(bruto.parse(), detector)
+            except Exception as e:
+                orcamento.confirmar(tokens_estimados, 0)
+                ultimo_erro = e
+                espera = self._preparar_nova_tentativa(e, tentativa)
+                if espera is None:
+                    self._registrar(operacao, modelo, RespostaLLM("", tentativas=tentativa), erro=e)
+                    raise
+                time.sleep(espera)
+                continue
+
+            latencia = time.perf_counter() - inicio
+            resposta = self._montar_resposta(
+                texto, uso, mensagens, bruto.headers, tokens_estimados, latencia, tentativa, interrompida
+            )
+            self._confirmar_orcamento(orcamento, tokens_estimados, resposta)
+            self._registrar(operacao, modelo, resposta)
+            return resposta
+
+        raise ultimo_erro
+
+    async def _completar_api_async(self, mensagens, modelo, temperatura, max_tokens, detector, operacao, extra):
+        """Método privado, versão assíncrona de _completar_api."""
+        cliente = self._obter_cliente_async()
+        tokens_estimados = self.estimar_tokens(mensagens) + max_tokens
+        orcamento = obter_orcamento()
+        ultimo_erro = None
+
+        for tentativa in range(1, self.max_tentativas + 1):
+            orcamento.reservar(tokens_estimados)
+            await self.limitador.adquirir_async(tokens_estimados)
+            self._contar_requisicao()
+            inicio = time.perf_counter()
+            try:
+                bruto = await cliente.chat.completions.with_raw_response.create(
+                    model=modelo,
+                    messages=mensagens,
+                    temperature=temperatura,
+                    max_tokens=max_tokens,
+                    stream=detector is not None,
+                    **extra
+                )
+                if detector is None:
+                    response = await bruto.parse()
+                    texto, uso, interrompida = self._conteudo(response), getattr(response, "usage", None), False
+                else:
+                    texto, uso, interrompida = await self._ler_stream_async(await bruto.parse(), detector)
+            except Exception as e:
+                orcamento.confirmar(tokens_estimados, 0)
+                ultimo_erro = e
+                espera = self._preparar_nova_tentativa(e, tentativa)
+                if espera is None:
+                    self._registrar(operacao, modelo, RespostaLLM("", tentativas=tentativa), erro=e)
+                    raise
+                await asyncio.sleep(espera)
+                continue
+
+            latencia = time.perf_counter() - inicio
+            resposta = self._montar_resposta(
+                texto, uso, mensagens, bruto.headers, tokens_estimados, latencia, tentativa, interrompida
+            )
+            self._confirmar_orcamento(orcamento, tokens_estimados, resposta)
+            self._registrar(operacao, modelo, resposta)
+            return resposta
+
+        raise ultimo_erro
+
+    def _obter_cliente(self):
+        """Método privado que cria, no primeiro uso, o cliente Groq síncrono."""
+        if not self.api_key:
+            raise RuntimeError("Chave da API da Groq não configurada")
+        with self._lock_cliente:
+            if self.client is None:
+                import groq
+                import httpx
+                http_client = httpx.Client(limits=self._limites_conexao(), timeout=self.timeout)
+                # As novas tentativas são feitas aqui, coordenadas com o limitador
+                self.client = groq.Groq(api_key=self.api_key, http_client=http_client, max_retries=0)
+            return self.client
+
+    def _obter_cliente_async(self):
+        """Método privado que retorna o AsyncGroq do event loop em execução."""
+        if not self.api_key:
+            raise RuntimeError("Chave da API da Groq não configurada")
+        loop = asyncio.get_running_loop()
+        cliente = self._clientes_async.get(loop)
+        if cliente is None:
+            import groq
+            import httpx
+            http_client = httpx.AsyncClient(limits=self._limites_conexao(), timeout=self.timeout)
+            cliente = groq.AsyncGroq(api_key=self.api_key, http_client=http_client, max_retries=0)
+            self._clientes_async[loop] = cliente
+        return cliente
+
+    async def fechar_async(self):
+        """Fecha o cliente assíncrono do event loop em execução e libera suas conexões.
+
+        Chamado ao fim de cada simulação assíncrona, antes de o loop terminar;
+        uma nova chamada no mesmo loop cria outro cliente.
+        """
+        cliente = self._clientes_async.pop(asyncio.get_running_loop(), None)
+        if cliente is not None:
+            await cliente.close()
+
+    def _limites_conexao(self):
+        """Método privado com os limites do pool de conexões keep-alive."""
+        import httpx
+        return httpx.Limits(
+            max_connections=self.max_conexoes,
+            max_keepalive_connections=self.max_conexoes,
+            keepalive_expiry=30.0
+        )
+
+    @staticmethod
+    def _confirmar_orcamento(orcamento, tokens_estimados, resposta):
+        """Método privado que troca a reserva da requisição pelos tokens gastos.
+
+        Sem o consumo informado pela API, a estimativa reservada continua contando.
+        """
+        gastos = resposta.tokens_prompt + resposta.tokens_completacao
+        orcamento.confirmar(tokens_estimados, gastos or tokens_estimados)
+
+    @staticmethod
+    def _registrar(operacao, modelo, resposta, origem="api", erro=None):
+        """Método privado que registra a chamada no rastreador da execução em andamento."""
+        obter_rastreador().registrar_chamada(
+            operacao, modelo,
+            tokens_prompt=resposta.tokens_prompt,
+            tokens_completacao=resposta.tokens_completacao,
+            latencia=resposta.latencia,
+            tentativas=resposta.tentativas,
+            interrompida=resposta.interrompida,
+            origem=origem,
+            erro=type(erro).__name__ if erro is not None else None
+        )
+
+    def _contar_requisicao(self):
+        """Método privado que incrementa o contador de requisições enviadas."""
+        with self._lock_contador:
+            self.requisicoes += 1
+
+    def _preparar_nova_tentativa(self, erro, tentativa):
+        """Método privado que retorna quanto esperar antes de repetir, ou None para desistir."""
+        espera = self._tempo_de_espera(erro, tentativa)
+        if espera is None or tentativa == self.max_tentativas:
+            return None
+        print(f"[AVISO] Tentativa {tentativa}/{self.max_tentativas} falhou: {str(erro)}; "
+              f"aguardando {espera:.1f}s")
+        import groq
+        if isinstance(erro, groq.RateLimitError):
+            # A pausa vale para todas as chamadas; esta apenas aguarda a liberação no limitador
+            self.limitador.pausar(espera)
+            return 0.0
+        return espera
+
+    @staticmethod
+    def _conteudo(response):
+        """Método privado que extrai o texto de uma resposta completa (sem streaming)."""
+        return response.choices[0].message.content or ""
+
+    @staticmethod
+    def _uso_do_trecho(trecho):
+        """Método privado que lê o consumo de tokens de um trecho do stream, se houver.
+
+        A Groq envia o consumo no último trecho, em `x_groq.usage`; outras APIs
+        compatíveis usam o campo `usage` do próprio trecho.
+        """
+        uso = getattr(trecho, "usage", None)
+        if uso is None:
+            uso = getattr(getattr(trecho, "x_groq", None), "usage", None)
+        return uso
+
+    def _ler_stream(self, stream, detector):
+        """Método privado que consome o stream até o detector reconhecer o fim da parte útil.
+
+        Retorna (texto, uso, interrompida). Fechar o stream antes do fim encerra
+        a conexão, e o servidor deixa de gerar (e cobrar) o restante.
+        """
+        detector.reiniciar()
+        uso = None
+        try:
+            for trecho in stream:
+                uso = self._uso_do_trecho(trecho) or uso
+                if trecho.choices and detector.alimentar(trecho.choices[0].delta.content):
+                    return detector.resultado, uso, True
+        finally:
+            stream.close()
+        return detector.resultado, uso, False
+
+    async def _ler_stream_async(self, stream, detector):
+        """Método privado equivalente a _ler_stream para o cliente assíncrono."""
+        detector.reiniciar()
+        uso = None
+        try:
+            async for trecho in stream:
+                uso = self._uso_do_trecho(trecho) or uso
+                if trecho.choices and detector.alimentar(trecho.choices[0].delta.content):
+                    return detector.resultado, uso, True
+        finally:
+            await stream.close()
+        return detector.resultado, uso, False
+
+    def _montar_resposta(self, texto, uso, mensagens, headers, tokens_estimados, latencia, tentativa,
+                         interrompida=False):
+        """Método privado que monta o RespostaLLM e atualiza o limitador."""
+        self._sincronizar_limites(headers)
+
+        if uso is not None:
+            tokens_prompt = getattr(uso, "prompt_tokens", 0) or 0
+            tokens_completacao = getattr(uso, "completion_tokens", 0) or 0
+        elif interrompida:
+            # Ao interromper o stream o consumo real não chega; estima pelo texto recebido
+            tokens_prompt = self.estimar_tokens(mensagens)
+            tokens_completacao = len(texto) // 4 + 1
+        else:
+            tokens_prompt = tokens_completacao = 0
+        if uso is not None or interrompida:
+            self.limitador.reembolsar(tokens_estimados, tokens_prompt + tokens_completacao)
+
+        return RespostaLLM(
+            texto=texto.strip(),
+            tokens_prompt=tokens_prompt,
+            tokens_completacao=tokens_completacao,
+            latencia=latencia,
+            tentativas=tentativa,
+            interrompida=interrompida
+        )
+
+    @staticmethod
+    def estimar_tokens(mensagens):
+        """Estimativa grosseira de tokens (aprox. 4 caracteres por token)."""
+        caracteres = sum(len(m.get("content") or "") for m in mensagens)
+        return caracteres // 4 + 8 * len(mensagens)
+
+    def _tempo_de_espera(self, erro, tentativa):
+        """Método privado que decide se o erro é temporário e quanto esperar.
+
+        Retorna None para erros que não devem ser repetidos.
+        """
+        import groq
+        if isinstance(erro, groq.RateLimitError):
+            dica = self._ler_dica_servidor(erro.response.headers)
+            return dica if dica is not None else self._atraso_exponencial(tentativa)
+        if isinstance(erro, groq.APIStatusError):
+            if erro.status_code >= 500:
+                dica = self._ler_dica_servidor(erro.response.headers)
+                return dica if dica is not None else self._atraso_exponencial(tentativa)
+            return None
+        if isinstance(erro, groq.APIConnectionError):
+            return self._atraso_exponencial(tentativa)
+        return None
+
+    def _atraso_exponencial(self, tentativa):
+        """Método privado de backoff exponencial com jitter completo."""
+        limite = min(self.atraso_maximo, self.atraso_base * (2 ** (tentativa - 1)))
+        return random.uniform(limite / 2, limite)
+
+    def _sincronizar_limites(self, headers):
+        """Método privado que alinha o limitador ao saldo de tokens informado pelo servidor."""
+        restantes = headers.get("x-ratelimit-remaining-tokens")
+        if restantes is not None:
+            try:
+                self.limitador.sincronizar_tokens(float(restantes))
+            except ValueError:
+                pass
+
+    @staticmethod
+    def _ler_dica_servidor(headers):
+        """Método privado que lê Retry-After ou x-ratelimit-reset-* dos headers."""
+        retry_after = headers.get("retry-after")
+        if retry_after is not None:
+            try:
+                return max(0.0, float(retry_after))
+            except ValueError:
+                pass
+
+        esperas = [
+            _converter_duracao(headers.get(nome))
+            for nome in ("x-ratelimit-reset-requests", "x-ratelimit-reset-tokens")
+        ]
+        esperas = [e for e in esperas if e is not None]
+        return max(esperas) if esperas else None
+
+
+def _converter_duracao(valor):
+    """Converte durações como '1m2.5s', '7.66s' ou '250ms' em segundos."""
+    if not valor:
+        return None
+    partes = re.findall(r"([\d.]+)(ms|h|m|s)", valor)
+    if not partes:
+        return None
+    fatores = {"h": 3600.0, "m": 60.0, "s": 1.0, "ms": 0.001}
+    return sum(float(numero) * fatores[unidade] for numero, unidade in partes)
+
+
+_clientes = {}
+_clientes_lock = threading.Lock()
+
+
+def obter_cliente_llm(api_key=None):
+    """Retorna o ClienteLLM compartilhado do processo para a chave informada."""
+    if api_key is None:
+        api_key = os.getenv("GROQ_API_KEY")
+    with _clientes_lock:
+        cliente = _clientes.get(api_key)
+        if cliente is None:
+            from controller.cassete_llm import obter_cassete_configurado
+            cliente = ClienteLLM(api_key=api_key)
+            cliente.cassete = obter_cassete_configurado()
+            _clientes[api_key] = cliente
+        return cliente
+
+
+def obter_chaves_api():
+    """Retorna as chaves da API configuradas.
+
+    GROQ_API_KEYS aceita várias chaves separadas por vírgula; sem ela, usa
+    apenas GROQ_API_KEY. Retorna uma lista vazia se nenhuma estiver definida.
+    """
+    chaves = [c.strip() for c in os.getenv("GROQ_API_KEYS", "").split(",") if c.strip()]
+    if not chaves and os.getenv("GROQ_API_KEY"):
+        chaves = [os.getenv("GROQ_API_KEY")]
+    return chaves
@@ -0,0 +1,135 @@
+from abc import ABC, abstractmethod
+
+
+class DetectorFim(ABC):
+    """Reconhece, enquanto a resposta chega em partes, quando ela já contém o necessário.
+
+    Responsabilidades:
+    - Acumular o texto recebido por streaming
+    - Examinar apenas o trecho novo a cada parte, sem reler o texto inteiro
+    - Informar onde termina a parte útil, para a leitura ser interrompida ali
+    """
+    def __init__(self):
+        self.reiniciar()
+
+    def reiniciar(self):
+        """Descarta o texto recebido, para uma nova tentativa da mesma chamada."""
+        self.texto = ""
+        self.fim = None
+
+    @property
+    def assinatura(self):
+        """Identifica o detector e seus parâmetros (ex.: na chave de um cassete)."""
+        return type(self).__name__
+
+    @property
+    def completo(self):
+        """Indica se a parte útil da resposta já chegou."""
+        return self.fim is not None
+
+    @property
+    def resultado(self):
+        """Texto até o fim da parte útil (ou tudo o que chegou, se ela não terminou)."""
+        return self.texto[:self.fim] if self.completo else self.texto
+
+    def alimentar(self, trecho):
+        """Acrescenta um trecho da resposta; retorna True quando a parte útil está completa."""
+        if self.completo or not trecho:
+            return self.completo
+        inicio = len(self.texto)
+        self.texto += trecho
+        self.fim = self._examinar(inicio)
+        return self.completo
+
+    @abstractmethod
+    def _examinar(self, inicio):
+        """Examina o texto a partir de `inicio`; retorna a posição do fim da parte útil ou None."""
+        pass
+
+
+class DetectorJSON(DetectorFim):
+    """Termina quando o primeiro objeto (ou array) JSON da resposta se fecha.
+
+    Chaves e colchetes dentro de strings JSON são ignorados; o texto antes da
+    abertura (ex.: "Aqui estão as notas:") não é analisado.
+    """
+    def __init__(self, abertura="{"):
+        if abertura not in ("{", "["):
+            raise ValueError("abertura deve ser '{' ou '['")
+        self.abertura = abertura
+        super().__init__()
+
+    @property
+    def assinatura(self):
+        return f"{type(self).__name__}({self.abertura})"
+
+    def reiniciar(self):
+        super().reiniciar()
+        self._profundidade = 0
+        self._em_string = False
+        self._escape = False
+
+    def _examinar(self, inicio):
+        """Método privado que acompanha a profundidade de chaves e colchetes."""
+        for posicao in range(inicio, len(self.texto)):
+            caractere = self.texto[posicao]
+            if self._profundidade == 0:
+                if caractere == self.abertura:
+                    self._profundidade = 1
+                continue
+            if self._em_string:
+                if self._escape:
+                    self._escape = False
+                elif caractere == "\\":
+                    self._escape = True
+                elif caractere == '"':
+                    self._em_string = False
+            elif caractere == '"':
+                self._em_string = True
+            elif caractere in "{[":
+                self._profundidade += 1
+            elif caractere in "}]":
+                self._profundidade -= 1
+                if self._profundidade == 0:
+                    return posicao + 1
+        return None
+
+
+class DetectorBlocosCodigo(DetectorFim):
+    """Termina quando `quantidade` blocos de código cercados por ``` se fecham.
+
+    A cerca de abertura precisa iniciar uma linha; a de fechamento pode vir no
+    fim de uma linha de código. Só linhas completas são analisadas.
+    """
+    def __init__(self, quantidade=1):
+        self.quantidade = max(1, quantidade)
+        super().__init__()
+
+    @property
+    def assinatura(self):
+        return f"{type(self).__name__}({self.quantidade})"
+
+    def reiniciar(self):
+        super().reiniciar()
+        self._inicio_linha = 0
+        self._dentro = False
+        self._blocos = 0
+
+    def _examinar(self, inicio):
+        """Método privado que percorre as linhas completas recebidas desde a última vez."""
+        while True:
+            quebra = self.texto.find("\n", self._inicio_linha)
+            if quebra == -1:
+                return None
+            inicio_linha = self._inicio_linha
+            linha = self.texto[inicio_linha:quebra].rstrip()
+            self._inicio_linha = quebra + 1
+
+            if not self._dentro:
+                self._dentro = linha.lstrip().startswith("```")
+            elif linha.endswith("```"):
+                # Uma cerca no meio da linha (ex.: dentro de uma string) não fecha o bloco
+                self._dentro = False
+                self._blocos += 1
+                if self._blocos >= self.quantidade:
+                    return inicio_linha + len(linha)
@@ -0,0 +1,85 @@
+import asyncio
+import threading
+
+
+class ExecucaoSimulacao:
+    """Executa uma simulação em segundo plano, sem bloquear quem a iniciou.
+
+    Responsabilidades:
+    - Rodar SimulacaoController.simular em um event loop próprio, em uma thread
+    - Acumular os eventos de cada geração para consulta a qualquer momento
+    - Cancelar a simulação quando solicitado, encerrando as chamadas em andamento
+    """
+    def __init__(self, controller, codigo_inicial, linguagem, tamanho_populacao=5, geracoes=3, retomar=False,
+                 orcamento=None):
+        self.controller = controller
+        self.parametros = {
+            "codigo_inicial": codigo_inicial,
+            "linguagem": linguagem,
+            "tamanho_populacao": tamanho_populacao,
+            "geracoes": geracoes,
+            "retomar": retomar,
+            "orcamento": orcamento
+        }
+        self.resultado = None
+        self.erro = None
+        self.cancelada = False
+        self._eventos = []
+        self._lock = threading.Lock()
+        self._loop = None
+        self._tarefa = None
+        self._parada_pedida = False
+        self._thread = threading.Thread(target=self._executar, name="execucao-simulacao", daemon=True)
+
+    def iniciar(self):
+        """Inicia a simulação em segundo plano e retorna imediatamente."""
+        self._thread.start()
+        return self
+
+    def parar(self):
+        """Pede o cancelamento da simulação; o histórico já avaliado é mantido."""
+        with self._lock:
+            self._parada_pedida = True
+            if self._loop is not None and self._tarefa is not None:
+                self._loop.call_soon_threadsafe(self._tarefa.cancel)
+
+    def aguardar(self, timeout=None):
+        """Aguarda o fim da simulação; retorna True se ela terminou."""
+        self._thread.join(timeout)
+        return not self._thread.is_alive()
+
+    @property
+    def em_andamento(self):
+        """Indica se a simulação ainda está executando."""
+        return self._thread.is_alive()
+
+    def eventos(self):
+        """Retorna uma cópia dos eventos de geração recebidos até agora."""
+        with self._lock:
+            return list(self._eventos)
+
+    def _executar(self):
+        """Método privado executado na thread de fundo."""
+        try:
+            asyncio.run(self._consumir())
+        except asyncio.CancelledError:
+            self.cancelada = True
+            print("[INFO] Simulação cancelada")
+        except Exception as e:
+            self.erro = str(e)
+            print(f"[ERRO] Erro na simulação em segundo plano: {str(e)}")
+
+    async def _consumir(self):
+        """Método privado que percorre os eventos da simulação."""
+        with self._lock:
+            if self._parada_pedida:
+                raise asyncio.CancelledError()
+            self._loop = asyncio.get_running_loop()
+            self._tarefa = asyncio.current_task()
+
+        async for evento in self.controller.simular(**self.parametros):
+            if evento["tipo"] == "fim":
+                self.resultado = evento
+            else:
+                with self._lock:
+                    self._eventos.append(evento)
@@ -0,0 +1,163 @@
+import math
+import threading
+from controller.interfaces import IFiltroCandidatos
+from controller.sandbox import PoolSandbox, encontrar_funcao_alvo, gerar_entradas
+
+
+class FiltroCorrecao(IFiltroCandidatos):
+    """Filtro diferencial que compara cada candidato com o algoritmo original.
+
+    Responsabilidades:
+    - Executar o original e o candidato nas mesmas entradas geradas
+    - Descartar candidatos que lançam exceções, estouram o tempo ou mudam a saída
+    - Evitar que candidatos quebrados gastem chamadas de avaliação
+
+    Sem um `pool`, o filtro cria o seu na primeira verificação e o encerra em
+    fechar(); um pool recebido pertence a quem o criou e continua aberto.
+    """
+    def __init__(self, pool=None, caminho_original="./utils/algoritmo_original.py",
+                 tamanhos=(0, 1, 2, 3, 10, 50, 200), semente=7, num_workers=None):
+        self.pool = pool
+        self._pool_proprio = pool is None
+        self.num_workers = num_workers
+        # Verdadeiro se o pool não pôde ser iniciado; a verificação fica desativada
+        self.sandbox_indisponivel = False
+        self.caminho_original = caminho_original
+        self.tamanhos = tamanhos
+        self.semente = semente
+        self._referencia = None
+        self._lock = threading.Lock()
+        self._lock_referencia = threading.Lock()
+        self.verificados = 0
+        self.aprovados = 0
+        self.rejeitados = {"erro": 0, "divergencia": 0}
+
+    def filtrar(self, algoritmo):
+        """Retorna o algoritmo se ele se comporta como o original, ou None caso contrário."""
+        if algoritmo.linguagem.lower() != "python":
+            return algoritmo
+
+        pool = self._obter_pool()
+        if pool is None:
+            # Sandbox indisponível: o candidato segue sem a verificação
+            return algoritmo
+
+        referencia = self._obter_referencia(pool)
+        if referencia is None:
+            # Sem um original executável não há com o que comparar
+            return algoritmo
+        nome_funcao, entradas, saidas_esperadas = referencia
+
+        resultado = pool.executar(algoritmo.codigo, entradas, nome_funcao)
+        with self._lock:
+            self.verificados += 1
+
+        if not resultado["ok"]:
+            print(f"[INFO] Candidato {algoritmo.id} descartado: {resultado['erro']}")
+            self._contar_rejeicao("erro")
+            return None
+
+        for esperada, obtida in zip(saidas_esperadas, resultado["saidas"]):
+            if not self._saidas_equivalentes(esperada, obtida):
+                print(f"[INFO] Candidato {algoritmo.id} descartado: saída diferente do original")
+                self._contar_rejeicao("divergencia")
+                return None
+
+        with self._lock:
+            self.aprovados += 1
+        return algoritmo
+
+    def get_estatisticas(self):
+        """Retorna os contadores do filtro de correção."""
+        with self._lock:
+            return {
+                "verificados": self.verificados,
+                "aprovados": self.aprovados,
+                "rejeitados": sum(self.rejeitados.values()),
+                "rejeitados_por_motivo": dict(self.rejeitados),
+                "sandbox_indisponivel": self.sandbox_indisponivel
+            }
+
+    def fechar(self):
+        """Encerra o pool de workers criado pelo filtro (um novo é criado se o filtro voltar a ser usado)."""
+        with self._lock:
+            # A próxima execução tenta iniciar o sandbox de novo
+            self.sandbox_indisponivel = False
+            if self.pool is not None and self._pool_proprio:
+                self.pool.fechar()
+                self.pool = None
+
+    def _contar_rejeicao(self, motivo):
+        """Método privado que incrementa o contador de rejeições."""
+        with self._lock:
+            self.rejeitados[motivo] += 1
+
+    def _obter_pool(self):
+        """Método privado que cria o pool de workers na primeira utilização; retorna None se ele não iniciar."""
+        with self._lock:
+            if self.pool is None and not self.sandbox_indisponivel:
+                try:
+                    self.pool = PoolSandbox(num_workers=self.num_workers)
+                except Exception as e:
+                    # Ex.: script sem o guard if __name__ == "__main__", exigido pelo "spawn"
+                    print(f"[ERRO] Não foi possível iniciar o sandbox de execução: {str(e)}. "
+                          f"A verificação de correção está desativada nesta execução")
+                    self.sandbox_indisponivel = True
+            return self.pool
+
+    def _obter_referencia(self, pool):
+        """Método privado que executa o original no pool e guarda as saídas esperadas."""
+        try:
+            with open(self.caminho_original, "r", encoding="utf-8") as f:
+                codigo_original = f.read()
+        except OSError:
+            return None
+
+        with self._lock_referencia:
+            if self._referencia is not None and self._referencia[0] == codigo_original:
+                return self._referencia[1]
+
+            referencia = None
+            alvo = encontrar_funcao_alvo(codigo_original)
+            if alvo is not None:
+                nome_funcao, parametros = alvo
+                entradas = gerar_entradas(parametros, tamanhos=self.tamanhos, semente=self.semente)
+                resultado = pool.executar(codigo_original, entradas, nome_funcao)
+                if resultado["ok"]:
+                    referencia = (nome_funcao, entradas, resultado["saidas"])
+                else:
+                    print(f"[AVISO] Algoritmo original não pôde ser executado: {resultado['erro']}")
+
+            self._referencia = (codigo_original, referencia)
+            return referencia
+
+    @classmethod
+    def _saidas_equivalentes(cls, esperada, obtida):
+        """Compara duas saídas (status, valor), tolerando arredondamento em floats."""
+        status_esperado, valor_esperado = esperada
+        status_obtido, valor_obtido = obtida
+        if status_esperado != status_obtido:
+            return False
+        if status_esperado == "erro":
+            # Basta que o candidato também rejeite a entrada
+            return True
+        return cls._valores_equivalentes(valor_esperado, valor_obtido)
+
+    @classmethod
+    def _valores_equivalentes(cls, a, b):
+        """Método privado de comparação recursiva de valores."""
+        if isinstance(a, float) or isinstance(b, float):
+            try:
+                return math.isclose(a, b, rel_tol=1e-9, abs_tol=1e-12)
+            except TypeError:
+                return False
+        if isinstance(a, (list, tuple)) and isinstance(b, (list, tuple)):
+            return (type(a) is type(b) and len(a) == len(b)
+                    and all(cls._valores_equivalentes(x, y) for x, y in zip(a, b)))
+        if isinstance(a, dict) and isinstance(b, dict):
+            return (a.keys() == b.keys()
+                    and all(cls._valores_equivalentes(a[k], b[k]) for k in a))
+        try:
+            return bool(a == b)
+        except Exception:
+            return False
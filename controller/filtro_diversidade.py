@@ -0,0 +1,51 @@
+import threading
+from controller.interfaces import IFiltroCandidatos
+from model.indice_diversidade import IndiceDiversidade
+
+
+class FiltroDiversidade(IFiltroCandidatos):
+    """Filtro que evita avaliar e selecionar cópias de indivíduos já conhecidos.
+
+    Responsabilidades:
+    - Reaproveitar as notas de gêmeos exatos (mesma AST sem comentários e docstrings)
+    - Descartar quase-duplicatas quando a geração já tem indivíduos parecidos demais
+    """
+    def __init__(self, indice=None):
+        self.indice = indice if indice is not None else IndiceDiversidade()
+        self._lock = threading.Lock()
+        self.reaproveitados = 0
+        self.descartados = 0
+
+    def filtrar(self, algoritmo):
+        """Retorna o algoritmo (com notas reaproveitadas, se houver gêmeo) ou None."""
+        if not self.indice.admitir(algoritmo):
+            print(f"[INFO] Candidato {algoritmo.id} descartado: limite de indivíduos parecidos atingido")
+            with self._lock:
+                self.descartados += 1
+            return None
+
+        notas = self.indice.buscar_notas(algoritmo)
+        if notas is not None:
+            # Algoritmos com fitness definido não são reenviados ao avaliador
+            fitness, metricas = notas
+            algoritmo.set_fitness(fitness)
+            algoritmo.set_metricas(dict(metricas))
+            with self._lock:
+                self.reaproveitados += 1
+        return algoritmo
+
+    def registrar_avaliado(self, algoritmo):
+        """Guarda as notas do algoritmo avaliado para futuros gêmeos."""
+        self.indice.registrar_notas(algoritmo)
+
+    def iniciar_geracao(self, geracao):
+        """Reinicia o controle de diversidade para a nova geração."""
+        self.indice.nova_geracao()
+
+    def get_estatisticas(self):
+        """Retorna os contadores de reaproveitamento e descarte."""
+        with self._lock:
+            return {
+                "reaproveitados": self.reaproveitados,
+                "descartados": self.descartados
+            }
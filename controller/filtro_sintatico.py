@@ -0,0 +1,146 @@
+import ast
+import re
+import textwrap
+import threading
+from controller.interfaces import IFiltroCandidatos
+
+# Blocos de código em markdown: ```linguagem\n ... ```
+_PADRAO_BLOCO = re.compile(r"```[ \t]*([\w+#.-]*)[ \t]*\n(.*?)(?:```|\Z)", re.DOTALL)
+
+# Linhas que indicam o início de código Python
+_PADRAO_INICIO_PYTHON = re.compile(r"^(def |async def |class |import |from |@|if __name__)")
+
+# Rótulos aceitos na abertura do bloco para cada linguagem
+_ALIASES_LINGUAGEM = {
+    "python": ("python", "py", "python3"),
+    "javascript": ("javascript", "js", "jsx")
+}
+
+# Marcadores deixados pelos fallbacks do OperadorGenetico
+_MARCADOR_COMBINADO = "# Código combinado (fallback por erro na API)"
+_MARCADOR_SEGUNDO_ALGORITMO = "# Algoritmo 2:"
+_PADRAO_MARCADORES = re.compile(
+    r"(# Código combinado \(fallback por erro na API\)|# Código original \(falha na mutação\)|"
+    r"# Algoritmo 1:|"
+    r"# Variação \d+ do algoritmo original|# Gerada automaticamente)"
+)
+
+
+class FiltroSintatico(IFiltroCandidatos):
+    """Filtro estático e barato aplicado antes de qualquer execução ou avaliação.
+
+    Responsabilidades:
+    - Extrair o código das respostas do modelo (blocos markdown, texto explicativo)
+    - Separar os programas concatenados pelos fallbacks dos operadores
+    - Normalizar espaços em branco
+    - Verificar a sintaxe Python com ast.parse/compile, tentando reparar antes de descartar
+    """
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.recebidos = 0
+        self.reparados = 0
+        self.descartados = 0
+
+    def filtrar(self, algoritmo):
+        """Retorna o algoritmo com o código limpo, ou None se não houver código válido."""
+        with self._lock:
+            self.recebidos += 1
+
+        original = algoritmo.codigo or ""
+        python = algoritmo.linguagem.lower() == "python"
+        codigo = self.extrair_codigo(original, algoritmo.linguagem)
+        codigo = self.normalizar(codigo)
+
+        if python:
+            codigo = self._reparar_python(codigo)
+
+        if not codigo or not codigo.strip():
+            print(f"[INFO] Candidato {algoritmo.id} descartado: nenhum código válido na resposta")
+            with self._lock:
+                self.descartados += 1
+            return None
+
+        if codigo != self.normalizar(original):
+            with self._lock:
+                self.reparados += 1
+        algoritmo.codigo = codigo
+        return algoritmo
+
+    def get_estatisticas(self):
+        """Retorna os contadores do filtro sintático."""
+        with self._lock:
+            return {
+                "recebidos": self.recebidos,
+                "reparados": self.reparados,
+                "descartados": self.descartados
+            }
+
+    @staticmethod
+    def extrair_codigo(texto, linguagem="Python"):
+        """Extrai o código de uma resposta do modelo, descartando texto e cercas markdown."""
+        texto = texto.replace("\r\n", "\n").replace("\r", "\n")
+        combinado = _MARCADOR_COMBINADO in texto
+
+        # Remove marcadores de fallback do início; o da mutação pode envolver o do cruzamento
+        texto = texto.lstrip()
+        marcador = _PADRAO_MARCADORES.match(texto)
+        while marcador:
+            texto = texto[marcador.end():].lstrip()
+            marcador = _PADRAO_MARCADORES.match(texto)
+
+        # Fallback de cruzamento: mantém apenas o primeiro programa
+        if combinado and _MARCADOR_SEGUNDO_ALGORITMO in texto:
+            texto = texto.split(_MARCADOR_SEGUNDO_ALGORITMO, 1)[0]
+
+        blocos = _PADRAO_BLOCO.findall(texto)
+        if blocos:
+            linguagem = linguagem.lower()
+            aceitos = _ALIASES_LINGUAGEM.get(linguagem, (linguagem,)) + ("",)
+            preferidos = [c for lang, c in blocos if lang.lower() in aceitos]
+            candidatos = preferidos or [c for _, c in blocos]
+            if linguagem == "python":
+                # O primeiro bloco que compila vence; senão, o maior
+                for bloco in candidatos:
+                    if FiltroSintatico._compila(bloco):
+                        return bloco
+            return max(candidatos, key=len)
+        return texto
+
+    @staticmethod
+    def normalizar(codigo):
+        """Normaliza quebras de linha, espaços finais e linhas em branco excessivas."""
+        codigo = codigo.replace("\r\n", "\n").replace("\r", "\n")
+        linhas = [linha.rstrip() for linha in codigo.split("\n")]
+        codigo = "\n".join(linhas).strip("\n")
+        codigo = re.sub(r"\n{3,}", "\n\n\n", codigo)
+        return codigo + "\n" if codigo else ""
+
+    def _reparar_python(self, codigo):
+        """Método privado que retorna código Python compilável ou None."""
+        if self._compila(codigo):
+            return codigo
+
+        tentativa = textwrap.dedent(codigo)
+        if self._compila(tentativa):
+            return tentativa
+
+        # Remove texto explicativo antes e depois do código
+        linhas = tentativa.split("\n")
+        inicios = [i for i, linha in enumerate(linhas) if _PADRAO_INICIO_PYTHON.match(linha)]
+        for inicio in inicios[:3]:
+            for fim in range(len(linhas), inicio, -1):
+                trecho = "\n".join(linhas[inicio:fim]).strip("\n") + "\n"
+                if self._compila(trecho):
+                    return trecho
+        return None
+
+    @staticmethod
+    def _compila(codigo):
+        """Verifica se o código Python é sintaticamente válido."""
+        if not codigo or not codigo.strip():
+            return False
+        try:
+            compile(ast.parse(codigo), "<candidato>", "exec")
+            return True
+        except (SyntaxError, ValueError):
+            return False
@@ -0,0 +1,177 @@
+import hashlib
+import threading
+import time
+from collections import deque
+
+import numpy as np
+
+from controller.interfaces import IFiltroCandidatos
+from model.modelo_substituto import ModeloSubstituto, extrair_caracteristicas
+
+
+class FiltroSubstituto(IFiltroCandidatos):
+    """Filtro que só envia ao avaliador os candidatos com as melhores notas previstas.
+
+    Responsabilidades:
+    - Prever as notas de cada candidato com um ModeloSubstituto, em microssegundos
+    - Aprovar os candidatos cujo fitness previsto está entre os melhores esperados
+    - Treinar o modelo com as notas reais de cada candidato avaliado
+    - Acompanhar o erro das previsões, comparando-as com as notas reais
+
+    O limiar é o quantil (1 - fracao_avaliada) do fitness previsto para os
+    candidatos recentes, e o modelo só aprende entre gerações. Assim a decisão
+    sobre um candidato depende apenas do seu código e das gerações anteriores,
+    e não da ordem em que os filhos chegam à triagem (um cassete reproduz a
+    mesma seleção). Uma fração `exploracao` dos reprovados é avaliada mesmo
+    assim, escolhida pelo hash do código, para o modelo continuar aprendendo
+    com candidatos que ele subestima.
+    """
+    def __init__(self, modelo=None, fracao_avaliada=0.5, minimo_amostras=20, exploracao=0.1, janela=200):
+        """
+        Args:
+            modelo: ModeloSubstituto a usar (um novo, por padrão)
+            fracao_avaliada: Fração esperada dos candidatos enviada ao avaliador
+            minimo_amostras: Avaliações reais antes de o modelo começar a descartar
+            exploracao: Fração dos reprovados que é avaliada mesmo assim
+            janela: Quantidade de candidatos recentes usada para calcular o limiar
+        """
+        if not 0 < fracao_avaliada <= 1:
+            raise ValueError("fracao_avaliada deve estar entre 0 (exclusive) e 1")
+        self.modelo = modelo if modelo is not None else ModeloSubstituto()
+        self.fracao_avaliada = fracao_avaliada
+        self.minimo_amostras = minimo_amostras
+        self.exploracao = exploracao
+        self._lock = threading.Lock()
+        self.limiar = None
+        # Características dos candidatos recentes, para recalcular o limiar com o modelo atualizado
+        self._janela = deque(maxlen=janela)
+        # Candidatos triados e avaliados na geração atual, incorporados em iniciar_geracao
+        self._triados = []
+        self._avaliados = []
+        # hash do código → notas previstas, para comparar com as notas reais (um id() pode
+        # ser reaproveitado por outro objeto depois que o algoritmo é descartado)
+        self._previsoes = {}
+        self.aprovados = 0
+        self.descartados = 0
+        self.explorados = 0
+        self.previsoes = 0
+        self.tempo_previsoes = 0.0
+        self.comparacoes = 0
+        self._erro_absoluto = np.zeros(len(ModeloSubstituto.CRITERIOS) + 1)
+
+    def filtrar(self, algoritmo):
+        """Retorna o algoritmo se valer uma avaliação real, ou None."""
+        # Notas reaproveitadas (ex.: gêmeo conhecido) não custam avaliação
+        if algoritmo.fitness is not None or algoritmo.linguagem.lower() != "python":
+            return algoritmo
+
+        inicio = time.perf_counter()
+        caracteristicas = extrair_caracteristicas(algoritmo.codigo)
+        notas = self.modelo.prever(caracteristicas)
+        duracao = time.perf_counter() - inicio
+        chave = self._chave(algoritmo.codigo)
+        limiar = self.limiar
+
+        with self._lock:
+            self.previsoes += 1
+            self.tempo_previsoes += duracao
+            self._triados.append((chave, caracteristicas))
+
+        if limiar is None:
+            # Aquecimento: o modelo ainda não tem avaliações suficientes para opinar
+            with self._lock:
+                self.aprovados += 1
+            return algoritmo
+
+        fitness_previsto = float(notas.mean())
+        explorado = fitness_previsto < limiar and self._explorar(chave)
+        if fitness_previsto < limiar and not explorado:
+            print(f"[INFO] Candidato {algoritmo.id} descartado: fitness previsto {fitness_previsto:.1f} "
+                  f"abaixo do limiar {limiar:.1f}")
+            with self._lock:
+                self.descartados += 1
+            return None
+
+        with self._lock:
+            self.aprovados += 1
+            self.explorados += 1 if explorado else 0
+            self._previsoes[chave] = notas
+        return algoritmo
+
+    def registrar_avaliado(self, algoritmo):
+        """Guarda as notas reais para o treino e compara com as previstas."""
+        metricas = algoritmo.get_metricas() or {}
+        if algoritmo.linguagem.lower() != "python" or not self._notas_validas(metricas):
+            return
+        reais = np.array([float(metricas[criterio]) for criterio in ModeloSubstituto.CRITERIOS])
+        caracteristicas = extrair_caracteristicas(algoritmo.codigo)
+        chave = self._chave(algoritmo.codigo)
+
+        with self._lock:
+            previstas = self._previsoes.pop(chave, None)
+            if previstas is not None:
+                self.comparacoes += 1
+                self._erro_absoluto[:-1] += np.abs(previstas - reais)
+                self._erro_absoluto[-1] += abs(previstas.mean() - reais.mean())
+            self._avaliados.append((chave, caracteristicas, metricas))
+
+    def iniciar_geracao(self, geracao):
+        """Treina o modelo com a geração anterior e recalcula o limiar de aprovação."""
+        with self._lock:
+            # Ordenados pelo hash do código, para o resultado não depender da ordem de chegada
+            for _, caracteristicas, metricas in sorted(self._avaliados, key=lambda amostra: amostra[0]):
+                self.modelo.atualizar(caracteristicas, metricas)
+            for _, caracteristicas in sorted(self._triados, key=lambda triado: triado[0]):
+                self._janela.append(caracteristicas)
+            self._avaliados = []
+            self._triados = []
+            self._previsoes = {}
+
+            if self.modelo.amostras < self.minimo_amostras or not self._janela:
+                self.limiar = None
+                return
+            previstos = self.modelo.prever_fitness(np.array(self._janela))
+            self.limiar = float(np.quantile(previstos, 1 - self.fracao_avaliada))
+
+        erro = self._erro_medio()
+        erro_texto = f", erro médio do fitness previsto {erro['fitness']:.1f}" if erro else ""
+        print(f"[INFO] Modelo substituto da geração {geracao}: {self.modelo.amostras} amostras, "
+              f"limiar {self.limiar:.1f}{erro_texto}")
+
+    def get_estatisticas(self):
+        """Retorna os contadores de aprovação e descarte, o limiar e o erro médio das previsões."""
+        with self._lock:
+            return {
+                "aprovados": self.aprovados,
+                "descartados": self.descartados,
+                "explorados": self.explorados,
+                "amostras": self.modelo.amostras,
+                "limiar": round(self.limiar, 2) if self.limiar is not None else None,
+                "comparacoes": self.comparacoes,
+                "erro_medio": self._erro_medio(),
+                "tempo_medio_previsao_us": round(self.tempo_previsoes / self.previsoes * 1e6, 1)
+                if self.previsoes else 0.0
+            }
+
+    def _erro_medio(self):
+        """Método privado com o erro absoluto médio de cada critério e do fitness (None sem comparações)."""
+        if not self.comparacoes:
+            return None
+        nomes = ModeloSubstituto.CRITERIOS + ("fitness",)
+        return {nome: round(float(erro / self.comparacoes), 2) for nome, erro in zip(nomes, self._erro_absoluto)}
+
+    def _explorar(self, chave):
+        """Método privado que decide, pelo hash do código, se um reprovado é avaliado mesmo assim."""
+        return int(chave[:16], 16) / 16 ** 16 < self.exploracao
+
+    @staticmethod
+    def _chave(codigo):
+        """Método privado com o hash do código (previsões, ordem de treino e sorteio da exploração)."""
+        return hashlib.blake2b((codigo or "").encode("utf-8"), digest_size=16).hexdigest()
+
+    @staticmethod
+    def _notas_validas(metricas):
+        """Método privado que ignora as notas mínimas atribuídas quando a avaliação falha."""
+        if any(criterio not in metricas for criterio in ModeloSubstituto.CRITERIOS):
+            return False
+        return any(float(metricas[criterio]) > 1 for criterio in ModeloSubstituto.CRITERIOS)
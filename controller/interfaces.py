@@ -2,6 +2,7 @@
 Interfaces para os controladores do sistema.
 Seguindo o princípio de Inversão de Dependência (SOLID).
 """
+import asyncio
 from abc import ABC, abstractmethod
 from typing import Dict, List, Optional, Any
 
@@ -13,18 +14,27 @@ class IAvaliador(ABC):
         """Avalia um algoritmo e atualiza seu fitness e métricas."""
         pass
     
+    @abstractmethod
+    def avaliar_lote(self, algoritmos: List) -> List:
+        """Avalia vários algoritmos de forma concorrente e retorna a mesma lista."""
+        pass
+    
+    async def avaliar_lote_async(self, algoritmos: List) -> List:
+        """Versão assíncrona de avaliar_lote; por padrão executa a versão síncrona em uma thread."""
+        return await asyncio.to_thread(self.avaliar_lote, algoritmos)
+    
     @abstractmethod
     def set_geracao(self, geracao: int):
         """Define a geração atual para as próximas avaliações."""
         pass
     
     @abstractmethod
-    def salvar_historico(self, caminho: str = "./utils/historico_avaliacoes.json"):
-        """Salva o histórico de avaliações em um arquivo."""
+    def salvar_historico(self, caminho: Optional[str] = None):
+        """Grava no arquivo de histórico as avaliações ainda não salvas."""
         pass
     
     @abstractmethod
-    def carregar_historico(self, caminho: str = "./utils/historico_avaliacoes.json"):
+    def carregar_historico(self, caminho: Optional[str] = None):
         """Carrega o histórico de avaliações de um arquivo."""
         pass
     
@@ -32,14 +42,34 @@ class IAvaliador(ABC):
     def get_metricas_geracao(self, geracao: Optional[int] = None) -> Dict[str, Any]:
         """Retorna as métricas médias de uma geração específica."""
         pass
+    
+    def reiniciar_historico(self):
+        """Esquece as avaliações da execução anterior; por padrão não faz nada."""
+        pass
+
+    def tamanho_lote_preferido(self) -> int:
+        """Quantos candidatos convém reunir em cada chamada de avaliar_lote; por padrão 1."""
+        return 1
+
+    def lotes_reprodutiveis(self) -> bool:
+        """Indica se os lotes devem seguir a ordem dos pares, não a de chegada (ex.: cassete); por padrão False."""
+        return False
+
+    def posicao_historico(self) -> Optional[Dict[str, Any]]:
+        """Retorna até onde o histórico já foi gravado, para checkpoints; por padrão None."""
+        return None
+
+    def retomar_historico(self, posicao: Dict[str, Any]):
+        """Continua o histórico a partir de uma posicao_historico anterior; por padrão não faz nada."""
+        pass
 
 
 class IOperadorGenetico(ABC):
     """Interface para operadores genéticos."""
     
     @abstractmethod
-    def selecionar(self, algoritmos: List, quantidade: int = 5) -> List:
-        """Seleciona os melhores algoritmos para reprodução."""
+    def selecionar(self, algoritmos: List, quantidade: int = 5, estrategia: Optional[str] = None) -> List:
+        """Seleciona os algoritmos para reprodução, opcionalmente com outra estratégia."""
         pass
     
     @abstractmethod
@@ -56,3 +86,45 @@ class IOperadorGenetico(ABC):
     def gerar_variacoes_iniciais(self, codigo_base: str, linguagem: str, quantidade: int = 10) -> List:
         """Gera variações iniciais de um código base."""
         pass
+    
+    async def cruzar_async(self, pai1, pai2):
+        """Versão assíncrona de cruzar; por padrão executa a versão síncrona em uma thread."""
+        return await asyncio.to_thread(self.cruzar, pai1, pai2)
+    
+    async def mutar_async(self, algoritmo):
+        """Versão assíncrona de mutar; por padrão executa a versão síncrona em uma thread."""
+        return await asyncio.to_thread(self.mutar, algoritmo)
+    
+    async def gerar_variacoes_iniciais_async(self, codigo_base: str, linguagem: str, quantidade: int = 10) -> List:
+        """Versão assíncrona de gerar_variacoes_iniciais; por padrão usa uma thread."""
+        return await asyncio.to_thread(self.gerar_variacoes_iniciais, codigo_base, linguagem, quantidade)
+
+    def get_estado_rng(self) -> Optional[Dict[str, Any]]:
+        """Retorna o estado dos geradores aleatórios (serializável em JSON); por padrão None."""
+        return None
+
+    def set_estado_rng(self, estado: Dict[str, Any]):
+        """Restaura o estado de get_estado_rng; por padrão não faz nada."""
+        pass
+
+
+class IFiltroCandidatos(ABC):
+    """Interface para filtros que descartam candidatos antes da avaliação."""
+    
+    @abstractmethod
+    def filtrar(self, algoritmo):
+        """Retorna o algoritmo (possivelmente corrigido) ou None para descartá-lo."""
+        pass
+    
+    @abstractmethod
+    def get_estatisticas(self) -> Dict[str, Any]:
+        """Retorna os contadores de candidatos aprovados e descartados."""
+        pass
+    
+    def iniciar_geracao(self, geracao: int):
+        """Chamado no início de cada geração; por padrão não faz nada."""
+        pass
+    
+    def registrar_avaliado(self, algoritmo):
+        """Chamado após a avaliação de um candidato aprovado; por padrão não faz nada."""
+        pass
@@ -0,0 +1,258 @@
+import multiprocessing
+import os
+import queue
+import random
+
+from model.populacao import Populacao
+from controller.cliente_llm import obter_chaves_api
+
+# Tempo máximo de espera pelos migrantes de uma ilha vizinha
+TIMEOUT_MIGRACAO_PADRAO = 600.0
+
+
+def vizinhos(topologia, ilha, num_ilhas):
+    """Retorna as ilhas que recebem os migrantes de `ilha`.
+
+    Topologias:
+    - "anel": cada ilha envia para a seguinte
+    - "completa": cada ilha envia para todas as outras
+    - "estrela": a ilha 0 troca migrantes com todas as demais
+    """
+    if num_ilhas < 2:
+        return []
+    if topologia == "anel":
+        return [(ilha + 1) % num_ilhas]
+    if topologia == "completa":
+        return [i for i in range(num_ilhas) if i != ilha]
+    if topologia == "estrela":
+        return list(range(1, num_ilhas)) if ilha == 0 else [0]
+    raise ValueError(f"Topologia desconhecida: {topologia} (use anel, completa ou estrela)")
+
+
+def origens(topologia, ilha, num_ilhas):
+    """Retorna as ilhas que enviam migrantes para `ilha`."""
+    return [i for i in range(num_ilhas) if ilha in vizinhos(topologia, i, num_ilhas)]
+
+
+def criar_componentes_ilha(indice, configuracao):
+    """Cria avaliador, operador e filtros de uma ilha, dentro do processo dela.
+
+    Fábricas alternativas devem ter a mesma assinatura e ser definidas no
+    nível do módulo, para que possam ser enviadas ao processo da ilha.
+    """
+    from controller.avaliador_execucao import AvaliadorExecucao
+    from controller.operador_genetico import OperadorGenetico
+    from controller.filtro_sintatico import FiltroSintatico
+    from controller.filtro_diversidade import FiltroDiversidade
+    from controller.filtro_substituto import FiltroSubstituto
+    from controller.filtro_correcao import FiltroCorrecao
+
+    # As ilhas dividem os núcleos entre seus pools de execução
+    workers = max(1, (os.cpu_count() or 2) // configuracao["num_ilhas"])
+    avaliador = AvaliadorExecucao(caminho_historico=configuracao["caminho_historico"], num_workers=workers)
+    operador = OperadorGenetico(
+        api_key=configuracao["api_key"],
+        estrategia_selecao=configuracao.get("estrategia_selecao", "roleta"),
+        semente=configuracao.get("semente")
+    )
+    filtros = [FiltroSintatico(), FiltroDiversidade(), FiltroSubstituto(), FiltroCorrecao(num_workers=workers)]
+    return avaliador, operador, filtros
+
+
+def _segmentos(geracoes, intervalo_migracao):
+    """Divide as gerações em trechos separados por migrações."""
+    segmentos = [intervalo_migracao] * (geracoes // intervalo_migracao)
+    if geracoes % intervalo_migracao:
+        segmentos.append(geracoes % intervalo_migracao)
+    return segmentos
+
+
+def _executar_ilha(indice, configuracao, fabrica, filas_entrada, fila_resultados):
+    """Processo de uma ilha: evolui a população local e troca migrantes com as vizinhas."""
+    # Cada ilha usa a sua chave e a sua parcela do limite de taxa da chave
+    if configuracao["api_key"]:
+        os.environ["GROQ_API_KEY"] = configuracao["api_key"]
+    for variavel, limite in configuracao["limites"].items():
+        os.environ[variavel] = str(limite)
+    random.seed(configuracao["semente"])
+
+    avaliador, filtros = None, []
+    try:
+        avaliador, operador, filtros = fabrica(indice, configuracao)
+        populacao = Populacao(linguagem=configuracao["linguagem"], tamanho=configuracao["tamanho_populacao"])
+        populacao.set_avaliador(avaliador)
+        populacao.set_operador(operador)
+        for filtro in filtros:
+            populacao.adicionar_filtro(filtro)
+
+        populacao.gerar_populacao_inicial(codigo_base=configuracao["codigo_inicial"])
+
+        topologia = configuracao["topologia"]
+        num_ilhas = configuracao["num_ilhas"]
+        destinos = vizinhos(topologia, indice, num_ilhas)
+        esperadas = set(origens(topologia, indice, num_ilhas))
+        # Migrantes que chegaram antes de a ilha terminar a época correspondente
+        adiantados = {}
+        migracoes = 0
+
+        segmentos = _segmentos(configuracao["geracoes"], configuracao["intervalo_migracao"])
+        for epoca, num_geracoes in enumerate(segmentos):
+            populacao.evoluir(num_geracoes=num_geracoes)
+            if epoca == len(segmentos) - 1 or not destinos:
+                continue
+
+            enviados = populacao.emigrantes(configuracao["num_migrantes"])
+            for destino in destinos:
+                filas_entrada[destino].put((epoca, indice, enviados))
+
+            recebidos = adiantados.pop(epoca, {})
+            while set(recebidos) != esperadas:
+                try:
+                    epoca_msg, origem, migrantes = filas_entrada[indice].get(timeout=configuracao["timeout_migracao"])
+                except queue.Empty:
+                    print(f"[AVISO] Ilha {indice}: migrantes da época {epoca} não chegaram a tempo")
+                    break
+                if epoca_msg == epoca:
+                    recebidos[origem] = migrantes
+                elif epoca_msg > epoca:
+                    adiantados.setdefault(epoca_msg, {})[origem] = migrantes
+
+            chegada = [m for migrantes in recebidos.values() for m in migrantes]
+            populacao.receber_migrantes(chegada)
+            migracoes += 1
+            print(f"[INFO] Ilha {indice}: {len(chegada)} migrantes recebidos na geração {populacao.geracao}")
+
+        estatisticas = populacao.get_estatisticas()
+        if estatisticas is not None:
+            estatisticas["ilha"] = indice
+            estatisticas["migracoes"] = migracoes
+            estatisticas["filtros"] = {type(f).__name__: f.get_estatisticas() for f in filtros}
+        fila_resultados.put({
+            "ilha": indice,
+            "algoritmos": populacao.algoritmos,
+            "estatisticas": estatisticas,
+            "historico_caminho": configuracao["caminho_historico"],
+            "erro": None
+        })
+    except Exception as e:
+        print(f"[ERRO] Ilha {indice} falhou: {str(e)}")
+        fila_resultados.put({
+            "ilha": indice,
+            "algoritmos": [],
+            "estatisticas": None,
+            "historico_caminho": configuracao["caminho_historico"],
+            "erro": str(e)
+        })
+    finally:
+        for componente in [*filtros, avaliador]:
+            if hasattr(componente, "fechar"):
+                componente.fechar()
+
+
+class ModeloIlhas:
+    """Evolução em ilhas: várias populações em processos separados, com migração periódica.
+
+    Responsabilidades:
+    - Iniciar um processo por ilha, cada um com seu avaliador, operador e filtros
+    - Distribuir as chaves da API entre as ilhas e dividir os limites de taxa
+    - Enviar os melhores indivíduos pela topologia a cada `intervalo_migracao` gerações
+    - Reunir as populações finais de todas as ilhas
+    """
+    def __init__(self, num_ilhas=None, intervalo_migracao=2, num_migrantes=1, topologia="anel",
+                 chaves_api=None, diretorio_historico="./utils/ilhas", fabrica_componentes=None,
+                 estrategia_selecao="roleta", timeout_migracao=TIMEOUT_MIGRACAO_PADRAO):
+        self.chaves_api = chaves_api if chaves_api is not None else obter_chaves_api()
+        self.num_ilhas = num_ilhas or max(1, min(os.cpu_count() or 1, max(2, len(self.chaves_api))))
+        self.intervalo_migracao = max(1, intervalo_migracao)
+        self.num_migrantes = max(0, num_migrantes)
+        vizinhos(topologia, 0, max(2, self.num_ilhas))  # valida a topologia
+        self.topologia = topologia
+        self.diretorio_historico = diretorio_historico
+        self.fabrica_componentes = fabrica_componentes or criar_componentes_ilha
+        self.estrategia_selecao = estrategia_selecao
+        self.timeout_migracao = timeout_migracao
+
+    def executar(self, codigo_inicial, linguagem, tamanho_populacao=5, geracoes=3, callback_progresso=None):
+        """Executa todas as ilhas e retorna a lista de resultados, ordenada pela ilha."""
+        os.makedirs(self.diretorio_historico, exist_ok=True)
+        contexto = multiprocessing.get_context("spawn")
+        filas_entrada = [contexto.Queue() for _ in range(self.num_ilhas)]
+        fila_resultados = contexto.Queue()
+
+        processos = []
+        for indice in range(self.num_ilhas):
+            configuracao = self._configuracao_ilha(indice, codigo_inicial, linguagem, tamanho_populacao, geracoes)
+            # Não-daemon: cada ilha precisa criar o seu próprio pool de sandbox
+            processo = contexto.Process(
+                target=_executar_ilha,
+                args=(indice, configuracao, self.fabrica_componentes, filas_entrada, fila_resultados),
+                name=f"ilha-{indice}"
+            )
+            processo.start()
+            processos.append(processo)
+        print(f"[INFO] {self.num_ilhas} ilhas iniciadas (topologia {self.topologia}, "
+              f"migração a cada {self.intervalo_migracao} gerações)")
+
+        resultados = {}
+        while len(resultados) < self.num_ilhas:
+            try:
+                resultado = fila_resultados.get(timeout=1.0)
+            except queue.Empty:
+                mortos = [i for i, p in enumerate(processos) if not p.is_alive() and i not in resultados]
+                for indice in mortos:
+                    # Processo encerrado sem resultado (ex.: morto pelo sistema)
+                    if processos[indice].exitcode not in (0, None):
+                        resultados[indice] = {
+                            "ilha": indice, "algoritmos": [], "estatisticas": None,
+                            "historico_caminho": self._caminho_historico(indice),
+                            "erro": f"processo encerrado com código {processos[indice].exitcode}"
+                        }
+                continue
+            resultados[resultado["ilha"]] = resultado
+            if callback_progresso:
+                callback_progresso(len(resultados), self.num_ilhas)
+
+        # Migrantes não lidos (ex.: de uma ilha que falhou) impediriam os remetentes de encerrar
+        for fila in filas_entrada:
+            while True:
+                try:
+                    fila.get(timeout=0.1)
+                except queue.Empty:
+                    break
+        for processo in processos:
+            processo.join(timeout=30)
+            if processo.is_alive():
+                processo.terminate()
+        return [resultados[i] for i in range(self.num_ilhas)]
+
+    def _configuracao_ilha(self, indice, codigo_inicial, linguagem, tamanho_populacao, geracoes):
+        """Método privado que monta a configuração enviada ao processo da ilha."""
+        api_key = self.chaves_api[indice % len(self.chaves_api)] if self.chaves_api else None
+        limites = {}
+        if api_key:
+            # Ilhas que compartilham uma chave dividem o limite de taxa dela
+            compartilhando = len(range(indice % len(self.chaves_api), self.num_ilhas, len(self.chaves_api)))
+            limites = {
+                "GROQ_LIMITE_RPM": max(1, int(os.getenv("GROQ_LIMITE_RPM", "30")) // compartilhando),
+                "GROQ_LIMITE_TPM": max(1, int(os.getenv("GROQ_LIMITE_TPM", "6000")) // compartilhando)
+            }
+        return {
+            "codigo_inicial": codigo_inicial,
+            "linguagem": linguagem,
+            "tamanho_populacao": tamanho_populacao,
+            "geracoes": geracoes,
+            "num_ilhas": self.num_ilhas,
+            "topologia": self.topologia,
+            "intervalo_migracao": self.intervalo_migracao,
+            "num_migrantes": self.num_migrantes,
+            "timeout_migracao": self.timeout_migracao,
+            "api_key": api_key,
+            "limites": limites,
+            "estrategia_selecao": self.estrategia_selecao,
+            "caminho_historico": self._caminho_historico(indice),
+            "semente": random.randrange(2 ** 32)
+        }
+
+    def _caminho_historico(self, indice):
+        """Método privado que retorna o arquivo de histórico de uma ilha."""
+        return os.path.join(self.diretorio_historico, f"historico_ilha_{indice}.jsonl")
@@ -1,17 +1,35 @@
-from groq import Groq
-import os
 import random
+import numpy as np
 from model.algoritmo import Algoritmo
 from controller.interfaces import IOperadorGenetico
+from controller.cliente_llm import obter_cliente_llm
+from controller.detector_resposta import DetectorBlocosCodigo
+from controller.selecao import MotorSelecao
+from model.arquivo_pareto import matriz_metricas
 
 class OperadorGenetico(IOperadorGenetico):
-    def __init__(self):
-        self.client = Groq(api_key=os.getenv("GROQ_API_KEY"))
+    # Faixa do max_tokens das respostas com código, dimensionado pelo tamanho do código de entrada
+    TOKENS_MINIMOS_CODIGO = 160
+    TOKENS_MAXIMOS_CODIGO = 1500
+    TOKENS_MAXIMOS_VARIACOES = 3000
 
-    def selecionar(self, algoritmos, quantidade=5):
-        """Seleciona os melhores algoritmos para reprodução usando seleção por roleta."""
+    def __init__(self, api_key=None, estrategia_selecao="roleta", semente=None):
+        # Cliente compartilhado com o avaliador (mesmo pool de conexões e limites)
+        self.cliente = obter_cliente_llm(api_key)
+        self.model = "llama-3.1-8b-instant"
+        # Com semente, a seleção de pais (e, com um cassete, a simulação inteira) é reprodutível
+        self.motor_selecao = MotorSelecao(estrategia_selecao, semente=semente)
+
+    def selecionar(self, algoritmos, quantidade=5, estrategia=None):
+        """Seleciona algoritmos para reprodução.
+
+        A estratégia padrão é a roleta sem reposição; `estrategia` aceita
+        "roleta", "sus", "torneio", "ranking" ou "nsga2" (ver MotorSelecao).
+        O NSGA-II compara eficiência, clareza e boas práticas separadamente,
+        em vez da média arredondada do fitness.
+        """
         print(f"[DEBUG] Selecionando entre {len(algoritmos)} algoritmos...")
-        
+
         # Filtra algoritmos com fitness positivo
         algoritmos_validos = [a for a in algoritmos if a.get_fitness() > 0]
         print(f"[DEBUG] Encontrados {len(algoritmos_validos)} algoritmos válidos")
@@ -21,45 +39,83 @@ class OperadorGenetico(IOperadorGenetico):
             print("[DEBUG] Nenhum algoritmo válido encontrado, usando todos os algoritmos")
             return algoritmos[:quantidade]
 
-        # Ordena por fitness
-        algoritmos_validos.sort(key=lambda x: x.get_fitness(), reverse=True)
-
-        # Ajusta quantidade para não exceder o número de válidos
-        quantidade = min(quantidade, len(algoritmos_validos))
-
-        return self._selecao_roleta(algoritmos_validos, quantidade)
-        
-    def _selecao_roleta(self, algoritmos_validos, quantidade):
-        """Método privado que implementa a seleção por roleta."""
-        fitness_total = sum(a.get_fitness() for a in algoritmos_validos)
-
-        selecionados = []
-        usados = set()
-
-        while len(selecionados) < quantidade:
-            r = random.random()
-            soma = 0
-            for i, a in enumerate(algoritmos_validos):
-                if i in usados:
-                    continue  # pula algoritmos já usados
-                prob = a.get_fitness() / fitness_total
-                soma += prob
-                if r <= soma:
-                    selecionados.append(a)
-                    usados.add(i)
-                    break
+        fitness = np.fromiter(
+            (a.get_fitness() for a in algoritmos_validos), dtype=np.float64, count=len(algoritmos_validos)
+        )
+        objetivos = None
+        if (estrategia or self.motor_selecao.estrategia) == "nsga2":
+            objetivos = matriz_metricas(algoritmos_validos)
+        indices = self.motor_selecao.selecionar_indices(fitness, quantidade, estrategia, objetivos)
+        return [algoritmos_validos[i] for i in indices]
 
-        return selecionados
+    def get_estado_rng(self):
+        """Retorna o estado do motor de seleção e do módulo random (ids dos novos algoritmos)."""
+        versao, interno, gauss = random.getstate()
+        return {
+            "selecao": self.motor_selecao.get_estado(),
+            "random": [versao, list(interno), gauss]
+        }
 
+    def set_estado_rng(self, estado):
+        """Restaura o estado de get_estado_rng."""
+        if estado.get("selecao"):
+            self.motor_selecao.set_estado(estado["selecao"])
+        if estado.get("random"):
+            versao, interno, gauss = estado["random"]
+            random.setstate((versao, tuple(interno), gauss))
 
     def cruzar(self, pai1, pai2):
         """Cruza dois algoritmos para gerar um novo."""
         novo_codigo = self._gerar_codigo_cruzado(pai1.codigo, pai2.codigo)
         return Algoritmo(id=random.randint(1000, 9999), linguagem=pai1.linguagem, codigo=novo_codigo)
+
+    async def cruzar_async(self, pai1, pai2):
+        """Versão assíncrona de cruzar."""
+        try:
+            novo_codigo = (await self.cliente.completar_async(
+                mensagens=[{"role": "user", "content": self._prompt_cruzamento(pai1.codigo, pai2.codigo)}],
+                modelo=self.model,
+                temperatura=0.7,
+                max_tokens=self._max_tokens_codigo(pai1.codigo + pai2.codigo, folga=1.2),
+                detector=DetectorBlocosCodigo(),
+                operacao="cruzamento"
+            )).texto
+        except Exception as e:
+            print(f"[Erro ao cruzar algoritmos]: {str(e)}")
+            novo_codigo = self._fallback_cruzamento(pai1.codigo, pai2.codigo)
+        return Algoritmo(id=random.randint(1000, 9999), linguagem=pai1.linguagem, codigo=novo_codigo)
         
     def _gerar_codigo_cruzado(self, codigo1, codigo2):
         """Método privado que usa a API para gerar um código cruzado a partir de dois códigos."""
-        prompt = f"""
+        try:
+            return self.cliente.completar(
+                mensagens=[{"role": "user", "content": self._prompt_cruzamento(codigo1, codigo2)}],
+                modelo=self.model,
+                temperatura=0.7,
+                max_tokens=self._max_tokens_codigo(codigo1 + codigo2, folga=1.2),
+                detector=DetectorBlocosCodigo(),
+                operacao="cruzamento"
+            ).texto
+        except Exception as e:
+            print(f"[Erro ao cruzar algoritmos]: {str(e)}")
+            return self._fallback_cruzamento(codigo1, codigo2)
+
+    @classmethod
+    def _max_tokens_codigo(cls, codigo, folga=1.5, quantidade=1):
+        """Método privado que dimensiona o max_tokens para `quantidade` códigos do tamanho de `codigo`.
+
+        Cabe o código com folga para crescer, as cercas de markdown e uma linha
+        de explicação; um limite fixo cortava códigos longos e desperdiçava a
+        reserva de tokens com os curtos.
+        """
+        tokens = max(cls.TOKENS_MINIMOS_CODIGO, int((len(codigo) // 4 + 1) * folga) + 40)
+        limite = cls.TOKENS_MAXIMOS_CODIGO if quantidade == 1 else cls.TOKENS_MAXIMOS_VARIACOES
+        return min(limite, tokens * quantidade)
+
+    @staticmethod
+    def _prompt_cruzamento(codigo1, codigo2):
+        """Método privado que monta o prompt de cruzamento."""
+        return f"""
         Você é um otimizador de código.
         Combine os dois algoritmos a seguir, criando uma versão que preserve o objetivo de ambos e que seja eficiente.
         Algoritmo 1:
@@ -68,18 +124,11 @@ class OperadorGenetico(IOperadorGenetico):
         {codigo2}
         ⚠️ Responda apenas com Resultado (código):
         """
-        try:
-            response = self.client.chat.completions.create(
-                model="llama-3.1-8b-instant",
-                messages=[{"role": "user", "content": prompt}],
-                temperature=0.7,
-                max_tokens=300
-            )
-            return response.choices[0].message.content.strip()
-        except Exception as e:
-            print(f"[Erro ao cruzar algoritmos]: {str(e)}")
-            # Em caso de erro, retorna uma combinação simples dos códigos
-            return f"""# Código combinado (fallback por erro na API)
+
+    @staticmethod
+    def _fallback_cruzamento(codigo1, codigo2):
+        """Método privado com a combinação simples usada quando a API falha."""
+        return f"""# Código combinado (fallback por erro na API)
 # Algoritmo 1:
 {codigo1}
 
@@ -90,10 +139,42 @@ class OperadorGenetico(IOperadorGenetico):
         """Aplica mutação em um algoritmo."""
         novo_codigo = self._gerar_codigo_mutado(algoritmo.codigo)
         return Algoritmo(id=random.randint(1000, 9999), linguagem=algoritmo.linguagem, codigo=novo_codigo)
+
+    async def mutar_async(self, algoritmo):
+        """Versão assíncrona de mutar."""
+        try:
+            novo_codigo = (await self.cliente.completar_async(
+                mensagens=[{"role": "user", "content": self._prompt_mutacao(algoritmo.codigo)}],
+                modelo=self.model,
+                temperatura=0.7,
+                max_tokens=self._max_tokens_codigo(algoritmo.codigo),
+                detector=DetectorBlocosCodigo(),
+                operacao="mutacao"
+            )).texto
+        except Exception as e:
+            print(f"[Erro ao mutar algoritmo]: {str(e)}")
+            novo_codigo = self._fallback_mutacao(algoritmo.codigo)
+        return Algoritmo(id=random.randint(1000, 9999), linguagem=algoritmo.linguagem, codigo=novo_codigo)
         
     def _gerar_codigo_mutado(self, codigo):
         """Método privado que usa a API para gerar uma mutação de um código."""
-        prompt = f"""
+        try:
+            return self.cliente.completar(
+                mensagens=[{"role": "user", "content": self._prompt_mutacao(codigo)}],
+                modelo=self.model,
+                temperatura=0.7,
+                max_tokens=self._max_tokens_codigo(codigo),
+                detector=DetectorBlocosCodigo(),
+                operacao="mutacao"
+            ).texto
+        except Exception as e:
+            print(f"[Erro ao mutar algoritmo]: {str(e)}")
+            return self._fallback_mutacao(codigo)
+
+    @staticmethod
+    def _prompt_mutacao(codigo):
+        """Método privado que monta o prompt de mutação."""
+        return f"""
         Você é um otimizador de código.
         Melhore o seguinte código com pequenas alterações que aumentem a eficiência ou simplifiquem a lógica.
 
@@ -102,42 +183,78 @@ class OperadorGenetico(IOperadorGenetico):
 
         ⚠️ Responda apenas com Resultado (código otimizado apenas):
         """
-        try:
-            response = self.client.chat.completions.create(
-                model="llama-3.1-8b-instant",
-                messages=[{"role": "user", "content": prompt}],
-                temperature=0.7,
-                max_tokens=200
-            )
-            return response.choices[0].message.content.strip()
-        except Exception as e:
-            print(f"[Erro ao mutar algoritmo]: {str(e)}")
-            # Em caso de erro, retorna o código original com um pequeno comentário
-            return f"""# Código original (falha na mutação){codigo}"""
+
+    @staticmethod
+    def _fallback_mutacao(codigo):
+        """Método privado que devolve o código original quando a API falha."""
+        # Em caso de erro, retorna o código original com um pequeno comentário
+        return f"""# Código original (falha na mutação)
+{codigo}"""
 
     def gerar_variacoes_iniciais(self, codigo_base: str, linguagem: str, quantidade: int = 10):
         """Gera variações iniciais de um código base."""
         try:
             variacoes = self._obter_variacoes_da_api(codigo_base, linguagem, quantidade)
-            
-            # Se não conseguiu obter variações suficientes da API, cria variações simples
-            if len(variacoes) < quantidade:
-                variacoes.extend(self._criar_variacoes_simples(codigo_base, linguagem, quantidade - len(variacoes)))
-                
-            return variacoes[:quantidade]  # Garante que não ultrapasse a quantidade solicitada
-            
+            return self._completar_variacoes(variacoes, codigo_base, linguagem, quantidade)
         except Exception as e:
             print(f"[Erro ao gerar variações]: {str(e)}")
             # Em caso de erro, cria variações simples
             return self._criar_variacoes_simples(codigo_base, linguagem, quantidade)
+
+    async def gerar_variacoes_iniciais_async(self, codigo_base: str, linguagem: str, quantidade: int = 10):
+        """Versão assíncrona de gerar_variacoes_iniciais."""
+        try:
+            variacoes = self._iniciar_variacoes(codigo_base, linguagem)
+            try:
+                resposta = (await self.cliente.completar_async(
+                    mensagens=[{"role": "user", "content": self._prompt_variacoes(codigo_base, linguagem, quantidade)}],
+                    modelo=self.model,
+                    temperatura=0.8,
+                    max_tokens=self._max_tokens_codigo(codigo_base, quantidade=quantidade),
+                    detector=DetectorBlocosCodigo(quantidade),
+                    operacao="variacoes_iniciais"
+                )).texto
+                print("[INFO] Resposta da API recebida com sucesso")
+                self._separar_variacoes(resposta, linguagem, variacoes, quantidade)
+            except Exception as e:
+                print(f"[ERRO] Falha ao chamar API para variações: {str(e)}")
+            return self._completar_variacoes(variacoes, codigo_base, linguagem, quantidade)
+        except Exception as e:
+            print(f"[Erro ao gerar variações]: {str(e)}")
+            return self._criar_variacoes_simples(codigo_base, linguagem, quantidade)
+
+    def _completar_variacoes(self, variacoes, codigo_base, linguagem, quantidade):
+        """Método privado que completa com variações simples e limita à quantidade pedida."""
+        # Se não conseguiu obter variações suficientes da API, cria variações simples
+        if len(variacoes) < quantidade:
+            variacoes.extend(self._criar_variacoes_simples(codigo_base, linguagem, quantidade - len(variacoes)))
+
+        return variacoes[:quantidade]  # Garante que não ultrapasse a quantidade solicitada
     
     def _obter_variacoes_da_api(self, codigo_base, linguagem, quantidade):
         """Método privado que usa a API para gerar variações de um código."""
-        variacoes = []
+        variacoes = self._iniciar_variacoes(codigo_base, linguagem)
         
+        try:
+            resposta = self.cliente.completar(
+                mensagens=[{"role": "user", "content": self._prompt_variacoes(codigo_base, linguagem, quantidade)}],
+                modelo=self.model,
+                temperatura=0.8,
+                max_tokens=self._max_tokens_codigo(codigo_base, quantidade=quantidade),
+                detector=DetectorBlocosCodigo(quantidade),
+                operacao="variacoes_iniciais"
+            ).texto
+            print("[INFO] Resposta da API recebida com sucesso")
+        except Exception as e:
+            print(f"[ERRO] Falha ao chamar API para variações: {str(e)}")
+            return variacoes  # Retorna apenas o código original
+
+        return self._separar_variacoes(resposta, linguagem, variacoes, quantidade)
+
+    def _iniciar_variacoes(self, codigo_base, linguagem):
+        """Método privado que cria a lista de variações com o código base e salva o backup."""
         # Primeiro, adicione o código base como primeira variação para garantir que tenhamos pelo menos uma
-        from model.algoritmo import Algoritmo
-        variacoes.append(Algoritmo(id=1000, linguagem=linguagem, codigo=codigo_base))
+        variacoes = [Algoritmo(id=1000, linguagem=linguagem, codigo=codigo_base)]
         
         # Salva o código original como backup para uso futuro
         try:
@@ -145,9 +262,12 @@ class OperadorGenetico(IOperadorGenetico):
                 f.write(codigo_base)
         except Exception as e:
             print(f"[AVISO] Não foi possível salvar o código original: {str(e)}")
-        
-        try:
-            prompt = f"""
+        return variacoes
+
+    @staticmethod
+    def _prompt_variacoes(codigo_base, linguagem, quantidade):
+        """Método privado que monta o prompt de geração de variações."""
+        return f"""
             Você é um gerador de variações de código.
             Receba um algoritmo em {linguagem} e crie {quantidade} variações ligeiramente diferentes dele.
             Cada variação deve manter o comportamento original, mas pode ser mais legível, organizada.
@@ -157,18 +277,10 @@ class OperadorGenetico(IOperadorGenetico):
 
             ⚠️ Responda apenas com Resultado (código):
             """
-            response = self.client.chat.completions.create(
-                model="llama-3.1-8b-instant",
-                messages=[{"role": "user", "content": prompt}],
-                temperature=0.8,
-                max_tokens=3000,
-            )
-            resposta = response.choices[0].message.content.strip()
-            print("[INFO] Resposta da API recebida com sucesso")
-        except Exception as e:
-            print(f"[ERRO] Falha ao chamar API para variações: {str(e)}")
-            return variacoes  # Retorna apenas o código original
 
+    @staticmethod
+    def _separar_variacoes(resposta, linguagem, variacoes, quantidade):
+        """Método privado que extrai os blocos de código da resposta para a lista de variações."""
         # Separar versões (ex: separadas por comentários ou blocos)
         blocos = resposta.split("```")
         for i, bloco in enumerate(blocos):
@@ -189,7 +301,9 @@ class OperadorGenetico(IOperadorGenetico):
         
         # Cria variações simples adicionando comentários ou pequenas modificações
         for i in range(1, quantidade):
-            codigo_modificado = f"""# Variação {i} do algoritmo original# Gerada automaticamente{codigo_base}"""
+            codigo_modificado = f"""# Variação {i} do algoritmo original
+# Gerada automaticamente
+{codigo_base}"""
             variacoes.append(Algoritmo(id=1000+i, linguagem=linguagem, codigo=codigo_modificado))
             
         return variacoes
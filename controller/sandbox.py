@@ -0,0 +1,266 @@
+import ast
+import copy
+import multiprocessing
+import os
+import pickle
+import random
+import signal
+import string
+import sys
+import time
+import tracemalloc
+from multiprocessing import TimeoutError as TempoEsgotadoPool
+
+try:
+    import resource
+except ImportError:  # Windows não possui limites de recursos POSIX
+    resource = None
+
+
+# Nomes de parâmetros usados para escolher o tipo das entradas geradas
+_PARAMETROS_LISTA = ("lista", "list", "arr", "array", "vetor", "nums", "numeros", "valores",
+                     "dados", "seq", "items", "itens", "elementos", "colecao")
+_PARAMETROS_TEXTO = ("texto", "text", "string", "str", "palavra", "frase", "nome", "s")
+_PARAMETROS_DICT = ("dic", "dict", "mapa", "tabela")
+
+
+class _TempoEsgotado(BaseException):
+    """Sinaliza dentro do worker que o tempo de parede da tarefa acabou.
+
+    Herda de BaseException para não ser capturada por `except Exception` do candidato.
+    """
+    pass
+
+
+def encontrar_funcao_alvo(codigo):
+    """Retorna (nome, parametros) da primeira função pública de nível superior, ou None."""
+    try:
+        arvore = ast.parse(codigo)
+    except (SyntaxError, ValueError):
+        return None
+
+    funcoes = [n for n in arvore.body if isinstance(n, (ast.FunctionDef, ast.AsyncFunctionDef))]
+    publicas = [f for f in funcoes if not f.name.startswith("_")] or funcoes
+    if not publicas:
+        return None
+
+    funcao = publicas[0]
+    args = funcao.args
+    # Parâmetros com valor padrão são deixados para o próprio candidato
+    obrigatorios = args.args[:len(args.args) - len(args.defaults)]
+    return funcao.name, [a.arg for a in obrigatorios if a.arg not in ("self", "cls")]
+
+
+def gerar_entradas(parametros, tamanhos=(0, 1, 2, 10, 100, 1000), semente=42):
+    """Gera tuplas de argumentos reprodutíveis para os parâmetros informados."""
+    rng = random.Random(semente)
+    entradas = []
+    for tamanho in tamanhos:
+        args = []
+        for nome in parametros:
+            args.append(_gerar_valor(nome.lower(), tamanho, rng, len(parametros) == 1))
+        entradas.append(tuple(args))
+    return entradas
+
+
+def _gerar_valor(nome, tamanho, rng, unico_parametro):
+    """Gera um valor para o parâmetro de acordo com o seu nome."""
+    if any(p in nome for p in _PARAMETROS_DICT):
+        return {f"k{i}": rng.randint(-1000, 1000) for i in range(tamanho)}
+    if nome in _PARAMETROS_TEXTO or any(p in nome for p in _PARAMETROS_TEXTO if len(p) > 1):
+        return "".join(rng.choice(string.ascii_lowercase + " ") for _ in range(tamanho))
+    if unico_parametro or any(p in nome for p in _PARAMETROS_LISTA):
+        return [rng.randint(-1000, 1000) for _ in range(tamanho)]
+    # Escalares ficam pequenos para não explodir algoritmos exponenciais
+    return rng.randint(0, min(tamanho, 20))
+
+
+def _inicializar_worker(limite_memoria_mb):
+    """Prepara o processo worker: limites de recursos e tratamento de alarme."""
+    def _ao_esgotar_tempo(signum, frame):
+        raise _TempoEsgotado()
+
+    if hasattr(signal, "SIGALRM"):
+        signal.signal(signal.SIGALRM, _ao_esgotar_tempo)
+
+    if resource is None:
+        return
+
+    # Limita a memória ao uso atual mais a folga configurada
+    uso_atual = _memoria_virtual_atual()
+    if uso_atual is not None and limite_memoria_mb:
+        limite = uso_atual + limite_memoria_mb * 1024 * 1024
+        resource.setrlimit(resource.RLIMIT_AS, (limite, limite))
+
+    # Impede que o candidato grave arquivos em disco
+    if hasattr(signal, "SIGXFSZ"):
+        signal.signal(signal.SIGXFSZ, signal.SIG_IGN)
+    resource.setrlimit(resource.RLIMIT_FSIZE, (0, 0))
+
+
+def _memoria_virtual_atual():
+    """Lê o tamanho virtual do processo em bytes (Linux)."""
+    try:
+        with open("/proc/self/status", encoding="utf-8") as f:
+            for linha in f:
+                if linha.startswith("VmSize:"):
+                    return int(linha.split()[1]) * 1024
+    except OSError:
+        pass
+    return None
+
+
+def _limitar_cpu(segundos):
+    """Define um limite de CPU relativo ao que o worker já consumiu."""
+    if resource is None or not segundos:
+        return
+    uso = resource.getrusage(resource.RUSAGE_SELF)
+    consumido = int(uso.ru_utime + uso.ru_stime)
+    _, maximo = resource.getrlimit(resource.RLIMIT_CPU)
+    novo = consumido + int(segundos) + 1
+    if maximo != resource.RLIM_INFINITY:
+        novo = min(novo, maximo)
+    resource.setrlimit(resource.RLIMIT_CPU, (novo, maximo))
+
+
+def _serializar_saida(valor):
+    """Garante que a saída possa voltar ao processo principal."""
+    try:
+        pickle.dumps(valor)
+        return valor
+    except Exception:
+        return repr(valor)
+
+
+def _executar_candidato(codigo, entradas, nome_funcao, repeticoes, medir_memoria,
+                        timeout_segundos, limite_cpu_segundos):
+    """Executa o código no worker e mede tempo, memória e saídas para cada entrada."""
+    _limitar_cpu(limite_cpu_segundos)
+    if timeout_segundos and hasattr(signal, "setitimer"):
+        signal.setitimer(signal.ITIMER_REAL, timeout_segundos)
+
+    stdout_original = sys.stdout
+    try:
+        with open(os.devnull, "w") as nulo:
+            sys.stdout = nulo
+            namespace = {"__name__": "__candidato__"}
+            exec(compile(codigo, "<candidato>", "exec"), namespace)
+
+            alvo = encontrar_funcao_alvo(codigo)
+            funcao = namespace.get(nome_funcao) if nome_funcao else None
+            if not callable(funcao):
+                funcao = namespace.get(alvo[0]) if alvo else None
+            if not callable(funcao):
+                return {"ok": False, "erro": "Nenhuma função encontrada no código"}
+
+            saidas = []
+            erros = 0
+            tempo_total = 0.0
+            for args in entradas:
+                melhor = None
+                saida = None
+                for _ in range(max(1, repeticoes)):
+                    copia = copy.deepcopy(args)
+                    inicio = time.perf_counter()
+                    try:
+                        saida = ("ok", funcao(*copia))
+                    except _TempoEsgotado:
+                        raise
+                    except BaseException as e:
+                        saida = ("erro", type(e).__name__)
+                    decorrido = time.perf_counter() - inicio
+                    melhor = decorrido if melhor is None else min(melhor, decorrido)
+                if saida[0] == "erro":
+                    erros += 1
+                else:
+                    tempo_total += melhor
+                saidas.append((saida[0], _serializar_saida(saida[1])))
+
+            memoria_pico = 0
+            if medir_memoria:
+                # Passada separada para que o tracemalloc não distorça o tempo
+                tracemalloc.start()
+                try:
+                    for args in entradas:
+                        copia = copy.deepcopy(args)
+                        tracemalloc.reset_peak()
+                        # Desconta a cópia da entrada, já alocada antes da chamada
+                        base = tracemalloc.get_traced_memory()[0]
+                        try:
+                            funcao(*copia)
+                        except _TempoEsgotado:
+                            raise
+                        except BaseException:
+                            pass
+                        memoria_pico = max(memoria_pico, tracemalloc.get_traced_memory()[1] - base)
+                finally:
+                    tracemalloc.stop()
+
+            return {
+                "ok": True,
+                "funcao": funcao.__name__,
+                "saidas": saidas,
+                "erros": erros,
+                "tempo": tempo_total,
+                "memoria_pico": memoria_pico
+            }
+    except _TempoEsgotado:
+        return {"ok": False, "erro": "Tempo limite excedido"}
+    except MemoryError:
+        return {"ok": False, "erro": "Limite de memória excedido"}
+    except BaseException as e:
+        return {"ok": False, "erro": f"{type(e).__name__}: {e}"}
+    finally:
+        sys.stdout = stdout_original
+        if timeout_segundos and hasattr(signal, "setitimer"):
+            signal.setitimer(signal.ITIMER_REAL, 0)
+
+
+class PoolSandbox:
+    """Pool de processos pré-aquecidos para executar código candidato.
+
+    Responsabilidades:
+    - Manter workers prontos, isolados do processo principal
+    - Limitar CPU, memória, gravação em disco e tempo de parede de cada tarefa
+    - Repor workers que morrem ao estourar os limites
+    """
+    def __init__(self, num_workers=None, limite_cpu_segundos=5, limite_memoria_mb=256,
+                 timeout_segundos=5.0, tarefas_por_worker=200):
+        self.num_workers = num_workers or os.cpu_count() or 2
+        self.limite_cpu_segundos = limite_cpu_segundos
+        self.limite_memoria_mb = limite_memoria_mb
+        self.timeout_segundos = timeout_segundos
+        # "spawn" evita herdar threads e conexões abertas do processo principal
+        contexto = multiprocessing.get_context("spawn")
+        self._pool = contexto.Pool(
+            processes=self.num_workers,
+            initializer=_inicializar_worker,
+            initargs=(limite_memoria_mb,),
+            maxtasksperchild=tarefas_por_worker
+        )
+
+    def executar_async(self, codigo, entradas, nome_funcao=None, repeticoes=1, medir_memoria=False):
+        """Agenda a execução do código e retorna um AsyncResult."""
+        return self._pool.apply_async(
+            _executar_candidato,
+            (codigo, entradas, nome_funcao, repeticoes, medir_memoria,
+             self.timeout_segundos, self.limite_cpu_segundos)
+        )
+
+    def executar(self, codigo, entradas, nome_funcao=None, repeticoes=1, medir_memoria=False):
+        """Executa o código no sandbox e aguarda o resultado."""
+        tarefa = self.executar_async(codigo, entradas, nome_funcao, repeticoes, medir_memoria)
+        return self.aguardar(tarefa)
+
+    def aguardar(self, tarefa):
+        """Aguarda uma tarefa agendada, respeitando o tempo limite com folga."""
+        try:
+            return tarefa.get(timeout=self.timeout_segundos * 2 + 5)
+        except TempoEsgotadoPool:
+            # O worker foi morto pelo limite de CPU ou ficou preso em código nativo
+            return {"ok": False, "erro": "Tempo limite excedido"}
+
+    def fechar(self):
+        """Encerra os workers do pool."""
+        self._pool.terminate()
+        self._pool.join()
@@ -0,0 +1,135 @@
+import numpy as np
+from model.arquivo_pareto import distancia_multidao, ordenar_frentes
+
+
+class MotorSelecao:
+    """Seleção de pais vetorizada sobre arrays de fitness.
+
+    Responsabilidades:
+    - Oferecer roleta sem reposição, amostragem estocástica universal (SUS),
+      torneio, ranking linear e NSGA-II (vários objetivos)
+    - Trabalhar apenas com índices, sem percorrer a população em Python
+    - Manter um gerador aleatório próprio para resultados reprodutíveis
+
+    Roleta e ranking nunca repetem indivíduos; SUS e torneio são métodos com
+    reposição e podem escolher o mesmo indivíduo mais de uma vez. O NSGA-II
+    usa torneios binários com reposição sobre a frente de não dominância e a
+    distância de multidão de cada indivíduo.
+    """
+    ESTRATEGIAS = ("roleta", "sus", "torneio", "ranking", "nsga2")
+
+    def __init__(self, estrategia="roleta", tamanho_torneio=3, pressao_ranking=1.7, semente=None):
+        self._validar(estrategia)
+        if not 1.0 <= pressao_ranking <= 2.0:
+            raise ValueError("pressao_ranking deve estar entre 1.0 e 2.0")
+        self.estrategia = estrategia
+        self.tamanho_torneio = max(1, tamanho_torneio)
+        self.pressao_ranking = pressao_ranking
+        self.rng = np.random.default_rng(semente)
+
+    def selecionar_indices(self, fitness, quantidade, estrategia=None, objetivos=None):
+        """Retorna os índices dos indivíduos selecionados.
+
+        Args:
+            fitness: Sequência ou array com o fitness (não negativo) de cada indivíduo
+            quantidade: Número de indivíduos a selecionar
+            estrategia: Sobrepõe a estratégia padrão do motor nesta chamada
+            objetivos: Matriz (indivíduos × objetivos a maximizar) usada pelo NSGA-II;
+                sem ela, o fitness é o único objetivo
+        """
+        estrategia = estrategia or self.estrategia
+        self._validar(estrategia)
+        fitness = np.asarray(fitness, dtype=np.float64)
+        n = len(fitness)
+        if n == 0 or quantidade <= 0:
+            return np.empty(0, dtype=np.intp)
+
+        if estrategia == "roleta":
+            return self._sem_reposicao(fitness, quantidade)
+        if estrategia == "sus":
+            return self._sus(fitness, quantidade)
+        if estrategia == "torneio":
+            return self._torneio(fitness, quantidade)
+        if estrategia == "nsga2":
+            return self._nsga2(fitness if objetivos is None else objetivos, quantidade)
+        return self._sem_reposicao(self._pesos_ranking(fitness), quantidade)
+
+    def get_estado(self):
+        """Retorna o estado do gerador aleatório (dicionário serializável em JSON)."""
+        return self.rng.bit_generator.state
+
+    def set_estado(self, estado):
+        """Restaura um estado obtido com get_estado."""
+        self.rng.bit_generator.state = estado
+
+    def _sem_reposicao(self, pesos, quantidade):
+        """Método privado que sorteia sem reposição com probabilidade proporcional ao peso.
+
+        Usa as chaves de Efraimidis-Spirakis (log(u) / peso): os `quantidade`
+        maiores valores formam uma amostra ponderada sem reposição, em O(n).
+        """
+        positivos = np.flatnonzero(pesos > 0)
+        if len(positivos) == 0:
+            # Sem peso nenhum, todos têm a mesma chance
+            positivos = np.arange(len(pesos))
+            pesos = np.ones(len(pesos))
+        quantidade = min(quantidade, len(positivos))
+
+        chaves = np.log(self.rng.random(len(positivos))) / pesos[positivos]
+        if quantidade < len(positivos):
+            melhores = np.argpartition(chaves, -quantidade)[-quantidade:]
+        else:
+            melhores = np.arange(len(positivos))
+        # Ordem decrescente de chave, equivalente à ordem dos sorteios
+        melhores = melhores[np.argsort(chaves[melhores])[::-1]]
+        return positivos[melhores]
+
+    def _sus(self, fitness, quantidade):
+        """Método privado que aplica a amostragem estocástica universal."""
+        acumulado = np.cumsum(np.maximum(fitness, 0))
+        total = acumulado[-1]
+        if total <= 0:
+            return self.rng.integers(0, len(fitness), size=quantidade)
+        passo = total / quantidade
+        ponteiros = self.rng.uniform(0, passo) + passo * np.arange(quantidade)
+        indices = np.searchsorted(acumulado, ponteiros, side="right")
+        # Embaralha para que os pares de cruzamento não sigam a ordem da população
+        return self.rng.permutation(np.minimum(indices, len(fitness) - 1))
+
+    def _torneio(self, fitness, quantidade):
+        """Método privado que realiza `quantidade` torneios simultâneos."""
+        competidores = self.rng.integers(0, len(fitness), size=(quantidade, self.tamanho_torneio))
+        vencedores = fitness[competidores].argmax(axis=1)
+        return competidores[np.arange(quantidade), vencedores]
+
+    def _nsga2(self, objetivos, quantidade):
+        """Método privado que realiza `quantidade` torneios binários por frente e distância de multidão.
+
+        Vence a frente de menor índice; na mesma frente, o indivíduo mais isolado,
+        o que preserva a diversidade de compromissos entre os objetivos.
+        """
+        objetivos = np.asarray(objetivos, dtype=np.float64)
+        frentes = ordenar_frentes(objetivos)
+        distancia = distancia_multidao(objetivos, frentes)
+        a, b = self.rng.integers(0, len(frentes), size=(2, quantidade))
+        vence_a = (frentes[a] < frentes[b]) | ((frentes[a] == frentes[b]) & (distancia[a] >= distancia[b]))
+        return np.where(vence_a, a, b)
+
+    def _pesos_ranking(self, fitness):
+        """Método privado que converte fitness em pesos de ranking linear."""
+        n = len(fitness)
+        if n == 1:
+            return np.ones(1)
+        posicoes = np.empty(n, dtype=np.float64)
+        posicoes[np.argsort(fitness, kind="stable")] = np.arange(n)
+        s = self.pressao_ranking
+        # Pior indivíduo recebe (2 - s) / n, melhor recebe s / n
+        return ((2 - s) + 2 * (s - 1) * posicoes / (n - 1)) / n
+
+    @classmethod
+    def _validar(cls, estrategia):
+        """Método privado que rejeita estratégias desconhecidas."""
+        if estrategia not in cls.ESTRATEGIAS:
+            raise ValueError(
+                f"Estratégia de seleção desconhecida: {estrategia} (use uma de {', '.join(cls.ESTRATEGIAS)})"
+            )
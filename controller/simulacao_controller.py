@@ -1,29 +1,76 @@
 import os
 import json
+import threading
+import time
 from model.populacao import Populacao
 from model.algoritmo import Algoritmo
+from model.checkpoint import CheckpointPopulacao
+from model import orcamento as modulo_orcamento
+from model import rastreamento
+from model.orcamento import OrcamentoExecucao
+from model.rastreamento import Rastreador
 from controller.avaliador_service import AvaliadorService
+from controller.avaliador_execucao import AvaliadorExecucao
 from controller.operador_genetico import OperadorGenetico
-from controller.interfaces import IAvaliador, IOperadorGenetico
+from controller.filtro_sintatico import FiltroSintatico
+from controller.filtro_diversidade import FiltroDiversidade
+from controller.filtro_substituto import FiltroSubstituto
+from controller.filtro_correcao import FiltroCorrecao
+from controller.modelo_ilhas import ModeloIlhas
+from controller.interfaces import IAvaliador, IOperadorGenetico, IFiltroCandidatos
+from model.historico import GravadorHistorico, iterar_historico
 
 class SimulacaoController:
     """Controlador principal que orquestra a simulação de evolução de algoritmos."""
     
-    def __init__(self, avaliador=None, operador_genetico=None):
+    # Formatos aceitos na exportação do rastreamento e a extensão de cada arquivo
+    FORMATOS_RASTREAMENTO = {"json": ".json", "prometheus": ".prom"}
+
+    def __init__(self, avaliador=None, operador_genetico=None, filtros=None,
+                 caminho_checkpoint="./utils/checkpoint_populacao.json.gz",
+                 caminho_rastreamento="./utils/rastreamento", formatos_rastreamento=("json",),
+                 cache_avaliacoes=None, pool_sandbox=None):
         """
         Inicializa o controlador com dependências injetadas.
         
         Args:
             avaliador: Implementação de IAvaliador (opcional)
             operador_genetico: Implementação de IOperadorGenetico (opcional)
+            filtros: Lista de IFiltroCandidatos aplicados antes da avaliação (opcional)
+            caminho_checkpoint: Arquivo com o estado da população a cada geração (None desativa)
+            caminho_rastreamento: Prefixo dos arquivos com as fases e o consumo da API de cada
+                execução, sem extensão (None desativa a exportação)
+            formatos_rastreamento: Formatos exportados: "json" e/ou "prometheus"
+            cache_avaliacoes: CacheAvaliacoes do avaliador padrão, para compartilhar um
+                único arquivo entre controladores (opcional; sem ele, o avaliador cria o seu)
+            pool_sandbox: PoolSandbox do avaliador e do filtro de correção padrão, compartilhado
+                entre controladores (opcional; sem ele, cada um cria o seu a cada execução)
         """
-        self.avaliador = avaliador if avaliador else AvaliadorService()
+        formatos_invalidos = set(formatos_rastreamento) - set(self.FORMATOS_RASTREAMENTO)
+        if formatos_invalidos:
+            raise ValueError(f"Formatos de rastreamento inválidos: {sorted(formatos_invalidos)}")
+        # O avaliador padrão mede a eficiência executando os candidatos no sandbox
+        self.avaliador = avaliador if avaliador else AvaliadorExecucao(cache=cache_avaliacoes, pool=pool_sandbox)
         self.operador_genetico = operador_genetico if operador_genetico else OperadorGenetico()
+        # Filtros baratos primeiro: sintaxe, duplicatas e notas previstas antes da execução diferencial
+        self.filtros = filtros if filtros is not None else [
+            FiltroSintatico(), FiltroDiversidade(), FiltroSubstituto(), FiltroCorrecao(pool=pool_sandbox)
+        ]
         self.populacao = None
-        self.historico_caminho = "./utils/historico_avaliacoes.json"
+        self.checkpoint = CheckpointPopulacao(caminho_checkpoint) if caminho_checkpoint else None
+        # Impede duas simulações simultâneas no mesmo controlador, que dividem a população e os filtros
+        self._lock_execucao = threading.Lock()
+        self.historico_caminho = getattr(self.avaliador, "caminho_historico", "./utils/historico_avaliacoes.jsonl")
+        self.caminho_rastreamento = caminho_rastreamento
+        self.formatos_rastreamento = tuple(formatos_rastreamento)
+        # Rastreador da última execução (tempo por fase, tokens e novas tentativas)
+        self.rastreador = None
+        # Orçamento da última execução e o consumo (tokens, requisições, segundos) de cada geração
+        self.orcamento = None
+        self._custos_geracao = []
     
     def iniciar_simulacao(self, codigo_inicial, linguagem, tamanho_populacao=5, 
-                         geracoes=3, callback_progresso=None):
+                         geracoes=3, callback_progresso=None, retomar=False, orcamento=None):
         """
         Inicia a simulação de evolução de algoritmos.
         
@@ -32,47 +79,391 @@ class SimulacaoController:
             linguagem: Linguagem de programação do código
             tamanho_populacao: Tamanho da população
             geracoes: Número de gerações
-            callback_progresso: Função de callback para atualizar o progresso
+            callback_progresso: Função chamada com (geração concluída, total) ao fim de cada geração
+            retomar: Continua do checkpoint de uma execução interrompida com o mesmo código,
+                sem refazer as gerações já concluídas
+            orcamento: OrcamentoExecucao com os limites de tokens, requisições e tempo
+                da execução (opcional; sem ele, o consumo é apenas contabilizado)
             
         Returns:
             Tupla contendo (melhor_algoritmo, estatisticas, caminho_historico)
         """
+        if not self._lock_execucao.acquire(blocking=False):
+            raise RuntimeError("Já existe uma simulação em andamento neste controlador")
+
+        self._iniciar_rastreamento()
+        self._iniciar_orcamento(orcamento)
         try:
             print(f"[INFO] Iniciando simulação com {tamanho_populacao} indivíduos e {geracoes} gerações")
+            self._criar_populacao(linguagem, tamanho_populacao)
             
-            # Cria a população
-            self.populacao = Populacao(linguagem=linguagem, tamanho=tamanho_populacao)
-            
-            # Configura as dependências
-            self.populacao.set_avaliador(self.avaliador)
-            self.populacao.set_operador(self.operador_genetico)
-            
-            # Gera a população inicial
-            self.populacao.gerar_populacao_inicial(codigo_base=codigo_inicial)
-            
-            # Evolui a população por todas as gerações de uma vez
-            print(f"[INFO] Evoluindo população por {geracoes} gerações")
-            self.populacao.evoluir(num_geracoes=geracoes)
+            # Gera a população inicial, a menos que um checkpoint a restaure
+            if not (retomar and self._restaurar_checkpoint(codigo_inicial, linguagem)):
+                self.populacao.gerar_populacao_inicial(codigo_base=codigo_inicial)
             
-            # Atualiza o progresso se houver callback
-            if callback_progresso:
-                callback_progresso(geracoes, geracoes)
-            
-            # Obtém o melhor algoritmo
-            melhor_algoritmo = self.populacao.melhor_individuo()
-            
-            # Salva o melhor algoritmo
-            self.populacao.salvar_melhor_algoritmo("./utils/melhor_algoritmo")
-            
-            # Obtém estatísticas
-            estatisticas = self.populacao.get_estatisticas()
+            # Evolui uma geração por vez para informar o progresso
+            print(f"[INFO] Evoluindo população até a geração {geracoes}")
+            while self.populacao.geracao < geracoes and self._planejar_geracao():
+                consumo_anterior = self.orcamento.consumo()
+                self.populacao.evoluir(num_geracoes=1)
+                self._registrar_custo_geracao(consumo_anterior)
+                if callback_progresso:
+                    callback_progresso(self.populacao.geracao, geracoes)
             
+            melhor_algoritmo, estatisticas = self._finalizar_simulacao()
             return melhor_algoritmo, estatisticas, self.historico_caminho
             
         except Exception as e:
             print(f"[ERRO] Erro na simulação: {str(e)}")
             return None, None, None
-    
+        finally:
+            modulo_orcamento.desativar(self.orcamento)
+            self._encerrar_rastreamento()
+            self.fechar()
+            self._lock_execucao.release()
+
+    async def simular(self, codigo_inicial, linguagem, tamanho_populacao=5, geracoes=3, retomar=False,
+                      orcamento=None):
+        """
+        Executa a simulação no event loop, como um iterador assíncrono de eventos.
+
+        Produz um evento {"tipo": "geracao", ...} ao fim da geração inicial e de
+        cada geração seguinte, com melhor e média de fitness, chamadas à API da
+        geração e tempo decorrido, e um evento final {"tipo": "fim", ...} com o
+        melhor algoritmo, as estatísticas e o caminho do histórico. Interromper a
+        iteração (break ou cancelamento da tarefa) cancela a simulação; o
+        histórico já avaliado continua salvo. Com `retomar`, a simulação continua
+        do checkpoint da última geração concluída, se ele for do mesmo código.
+        Com um `orcamento` (OrcamentoExecucao), a evolução é ajustada para caber
+        nos limites e pode terminar antes da última geração.
+
+        Exemplo:
+            async for evento in controller.simular(codigo, "Python", geracoes=5):
+                print(evento["geracao"], evento.get("melhor_fitness"))
+        """
+        if not self._lock_execucao.acquire(blocking=False):
+            raise RuntimeError("Já existe uma simulação em andamento neste controlador")
+
+        self._iniciar_rastreamento()
+        self._iniciar_orcamento(orcamento)
+        try:
+            print(f"[INFO] Iniciando simulação assíncrona com {tamanho_populacao} indivíduos e {geracoes} gerações")
+            inicio = time.perf_counter()
+            chamadas_anteriores = self._contar_chamadas_api()
+            self._criar_populacao(linguagem, tamanho_populacao)
+
+            if not (retomar and self._restaurar_checkpoint(codigo_inicial, linguagem)):
+                await self.populacao.gerar_populacao_inicial_async(codigo_base=codigo_inicial)
+            chamadas_anteriores, evento = self._evento_geracao(inicio, chamadas_anteriores, geracoes)
+            yield evento
+
+            while self.populacao.geracao < geracoes and self._planejar_geracao():
+                consumo_anterior = self.orcamento.consumo()
+                await self.populacao.evoluir_geracao_async()
+                self._registrar_custo_geracao(consumo_anterior)
+                chamadas_anteriores, evento = self._evento_geracao(inicio, chamadas_anteriores, geracoes)
+                yield evento
+
+            melhor_algoritmo, estatisticas = self._finalizar_simulacao()
+            yield {
+                "tipo": "fim",
+                "melhor_algoritmo": melhor_algoritmo,
+                "estatisticas": estatisticas,
+                "caminho_historico": self.historico_caminho,
+                "tempo_decorrido": time.perf_counter() - inicio
+            }
+        finally:
+            # Em caso de cancelamento, grava o que já foi avaliado
+            try:
+                self.avaliador.salvar_historico()
+            except Exception as e:
+                print(f"[AVISO] Não foi possível salvar o histórico: {str(e)}")
+            await self._fechar_clientes_async()
+            modulo_orcamento.desativar(self.orcamento)
+            self._encerrar_rastreamento()
+            self.fechar()
+            self._lock_execucao.release()
+
+    def fechar(self):
+        """Encerra os workers de execução criados pelos filtros e pelo avaliador.
+
+        Chamado ao fim de cada simulação; os workers são recriados na próxima.
+        Pools recebidos de fora continuam abertos.
+        """
+        for componente in [*self.filtros, self.avaliador]:
+            fechar = getattr(componente, "fechar", None)
+            if fechar is None:
+                continue
+            try:
+                fechar()
+            except Exception as e:
+                print(f"[AVISO] Não foi possível encerrar {type(componente).__name__}: {str(e)}")
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, tipo, valor, rastro):
+        self.fechar()
+
+    def _criar_populacao(self, linguagem, tamanho_populacao):
+        """Método privado que cria a população e configura as dependências."""
+        # O controlador pode ser reutilizado: cada execução começa com um histórico vazio
+        self.avaliador.reiniciar_historico()
+        self.populacao = Populacao(linguagem=linguagem, tamanho=tamanho_populacao)
+        self.populacao.set_avaliador(self.avaliador)
+        self.populacao.set_operador(self.operador_genetico)
+        for filtro in self.filtros:
+            self.populacao.adicionar_filtro(filtro)
+        self.populacao.set_checkpoint(self.checkpoint)
+
+    def _restaurar_checkpoint(self, codigo_inicial, linguagem):
+        """Método privado que restaura a população do checkpoint; retorna False se não houver um compatível."""
+        estado = self.checkpoint.carregar() if self.checkpoint is not None else None
+        if estado is None:
+            print("[INFO] Nenhum checkpoint para retomar, iniciando uma nova simulação")
+            return False
+        if estado.get("codigo_base") != codigo_inicial or estado.get("linguagem") != linguagem:
+            print("[AVISO] O checkpoint é de outro código ou linguagem, iniciando uma nova simulação")
+            return False
+        if not estado.get("algoritmos"):
+            print("[AVISO] O checkpoint não tem algoritmos, iniciando uma nova simulação")
+            return False
+
+        self.populacao.restaurar_estado(estado)
+        print(f"[INFO] Simulação retomada a partir da geração {self.populacao.geracao}")
+        return True
+
+    def _finalizar_simulacao(self):
+        """Método privado que salva o melhor algoritmo e monta as estatísticas finais."""
+        # Obtém o melhor algoritmo
+        melhor_algoritmo = self.populacao.melhor_individuo()
+        
+        # Salva o melhor algoritmo
+        self.populacao.salvar_melhor_algoritmo("./utils/melhor_algoritmo")
+        
+        # Obtém estatísticas
+        estatisticas = self.populacao.get_estatisticas()
+
+        # A execução terminou: não há mais o que retomar
+        if self.checkpoint is not None:
+            self.checkpoint.remover()
+
+        # Informa quantos candidatos cada filtro descartou antes da avaliação
+        if estatisticas is not None and self.filtros:
+            estatisticas["filtros"] = {
+                type(filtro).__name__: filtro.get_estatisticas() for filtro in self.filtros
+            }
+
+        # Informa quantas chamadas à API o cache de avaliações evitou
+        if isinstance(self.avaliador, AvaliadorService):
+            estatisticas_cache = self.avaliador.get_estatisticas_cache()
+            if estatisticas_cache:
+                print(f"[INFO] Cache de avaliações: {estatisticas_cache}")
+                if estatisticas is not None:
+                    estatisticas["cache_avaliacoes"] = estatisticas_cache
+
+        # Informa onde foram o tempo e a cota da API, e o que foi cortado para caber no orçamento
+        if estatisticas is not None and self.rastreador is not None:
+            estatisticas["rastreamento"] = self.rastreador.resumo()
+        if estatisticas is not None and self.orcamento is not None:
+            estatisticas["orcamento"] = self.orcamento.resumo()
+        return melhor_algoritmo, estatisticas
+
+    def _iniciar_orcamento(self, orcamento):
+        """Método privado que prepara o orçamento da execução (sem limites se None) e o ativa."""
+        self.orcamento = orcamento if orcamento is not None else OrcamentoExecucao()
+        self.orcamento.reiniciar()
+        self._custos_geracao = []
+        modulo_orcamento.ativar(self.orcamento)
+
+    def _registrar_custo_geracao(self, consumo_anterior):
+        """Método privado que guarda o consumo (tokens, requisições, segundos) da geração concluída."""
+        self._custos_geracao.append(tuple(
+            depois - antes for depois, antes in zip(self.orcamento.consumo(), consumo_anterior)
+        ))
+
+    def _planejar_geracao(self):
+        """Método privado que decide se a próxima geração cabe no orçamento, e em que modo.
+
+        A estimativa é o consumo médio das gerações anteriores (na primeira, o da
+        população inicial). A evolução para se o orçamento se esgotou ou se não
+        há tempo para mais uma geração. Sem tokens ou requisições para uma geração
+        completa, ela segue no modo econômico, sem cruzamento, e os pares menos
+        promissores ficam com os pais quando o orçamento acabar.
+        """
+        orcamento = self.orcamento
+        if not orcamento.limitado:
+            return True
+        if orcamento.nivel() == "esgotado":
+            print("[AVISO] Orçamento da execução esgotado, encerrando a evolução")
+            return False
+
+        custos = self._custos_geracao or [orcamento.consumo()]
+        estimativa = [sum(custo[i] for custo in custos) / len(custos) for i in range(3)]
+        tokens, requisicoes, segundos = orcamento.restante()
+        if segundos is not None and estimativa[2] > segundos:
+            print(f"[AVISO] Restam {segundos:.1f}s e uma geração leva cerca de {estimativa[2]:.1f}s, "
+                  f"encerrando a evolução")
+            return False
+
+        cabe = all(restante is None or custo <= restante
+                   for custo, restante in zip(estimativa, (tokens, requisicoes)))
+        orcamento.definir_modo("normal" if cabe else "economico")
+        if not cabe:
+            print(f"[INFO] Orçamento insuficiente para uma geração completa (cerca de {estimativa[0]:.0f} "
+                  f"tokens e {estimativa[1]:.0f} requisições), seguindo no modo econômico")
+        return True
+
+    def _iniciar_rastreamento(self):
+        """Método privado que cria o rastreador da execução e o torna o ativo no processo."""
+        self.rastreador = Rastreador()
+        rastreamento.ativar(self.rastreador)
+
+    def _encerrar_rastreamento(self):
+        """Método privado que desativa o rastreador, resume a execução e exporta os arquivos."""
+        rastreador = self.rastreador
+        rastreador.encerrar()
+        rastreamento.desativar(rastreador)
+
+        resumo = rastreador.resumo()
+        llm = resumo["llm"]
+        fases = sorted(resumo["fases"].items(), key=lambda f: f[1]["total_s"], reverse=True)
+        fases = ", ".join(f"{nome} {estatisticas['total_s']:.1f}s" for nome, estatisticas in fases[:4])
+        print(f"[INFO] Rastreamento: {resumo['tempo_total_s']:.1f}s, {llm['chamadas']} chamadas à API "
+              f"({llm['novas_tentativas']} novas tentativas, {llm['falhas']} falhas), "
+              f"{llm['tokens_prompt']} tokens de prompt e {llm['tokens_completacao']} de resposta; "
+              f"fases: {fases or 'nenhuma'}")
+
+        if not self.caminho_rastreamento:
+            return
+        for formato in self.formatos_rastreamento:
+            caminho = self.caminho_rastreamento + self.FORMATOS_RASTREAMENTO[formato]
+            try:
+                if formato == "json":
+                    rastreador.exportar_json(caminho)
+                else:
+                    rastreador.exportar_prometheus(caminho)
+            except OSError as e:
+                print(f"[AVISO] Não foi possível exportar o rastreamento em {caminho}: {str(e)}")
+
+    def _evento_geracao(self, inicio, chamadas_anteriores, total_geracoes):
+        """Método privado que monta o evento de fim de geração; retorna (chamadas, evento)."""
+        fitness = [a.get_fitness() for a in self.populacao.algoritmos]
+        chamadas = self._contar_chamadas_api()
+        evento = {
+            "tipo": "geracao",
+            "geracao": self.populacao.geracao,
+            "total_geracoes": total_geracoes,
+            "melhor_fitness": max(fitness) if fitness else 0,
+            "media_fitness": round(sum(fitness) / len(fitness), 2) if fitness else 0,
+            "tamanho": len(fitness),
+            "chamadas_api": chamadas - chamadas_anteriores,
+            "tempo_decorrido": time.perf_counter() - inicio
+        }
+        return chamadas, evento
+
+    async def _fechar_clientes_async(self):
+        """Método privado que fecha as conexões abertas pelos clientes da API no event loop da execução."""
+        clientes = {}
+        for servico in (self.avaliador, self.operador_genetico):
+            cliente = getattr(servico, "cliente", None)
+            if cliente is not None and hasattr(cliente, "fechar_async"):
+                clientes[id(cliente)] = cliente
+        for cliente in clientes.values():
+            try:
+                await cliente.fechar_async()
+            except Exception as e:
+                print(f"[AVISO] Não foi possível fechar o cliente assíncrono da API: {str(e)}")
+
+    def _contar_chamadas_api(self):
+        """Método privado com as requisições à API feitas por esta execução.
+
+        Conta pelo rastreador, e não pelos clientes: eles são do processo e
+        atendem também as simulações de outras sessões.
+        """
+        return self.rastreador.requisicoes_api() if self.rastreador is not None else 0
+
+    def iniciar_simulacao_ilhas(self, codigo_inicial, linguagem, tamanho_populacao=5, geracoes=3,
+                                num_ilhas=None, intervalo_migracao=2, num_migrantes=1, topologia="anel",
+                                callback_progresso=None, **opcoes_ilhas):
+        """
+        Inicia a simulação no modelo de ilhas, com uma população por processo.
+
+        Cada ilha cria seu próprio avaliador, operador e filtros (ver
+        ModeloIlhas); o avaliador e o operador deste controlador não são usados.
+
+        Args:
+            codigo_inicial: Código inicial para gerar as populações
+            linguagem: Linguagem de programação do código
+            tamanho_populacao: Tamanho da população de cada ilha
+            geracoes: Número de gerações
+            num_ilhas: Número de ilhas (padrão: núcleos e chaves disponíveis)
+            intervalo_migracao: Gerações entre migrações
+            num_migrantes: Melhores indivíduos enviados por migração
+            topologia: "anel", "completa" ou "estrela"
+            callback_progresso: Chamado com (ilhas concluídas, total de ilhas)
+            **opcoes_ilhas: Demais argumentos de ModeloIlhas
+
+        Returns:
+            Tupla contendo (melhor_algoritmo, estatisticas, caminho_historico)
+        """
+        try:
+            if isinstance(self.operador_genetico, OperadorGenetico):
+                opcoes_ilhas.setdefault("estrategia_selecao", self.operador_genetico.motor_selecao.estrategia)
+            modelo = ModeloIlhas(
+                num_ilhas=num_ilhas, intervalo_migracao=intervalo_migracao,
+                num_migrantes=num_migrantes, topologia=topologia, **opcoes_ilhas
+            )
+            print(f"[INFO] Iniciando simulação em {modelo.num_ilhas} ilhas com {tamanho_populacao} "
+                  f"indivíduos cada e {geracoes} gerações")
+
+            # Grava o original antes de iniciar as ilhas, que o leem para a verificação diferencial
+            with open("./utils/algoritmo_original.py", "w", encoding="utf-8") as f:
+                f.write(codigo_inicial)
+
+            resultados = modelo.executar(
+                codigo_inicial, linguagem, tamanho_populacao=tamanho_populacao,
+                geracoes=geracoes, callback_progresso=callback_progresso
+            )
+            return self._reunir_ilhas(resultados, linguagem, tamanho_populacao)
+
+        except Exception as e:
+            print(f"[ERRO] Erro na simulação em ilhas: {str(e)}")
+            return None, None, None
+
+    def _reunir_ilhas(self, resultados, linguagem, tamanho_populacao):
+        """Método privado que junta populações e históricos das ilhas."""
+        for resultado in resultados:
+            if resultado["erro"]:
+                print(f"[AVISO] Ilha {resultado['ilha']} terminou com erro: {resultado['erro']}")
+
+        # População única com os finais de todas as ilhas, para salvar o melhor e as estatísticas
+        self.populacao = Populacao(linguagem=linguagem, tamanho=tamanho_populacao * len(resultados))
+        self.populacao.algoritmos = [a for r in resultados for a in r["algoritmos"]]
+        self.populacao.geracao = max(
+            (r["estatisticas"]["geracao"] for r in resultados if r["estatisticas"]), default=0
+        )
+
+        # Histórico combinado, com a ilha de origem em cada registro
+        gravador = GravadorHistorico(self.historico_caminho)
+        gravador.reiniciar()
+        for resultado in resultados:
+            try:
+                for registro in iterar_historico(resultado["historico_caminho"]):
+                    registro["ilha"] = resultado["ilha"]
+                    gravador.anexar([registro])
+            except FileNotFoundError:
+                continue
+        gravador.descarregar()
+
+        melhor_algoritmo = self.populacao.melhor_individuo()
+        self.populacao.salvar_melhor_algoritmo("./utils/melhor_algoritmo")
+
+        estatisticas = self.populacao.get_estatisticas()
+        if estatisticas is not None:
+            estatisticas["ilhas"] = [r["estatisticas"] for r in resultados]
+        return melhor_algoritmo, estatisticas, self.historico_caminho
+
     def exportar_algoritmo(self, algoritmo, caminho):
         """
         Exporta um algoritmo para um arquivo.
@@ -1,7 +1,7 @@
 import streamlit as st
 from dotenv import load_dotenv
 from view.streamlit_view import StreamlitView
-from controller.simulacao_controller import SimulacaoController
+from controller.execucao_simulacao import ExecucaoSimulacao
 
 # Carrega as variáveis de ambiente
 load_dotenv()
@@ -9,31 +9,79 @@ load_dotenv()
 # Configura a página
 st.set_page_config(page_title="CodeGenix - Simulador de Evolução de Algoritmos", layout="wide")
 
+
+@st.cache_resource
+def obter_recursos_compartilhados():
+    """Cria uma única vez os recursos caros divididos por todas as sessões: o cache e o sandbox.
+
+    Os clientes da API já são compartilhados pelo processo (ver obter_cliente_llm).
+    """
+    # Importados só quando a primeira simulação é iniciada, para a página abrir mais rápido
+    from controller.cache_avaliacoes import CacheAvaliacoes
+    from controller.sandbox import PoolSandbox
+    recursos = {"cache_avaliacoes": None, "pool_sandbox": None}
+    try:
+        recursos["cache_avaliacoes"] = CacheAvaliacoes()
+    except Exception as e:
+        print(f"[AVISO] Cache de avaliações desativado: {str(e)}")
+    try:
+        recursos["pool_sandbox"] = PoolSandbox()
+    except Exception as e:
+        # Sem o pool compartilhado, o avaliador e o filtro de correção tentam criar o seu (e informam se falhar)
+        print(f"[AVISO] Não foi possível iniciar o sandbox compartilhado: {str(e)}")
+    return recursos
+
+
+def obter_controller():
+    """Retorna o controlador da sessão, criado na primeira simulação e reaproveitado entre reruns.
+
+    Cada sessão tem o seu, para que simulações de abas diferentes rodem ao mesmo tempo.
+    """
+    if "controller" not in st.session_state:
+        from controller.simulacao_controller import SimulacaoController
+        st.session_state["controller"] = SimulacaoController(**obter_recursos_compartilhados())
+    return st.session_state["controller"]
+
+
 def main():
     """Função principal que inicia a aplicação."""
-    # Cria a view e o controlador
-    view = StreamlitView()
-    controller = SimulacaoController()
+    # A view guarda os dados já carregados do histórico; vale para toda a sessão
+    if "view" not in st.session_state:
+        st.session_state["view"] = StreamlitView()
+    view = st.session_state["view"]
     
     # Exibe a interface e obtém as configurações
     config = view.exibir_interface()
+
+    execucao = st.session_state.get("execucao")
+    em_andamento = execucao is not None and execucao.em_andamento
     
-    # Botão para iniciar a simulação
-    if st.button("Iniciar Simulação"):
+    col_iniciar, col_parar = st.columns(2)
+    # Botão para iniciar a simulação em segundo plano
+    if col_iniciar.button("Iniciar Simulação", disabled=em_andamento):
         if not config["codigo_inicial"].strip():
             st.error("Por favor, insira um código inicial.")
         else:
-            with st.spinner("Executando simulação..."):
-                # Inicia a simulação
-                melhor_algoritmo, estatisticas, caminho_historico = controller.iniciar_simulacao(
-                    codigo_inicial=config["codigo_inicial"],
-                    linguagem=config["linguagem"],
-                    tamanho_populacao=config["tamanho_populacao"],
-                    geracoes=config["geracoes"],
-                )
-                
-                # Exibe os resultados
-                view.exibir_resultados(melhor_algoritmo, estatisticas, caminho_historico)
+            from model.orcamento import OrcamentoExecucao
+            execucao = ExecucaoSimulacao(
+                obter_controller(),
+                codigo_inicial=config["codigo_inicial"],
+                linguagem=config["linguagem"],
+                tamanho_populacao=config["tamanho_populacao"],
+                geracoes=config["geracoes"],
+                retomar=config["retomar"],
+                orcamento=OrcamentoExecucao(**config["orcamento"]),
+            ).iniciar()
+            st.session_state["execucao"] = execucao
+            em_andamento = True
+
+    # Botão para cancelar a simulação em andamento
+    if col_parar.button("Parar", disabled=not em_andamento):
+        execucao.parar()
+
+    # Progresso ao vivo e, ao final, os resultados (mantidos entre reruns)
+    if execucao is not None:
+        view.exibir_execucao(execucao)
 
 if __name__ == "__main__":
-    main()
\ No newline at end of file
+    main()
@@ -41,3 +41,21 @@ class Algoritmo:
         clone.fitness = self.fitness
         clone.metricas = deepcopy(self.metricas)
         return clone
+
+    def para_dict(self):
+        """Retorna o algoritmo como dicionário serializável em JSON."""
+        return {
+            "id": self.id,
+            "linguagem": self.linguagem,
+            "codigo": self.codigo,
+            "fitness": self.fitness,
+            "metricas": dict(self.metricas)
+        }
+
+    @classmethod
+    def de_dict(cls, dados):
+        """Recria um algoritmo a partir do dicionário de para_dict."""
+        algoritmo = cls(dados["id"], dados["linguagem"], dados["codigo"])
+        algoritmo.fitness = dados.get("fitness")
+        algoritmo.metricas = dict(dados.get("metricas") or algoritmo.metricas)
+        return algoritmo
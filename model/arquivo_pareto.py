@@ -0,0 +1,173 @@
+import threading
+
+import numpy as np
+
+# Critérios do avaliador, na ordem das colunas da matriz de objetivos
+CRITERIOS = ("eficiencia", "clareza", "boas_praticas")
+
+# Linhas da matriz de dominância montadas de cada vez (os temporários cabem no cache)
+_LINHAS_BLOCO = 512
+
+
+def ordenar_frentes(objetivos):
+    """Ordenação rápida por não dominância (NSGA-II) de uma matriz de objetivos a maximizar.
+
+    Retorna, para cada linha, o índice da sua frente: 0 para as não dominadas,
+    1 para as dominadas apenas pelas da frente 0, e assim por diante.
+
+    As notas são inteiras e se repetem muito, então a dominância é calculada
+    sobre os vetores distintos: linhas iguais ficam na mesma frente, e um vetor
+    pelo menos tão bom quanto outro distinto em todos os objetivos o domina.
+    A matriz de dominância (k × k booleanos, com k vetores distintos) é montada
+    em blocos de linhas com broadcasting, e cada frente é retirada com uma soma
+    sobre as linhas dos seus membros, em O(k²) no total.
+    """
+    objetivos = np.asarray(objetivos, dtype=np.float64)
+    if objetivos.ndim == 1:
+        objetivos = objetivos[:, None]
+    if len(objetivos) == 0:
+        return np.empty(0, dtype=np.intp)
+
+    distintos, inverso = np.unique(objetivos, axis=0, return_inverse=True)
+    inverso = inverso.reshape(-1)
+    k = len(distintos)
+    # domina[i, j]: i é pelo menos tão bom quanto j em todos os objetivos (e i != j)
+    domina = np.empty((k, k), dtype=bool)
+    comparacao = np.empty((min(k, _LINHAS_BLOCO), k), dtype=bool)
+    for inicio in range(0, k, _LINHAS_BLOCO):
+        bloco = distintos[inicio:inicio + _LINHAS_BLOCO]
+        saida = domina[inicio:inicio + _LINHAS_BLOCO]
+        np.greater_equal(bloco[:, :1], distintos[:, 0], out=saida)
+        for j in range(1, distintos.shape[1]):
+            np.greater_equal(bloco[:, j:j + 1], distintos[:, j], out=comparacao[:len(bloco)])
+            saida &= comparacao[:len(bloco)]
+    np.fill_diagonal(domina, False)
+
+    dominadores = domina.sum(axis=0)
+    frentes = np.full(k, -1, dtype=np.intp)
+    atual = np.flatnonzero(dominadores == 0)
+    frente = 0
+    while atual.size:
+        frentes[atual] = frente
+        dominadores -= domina[atual].sum(axis=0)
+        dominadores[atual] = -1
+        atual = np.flatnonzero(dominadores == 0)
+        frente += 1
+    return frentes[inverso]
+
+
+def distancia_multidao(objetivos, frentes):
+    """Distância de multidão (NSGA-II) de cada linha dentro da sua frente.
+
+    Os extremos de cada frente recebem infinito; os demais, a soma, em cada
+    objetivo, da distância normalizada entre os vizinhos. Todas as frentes são
+    tratadas juntas, ordenando por (frente, valor) uma vez por objetivo.
+    """
+    objetivos = np.asarray(objetivos, dtype=np.float64)
+    if objetivos.ndim == 1:
+        objetivos = objetivos[:, None]
+    n = len(objetivos)
+    distancia = np.zeros(n)
+    if n == 0:
+        return distancia
+
+    for coluna in objetivos.T:
+        ordem = np.lexsort((coluna, frentes))
+        valores = coluna[ordem]
+        grupos = frentes[ordem]
+        inicio = np.r_[True, grupos[1:] != grupos[:-1]]
+        fim = np.r_[grupos[1:] != grupos[:-1], True]
+        # Amplitude do objetivo na frente de cada linha
+        grupo = np.cumsum(inicio) - 1
+        amplitude = valores[fim][grupo] - valores[inicio][grupo]
+        vizinhanca = np.r_[valores[1:], valores[-1]] - np.r_[valores[0], valores[:-1]]
+        contribuicao = np.divide(vizinhanca, amplitude, out=np.zeros(n), where=amplitude > 0)
+        contribuicao[inicio | fim] = np.inf
+        distancia[ordem] += contribuicao
+    return distancia
+
+
+def matriz_metricas(algoritmos):
+    """Matriz (algoritmos × critérios) com as métricas de cada algoritmo."""
+    matriz = np.zeros((len(algoritmos), len(CRITERIOS)))
+    for linha, algoritmo in enumerate(algoritmos):
+        metricas = algoritmo.get_metricas() or {}
+        matriz[linha] = [float(metricas.get(criterio, 0) or 0) for criterio in CRITERIOS]
+    return matriz
+
+
+class ArquivoPareto:
+    """Arquivo dos melhores compromissos entre os critérios encontrados na execução.
+
+    Responsabilidades:
+    - Guardar os algoritmos não dominados em eficiência, clareza e boas práticas
+    - Retirar os membros que passam a ser dominados por um algoritmo novo
+    - Limitar o tamanho pela distância de multidão, preservando os extremos
+
+    O fitness é a média dos critérios e esconde os compromissos entre eles;
+    o arquivo mostra, por exemplo, a versão mais eficiente e a mais clara,
+    mesmo que nenhuma delas tenha o maior fitness.
+    """
+    def __init__(self, capacidade=50):
+        self.capacidade = capacidade
+        self._lock = threading.Lock()
+        self._membros = []
+
+    def atualizar(self, algoritmos, geracao):
+        """Acrescenta os algoritmos avaliados que não são dominados; retorna quantos entraram."""
+        with self._lock:
+            conhecidos = {membro["codigo"] for membro in self._membros}
+            novos = []
+            for algoritmo in algoritmos:
+                if algoritmo.fitness is None or algoritmo.codigo in conhecidos:
+                    continue
+                conhecidos.add(algoritmo.codigo)
+                novos.append({
+                    "id": algoritmo.id,
+                    "geracao": geracao,
+                    "fitness": algoritmo.get_fitness(),
+                    "metricas": {criterio: (algoritmo.get_metricas() or {}).get(criterio, 0)
+                                 for criterio in CRITERIOS},
+                    "codigo": algoritmo.codigo,
+                    "linguagem": algoritmo.linguagem
+                })
+            if not novos:
+                return 0
+
+            candidatos = self._membros + novos
+            objetivos = self._objetivos(candidatos)
+            nao_dominados = np.flatnonzero(ordenar_frentes(objetivos) == 0)
+            candidatos = [candidatos[i] for i in nao_dominados]
+            objetivos = objetivos[nao_dominados]
+
+            # Acima da capacidade, sai um a um o membro mais cercado de vizinhos
+            while len(candidatos) > self.capacidade:
+                distancia = distancia_multidao(objetivos, np.zeros(len(candidatos), dtype=np.intp))
+                removido = int(np.argmin(distancia))
+                del candidatos[removido]
+                objetivos = np.delete(objetivos, removido, axis=0)
+
+            ids_novos = {id(novo) for novo in novos}
+            entraram = sum(1 for membro in candidatos if id(membro) in ids_novos)
+            self._membros = candidatos
+            return entraram
+
+    def membros(self):
+        """Membros do arquivo, serializáveis em JSON, do maior para o menor fitness."""
+        with self._lock:
+            membros = [dict(membro, metricas=dict(membro["metricas"])) for membro in self._membros]
+        return sorted(membros, key=lambda membro: membro["fitness"], reverse=True)
+
+    def restaurar(self, membros):
+        """Substitui os membros pelos de membros() (ex.: lidos de um checkpoint)."""
+        with self._lock:
+            self._membros = [dict(membro, metricas=dict(membro["metricas"])) for membro in membros]
+
+    def __len__(self):
+        return len(self._membros)
+
+    @staticmethod
+    def _objetivos(membros):
+        """Método privado com a matriz de critérios dos membros."""
+        return np.array([[float(membro["metricas"][criterio] or 0) for criterio in CRITERIOS]
+                         for membro in membros])
@@ -0,0 +1,66 @@
+import gzip
+import json
+import os
+import tempfile
+
+
+class CheckpointPopulacao:
+    """Guarda o estado da população ao fim de cada geração, para retomar a execução.
+
+    Responsabilidades:
+    - Gravar o estado em JSON compactado com gzip, de forma atômica: o arquivo
+      anterior só é substituído quando o novo está completo no disco
+    - Ler o estado de volta, ignorando arquivos corrompidos ou de outra versão
+    """
+    # Incrementar sempre que o formato do estado mudar
+    VERSAO = 1
+
+    def __init__(self, caminho="./utils/checkpoint_populacao.json.gz"):
+        self.caminho = caminho
+
+    def existe(self):
+        """Indica se há um checkpoint gravado."""
+        return os.path.exists(self.caminho)
+
+    def salvar(self, estado):
+        """Grava o estado (dicionário serializável em JSON) substituindo o anterior."""
+        diretorio = os.path.dirname(os.path.abspath(self.caminho))
+        os.makedirs(diretorio, exist_ok=True)
+        dados = json.dumps({"versao": self.VERSAO, **estado}, ensure_ascii=False).encode("utf-8")
+
+        # Arquivo temporário no mesmo diretório, para que a troca seja atômica
+        descritor, temporario = tempfile.mkstemp(prefix=".checkpoint-", suffix=".tmp", dir=diretorio)
+        try:
+            with os.fdopen(descritor, "wb") as arquivo:
+                with gzip.GzipFile(fileobj=arquivo, mode="wb", mtime=0) as compactado:
+                    compactado.write(dados)
+                arquivo.flush()
+                os.fsync(arquivo.fileno())
+            os.replace(temporario, self.caminho)
+        except BaseException:
+            if os.path.exists(temporario):
+                os.remove(temporario)
+            raise
+
+    def carregar(self):
+        """Retorna o estado gravado, ou None se não houver um checkpoint válido."""
+        try:
+            with gzip.open(self.caminho, "rb") as arquivo:
+                estado = json.loads(arquivo.read().decode("utf-8"))
+        except FileNotFoundError:
+            return None
+        except (OSError, EOFError, ValueError) as e:
+            print(f"[AVISO] Checkpoint {self.caminho} ilegível, ignorando: {str(e)}")
+            return None
+
+        if estado.get("versao") != self.VERSAO:
+            print(f"[AVISO] Checkpoint {self.caminho} de outra versão ({estado.get('versao')}), ignorando")
+            return None
+        return estado
+
+    def remover(self):
+        """Apaga o checkpoint, se existir."""
+        try:
+            os.remove(self.caminho)
+        except FileNotFoundError:
+            pass
@@ -0,0 +1,129 @@
+import json
+import os
+import threading
+
+
+class GravadorHistorico:
+    """Grava o histórico de avaliações em JSONL, apenas anexando registros novos.
+
+    Responsabilidades:
+    - Acumular registros em memória e gravá-los em lote com uma única escrita
+    - Nunca reescrever registros que já estão no arquivo
+    """
+    def __init__(self, caminho, tamanho_lote=100):
+        self.caminho = caminho
+        self.tamanho_lote = max(1, tamanho_lote)
+        self._pendentes = []
+        self._lock = threading.Lock()
+
+    def reiniciar(self):
+        """Descarta o conteúdo do arquivo para começar um novo histórico."""
+        with self._lock:
+            self._pendentes = []
+            diretorio = os.path.dirname(self.caminho)
+            if diretorio:
+                os.makedirs(diretorio, exist_ok=True)
+            open(self.caminho, "w", encoding="utf-8").close()
+
+    def anexar(self, registros):
+        """Enfileira registros; grava quando o lote enche."""
+        with self._lock:
+            self._pendentes.extend(registros)
+            cheio = len(self._pendentes) >= self.tamanho_lote
+        if cheio:
+            self.descarregar()
+
+    def descarregar(self):
+        """Grava no arquivo todos os registros pendentes."""
+        with self._lock:
+            if not self._pendentes:
+                return
+            linhas = "".join(
+                json.dumps(registro, ensure_ascii=False) + "\n" for registro in self._pendentes
+            )
+            with open(self.caminho, "a", encoding="utf-8") as f:
+                f.write(linhas)
+            self._pendentes = []
+
+
+class LeitorHistorico:
+    """Lê o histórico de forma incremental, acompanhando o final do arquivo.
+
+    Aceita o formato JSONL atual e o antigo arquivo JSON com uma única lista.
+    """
+    # Bytes antes da posição lida guardados para reconhecer o mesmo arquivo na próxima leitura
+    TAMANHO_MARCA = 256
+
+    def __init__(self, caminho):
+        self.caminho = caminho
+        self.posicao = 0
+        self.reiniciado = False
+        self._inode = None
+        self._marca = b""
+
+    def ler_novos(self):
+        """Retorna os registros gravados desde a última leitura.
+
+        Se o arquivo tiver sido reescrito (novo histórico, retomada de um
+        checkpoint ou troca do arquivo), recomeça do início e marca
+        `reiniciado` como True.
+        """
+        self.reiniciado = False
+        with open(self.caminho, "rb") as f:
+            if self.posicao and self._reescrito(f):
+                self.posicao = 0
+                self.reiniciado = True
+
+            f.seek(self.posicao)
+            conteudo = f.read()
+
+            if self.posicao == 0 and conteudo.lstrip().startswith(b"["):
+                # Formato antigo: uma lista JSON completa
+                self._avancar(f, len(conteudo))
+                return json.loads(conteudo.decode("utf-8"))
+
+            # Só consome linhas completas; uma linha parcial será lida na próxima vez
+            fim = conteudo.rfind(b"\n") + 1
+            self._avancar(f, fim)
+        return [
+            json.loads(linha)
+            for linha in conteudo[:fim].decode("utf-8").splitlines()
+            if linha.strip()
+        ]
+
+    def _reescrito(self, f):
+        """Método privado que verifica se o arquivo deixou de ser o lido até `posicao`.
+
+        O tamanho sozinho não basta: truncado e depois estendido além da posição
+        antiga, o arquivo seria lido a partir do meio de uma linha. Por isso
+        compara também o inode e os últimos bytes já lidos.
+        """
+        if os.fstat(f.fileno()).st_ino != self._inode:
+            return True
+        inicio = self.posicao - len(self._marca)
+        f.seek(inicio)
+        return f.read(len(self._marca)) != self._marca
+
+    def _avancar(self, f, lidos):
+        """Método privado que avança a posição e guarda a marca do trecho já lido."""
+        self.posicao += lidos
+        self._inode = os.fstat(f.fileno()).st_ino
+        inicio = max(0, self.posicao - self.TAMANHO_MARCA)
+        f.seek(inicio)
+        self._marca = f.read(self.posicao - inicio)
+
+
+def iterar_historico(caminho):
+    """Percorre os registros do histórico sem carregar o arquivo inteiro (JSONL)."""
+    with open(caminho, "r", encoding="utf-8") as f:
+        primeira = f.readline()
+        if primeira.lstrip().startswith("["):
+            # Formato antigo não permite leitura parcial
+            f.seek(0)
+            yield from json.load(f)
+            return
+        if primeira.strip():
+            yield json.loads(primeira)
+        for linha in f:
+            if linha.strip():
+                yield json.loads(linha)
@@ -0,0 +1,266 @@
+import threading
+
+import numpy as np
+
+
+class HistoricoColunar:
+    """Histórico de avaliações armazenado em colunas NumPy.
+
+    Responsabilidades:
+    - Guardar fitness e métricas em arrays contíguos, com crescimento amortizado
+    - Manter um índice geração → faixa de linhas para consultas diretas
+    - Referenciar o código de cada avaliação por uma tabela sem repetições
+    - Calcular médias, máximos e argmax por geração com operações vetorizadas
+    """
+    COLUNAS = ("fitness", "eficiencia", "clareza", "boas_praticas")
+
+    def __init__(self, capacidade=1024):
+        capacidade = max(1, capacidade)
+        self._geracoes = np.empty(capacidade, dtype=np.int32)
+        self._valores = np.empty((capacidade, len(self.COLUNAS)), dtype=np.float64)
+        self._ids_codigo = np.empty(capacidade, dtype=np.int64)
+        self._tamanho = 0
+        self._codigos = []
+        self._id_por_codigo = {}
+        # Geração → [início, fim) das linhas, válido enquanto as linhas estiverem ordenadas
+        self._faixas = {}
+        self._maior_geracao = None
+        self._ordenado = True
+        self._lock = threading.Lock()
+
+    def __len__(self):
+        return self._tamanho
+
+    def adicionar(self, geracao, fitness, metricas, codigo=None):
+        """Adiciona uma avaliação ao histórico."""
+        with self._lock:
+            if self._tamanho == len(self._geracoes):
+                self._crescer()
+
+            linha = self._tamanho
+            self._geracoes[linha] = geracao
+            self._valores[linha] = (
+                fitness,
+                metricas.get("eficiencia", 0),
+                metricas.get("clareza", 0),
+                metricas.get("boas_praticas", 0)
+            )
+            self._ids_codigo[linha] = self._id_do_codigo(codigo)
+            self._tamanho += 1
+
+            self._indexar(geracao, linha, linha + 1)
+
+    def adicionar_registros(self, registros):
+        """Adiciona, de uma vez, registros no formato do histórico JSON/JSONL."""
+        registros = list(registros)
+        if not registros:
+            return
+        geracoes = np.fromiter((r["geracao"] for r in registros), dtype=np.int32, count=len(registros))
+        valores = np.array([
+            (
+                r["fitness"],
+                r.get("metricas", {}).get("eficiencia", 0),
+                r.get("metricas", {}).get("clareza", 0),
+                r.get("metricas", {}).get("boas_praticas", 0)
+            )
+            for r in registros
+        ], dtype=np.float64)
+
+        with self._lock:
+            ids = np.fromiter(
+                (self._id_do_codigo(r.get("codigo")) for r in registros), dtype=np.int64, count=len(registros)
+            )
+            inicio = self._tamanho
+            fim = inicio + len(registros)
+            while fim > len(self._geracoes):
+                self._crescer()
+            self._geracoes[inicio:fim] = geracoes
+            self._valores[inicio:fim] = valores
+            self._ids_codigo[inicio:fim] = ids
+            self._tamanho = fim
+
+            # Uma entrada no índice por sequência de linhas da mesma geração
+            limites = np.flatnonzero(np.r_[True, geracoes[1:] != geracoes[:-1]])
+            fins = np.r_[limites[1:], len(geracoes)]
+            for a, b in zip(limites.tolist(), fins.tolist()):
+                if not self._ordenado:
+                    break
+                self._indexar(int(geracoes[a]), inicio + a, inicio + b)
+
+    def limpar(self):
+        """Remove todas as avaliações."""
+        with self._lock:
+            self._tamanho = 0
+            self._codigos = []
+            self._id_por_codigo = {}
+            self._faixas = {}
+            self._maior_geracao = None
+            self._ordenado = True
+
+    def geracoes(self):
+        """Retorna as gerações presentes, em ordem."""
+        with self._lock:
+            self._ordenar()
+            return sorted(self._faixas)
+
+    def metricas_geracao(self, geracao):
+        """Retorna médias, melhor fitness e melhor código de uma geração, ou None."""
+        with self._lock:
+            self._ordenar()
+            faixa = self._faixas.get(geracao)
+            if faixa is None:
+                return None
+            inicio, fim = faixa
+            valores = self._valores[inicio:fim]
+            medias = valores.mean(axis=0)
+            melhor = int(valores[:, 0].argmax())
+            id_codigo = int(self._ids_codigo[inicio + melhor])
+
+            return {
+                'geracao': geracao,
+                'num_avaliacoes': fim - inicio,
+                'media_fitness': round(float(medias[0]), 2),
+                'media_eficiencia': round(float(medias[1]), 2),
+                'media_clareza': round(float(medias[2]), 2),
+                'media_boas_praticas': round(float(medias[3]), 2),
+                'melhor_fitness': self._como_numero(valores[melhor, 0]),
+                'melhor_codigo': self._codigos[id_codigo] if id_codigo >= 0 else None
+            }
+
+    def agregados_por_geracao(self):
+        """Calcula, para todas as gerações de uma vez, contagens, médias, desvios, mínimos e máximos.
+
+        Retorna um dicionário de arrays alinhados pela geração; as colunas
+        seguem a ordem de COLUNAS.
+        """
+        with self._lock:
+            self._ordenar()
+            n = self._tamanho
+            if n == 0:
+                vazio = np.empty((0, len(self.COLUNAS)))
+                return {"geracoes": np.empty(0, dtype=np.int32), "contagens": np.empty(0, dtype=np.int64),
+                        "medias": vazio, "desvios": vazio, "minimos": vazio, "maximos": vazio,
+                        "linha_melhor": np.empty(0, dtype=np.int64)}
+
+            geracoes = np.array(sorted(self._faixas), dtype=np.int32)
+            inicios = np.array([self._faixas[g][0] for g in geracoes], dtype=np.int64)
+            contagens = np.array([self._faixas[g][1] - self._faixas[g][0] for g in geracoes], dtype=np.int64)
+            valores = self._valores[:n]
+
+            somas = np.add.reduceat(valores, inicios, axis=0)
+            medias = somas / contagens[:, None]
+            quadrados = np.add.reduceat(valores * valores, inicios, axis=0)
+            variancias = np.maximum(quadrados / contagens[:, None] - medias * medias, 0.0)
+            minimos = np.minimum.reduceat(valores, inicios, axis=0)
+            maximos = np.maximum.reduceat(valores, inicios, axis=0)
+
+            # Primeira linha de cada geração que atinge o fitness máximo
+            fitness = valores[:, 0]
+            atinge = fitness == np.repeat(maximos[:, 0], contagens)
+            linhas = np.flatnonzero(atinge)
+            linha_melhor = linhas[np.searchsorted(linhas, inicios)]
+
+            return {
+                "geracoes": geracoes,
+                "contagens": contagens,
+                "medias": medias,
+                "desvios": np.sqrt(variancias),
+                "minimos": minimos,
+                "maximos": maximos,
+                "linha_melhor": linha_melhor
+            }
+
+    def codigo_da_linha(self, linha):
+        """Retorna o código associado a uma linha do histórico, se conhecido."""
+        with self._lock:
+            id_codigo = int(self._ids_codigo[linha])
+            return self._codigos[id_codigo] if id_codigo >= 0 else None
+
+    def salvar(self, caminho):
+        """Salva as colunas em um arquivo .npz compactado."""
+        with self._lock:
+            self._ordenar()
+            n = self._tamanho
+            np.savez_compressed(
+                caminho,
+                geracoes=self._geracoes[:n],
+                valores=self._valores[:n],
+                ids_codigo=self._ids_codigo[:n],
+                codigos=np.array(self._codigos, dtype=object)
+            )
+
+    @classmethod
+    def carregar(cls, caminho):
+        """Carrega um histórico salvo com `salvar`."""
+        with np.load(caminho, allow_pickle=True) as dados:
+            geracoes = dados["geracoes"]
+            historico = cls(capacidade=len(geracoes))
+            historico._geracoes[:len(geracoes)] = geracoes
+            historico._valores[:len(geracoes)] = dados["valores"]
+            historico._ids_codigo[:len(geracoes)] = dados["ids_codigo"]
+            historico._codigos = list(dados["codigos"])
+        historico._tamanho = len(geracoes)
+        historico._id_por_codigo = {c: i for i, c in enumerate(historico._codigos)}
+        historico._ordenado = False
+        return historico
+
+    def _indexar(self, geracao, inicio, fim):
+        """Método privado que estende o índice com as linhas [inicio, fim) de uma geração."""
+        if not self._ordenado:
+            return
+        faixa = self._faixas.get(geracao)
+        if faixa is None and (self._maior_geracao is None or geracao > self._maior_geracao):
+            self._faixas[geracao] = [inicio, fim]
+            self._maior_geracao = geracao
+        elif faixa is not None and faixa[1] == inicio:
+            faixa[1] = fim
+        else:
+            # Geração fora de ordem: o índice será refeito na próxima consulta
+            self._ordenado = False
+
+    def _id_do_codigo(self, codigo):
+        """Método privado que retorna o id do código na tabela (-1 se ausente)."""
+        if codigo is None:
+            return -1
+        id_codigo = self._id_por_codigo.get(codigo)
+        if id_codigo is None:
+            id_codigo = len(self._codigos)
+            self._codigos.append(codigo)
+            self._id_por_codigo[codigo] = id_codigo
+        return id_codigo
+
+    def _crescer(self):
+        """Método privado que dobra a capacidade dos arrays."""
+        capacidade = len(self._geracoes) * 2
+        self._geracoes = np.resize(self._geracoes, capacidade)
+        valores = np.empty((capacidade, len(self.COLUNAS)), dtype=np.float64)
+        valores[:self._tamanho] = self._valores[:self._tamanho]
+        self._valores = valores
+        self._ids_codigo = np.resize(self._ids_codigo, capacidade)
+
+    def _ordenar(self):
+        """Método privado que ordena as linhas por geração e refaz o índice, se necessário."""
+        if self._ordenado:
+            return
+        n = self._tamanho
+        ordem = np.argsort(self._geracoes[:n], kind="stable")
+        self._geracoes[:n] = self._geracoes[:n][ordem]
+        self._valores[:n] = self._valores[:n][ordem]
+        self._ids_codigo[:n] = self._ids_codigo[:n][ordem]
+
+        self._faixas = {}
+        self._maior_geracao = None
+        if n:
+            geracoes = self._geracoes[:n]
+            inicios = np.flatnonzero(np.r_[True, geracoes[1:] != geracoes[:-1]])
+            fins = np.r_[inicios[1:], n]
+            for inicio, fim in zip(inicios.tolist(), fins.tolist()):
+                self._faixas[int(geracoes[inicio])] = [inicio, fim]
+            self._maior_geracao = int(geracoes[n - 1])
+        self._ordenado = True
+
+    @staticmethod
+    def _como_numero(valor):
+        """Converte para int quando o valor não tem parte fracionária."""
+        valor = float(valor)
+        return int(valor) if valor.is_integer() else valor
@@ -0,0 +1,163 @@
+import ast
+import hashlib
+import io
+import random
+import re
+import threading
+import tokenize
+from collections import defaultdict
+
+import numpy as np
+
+# Primo de Mersenne usado nas funções de hash universais do MinHash;
+# com 31 bits, a * v + b cabe em uint64 sem overflow
+_PRIMO = (1 << 31) - 1
+
+
+class IndiceDiversidade:
+    """Índice de duplicatas da população.
+
+    Responsabilidades:
+    - Identificar cópias exatas pelo hash da AST sem comentários e docstrings
+    - Identificar quase-duplicatas com MinHash/LSH sobre shingles de tokens
+    - Guardar as notas já obtidas para reaproveitá-las em gêmeos exatos
+    - Limitar quantos indivíduos parecidos entram em uma mesma geração
+    """
+    def __init__(self, num_permutacoes=64, num_bandas=8, tamanho_shingle=4,
+                 limiar_similaridade=0.8, limite_similares=2, semente=1):
+        if num_permutacoes % num_bandas != 0:
+            raise ValueError("num_permutacoes deve ser múltiplo de num_bandas")
+        self.num_permutacoes = num_permutacoes
+        self.num_bandas = num_bandas
+        self.linhas_por_banda = num_permutacoes // num_bandas
+        self.tamanho_shingle = tamanho_shingle
+        self.limiar_similaridade = limiar_similaridade
+        self.limite_similares = limite_similares
+
+        rng = random.Random(semente)
+        self._a = np.array([rng.randrange(1, _PRIMO) for _ in range(num_permutacoes)], dtype=np.uint64)
+        self._b = np.array([rng.randrange(0, _PRIMO) for _ in range(num_permutacoes)], dtype=np.uint64)
+
+        self._lock = threading.Lock()
+        # Impressão digital exata → (fitness, métricas) de um gêmeo já avaliado
+        self._notas_por_impressao = {}
+        # Assinaturas MinHash dos membros da geração atual, uma por linha
+        self._assinaturas = np.empty((64, num_permutacoes), dtype=np.uint64)
+        self._num_membros = 0
+        # (banda, hash da banda) → linhas dos membros da geração atual
+        self._baldes = defaultdict(list)
+
+    def impressao_digital(self, codigo, linguagem="Python"):
+        """Hash do código ignorando comentários, docstrings e formatação."""
+        if linguagem.lower() == "python":
+            try:
+                arvore = _RemovedorDocstrings().visit(ast.parse(codigo))
+                conteudo = ast.dump(arvore, annotate_fields=False, include_attributes=False)
+                return hashlib.sha256(conteudo.encode("utf-8")).hexdigest()
+            except (SyntaxError, ValueError):
+                pass
+        conteudo = " ".join(self._tokens(codigo, linguagem))
+        return hashlib.sha256(conteudo.encode("utf-8")).hexdigest()
+
+    def assinatura(self, codigo, linguagem="Python"):
+        """Assinatura MinHash dos shingles de tokens do código."""
+        tokens = self._tokens(codigo, linguagem)
+        k = self.tamanho_shingle
+        shingles = {" ".join(tokens[i:i + k]) for i in range(max(1, len(tokens) - k + 1))}
+        valores = np.fromiter(
+            (int.from_bytes(hashlib.blake2b(s.encode("utf-8"), digest_size=4).digest(), "little") % _PRIMO
+             for s in shingles),
+            dtype=np.uint64, count=len(shingles)
+        )
+        # Todas as permutações de uma vez: matriz (permutações × shingles)
+        hashes = (np.outer(self._a, valores) + self._b[:, None]) % _PRIMO
+        return hashes.min(axis=1)
+
+    def buscar_notas(self, algoritmo):
+        """Retorna (fitness, métricas) de um gêmeo exato já avaliado, ou None."""
+        impressao = self.impressao_digital(algoritmo.codigo, algoritmo.linguagem)
+        with self._lock:
+            notas = self._notas_por_impressao.get(impressao)
+        return notas
+
+    def registrar_notas(self, algoritmo):
+        """Guarda as notas de um algoritmo avaliado para reaproveitamento."""
+        if algoritmo.fitness is None:
+            return
+        impressao = self.impressao_digital(algoritmo.codigo, algoritmo.linguagem)
+        with self._lock:
+            self._notas_por_impressao[impressao] = (algoritmo.fitness, dict(algoritmo.metricas))
+
+    def admitir(self, algoritmo):
+        """Inclui o algoritmo na geração atual se o limite de diversidade permitir.
+
+        Retorna False quando já existem `limite_similares` membros parecidos.
+        """
+        assinatura = self.assinatura(algoritmo.codigo, algoritmo.linguagem)
+        chaves = list(self._chaves_bandas(assinatura))
+        with self._lock:
+            if self.limite_similares is not None:
+                # O LSH restringe a comparação aos membros que colidem em alguma banda
+                candidatos = set()
+                for chave in chaves:
+                    candidatos.update(self._baldes.get(chave, ()))
+                if len(candidatos) >= self.limite_similares:
+                    linhas = np.fromiter(candidatos, dtype=np.intp, count=len(candidatos))
+                    similaridades = (self._assinaturas[linhas] == assinatura).mean(axis=1)
+                    if np.count_nonzero(similaridades >= self.limiar_similaridade) >= self.limite_similares:
+                        return False
+
+            if self._num_membros == len(self._assinaturas):
+                self._assinaturas = np.concatenate([self._assinaturas, np.empty_like(self._assinaturas)])
+            linha = self._num_membros
+            self._assinaturas[linha] = assinatura
+            self._num_membros += 1
+            for chave in chaves:
+                self._baldes[chave].append(linha)
+            return True
+
+    def nova_geracao(self):
+        """Esvazia os membros da geração atual, mantendo as notas já conhecidas."""
+        with self._lock:
+            self._num_membros = 0
+            self._baldes.clear()
+
+    def _chaves_bandas(self, assinatura):
+        """Método privado que divide a assinatura em bandas para o LSH."""
+        r = self.linhas_por_banda
+        for banda in range(self.num_bandas):
+            yield banda, assinatura[banda * r:(banda + 1) * r].tobytes()
+
+    @staticmethod
+    def _tokens(codigo, linguagem):
+        """Método privado que tokeniza o código sem comentários e espaços."""
+        if linguagem.lower() == "python":
+            ignorar = (tokenize.COMMENT, tokenize.NL, tokenize.NEWLINE, tokenize.INDENT,
+                       tokenize.DEDENT, tokenize.ENCODING, tokenize.ENDMARKER)
+            try:
+                return [
+                    t.string for t in tokenize.generate_tokens(io.StringIO(codigo).readline)
+                    if t.type not in ignorar
+                ]
+            except (tokenize.TokenError, IndentationError, SyntaxError):
+                pass
+        # Tokenização genérica para outras linguagens ou código inválido
+        sem_comentarios = re.sub(r"//[^\n]*|/\*.*?\*/|#[^\n]*", " ", codigo, flags=re.DOTALL)
+        return re.findall(r"\w+|[^\w\s]", sem_comentarios)
+
+
+class _RemovedorDocstrings(ast.NodeTransformer):
+    """Remove docstrings de módulos, classes e funções da AST."""
+
+    def _remover(self, node):
+        self.generic_visit(node)
+        corpo = node.body
+        if (corpo and isinstance(corpo[0], ast.Expr)
+                and isinstance(corpo[0].value, ast.Constant) and isinstance(corpo[0].value.value, str)):
+            node.body = corpo[1:] or [ast.Pass()]
+        return node
+
+    visit_Module = _remover
+    visit_ClassDef = _remover
+    visit_FunctionDef = _remover
+    visit_AsyncFunctionDef = _remover
@@ -0,0 +1,172 @@
+import ast
+import builtins
+import threading
+
+import numpy as np
+
+# Nomes embutidos do Python, para contar os builtins usados pelo candidato
+_BUILTINS = frozenset(dir(builtins))
+
+# Nós que abrem um laço (e aumentam a profundidade de aninhamento)
+_LACOS = (ast.For, ast.AsyncFor, ast.While)
+_COMPREENSOES = (ast.ListComp, ast.SetComp, ast.DictComp, ast.GeneratorExp)
+_FUNCOES = (ast.FunctionDef, ast.AsyncFunctionDef)
+_COM_DOCSTRING = (ast.Module, ast.ClassDef, ast.FunctionDef, ast.AsyncFunctionDef)
+
+# Ordem das colunas do vetor de características
+CARACTERISTICAS = (
+    "vies", "valido", "nos", "linhas", "comentarios", "lacos", "aninhamento_lacos", "compreensoes",
+    "funcoes", "chamadas", "builtins_distintos", "condicionais", "tratamentos", "tem_docstring",
+    "tamanho_docstrings", "funcoes_documentadas", "funcoes_anotadas", "tamanho_identificadores"
+)
+
+
+def extrair_caracteristicas(codigo):
+    """Vetor de características baratas do código Python, tiradas da AST em uma única passada.
+
+    Contagens entram como log1p, para que programas grandes não dominem o modelo;
+    código que não compila tem só o viés, o número de linhas e os comentários.
+    """
+    codigo = codigo or ""
+    linhas = [linha.strip() for linha in codigo.splitlines() if linha.strip()]
+    comentarios = sum(1 for linha in linhas if linha.startswith("#"))
+    vetor = np.zeros(len(CARACTERISTICAS))
+    vetor[0] = 1.0
+    vetor[3] = np.log1p(len(linhas))
+    vetor[4] = np.log1p(comentarios)
+    try:
+        arvore = ast.parse(codigo)
+    except (SyntaxError, ValueError):
+        return vetor
+
+    contagem = _ContagemAst()
+    contagem.visitar(arvore, 0)
+    funcoes = max(1, contagem.funcoes)
+    vetor[1] = 1.0
+    vetor[2] = np.log1p(contagem.nos)
+    vetor[5] = np.log1p(contagem.lacos)
+    vetor[6] = contagem.aninhamento
+    vetor[7] = np.log1p(contagem.compreensoes)
+    vetor[8] = np.log1p(contagem.funcoes)
+    vetor[9] = np.log1p(contagem.chamadas)
+    vetor[10] = np.log1p(len(contagem.builtins))
+    vetor[11] = np.log1p(contagem.condicionais)
+    vetor[12] = np.log1p(contagem.tratamentos)
+    vetor[13] = 1.0 if contagem.docstrings else 0.0
+    vetor[14] = np.log1p(contagem.tamanho_docstrings)
+    vetor[15] = contagem.funcoes_documentadas / funcoes
+    vetor[16] = contagem.funcoes_anotadas / funcoes
+    vetor[17] = contagem.tamanho_identificadores / max(1, contagem.identificadores) / 10
+    return vetor
+
+
+class _ContagemAst:
+    """Contadores de extrair_caracteristicas, preenchidos em um percurso recursivo da AST."""
+    def __init__(self):
+        self.nos = 0
+        self.lacos = 0
+        self.aninhamento = 0
+        self.compreensoes = 0
+        self.funcoes = 0
+        self.chamadas = 0
+        self.builtins = set()
+        self.condicionais = 0
+        self.tratamentos = 0
+        self.docstrings = 0
+        self.tamanho_docstrings = 0
+        self.funcoes_documentadas = 0
+        self.funcoes_anotadas = 0
+        self.identificadores = 0
+        self.tamanho_identificadores = 0
+
+    def visitar(self, no, profundidade):
+        """Conta o nó e seus filhos; `profundidade` é o número de laços que o envolvem."""
+        self.nos += 1
+        if isinstance(no, _LACOS):
+            self.lacos += 1
+            profundidade += 1
+            self.aninhamento = max(self.aninhamento, profundidade)
+        elif isinstance(no, _COMPREENSOES):
+            self.compreensoes += 1
+        elif isinstance(no, ast.Call):
+            self.chamadas += 1
+            if isinstance(no.func, ast.Name) and no.func.id in _BUILTINS:
+                self.builtins.add(no.func.id)
+        elif isinstance(no, (ast.If, ast.IfExp)):
+            self.condicionais += 1
+        elif isinstance(no, ast.Try):
+            self.tratamentos += 1
+        elif isinstance(no, ast.Name):
+            self.identificadores += 1
+            self.tamanho_identificadores += len(no.id)
+
+        if isinstance(no, _COM_DOCSTRING):
+            docstring = ast.get_docstring(no, clean=False)
+            if docstring:
+                self.docstrings += 1
+                self.tamanho_docstrings += len(docstring)
+            if isinstance(no, _FUNCOES):
+                self.funcoes += 1
+                self.funcoes_documentadas += 1 if docstring else 0
+                argumentos = no.args.posonlyargs + no.args.args + no.args.kwonlyargs
+                if no.returns is not None or any(arg.annotation is not None for arg in argumentos):
+                    self.funcoes_anotadas += 1
+
+        for filho in ast.iter_child_nodes(no):
+            self.visitar(filho, profundidade)
+
+
+class ModeloSubstituto:
+    """Regressão linear online que prevê as notas do avaliador a partir do código.
+
+    Responsabilidades:
+    - Extrair características baratas da AST (ver extrair_caracteristicas)
+    - Prever eficiência, clareza e boas práticas com um produto escalar
+    - Aprender com cada avaliação real por mínimos quadrados recursivos (RLS),
+      sem guardar as amostras
+    - Esquecer aos poucos as avaliações antigas, que descrevem populações de gerações passadas
+
+    Os três critérios compartilham a mesma matriz de covariância, então uma
+    atualização custa O(d²) com d características, independentemente do histórico.
+    """
+    CRITERIOS = ("eficiencia", "clareza", "boas_praticas")
+
+    def __init__(self, esquecimento=0.99, regularizacao=0.01, nota_minima=0, nota_maxima=100):
+        """
+        Args:
+            esquecimento: Peso das amostras anteriores a cada atualização (1.0 não esquece)
+            regularizacao: Confiança inicial nos pesos zerados (menor aprende mais rápido)
+            nota_minima: Menor nota do avaliador (as previsões são limitadas a ela)
+            nota_maxima: Maior nota do avaliador
+        """
+        self.esquecimento = esquecimento
+        self.regularizacao = regularizacao
+        self.nota_minima = nota_minima
+        self.nota_maxima = nota_maxima
+        self._lock = threading.Lock()
+        dimensao = len(CARACTERISTICAS)
+        self._pesos = np.zeros((dimensao, len(self.CRITERIOS)))
+        self._covariancia = np.eye(dimensao) / regularizacao
+        self.amostras = 0
+
+    def prever(self, caracteristicas):
+        """Notas previstas (um valor por critério) para um vetor ou uma matriz de características."""
+        previsao = np.asarray(caracteristicas) @ self._pesos
+        return np.clip(previsao, self.nota_minima, self.nota_maxima)
+
+    def prever_fitness(self, caracteristicas):
+        """Fitness previsto: a média das notas previstas, como no AvaliadorService."""
+        return self.prever(caracteristicas).mean(axis=-1)
+
+    def atualizar(self, caracteristicas, metricas):
+        """Incorpora uma avaliação real: características do código e suas métricas."""
+        x = np.asarray(caracteristicas, dtype=float)
+        y = np.array([float(metricas[criterio]) for criterio in self.CRITERIOS])
+        with self._lock:
+            px = self._covariancia @ x
+            ganho = px / (self.esquecimento + x @ px)
+            self._pesos += np.outer(ganho, y - x @ self._pesos)
+            covariancia = (self._covariancia - np.outer(ganho, px)) / self.esquecimento
+            # Simetriza para os erros de arredondamento não se acumularem
+            self._covariancia = (covariancia + covariancia.T) / 2
+            self.amostras += 1
@@ -0,0 +1,185 @@
+import contextvars
+import threading
+import time
+
+
+class OrcamentoEsgotado(RuntimeError):
+    """A requisição não cabe no orçamento restante da execução."""
+
+
+class OrcamentoExecucao:
+    """Limita os tokens, as requisições à API e o tempo de uma execução.
+
+    Responsabilidades:
+    - Reservar os tokens estimados de cada requisição antes do envio e recusar as que não cabem
+    - Contabilizar os tokens realmente gastos, informados pela API
+    - Informar o nível de economia: "normal", "economico" ou "esgotado"
+    - Registrar os cortes feitos para a execução caber no orçamento
+
+    Limites None não são aplicados; sem nenhum limite, o orçamento apenas contabiliza.
+    A partir da primeira requisição recusada o orçamento fica esgotado, para que
+    nenhum trabalho novo comece com o pouco que sobrou.
+    """
+    NIVEIS = ("normal", "economico", "esgotado")
+
+    def __init__(self, max_tokens=None, max_requisicoes=None, max_segundos=None, limiar_economia=0.25):
+        """
+        Args:
+            max_tokens: Tokens de prompt e de resposta da execução inteira
+            max_requisicoes: Requisições à API, incluindo novas tentativas
+            max_segundos: Tempo total da execução
+            limiar_economia: Fração restante (no limite mais apertado) abaixo da qual
+                o nível passa a "economico"
+        """
+        self.max_tokens = max_tokens
+        self.max_requisicoes = max_requisicoes
+        self.max_segundos = max_segundos
+        self.limiar_economia = limiar_economia
+        self._lock = threading.Lock()
+        self.reiniciar()
+
+    @property
+    def limitado(self):
+        """Indica se algum limite está configurado."""
+        return any(limite is not None for limite in (self.max_tokens, self.max_requisicoes, self.max_segundos))
+
+    def reiniciar(self):
+        """Zera o consumo e recomeça a contar o tempo (início de uma execução)."""
+        with self._lock:
+            self._inicio = time.perf_counter()
+            self.tokens_gastos = 0
+            self.tokens_reservados = 0
+            self.requisicoes = 0
+            self.recusadas = 0
+            self.modo = "normal"
+            self.degradacoes = {}
+
+    @property
+    def segundos(self):
+        """Tempo decorrido desde o início da execução."""
+        return time.perf_counter() - self._inicio
+
+    def reservar(self, tokens):
+        """Reserva uma requisição com os tokens estimados; lança OrcamentoEsgotado se não couber."""
+        with self._lock:
+            motivo = self._motivo_recusa(tokens)
+            if motivo:
+                self.recusadas += 1
+                raise OrcamentoEsgotado(f"Orçamento da execução esgotado: {motivo}")
+            self.requisicoes += 1
+            self.tokens_reservados += tokens
+
+    def confirmar(self, tokens_reservados, tokens_gastos):
+        """Troca a reserva de uma requisição concluída (ou que falhou) pelo consumo real."""
+        with self._lock:
+            self.tokens_reservados -= tokens_reservados
+            self.tokens_gastos += tokens_gastos
+
+    def consumo(self):
+        """Tupla (tokens, requisições, segundos) consumidos até agora."""
+        with self._lock:
+            return self.tokens_gastos + self.tokens_reservados, self.requisicoes, self.segundos
+
+    def restante(self):
+        """Tupla (tokens, requisições, segundos) restantes; None nos limites não configurados."""
+        tokens, requisicoes, segundos = self.consumo()
+        return (
+            self.max_tokens - tokens if self.max_tokens is not None else None,
+            self.max_requisicoes - requisicoes if self.max_requisicoes is not None else None,
+            self.max_segundos - segundos if self.max_segundos is not None else None,
+        )
+
+    def fracao_restante(self):
+        """Fração restante do limite mais apertado (1.0 sem limites)."""
+        limites = (self.max_tokens, self.max_requisicoes, self.max_segundos)
+        fracoes = [
+            max(0.0, restante / limite)
+            for restante, limite in zip(self.restante(), limites)
+            if limite is not None
+        ]
+        return min(fracoes, default=1.0)
+
+    def nivel(self):
+        """Nível de economia: "esgotado", "economico" (modo definido ou pouco restante) ou "normal"."""
+        fracao = self.fracao_restante()
+        if self.recusadas or fracao <= 0:
+            return "esgotado"
+        if self.modo == "economico" or fracao < self.limiar_economia:
+            return "economico"
+        return "normal"
+
+    def definir_modo(self, modo):
+        """Define o modo pedido pelo escalonador ("normal" ou "economico")."""
+        if modo not in self.NIVEIS[:2]:
+            raise ValueError(f"Modo de orçamento inválido: {modo}")
+        self.modo = modo
+
+    def registrar_degradacao(self, tipo):
+        """Conta um corte feito para economizar (ex.: "sem_cruzamento")."""
+        with self._lock:
+            self.degradacoes[tipo] = self.degradacoes.get(tipo, 0) + 1
+
+    def resumo(self):
+        """Limites, consumo e cortes da execução, serializáveis em JSON."""
+        tokens, requisicoes, segundos = self.consumo()
+        return {
+            "limites": {"tokens": self.max_tokens, "requisicoes": self.max_requisicoes,
+                        "segundos": self.max_segundos},
+            "consumo": {"tokens": tokens, "requisicoes": requisicoes, "segundos": round(segundos, 3)},
+            "recusadas": self.recusadas,
+            "nivel": self.nivel(),
+            "degradacoes": dict(self.degradacoes)
+        }
+
+    def _motivo_recusa(self, tokens):
+        """Método privado que retorna por que a requisição não cabe, ou None se couber."""
+        if self.max_segundos is not None and self.segundos >= self.max_segundos:
+            return "tempo"
+        if self.max_requisicoes is not None and self.requisicoes >= self.max_requisicoes:
+            return "requisições"
+        if self.max_tokens is not None and self.tokens_gastos + self.tokens_reservados + tokens > self.max_tokens:
+            return "tokens"
+        return None
+
+
+class _OrcamentoLivre:
+    """Orçamento usado fora de uma execução: aceita tudo e não contabiliza."""
+    limitado = False
+
+    def reservar(self, tokens):
+        pass
+
+    def confirmar(self, tokens_reservados, tokens_gastos):
+        pass
+
+    def nivel(self):
+        return "normal"
+
+    def registrar_degradacao(self, tipo):
+        pass
+
+
+_LIVRE = _OrcamentoLivre()
+# Orçamento da execução em andamento no contexto atual (ver rastreamento._ativo)
+_ativo = contextvars.ContextVar("orcamento_ativo", default=None)
+
+
+def ativar(orcamento):
+    """Torna o orçamento o aplicado às chamadas à API da execução no contexto atual."""
+    _ativo.set(orcamento)
+
+
+def desativar(orcamento):
+    """Desativa o orçamento, se ele ainda for o ativo no contexto atual."""
+    if _ativo.get() is orcamento:
+        _ativo.set(None)
+
+
+def obter_orcamento():
+    """Retorna o orçamento ativo, ou um sem limites se não houver execução em andamento.
+
+    Como o rastreador, o orçamento é do contexto: execuções simultâneas
+    consomem cada uma o seu.
+    """
+    orcamento = _ativo.get()
+    return orcamento if orcamento is not None else _LIVRE
@@ -0,0 +1,439 @@
+import asyncio
+import contextvars
+import threading
+import time
+from queue import Empty, Queue
+from model.orcamento import obter_orcamento
+from model.rastreamento import obter_rastreador
+
+# Sinal de fim de fluxo enviado entre os estágios
+_FIM = object()
+
+
+class PipelineEvolucao:
+    """Pipeline que encadeia cruzamento → mutação → triagem → avaliação.
+
+    Responsabilidades:
+    - Colocar todos os pares de pais no cruzamento ao mesmo tempo
+    - Passar cada filho ao próximo estágio assim que o anterior termina
+    - Descartar nos filtros os filhos que não valem uma avaliação, deixando a vaga
+      vazia (None) para a população repor
+    - Reunir os filhos que chegam juntos à avaliação em uma única chamada de avaliar_lote
+      (ou, se o avaliador pedir lotes reprodutíveis, os filhos de pares vizinhos)
+    - Limitar a memória em uso com filas limitadas entre os estágios
+    - Substituir por um dos pais os filhos cujo processamento falhar
+    - Pular o cruzamento no modo econômico do orçamento e manter os pais quando ele se esgota
+    """
+    def __init__(self, operador, avaliador, max_concorrencia=8, tamanho_fila=None, filtros=None,
+                 tamanho_lote=None, janela_lote=0.5):
+        self.operador = operador
+        self.avaliador = avaliador
+        self.max_concorrencia = max(1, max_concorrencia)
+        self.tamanho_fila = tamanho_fila if tamanho_fila else self.max_concorrencia
+        self.filtros = list(filtros) if filtros else []
+        # Filhos por chamada de avaliação (padrão: o preferido pelo avaliador) e quanto
+        # tempo o primeiro da fila espera pelos seguintes
+        self.tamanho_lote = max(1, tamanho_lote if tamanho_lote else avaliador.tamanho_lote_preferido())
+        self.janela_lote = janela_lote
+        # Lotes fixos pela ordem dos pares: a composição não depende do tempo de cada filho
+        self.lotes_fixos = avaliador.lotes_reprodutiveis()
+        self.descartados = 0
+        self._lock = threading.Lock()
+        self._grupos = {}
+        self._total_pares = 0
+
+    def processar(self, pares):
+        """Processa os pares de pais e retorna os filhos na mesma ordem dos pares (None se descartado)."""
+        pares = list(pares)
+        if not pares:
+            return []
+
+        num_workers = min(len(pares), self.max_concorrencia)
+        self._total_pares = len(pares)
+
+        fila_cruzamento = Queue()
+        fila_mutacao = Queue(maxsize=self.tamanho_fila)
+        fila_triagem = Queue(maxsize=self.tamanho_fila)
+        fila_avaliacao = Queue(maxsize=self.tamanho_fila)
+        fila_resultados = Queue()
+
+        for indice, (pai1, pai2) in enumerate(pares):
+            fila_cruzamento.put({
+                "indice": indice,
+                "pais": (pai1, pai2),
+                "algoritmo": None,
+                "concluido": False
+            })
+        for _ in range(num_workers):
+            fila_cruzamento.put(_FIM)
+
+        # Na avaliação, cada worker reúne até tamanho_lote filhos por chamada
+        workers_avaliacao = max(1, -(-num_workers // self.tamanho_lote))
+        estagios = [
+            ("cruzamento", self._cruzar, fila_cruzamento, fila_mutacao, num_workers, None),
+            ("mutação", self._mutar, fila_mutacao, fila_triagem, num_workers, None),
+            ("triagem", self._triar, fila_triagem, fila_avaliacao, num_workers, None),
+            ("avaliação", self._avaliar_lote, fila_avaliacao, fila_resultados, workers_avaliacao, self.tamanho_lote),
+        ]
+
+        threads = []
+        for i, (nome, funcao, entrada, saida, workers, lote) in enumerate(estagios):
+            # Cada worker do estágio seguinte precisa receber um sinal de fim
+            workers_seguinte = estagios[i + 1][4] if i + 1 < len(estagios) else workers
+            threads.extend(self._iniciar_estagio(nome, funcao, entrada, saida, workers, workers_seguinte, lote))
+
+        resultados = [None] * len(pares)
+        for _ in range(len(pares)):
+            item = fila_resultados.get()
+            resultados[item["indice"]] = item["algoritmo"]
+
+        for thread in threads:
+            thread.join()
+
+        return resultados
+
+    async def processar_async(self, pares):
+        """Versão assíncrona de processar: cada par é uma tarefa no event loop.
+
+        Cruzamento, mutação e avaliação aguardam a API sem ocupar threads; os
+        filtros, que executam código, rodam em threads auxiliares.
+        """
+        pares = list(pares)
+        semaforo = asyncio.Semaphore(self.max_concorrencia)
+        # No máximo max_concorrencia pares chegam juntos à avaliação
+        agrupador = _AgrupadorAvaliacoes(
+            self.avaliador, min(self.tamanho_lote, self.max_concorrencia), self.janela_lote, len(pares),
+            lotes_fixos=self.lotes_fixos
+        )
+
+        async def avaliar(item):
+            await self._avaliar_async(item, agrupador)
+
+        async def processar_par(indice, pai1, pai2):
+            item = {"indice": indice, "pais": (pai1, pai2), "algoritmo": None, "concluido": False}
+            try:
+                await processar_etapas(item)
+            finally:
+                # Sem este par, os que aguardam na avaliação podem estar completos
+                agrupador.par_concluido(indice)
+            return item["algoritmo"]
+
+        async def processar_etapas(item):
+            async with semaforo:
+                etapas = [
+                    ("cruzamento", self._cruzar_async),
+                    ("mutação", self._mutar_async),
+                    ("triagem", self._triar_async),
+                    ("avaliação", avaliar),
+                ]
+                for nome, etapa in etapas:
+                    if item["concluido"]:
+                        break
+                    try:
+                        await etapa(item)
+                    except Exception as e:
+                        print(f"[ERRO] Falha no estágio de {nome}: {str(e)}")
+                        # Em caso de erro, mantém um dos algoritmos originais
+                        item["algoritmo"] = item["pais"][0]
+                        item["concluido"] = True
+
+        return list(await asyncio.gather(
+            *(processar_par(indice, pai1, pai2) for indice, (pai1, pai2) in enumerate(pares))
+        ))
+
+    def _iniciar_estagio(self, nome, funcao, entrada, saida, num_workers, workers_seguinte, tamanho_lote=None):
+        """Método privado que cria os workers de um estágio.
+
+        Com tamanho_lote, `funcao` recebe uma lista de itens: cada worker pega o
+        primeiro item disponível e espera até janela_lote pelos seguintes. O
+        último worker a terminar repassa o sinal de fim ao estágio seguinte.
+        """
+        restantes = [num_workers]
+        lock = threading.Lock()
+
+        def worker():
+            fim = False
+            while not fim:
+                item = entrada.get()
+                if item is _FIM:
+                    break
+                itens = [item]
+                if tamanho_lote is not None:
+                    if self.lotes_fixos:
+                        itens = self._reunir_grupo(item, tamanho_lote)
+                    elif tamanho_lote > 1:
+                        fim = self._completar_lote(entrada, itens, tamanho_lote)
+                    self._executar_etapa(nome, funcao, [i for i in itens if not i["concluido"]], itens)
+                elif not item["concluido"]:
+                    self._executar_etapa(nome, funcao, item, itens)
+                for item in itens:
+                    saida.put(item)
+
+            with lock:
+                restantes[0] -= 1
+                ultimo = restantes[0] == 0
+            if ultimo:
+                for _ in range(workers_seguinte):
+                    saida.put(_FIM)
+
+        # Cada worker roda em uma cópia do contexto, com o rastreador e o orçamento da execução
+        threads = [
+            threading.Thread(target=contextvars.copy_context().run, args=(worker,),
+                             name=f"pipeline-{nome}-{i}", daemon=True)
+            for i in range(num_workers)
+        ]
+        for thread in threads:
+            thread.start()
+        return threads
+
+    def _completar_lote(self, entrada, itens, tamanho_lote):
+        """Método privado que junta itens da fila até encher o lote ou acabar a janela.
+
+        Retorna True se encontrou o sinal de fim (não há mais itens a esperar).
+        """
+        limite = time.monotonic() + self.janela_lote
+        while len(itens) < tamanho_lote:
+            espera = limite - time.monotonic()
+            try:
+                item = entrada.get(timeout=espera) if espera > 0 else entrada.get_nowait()
+            except Empty:
+                return False
+            if item is _FIM:
+                return True
+            itens.append(item)
+        return False
+
+    def _reunir_grupo(self, item, tamanho_lote):
+        """Método privado que guarda o item até todos os pares do seu grupo chegarem.
+
+        Os grupos são fatias consecutivas de tamanho_lote pares. Retorna os itens
+        do grupo, em ordem, quando ele fica completo; senão, uma lista vazia.
+        """
+        grupo = item["indice"] // tamanho_lote
+        tamanho = min(tamanho_lote, self._total_pares - grupo * tamanho_lote)
+        with self._lock:
+            itens = self._grupos.setdefault(grupo, [])
+            itens.append(item)
+            if len(itens) < tamanho:
+                return []
+            del self._grupos[grupo]
+        return sorted(itens, key=lambda i: i["indice"])
+
+    @staticmethod
+    def _executar_etapa(nome, funcao, argumento, itens):
+        """Método privado que executa uma etapa; em caso de erro, mantém um dos pais."""
+        if not argumento:
+            return
+        try:
+            funcao(argumento)
+        except Exception as e:
+            print(f"[ERRO] Falha no estágio de {nome}: {str(e)}")
+            # Em caso de erro, mantém um dos algoritmos originais
+            for item in itens:
+                if not item["concluido"]:
+                    item["algoritmo"] = item["pais"][0]
+                    item["concluido"] = True
+
+    def _cruzar(self, item):
+        """Método privado do estágio de cruzamento."""
+        if self._economizar_cruzamento(item):
+            return
+        pai1, pai2 = item["pais"]
+        with obter_rastreador().fase("cruzamento"):
+            item["algoritmo"] = self.operador.cruzar(pai1, pai2)
+
+    def _mutar(self, item):
+        """Método privado do estágio de mutação."""
+        if self._sem_orcamento(item):
+            return
+        with obter_rastreador().fase("mutacao"):
+            item["algoritmo"] = self.operador.mutar(item["algoritmo"])
+
+    def _triar(self, item):
+        """Método privado do estágio de triagem pelos filtros."""
+        with obter_rastreador().fase("triagem"):
+            self._aplicar_filtros(item)
+
+    def _aplicar_filtros(self, item):
+        """Método privado que passa o filho pelos filtros; descartado, a vaga fica vazia."""
+        algoritmo = item["algoritmo"]
+        for filtro in self.filtros:
+            algoritmo = filtro.filtrar(algoritmo)
+            if algoritmo is None:
+                # Descartado: a população repõe a vaga com um novo filho (um pai traria
+                # de volta a mesma duplicata que o filtro acabou de recusar)
+                with self._lock:
+                    self.descartados += 1
+                item["algoritmo"] = None
+                item["concluido"] = True
+                return
+        item["algoritmo"] = algoritmo
+
+    def _avaliar_lote(self, itens):
+        """Método privado do estágio de avaliação, com vários filhos por chamada."""
+        for item in itens:
+            if item["algoritmo"].fitness is None:
+                self._sem_orcamento(item)
+        # Filhos que já receberam notas nos filtros (ex.: gêmeo conhecido) não são reavaliados
+        pendentes = [item["algoritmo"] for item in itens if item["algoritmo"].fitness is None]
+        if pendentes:
+            with obter_rastreador().fase("avaliacao"):
+                self.avaliador.avaliar_lote(pendentes)
+            self._registrar_avaliados(pendentes)
+        for item in itens:
+            item["concluido"] = True
+
+    def _economizar_cruzamento(self, item):
+        """Método privado que decide, pelo orçamento, se o par passa pelo cruzamento.
+
+        Retorna True se o estágio não deve chamar a API: esgotado, o pai ocupa a
+        vaga; no modo econômico, o filho é apenas uma mutação do melhor pai.
+        """
+        if self._sem_orcamento(item):
+            return True
+        orcamento = obter_orcamento()
+        if orcamento.nivel() != "economico":
+            return False
+        orcamento.registrar_degradacao("sem_cruzamento")
+        item["algoritmo"] = max(item["pais"], key=lambda pai: pai.get_fitness())
+        return True
+
+    @staticmethod
+    def _sem_orcamento(item):
+        """Método privado que, com o orçamento esgotado, põe o pai no lugar do filho; retorna se o fez."""
+        orcamento = obter_orcamento()
+        if orcamento.nivel() != "esgotado":
+            return False
+        orcamento.registrar_degradacao("pai_mantido")
+        item["algoritmo"] = item["pais"][0]
+        item["concluido"] = True
+        return True
+
+    def _registrar_avaliados(self, algoritmos):
+        """Método privado que informa aos filtros os filhos recém-avaliados."""
+        for algoritmo in algoritmos:
+            for filtro in self.filtros:
+                filtro.registrar_avaliado(algoritmo)
+
+    async def _cruzar_async(self, item):
+        """Método privado do estágio de cruzamento (assíncrono)."""
+        if self._economizar_cruzamento(item):
+            return
+        pai1, pai2 = item["pais"]
+        with obter_rastreador().fase("cruzamento"):
+            item["algoritmo"] = await self.operador.cruzar_async(pai1, pai2)
+
+    async def _mutar_async(self, item):
+        """Método privado do estágio de mutação (assíncrono)."""
+        if self._sem_orcamento(item):
+            return
+        with obter_rastreador().fase("mutacao"):
+            item["algoritmo"] = await self.operador.mutar_async(item["algoritmo"])
+
+    async def _triar_async(self, item):
+        """Método privado do estágio de triagem (em uma thread)."""
+        await asyncio.to_thread(self._triar, item)
+
+    async def _avaliar_async(self, item, agrupador):
+        """Método privado do estágio de avaliação (assíncrono), agrupado com os filhos vizinhos."""
+        algoritmo = item["algoritmo"]
+        if algoritmo.fitness is None and self._sem_orcamento(item):
+            return
+        if algoritmo.fitness is None:
+            await agrupador.avaliar(algoritmo, item["indice"])
+            self._registrar_avaliados([algoritmo])
+        item["concluido"] = True
+
+
+class _AgrupadorAvaliacoes:
+    """Reúne as avaliações pedidas quase ao mesmo tempo em uma chamada de avaliar_lote_async.
+
+    Um lote parte quando enche, quando todos os pares ainda em andamento estão
+    aguardando nele ou quando a janela aberta pelo primeiro pedido termina.
+    Com lotes_fixos, cada lote é uma fatia consecutiva de pares e parte quando
+    todos os pares da fatia estão aguardando nele ou já terminaram.
+    """
+    def __init__(self, avaliador, tamanho_lote, janela, pares_ativos, lotes_fixos=False):
+        self.avaliador = avaliador
+        self.tamanho_lote = tamanho_lote
+        self.janela = janela
+        self.pares_ativos = pares_ativos
+        self.lotes_fixos = lotes_fixos
+        self.total_pares = pares_ativos
+        self._pendentes = []
+        self._temporizador = None
+        self._tarefas = set()
+        # Lotes fixos: pedidos aguardando e pares já terminados de cada grupo ainda não enviado
+        self._grupos = {}
+        self._terminados = {}
+        self._enviados = set()
+
+    async def avaliar(self, algoritmo, indice=None):
+        """Avalia o algoritmo junto com os demais pedidos do mesmo lote."""
+        if self.tamanho_lote <= 1:
+            await self.avaliador.avaliar_lote_async([algoritmo])
+            return
+
+        futuro = asyncio.get_running_loop().create_future()
+        if self.lotes_fixos:
+            grupo = indice // self.tamanho_lote
+            self._grupos.setdefault(grupo, []).append((indice, algoritmo, futuro))
+            self._verificar_grupo(grupo)
+        else:
+            self._pendentes.append((algoritmo, futuro))
+            if len(self._pendentes) >= min(self.tamanho_lote, self.pares_ativos):
+                self._disparar()
+            elif self._temporizador is None:
+                self._temporizador = asyncio.get_running_loop().call_later(self.janela, self._disparar)
+        await futuro
+
+    def par_concluido(self, indice=None):
+        """Informa que um par terminou; os pendentes não precisam mais esperar por ele."""
+        self.pares_ativos -= 1
+        if self.lotes_fixos:
+            grupo = indice // self.tamanho_lote
+            if grupo not in self._enviados:
+                self._terminados[grupo] = self._terminados.get(grupo, 0) + 1
+                self._verificar_grupo(grupo)
+        elif self._pendentes and len(self._pendentes) >= self.pares_ativos:
+            self._disparar()
+
+    def _verificar_grupo(self, grupo):
+        """Método privado que envia o grupo quando nenhum dos seus pares falta chegar."""
+        aguardando = self._grupos.get(grupo, [])
+        tamanho = min(self.tamanho_lote, self.total_pares - grupo * self.tamanho_lote)
+        if aguardando and len(aguardando) + self._terminados.get(grupo, 0) >= tamanho:
+            del self._grupos[grupo]
+            self._enviados.add(grupo)
+            aguardando.sort(key=lambda pedido: pedido[0])
+            self._enviar([(algoritmo, futuro) for _, algoritmo, futuro in aguardando])
+
+    def _disparar(self):
+        """Método privado que envia os pedidos pendentes como um lote."""
+        if self._temporizador is not None:
+            self._temporizador.cancel()
+            self._temporizador = None
+        lote, self._pendentes = self._pendentes, []
+        if lote:
+            self._enviar(lote)
+
+    def _enviar(self, lote):
+        """Método privado que avalia o lote em uma tarefa separada."""
+        tarefa = asyncio.ensure_future(self._avaliar(lote))
+        # Mantém a referência até o fim, para a tarefa não ser coletada no meio
+        self._tarefas.add(tarefa)
+        tarefa.add_done_callback(self._tarefas.discard)
+
+    async def _avaliar(self, lote):
+        """Método privado que avalia o lote e libera quem o aguarda."""
+        try:
+            with obter_rastreador().fase("avaliacao"):
+                await self.avaliador.avaliar_lote_async([algoritmo for algoritmo, _ in lote])
+        except Exception as e:
+            for _, futuro in lote:
+                if not futuro.done():
+                    futuro.set_exception(e)
+            return
+        for _, futuro in lote:
+            if not futuro.done():
+                futuro.set_result(None)
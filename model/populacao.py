@@ -1,17 +1,39 @@
+import asyncio
+import contextvars
+import random
+from concurrent.futures import ThreadPoolExecutor
+from model.arquivo_pareto import ArquivoPareto
+from model.pipeline_evolucao import PipelineEvolucao
+from model.orcamento import obter_orcamento
+from model.rastreamento import obter_rastreador
+
 class Populacao:
     """Classe que representa uma população de algoritmos.
     
     Responsabilidades:
     - Gerenciar um conjunto de algoritmos
     - Controlar o processo de evolução através de gerações
+    - Manter o tamanho da população quando os filtros descartam candidatos
     """
-    def __init__(self, linguagem: str, tamanho: int = 5):
+    # Rodadas que geram novos candidatos no lugar dos descartados pelos filtros
+    RODADAS_REPOSICAO = 2
+
+    def __init__(self, linguagem: str, tamanho: int = 5, max_concorrencia: int = 8):
         self.algoritmos = []
         self.linguagem = linguagem
         self.geracao = 0
         self.tamanho = tamanho
+        self.max_concorrencia = max_concorrencia
         self.avaliador = None  
         self.operador = None   
+        self.filtros = []
+        # Candidatos descartados pelos filtros (chamadas de avaliação evitadas) por geração
+        self.descartes_por_geracao = {}
+        self.codigo_base = None
+        # CheckpointPopulacao gravado ao fim de cada geração (opcional)
+        self.checkpoint = None
+        # Algoritmos não dominados em eficiência, clareza e boas práticas encontrados na execução
+        self.arquivo_pareto = ArquivoPareto()
 
     def set_avaliador(self, avaliador):
         """Define o avaliador a ser utilizado."""
@@ -21,10 +43,105 @@ class Populacao:
         """Define o operador genético a ser utilizado."""
         self.operador = operador
         
+    def set_checkpoint(self, checkpoint):
+        """Define onde o estado é gravado ao fim de cada geração (None desativa)."""
+        self.checkpoint = checkpoint
+
+    def adicionar_filtro(self, filtro):
+        """Adiciona um filtro aplicado aos candidatos antes da avaliação."""
+        self.filtros.append(filtro)
+
+    def _aplicar_filtros(self, algoritmo):
+        """Método privado que passa o algoritmo pelos filtros; retorna None se descartado."""
+        for filtro in self.filtros:
+            algoritmo = filtro.filtrar(algoritmo)
+            if algoritmo is None:
+                return None
+        return algoritmo
+
+    def _iniciar_geracao_filtros(self):
+        """Método privado que avisa os filtros do início de uma nova geração."""
+        for filtro in self.filtros:
+            filtro.iniciar_geracao(self.geracao)
+
     def gerar_populacao_inicial(self, codigo_base: str, tamanho: int = None):
         """Gera a população inicial de algoritmos a partir de um código base."""
-        from model.algoritmo import Algoritmo
-        
+        with obter_rastreador().fase("populacao_inicial"):
+            self._gerar_populacao_inicial(codigo_base, tamanho)
+
+    def _gerar_populacao_inicial(self, codigo_base, tamanho):
+        """Método privado com as etapas de gerar_populacao_inicial."""
+        rastreador = obter_rastreador()
+        self._preparar_populacao_inicial(codigo_base, tamanho)
+        try:
+            # Tenta gerar variações com o operador genético
+            with rastreador.fase("variacoes_iniciais"):
+                variacoes = self.operador.gerar_variacoes_iniciais(
+                    codigo_base=codigo_base,
+                    linguagem=self.linguagem,
+                    quantidade=self.tamanho
+                )
+            with rastreador.fase("triagem"):
+                self.algoritmos = self._filtrar_variacoes(variacoes, codigo_base)
+
+            # Avalia de forma concorrente os algoritmos que ainda não têm notas
+            try:
+                pendentes = [a for a in self.algoritmos if a.fitness is None]
+                with rastreador.fase("avaliacao"):
+                    self.avaliador.avaliar_lote(pendentes)
+                self._registrar_avaliados(pendentes)
+            except Exception as e:
+                self._notas_padrao(e)
+            self.algoritmos = self._completar_populacao(self.algoritmos)
+            
+            # Salva o histórico da geração inicial
+            self._salvar_historico()
+            self.arquivo_pareto.atualizar(self.algoritmos, self.geracao)
+                
+        except Exception as e:
+            self._populacao_minima(codigo_base, e)
+
+        self._salvar_checkpoint()
+
+    async def gerar_populacao_inicial_async(self, codigo_base: str, tamanho: int = None):
+        """Versão assíncrona de gerar_populacao_inicial."""
+        with obter_rastreador().fase("populacao_inicial"):
+            await self._gerar_populacao_inicial_async(codigo_base, tamanho)
+
+    async def _gerar_populacao_inicial_async(self, codigo_base, tamanho):
+        """Método privado, versão assíncrona de _gerar_populacao_inicial."""
+        rastreador = obter_rastreador()
+        self._preparar_populacao_inicial(codigo_base, tamanho)
+        try:
+            with rastreador.fase("variacoes_iniciais"):
+                variacoes = await self.operador.gerar_variacoes_iniciais_async(
+                    codigo_base=codigo_base,
+                    linguagem=self.linguagem,
+                    quantidade=self.tamanho
+                )
+            # Os filtros executam código, então rodam fora do event loop
+            with rastreador.fase("triagem"):
+                self.algoritmos = await asyncio.to_thread(self._filtrar_variacoes, variacoes, codigo_base)
+
+            try:
+                pendentes = [a for a in self.algoritmos if a.fitness is None]
+                with rastreador.fase("avaliacao"):
+                    await self.avaliador.avaliar_lote_async(pendentes)
+                self._registrar_avaliados(pendentes)
+            except Exception as e:
+                self._notas_padrao(e)
+            self.algoritmos = self._completar_populacao(self.algoritmos)
+
+            self._salvar_historico()
+            self.arquivo_pareto.atualizar(self.algoritmos, self.geracao)
+
+        except Exception as e:
+            self._populacao_minima(codigo_base, e)
+
+        self._salvar_checkpoint()
+
+    def _preparar_populacao_inicial(self, codigo_base, tamanho):
+        """Método privado com as verificações e o backup anteriores à geração inicial."""
         if self.avaliador is None or self.operador is None:
             raise ValueError("Avaliador e Operador devem ser definidos antes de gerar a população inicial")
             
@@ -35,55 +152,141 @@ class Populacao:
         # Atualiza a geração atual no avaliador (geração inicial = 0)
         self.avaliador.set_geracao(self.geracao)
 
-        # Salva o código base como backup
+        self.codigo_base = codigo_base
+        self._salvar_codigo_original()
+
+    def _salvar_codigo_original(self):
+        """Método privado que salva o código base como backup (lido pela verificação diferencial)."""
         try:
             with open("./utils/algoritmo_original.py", "w", encoding="utf-8") as f:
-                f.write(codigo_base)
+                f.write(self.codigo_base)
         except Exception as e:
             print(f"[AVISO] Não foi possível salvar o código original: {str(e)}")
 
-        try:
-            # Tenta gerar variações com o operador genético
-            variacoes = self.operador.gerar_variacoes_iniciais(
-                codigo_base=codigo_base,
-                linguagem=self.linguagem,
-                quantidade=self.tamanho
+    def _filtrar_variacoes(self, variacoes, codigo_base):
+        """Método privado que descarta variações inválidas antes de gastar chamadas de avaliação."""
+        from model.algoritmo import Algoritmo
+
+        # Verifica se temos variações suficientes
+        if len(variacoes) < 1:
+            print("[AVISO] Nenhuma variação foi gerada pelo operador genético")
+            # Cria pelo menos um algoritmo com o código original
+            algoritmo_original = Algoritmo(id=999, linguagem=self.linguagem, codigo=codigo_base)
+            variacoes = [algoritmo_original]
+
+        if not self.filtros:
+            return variacoes
+
+        self._iniciar_geracao_filtros()
+        filtradas = self._aplicar_filtros_em_paralelo(variacoes)
+        descartados = len(variacoes) - len(filtradas)
+        # Novas variações no lugar das descartadas (ex.: quase-duplicatas)
+        for _ in range(self.RODADAS_REPOSICAO):
+            faltam = self.tamanho - len(filtradas)
+            if faltam <= 0 or not descartados:
+                break
+            print(f"[INFO] Gerando {faltam} variações no lugar das descartadas")
+            novas = self.operador.gerar_variacoes_iniciais(
+                codigo_base=codigo_base, linguagem=self.linguagem, quantidade=faltam
             )
-            
-            # Verifica se temos variações suficientes
-            if len(variacoes) < 1:
-                print("[AVISO] Nenhuma variação foi gerada pelo operador genético")
-                # Cria pelo menos um algoritmo com o código original
-                algoritmo_original = Algoritmo(id=999, linguagem=self.linguagem, codigo=codigo_base)
-                variacoes = [algoritmo_original]
-                
-            self.algoritmos = variacoes
-
-            # Avalia cada algoritmo da geração inicial
-            for algoritmo in self.algoritmos:
-                try:
-                    self.avaliador.avaliar(algoritmo)
-                except Exception as e:
-                    print(f"[ERRO] Falha ao avaliar algoritmo: {str(e)}")
-                    # Define um fitness padrão para evitar problemas
-                    algoritmo.set_fitness(50)
-            
-            # Salva o histórico da geração inicial
-            try:
+            aprovadas = self._aplicar_filtros_em_paralelo(novas)
+            descartados += len(novas) - len(aprovadas)
+            filtradas.extend(aprovadas[:faltam])
+            if not aprovadas:
+                break
+        self.descartes_por_geracao[self.geracao] = descartados
+        print(f"[INFO] Geração {self.geracao}: {descartados} candidatos descartados antes da avaliação")
+        if not filtradas:
+            print("[AVISO] Todas as variações foram descartadas, usando o código original")
+            filtradas = [Algoritmo(id=999, linguagem=self.linguagem, codigo=codigo_base)]
+        return filtradas
+
+    def _aplicar_filtros_em_paralelo(self, variacoes):
+        """Método privado que filtra as variações em threads; retorna as aprovadas, em ordem."""
+        if not variacoes:
+            return []
+        with ThreadPoolExecutor(max_workers=max(1, min(self.max_concorrencia, len(variacoes)))) as executor:
+            # Cada tarefa leva uma cópia do contexto, com o orçamento e o rastreador da execução
+            futuros = [executor.submit(contextvars.copy_context().run, self._aplicar_filtros, variacao)
+                       for variacao in variacoes]
+            return [a for a in (futuro.result() for futuro in futuros) if a is not None]
+
+    def _registrar_avaliados(self, algoritmos):
+        """Método privado que informa aos filtros os algoritmos recém-avaliados."""
+        for algoritmo in algoritmos:
+            for filtro in self.filtros:
+                filtro.registrar_avaliado(algoritmo)
+
+    def _notas_padrao(self, erro):
+        """Método privado que define um fitness padrão para os que ficaram sem avaliação."""
+        print(f"[ERRO] Falha ao avaliar algoritmos: {str(erro)}")
+        for algoritmo in self.algoritmos:
+            if algoritmo.fitness is None:
+                algoritmo.set_fitness(50)
+
+    def _salvar_historico(self):
+        """Método privado que grava o histórico sem interromper a evolução em caso de erro."""
+        try:
+            with obter_rastreador().fase("historico"):
                 self.avaliador.salvar_historico()
-            except Exception as e:
-                print(f"[ERRO] Falha ao salvar histórico: {str(e)}")
-                
         except Exception as e:
-            print(f"[ERRO] Falha ao gerar população inicial: {str(e)}")
-            # Cria uma população mínima com o código original
-            algoritmo_original = Algoritmo(id=999, linguagem=self.linguagem, codigo=codigo_base)
-            algoritmo_original.set_fitness(50)  # Define um fitness padrão
-            self.algoritmos = [algoritmo_original]
-            print("[INFO] Criada população mínima com o código original")
+            print(f"[ERRO] Falha ao salvar histórico: {str(e)}")
+
+    def _populacao_minima(self, codigo_base, erro):
+        """Método privado que cria uma população mínima com o código original."""
+        from model.algoritmo import Algoritmo
+
+        print(f"[ERRO] Falha ao gerar população inicial: {str(erro)}")
+        algoritmo_original = Algoritmo(id=999, linguagem=self.linguagem, codigo=codigo_base)
+        algoritmo_original.set_fitness(50)  # Define um fitness padrão
+        self.algoritmos = [algoritmo_original]
+        print("[INFO] Criada população mínima com o código original")
 
     def evoluir(self, num_geracoes: int = 3):
         """Evolui a população por um número específico de gerações."""
+        algoritmo_original = self._verificar_evolucao()
+            
+        for _ in range(num_geracoes):
+            with obter_rastreador().fase("geracao"):
+                pares = self._iniciar_geracao()
+                pipeline = self._criar_pipeline()
+                filhos = pipeline.processar(pares)
+                for _ in range(self.RODADAS_REPOSICAO):
+                    pares_reposicao = self._pares_reposicao(filhos)
+                    if not pares_reposicao:
+                        break
+                    filhos = [f for f in filhos if f is not None] + pipeline.processar(pares_reposicao)
+                self._concluir_geracao(filhos, pipeline)
+            
+        # Se no final da evolução não houver algoritmos, restaura o original
+        if not self.algoritmos and algoritmo_original:
+            self.algoritmos = [algoritmo_original]
+
+    async def evoluir_geracao_async(self):
+        """Evolui a população por uma geração, aguardando a API sem bloquear o event loop."""
+        algoritmo_original = self._verificar_evolucao()
+
+        with obter_rastreador().fase("geracao"):
+            pares = self._iniciar_geracao()
+            pipeline = self._criar_pipeline()
+            filhos = await pipeline.processar_async(pares)
+            for _ in range(self.RODADAS_REPOSICAO):
+                pares_reposicao = self._pares_reposicao(filhos)
+                if not pares_reposicao:
+                    break
+                filhos = [f for f in filhos if f is not None] + await pipeline.processar_async(pares_reposicao)
+            self._concluir_geracao(filhos, pipeline)
+
+        if not self.algoritmos and algoritmo_original:
+            self.algoritmos = [algoritmo_original]
+
+    async def evoluir_async(self, num_geracoes: int = 3):
+        """Versão assíncrona de evoluir."""
+        for _ in range(num_geracoes):
+            await self.evoluir_geracao_async()
+
+    def _verificar_evolucao(self):
+        """Método privado que valida o estado e retorna o melhor atual como backup."""
         if self.avaliador is None or self.operador is None:
             raise ValueError("Avaliador e Operador devem ser definidos antes de evoluir a população")
             
@@ -91,41 +294,168 @@ class Populacao:
             raise ValueError("A população inicial deve ser gerada antes de evoluir")
             
         # Guarda o algoritmo original com melhor fitness como backup
-        algoritmo_original = self.melhor_individuo()
-            
-        for _ in range(num_geracoes):
-            # Incrementa a geração antes de começar
-            self.geracao += 1
-            self.avaliador.set_geracao(self.geracao)
-
-            # Seleciona os melhores para cruzar
-            selecionados = self.operador.selecionar(self.algoritmos, quantidade=self.tamanho)
-
-            nova_geracao = []
-            for i in range(0, len(selecionados), 2):
-                if i + 1 < len(selecionados):
-                    try:
-                        filho = self.operador.cruzar(selecionados[i], selecionados[i + 1])
-                        filho = self.operador.mutar(filho)
-                        self.avaliador.avaliar(filho)
-                        nova_geracao.append(filho)
-                    except Exception as e:
-                        print(f"[ERRO] Falha ao processar algoritmo: {str(e)}")
-                        # Em caso de erro, adiciona um dos algoritmos originais
-                        nova_geracao.append(selecionados[i])
-
-            # Se a nova geração estiver vazia, mantém a geração anterior
-            if not nova_geracao:
-                print("[AVISO] Nova geração vazia, mantendo algoritmos anteriores")
-            else:
-                self.algoritmos = nova_geracao
-
-            # Salva o histórico da geração atual
+        return self.melhor_individuo()
+
+    def _iniciar_geracao(self):
+        """Método privado que avança a geração, seleciona os pais e forma os pares."""
+        # Incrementa a geração antes de começar
+        self.geracao += 1
+        self.avaliador.set_geracao(self.geracao)
+
+        self._iniciar_geracao_filtros()
+        # Cada par segue cruzamento → mutação → avaliação sem esperar os demais
+        pares = self._selecionar_pares(self.tamanho)
+        if obter_orcamento().limitado:
+            # Com orçamento limitado, os pares mais promissores entram primeiro no pipeline
+            # e são os últimos a ficar sem chamadas à API
+            pares.sort(key=lambda par: par[0].get_fitness() + par[1].get_fitness(), reverse=True)
+        return pares
+
+    def _selecionar_pares(self, quantidade):
+        """Método privado que seleciona `quantidade` pais e os agrupa em pares."""
+        with obter_rastreador().fase("selecao"):
+            selecionados = self.operador.selecionar(self.algoritmos, quantidade=quantidade)
+        return [
+            (selecionados[i], selecionados[i + 1])
+            for i in range(0, len(selecionados) - 1, 2)
+        ]
+
+    def _pares_reposicao(self, filhos):
+        """Método privado com novos pares para as vagas dos filhos descartados nos filtros."""
+        faltam = sum(1 for filho in filhos if filho is None)
+        if not faltam:
+            return []
+        print(f"[INFO] Geração {self.geracao}: gerando {faltam} filhos no lugar dos descartados")
+        return self._selecionar_pares(2 * faltam)
+
+    def _completar_populacao(self, algoritmos, reserva=()):
+        """Método privado que completa a população até o tamanho alvo, sem novas avaliações.
+
+        Entram primeiro os melhores da `reserva` (a geração anterior) cujo código
+        ainda não está na população; se ainda faltar, cópias dos melhores, com as notas.
+        """
+        completos = list(algoritmos)
+        codigos = {algoritmo.codigo for algoritmo in completos}
+        for algoritmo in sorted(reserva, key=lambda a: a.get_fitness(), reverse=True):
+            if len(completos) >= self.tamanho:
+                break
+            if algoritmo.codigo not in codigos:
+                completos.append(algoritmo)
+                codigos.add(algoritmo.codigo)
+
+        faltam = self.tamanho - len(completos)
+        melhores = sorted(completos, key=lambda a: a.get_fitness(), reverse=True)
+        if faltam > 0 and melhores:
+            print(f"[AVISO] Sem candidatos distintos suficientes: {faltam} vagas preenchidas com cópias dos melhores")
+            completos.extend(
+                melhores[i % len(melhores)].clone(novo_id=random.randint(1000, 9999)) for i in range(faltam)
+            )
+        return completos
+
+    def _criar_pipeline(self):
+        """Método privado que cria o pipeline de uma geração."""
+        return PipelineEvolucao(
+            self.operador, self.avaliador,
+            max_concorrencia=self.max_concorrencia,
+            filtros=self.filtros
+        )
+
+    def _concluir_geracao(self, nova_geracao, pipeline):
+        """Método privado que substitui a população e grava o histórico da geração."""
+        if self.filtros:
+            self.descartes_por_geracao[self.geracao] = pipeline.descartados
+            print(f"[INFO] Geração {self.geracao}: {pipeline.descartados} candidatos "
+                  f"descartados antes da avaliação")
+
+        # Se a nova geração estiver vazia, mantém a geração anterior
+        nova_geracao = [filho for filho in nova_geracao if filho is not None]
+        if not nova_geracao:
+            print("[AVISO] Nova geração vazia, mantendo algoritmos anteriores")
+        else:
+            self.arquivo_pareto.atualizar(nova_geracao, self.geracao)
+            # As vagas que os filhos não ocupam ficam com os melhores da geração anterior
+            self.algoritmos = self._completar_populacao(nova_geracao, reserva=self.algoritmos)
+
+        # Salva o histórico da geração atual e, depois dele, o checkpoint que aponta para o seu final
+        with obter_rastreador().fase("historico"):
             self.avaliador.salvar_historico()
-            
-        # Se no final da evolução não houver algoritmos, restaura o original
-        if not self.algoritmos and algoritmo_original:
-            self.algoritmos = [algoritmo_original]
+        self._salvar_checkpoint()
+
+    def get_estado(self):
+        """Retorna o estado da população como dicionário serializável em JSON.
+
+        Inclui algoritmos, notas, geração, estado dos geradores aleatórios do
+        operador, membros do arquivo de Pareto e até onde o histórico de
+        avaliações foi gravado.
+        """
+        return {
+            "linguagem": self.linguagem,
+            "tamanho": self.tamanho,
+            "geracao": self.geracao,
+            "codigo_base": self.codigo_base,
+            "algoritmos": [a.para_dict() for a in self.algoritmos],
+            "descartes_por_geracao": {str(g): n for g, n in self.descartes_por_geracao.items()},
+            "rng": self.operador.get_estado_rng() if self.operador is not None else None,
+            "pareto": self.arquivo_pareto.membros(),
+            "historico": self.avaliador.posicao_historico() if self.avaliador is not None else None
+        }
+
+    def restaurar_estado(self, estado):
+        """Restaura um estado de get_estado; a evolução continua na geração seguinte."""
+        from model.algoritmo import Algoritmo
+
+        if self.avaliador is None or self.operador is None:
+            raise ValueError("Avaliador e Operador devem ser definidos antes de restaurar a população")
+
+        self.linguagem = estado["linguagem"]
+        self.tamanho = estado["tamanho"]
+        self.geracao = estado["geracao"]
+        self.codigo_base = estado.get("codigo_base")
+        self.algoritmos = [Algoritmo.de_dict(a) for a in estado["algoritmos"]]
+        self.descartes_por_geracao = {int(g): n for g, n in estado.get("descartes_por_geracao", {}).items()}
+
+        if estado.get("rng"):
+            self.operador.set_estado_rng(estado["rng"])
+        if estado.get("historico"):
+            self.avaliador.retomar_historico(estado["historico"])
+        self.avaliador.set_geracao(self.geracao)
+        if self.codigo_base is not None:
+            self._salvar_codigo_original()
+
+        # Os filtros voltam a conhecer a população, como se ela tivesse acabado de ser avaliada
+        self._iniciar_geracao_filtros()
+        self._registrar_avaliados(self.algoritmos)
+        # Os compromissos de gerações anteriores, que já podem ter saído da população
+        self.arquivo_pareto.restaurar(estado.get("pareto", []))
+        self.arquivo_pareto.atualizar(self.algoritmos, self.geracao)
+        print(f"[INFO] População restaurada na geração {self.geracao} com {len(self.algoritmos)} algoritmos")
+
+    def _salvar_checkpoint(self):
+        """Método privado que grava o checkpoint sem interromper a evolução em caso de erro."""
+        if self.checkpoint is None:
+            return
+        try:
+            with obter_rastreador().fase("checkpoint"):
+                self.checkpoint.salvar(self.get_estado())
+        except Exception as e:
+            print(f"[AVISO] Não foi possível gravar o checkpoint: {str(e)}")
+
+    def emigrantes(self, quantidade=1):
+        """Retorna cópias dos melhores indivíduos para migrar a outra ilha."""
+        ordenados = sorted(self.algoritmos, key=lambda a: a.get_fitness(), reverse=True)
+        return [a.clone() for a in ordenados[:quantidade]]
+
+    def receber_migrantes(self, migrantes):
+        """Insere migrantes já avaliados, ocupando vagas livres ou o lugar dos piores."""
+        if not migrantes:
+            return
+        vagas = max(0, self.tamanho - len(self.algoritmos))
+        substituidos = min(len(self.algoritmos), max(0, len(migrantes) - vagas))
+        ordenados = sorted(self.algoritmos, key=lambda a: a.get_fitness(), reverse=True)
+        self.algoritmos = ordenados[:len(ordenados) - substituidos] + list(migrantes)
+        for migrante in migrantes:
+            for filtro in self.filtros:
+                filtro.registrar_avaliado(migrante)
 
     def melhor_individuo(self):
         """Retorna o melhor indivíduo da população atual."""
@@ -190,5 +520,7 @@ class Populacao:
             "geracao": self.geracao,
             "tamanho": len(self.algoritmos),
             "melhor_fitness": melhor.get_fitness() if melhor else 0,
-            "pior_fitness": pior.get_fitness() if pior else 0
+            "pior_fitness": pior.get_fitness() if pior else 0,
+            "descartados_por_geracao": dict(self.descartes_por_geracao),
+            "pareto": self.arquivo_pareto.membros()
         }
@@ -0,0 +1,232 @@
+import contextvars
+import json
+import os
+import threading
+import time
+from contextlib import contextmanager
+
+# Quantis publicados nos resumos e no formato Prometheus
+QUANTIS = (0.5, 0.95, 0.99)
+
+
+class Rastreador:
+    """Coleta a duração das fases da evolução e o consumo de cada chamada ao modelo.
+
+    Responsabilidades:
+    - Medir fases (seleção, cruzamento, mutação, triagem, avaliação, histórico...)
+    - Registrar tokens de prompt e de resposta, latência e novas tentativas por chamada
+    - Resumir onde foram o tempo e a cota de uma execução
+    - Exportar o resumo em JSON ou no formato de texto do Prometheus
+
+    Fases de filhos diferentes correm em paralelo, então a soma das durações de
+    uma fase pode passar do tempo total da execução.
+    """
+    def __init__(self, nome="codegenix"):
+        self.nome = nome
+        self.inicio = time.time()
+        self._inicio_relogio = time.perf_counter()
+        self._fim_relogio = None
+        self._lock = threading.Lock()
+        # fase → durações em segundos
+        self._fases = {}
+        # Uma entrada por chamada ao modelo (ver registrar_chamada)
+        self._chamadas = []
+
+    @contextmanager
+    def fase(self, nome):
+        """Mede o bloco como uma ocorrência da fase `nome`."""
+        inicio = time.perf_counter()
+        try:
+            yield
+        finally:
+            duracao = time.perf_counter() - inicio
+            with self._lock:
+                self._fases.setdefault(nome, []).append(duracao)
+
+    def registrar_chamada(self, operacao, modelo, tokens_prompt=0, tokens_completacao=0, latencia=0.0,
+                          tentativas=1, interrompida=False, origem="api", erro=None):
+        """Registra uma chamada ao modelo de linguagem (bem-sucedida ou não)."""
+        with self._lock:
+            self._chamadas.append({
+                "operacao": operacao or "outra",
+                "modelo": modelo,
+                "tokens_prompt": tokens_prompt,
+                "tokens_completacao": tokens_completacao,
+                "latencia": latencia,
+                "tentativas": tentativas,
+                "interrompida": interrompida,
+                "origem": origem,
+                "erro": erro
+            })
+
+    def requisicoes_api(self):
+        """Requisições enviadas à API até agora, incluindo novas tentativas (sem as do cassete)."""
+        with self._lock:
+            return sum(chamada["tentativas"] for chamada in self._chamadas if chamada["origem"] == "api")
+
+    def encerrar(self):
+        """Marca o fim da execução (o tempo total deixa de crescer)."""
+        if self._fim_relogio is None:
+            self._fim_relogio = time.perf_counter()
+
+    @property
+    def tempo_total(self):
+        """Segundos desde a criação até encerrar (ou até agora)."""
+        fim = self._fim_relogio if self._fim_relogio is not None else time.perf_counter()
+        return fim - self._inicio_relogio
+
+    def resumo(self):
+        """Resumo serializável em JSON: fases, chamadas ao modelo por operação e totais."""
+        with self._lock:
+            fases = {nome: list(duracoes) for nome, duracoes in self._fases.items()}
+            chamadas = list(self._chamadas)
+
+        por_operacao = {}
+        for chamada in chamadas:
+            por_operacao.setdefault(chamada["operacao"], []).append(chamada)
+
+        return {
+            "tempo_total_s": round(self.tempo_total, 3),
+            "fases": {nome: _estatisticas_duracoes(duracoes) for nome, duracoes in fases.items()},
+            "llm": dict(
+                _estatisticas_chamadas(chamadas),
+                por_operacao={op: _estatisticas_chamadas(lista) for op, lista in por_operacao.items()}
+            )
+        }
+
+    def exportar_json(self, caminho):
+        """Grava o resumo da execução em JSON."""
+        instantaneo = {"nome": self.nome, "inicio": self.inicio, **self.resumo()}
+        _gravar(caminho, json.dumps(instantaneo, indent=2, ensure_ascii=False))
+
+    def exportar_prometheus(self, caminho):
+        """Grava o resumo no formato de texto do Prometheus (ex.: para o textfile collector)."""
+        resumo = self.resumo()
+        prefixo = self.nome
+        linhas = [
+            f"# HELP {prefixo}_execucao_segundos Duração da execução",
+            f"# TYPE {prefixo}_execucao_segundos gauge",
+            f"{prefixo}_execucao_segundos {resumo['tempo_total_s']}",
+            f"# HELP {prefixo}_fase_segundos Duração de cada ocorrência das fases da evolução",
+            f"# TYPE {prefixo}_fase_segundos summary",
+        ]
+        for fase, estatisticas in resumo["fases"].items():
+            for quantil in QUANTIS:
+                valor = estatisticas[_chave_quantil(quantil)] / 1000
+                linhas.append(f'{prefixo}_fase_segundos{{fase="{fase}",quantile="{quantil}"}} {valor:.6f}')
+            linhas.append(f'{prefixo}_fase_segundos_sum{{fase="{fase}"}} {estatisticas["total_s"]}')
+            linhas.append(f'{prefixo}_fase_segundos_count{{fase="{fase}"}} {estatisticas["ocorrencias"]}')
+
+        contadores = [
+            ("llm_chamadas_total", "Chamadas ao modelo", "chamadas"),
+            ("llm_tentativas_total", "Requisições enviadas, incluindo novas tentativas", "tentativas"),
+            ("llm_falhas_total", "Chamadas que falharam após todas as tentativas", "falhas"),
+            ("llm_interrompidas_total", "Respostas lidas só até a parte útil", "interrompidas"),
+            ("llm_tokens_prompt_total", "Tokens de prompt", "tokens_prompt"),
+            ("llm_tokens_completacao_total", "Tokens de resposta", "tokens_completacao"),
+        ]
+        for metrica, descricao, campo in contadores:
+            linhas.append(f"# HELP {prefixo}_{metrica} {descricao}")
+            linhas.append(f"# TYPE {prefixo}_{metrica} counter")
+            for operacao, estatisticas in resumo["llm"]["por_operacao"].items():
+                linhas.append(f'{prefixo}_{metrica}{{operacao="{operacao}"}} {estatisticas[campo]}')
+
+        linhas.append(f"# HELP {prefixo}_llm_latencia_segundos Latência das chamadas ao modelo")
+        linhas.append(f"# TYPE {prefixo}_llm_latencia_segundos summary")
+        for operacao, estatisticas in resumo["llm"]["por_operacao"].items():
+            for quantil in QUANTIS:
+                valor = estatisticas["latencia"][_chave_quantil(quantil)] / 1000
+                linhas.append(f'{prefixo}_llm_latencia_segundos{{operacao="{operacao}",'
+                              f'quantile="{quantil}"}} {valor:.6f}')
+            linhas.append(f'{prefixo}_llm_latencia_segundos_sum{{operacao="{operacao}"}} '
+                          f'{estatisticas["latencia"]["total_s"]}')
+            linhas.append(f'{prefixo}_llm_latencia_segundos_count{{operacao="{operacao}"}} '
+                          f'{estatisticas["latencia"]["ocorrencias"]}')
+        _gravar(caminho, "\n".join(linhas) + "\n")
+
+
+class _RastreadorNulo:
+    """Rastreador usado fora de uma execução: não guarda nada."""
+    @contextmanager
+    def fase(self, nome):
+        yield
+
+    def registrar_chamada(self, *args, **kwargs):
+        pass
+
+
+_NULO = _RastreadorNulo()
+# Rastreador da execução em andamento no contexto atual. O contexto acompanha as tarefas
+# do asyncio e asyncio.to_thread; threads e executores recebem uma cópia ao serem criados
+_ativo = contextvars.ContextVar("rastreador_ativo", default=None)
+
+
+def ativar(rastreador):
+    """Torna o rastreador o destino das fases e chamadas da execução no contexto atual."""
+    _ativo.set(rastreador)
+
+
+def desativar(rastreador):
+    """Desativa o rastreador, se ele ainda for o ativo no contexto atual."""
+    if _ativo.get() is rastreador:
+        _ativo.set(None)
+
+
+def obter_rastreador():
+    """Retorna o rastreador ativo, ou um que descarta tudo se não houver execução rastreada.
+
+    O rastreador é do contexto, e não do processo: duas execuções simultâneas
+    (ex.: duas sessões do Streamlit) registram cada uma no seu, desde que os
+    workers do pipeline sejam iniciados com uma cópia do contexto da execução.
+    """
+    rastreador = _ativo.get()
+    return rastreador if rastreador is not None else _NULO
+
+
+def _chave_quantil(quantil):
+    """Nome do campo de um quantil no resumo (ex.: 0.95 → p95_ms)."""
+    return f"p{round(quantil * 100)}_ms"
+
+
+def _quantil(ordenados, quantil):
+    """Quantil com interpolação linear entre os vizinhos, como numpy.percentile."""
+    posicao = (len(ordenados) - 1) * quantil
+    inferior = int(posicao)
+    superior = min(inferior + 1, len(ordenados) - 1)
+    return ordenados[inferior] + (ordenados[superior] - ordenados[inferior]) * (posicao - inferior)
+
+
+def _estatisticas_duracoes(duracoes):
+    """Ocorrências, total e quantis (em ms) de uma lista de durações em segundos."""
+    ordenados = sorted(duracoes)
+    estatisticas = {"ocorrencias": len(ordenados), "total_s": round(sum(ordenados), 4)}
+    for quantil in QUANTIS:
+        estatisticas[_chave_quantil(quantil)] = round(_quantil(ordenados, quantil) * 1000, 2) if ordenados else 0.0
+    estatisticas["max_ms"] = round(ordenados[-1] * 1000, 2) if ordenados else 0.0
+    return estatisticas
+
+
+def _estatisticas_chamadas(chamadas):
+    """Totais de um conjunto de chamadas ao modelo."""
+    return {
+        "chamadas": len(chamadas),
+        "tentativas": sum(c["tentativas"] for c in chamadas),
+        "novas_tentativas": sum(c["tentativas"] - 1 for c in chamadas),
+        "falhas": sum(1 for c in chamadas if c["erro"]),
+        "interrompidas": sum(1 for c in chamadas if c["interrompida"]),
+        "do_cassete": sum(1 for c in chamadas if c["origem"] == "cassete"),
+        "tokens_prompt": sum(c["tokens_prompt"] for c in chamadas),
+        "tokens_completacao": sum(c["tokens_completacao"] for c in chamadas),
+        "latencia": _estatisticas_duracoes([c["latencia"] for c in chamadas if not c["erro"]])
+    }
+
+
+def _gravar(caminho, conteudo):
+    """Grava o arquivo de forma atômica, para um coletor nunca ler um arquivo pela metade."""
+    diretorio = os.path.dirname(caminho)
+    if diretorio:
+        os.makedirs(diretorio, exist_ok=True)
+    temporario = f"{caminho}.tmp"
+    with open(temporario, "w", encoding="utf-8") as arquivo:
+        arquivo.write(conteudo)
+    os.replace(temporario, caminho)
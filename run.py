@@ -1,4 +1,5 @@
 #!/usr/bin/env python3
+import importlib.util
 import os
 import subprocess
 import sys
@@ -15,6 +16,9 @@ logging.basicConfig(
 
 logger = logging.getLogger('codegenix')
 
+# Módulos exigidos pela aplicação (nome de importação, não o do pacote no pip)
+DEPENDENCIAS = ("streamlit", "groq", "dotenv", "pandas", "numpy", "matplotlib")
+
 def verificar_ambiente():
     """Verifica se o ambiente está corretamente configurado."""
     # Verifica se o arquivo .env existe
@@ -25,20 +29,15 @@ def verificar_ambiente():
         print("GROQ_API_KEY=sua_chave_api_aqui")
         return False
 
-    # Verifica se as dependências estão instaladas
-    try:
-        import streamlit
-        import groq
-        import dotenv
-        import pandas
-        import matplotlib
-        import seaborn
-        return True
-    except ImportError as e:
-        logger.error(f"Dependência faltando: {e}")
+    # Verifica se as dependências estão instaladas, sem importá-las: o servidor
+    # Streamlit roda em outro processo e as importaria de novo
+    faltando = [nome for nome in DEPENDENCIAS if importlib.util.find_spec(nome) is None]
+    if faltando:
+        logger.error(f"Dependências faltando: {', '.join(faltando)}")
         print("⚠️ Algumas dependências estão faltando!")
         print("Execute: pip install -r requirements.txt")
         return False
+    return True
 
 def main():
     """Função principal que inicia a aplicação."""
@@ -52,7 +51,8 @@ def main():
     try:
         print("🚀 Iniciando o servidor...")
         logger.info("Iniciando servidor Streamlit")
-        subprocess.run(["streamlit", "run", "main.py"], check=True)
+        # Usa o mesmo interpretador, mesmo que o executável streamlit não esteja no PATH
+        subprocess.run([sys.executable, "-m", "streamlit", "run", "main.py"], check=True)
     except KeyboardInterrupt:
         logger.info("Servidor encerrado pelo usuário")
         print("\n👋 Servidor encerrado!")
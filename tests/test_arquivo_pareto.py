@@ -0,0 +1,73 @@
+import json
+
+import numpy as np
+
+from model.algoritmo import Algoritmo
+from model.arquivo_pareto import ArquivoPareto, distancia_multidao, ordenar_frentes
+
+
+def _algoritmo(id, eficiencia, clareza, boas_praticas):
+    algoritmo = Algoritmo(id, "Python", f"def f{id}():\n    return {id}\n")
+    algoritmo.set_metricas({"eficiencia": eficiencia, "clareza": clareza, "boas_praticas": boas_praticas})
+    algoritmo.set_fitness(round((eficiencia + clareza + boas_praticas) / 3, 2))
+    return algoritmo
+
+
+def test_ordenar_frentes():
+    objetivos = [[3, 1], [1, 3], [2, 2], [1, 1], [0, 0], [2, 2]]
+    assert ordenar_frentes(objetivos).tolist() == [0, 0, 0, 1, 2, 0]
+
+
+def test_ordenar_frentes_com_um_objetivo_e_vazia():
+    assert ordenar_frentes([5, 1, 3]).tolist() == [0, 2, 1]
+    assert ordenar_frentes(np.empty((0, 3))).size == 0
+
+
+def test_distancia_multidao_extremos_infinitos():
+    objetivos = np.array([[0.0, 4.0], [1.0, 3.0], [3.0, 1.0], [4.0, 0.0]])
+    distancia = distancia_multidao(objetivos, np.zeros(4, dtype=np.intp))
+    assert np.isinf(distancia[[0, 3]]).all()
+    # (3 - 0) / 4 nos dois objetivos, e (4 - 1) / 4 nos dois
+    np.testing.assert_allclose(distancia[[1, 2]], [1.5, 1.5])
+
+
+def test_arquivo_guarda_apenas_os_nao_dominados():
+    arquivo = ArquivoPareto()
+    eficiente, claro = _algoritmo(1, 90, 40, 60), _algoritmo(2, 40, 90, 60)
+    assert arquivo.atualizar([eficiente, claro, _algoritmo(3, 30, 30, 30)], geracao=0) == 2
+    assert {membro["id"] for membro in arquivo.membros()} == {1, 2}
+
+    # Um novo algoritmo que domina o mais eficiente o tira do arquivo
+    assert arquivo.atualizar([_algoritmo(4, 95, 50, 70)], geracao=1) == 1
+    membros = arquivo.membros()
+    assert {membro["id"] for membro in membros} == {2, 4}
+    assert [membro["fitness"] for membro in membros] == sorted((m["fitness"] for m in membros), reverse=True)
+
+
+def test_arquivo_ignora_codigo_repetido_e_sem_avaliacao():
+    arquivo = ArquivoPareto()
+    algoritmo = _algoritmo(1, 50, 50, 50)
+    arquivo.atualizar([algoritmo], geracao=0)
+    sem_nota = Algoritmo(2, "Python", "def g():\n    pass\n")
+    assert arquivo.atualizar([algoritmo.clone(novo_id=5), sem_nota], geracao=1) == 0
+    assert len(arquivo) == 1
+
+
+def test_capacidade_preserva_os_extremos():
+    arquivo = ArquivoPareto(capacidade=3)
+    frente = [_algoritmo(i, 10 * i, 100 - 10 * i, 50) for i in range(1, 10)]
+    arquivo.atualizar(frente, geracao=0)
+    ids = {membro["id"] for membro in arquivo.membros()}
+    assert len(ids) == 3
+    assert {1, 9} <= ids
+
+
+def test_restaurar_membros_serializados():
+    arquivo = ArquivoPareto()
+    arquivo.atualizar([_algoritmo(1, 90, 40, 60), _algoritmo(2, 40, 90, 60)], geracao=3)
+
+    restaurado = ArquivoPareto()
+    restaurado.restaurar(json.loads(json.dumps(arquivo.membros())))
+    assert restaurado.membros() == arquivo.membros()
+    # Continua filtrando por dominância depois de restaurado
+    assert restaurado.atualizar([_algoritmo(3, 30, 30, 30)], geracao=4) == 0
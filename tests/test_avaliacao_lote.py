@@ -0,0 +1,134 @@
+import asyncio
+import json
+import re
+import threading
+
+import pytest
+
+from controller.avaliador_service import AvaliadorService
+from controller.cliente_llm import RespostaLLM
+
+
+def _notas(codigo):
+    """Notas determinísticas por código, para conferir que cada candidato recebe as suas."""
+    valor = float(int(re.search(r"\d+", codigo).group()))
+    return {"eficiencia": valor, "clareza": valor + 1, "boas_praticas": valor + 2}
+
+
+def _codigos_do_prompt(prompt):
+    return re.findall(r"### Código \d+\n```\n(.*?)\n```", prompt, re.S)
+
+
+class _ClienteRoteirizado:
+    """Cliente falso: `responder_lote` recebe os códigos do prompt em lote e devolve o texto."""
+
+    def __init__(self, responder_lote):
+        self.responder_lote = responder_lote
+        self.lotes = []
+        self.individuais = []
+        self._lock = threading.Lock()
+
+    def completar(self, mensagens, modelo, temperatura=0.7, max_tokens=300, detector=None, operacao=None,
+                  **extra):
+        prompt = mensagens[0]["content"]
+        if operacao == "avaliacao_lote":
+            codigos = _codigos_do_prompt(prompt)
+            with self._lock:
+                self.lotes.append(codigos)
+            return RespostaLLM(self.responder_lote(codigos))
+        codigo = prompt.split("Código:")[1].strip()
+        with self._lock:
+            self.individuais.append(codigo)
+        # A sequência de parada corta a "}" final
+        return RespostaLLM(json.dumps(_notas(codigo))[:-1])
+
+    async def completar_async(self, *args, **kwargs):
+        return self.completar(*args, **kwargs)
+
+
+def _resposta(codigos, ids=None):
+    ids = ids if ids is not None else range(1, len(codigos) + 1)
+    return json.dumps([dict(_notas(codigos[i - 1]) if i <= len(codigos) else _notas("0"), id=i) for i in ids])
+
+
+@pytest.fixture
+def avaliador(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    monkeypatch.delenv("GROQ_API_KEY", raising=False)
+    monkeypatch.delenv("GROQ_CASSETE", raising=False)
+    avaliador = AvaliadorService(max_candidatos_lote=4, orcamento_tokens_lote=10 ** 6)
+    avaliador.cache = None
+    return avaliador
+
+
+def _usar_cliente(avaliador, responder_lote):
+    avaliador.cliente = _ClienteRoteirizado(responder_lote)
+    avaliador.modo_offline = False
+    return avaliador.cliente
+
+
+def test_empacotar_respeita_quantidade_e_orcamento_de_tokens(avaliador):
+    codigos = [f"def f{i}(): pass" for i in range(9)]
+    assert avaliador._empacotar(codigos) == [[0, 1, 2, 3], [4, 5, 6, 7], [8]]
+
+    base = len(avaliador._montar_prompt_lote([])) // 4
+    custo_pequeno = len(codigos[0]) // 4 + 20 + avaliador.TOKENS_RESPOSTA_POR_CANDIDATO
+    avaliador.orcamento_tokens_lote = base + 2 * custo_pequeno
+    grande = "x = 1\n" * 2000
+    # Dois pequenos cabem por grupo; o grande, sozinho, passa do orçamento e fica isolado
+    assert avaliador._empacotar(codigos[:3] + [grande] + codigos[3:4]) == [[0, 1], [2], [3], [4]]
+
+
+def test_lote_bem_formado_usa_uma_requisicao(avaliador):
+    codigos = [f"def f{i}(): pass" for i in range(1, 4)]
+    # Ordem trocada e texto em volta do array
+    cliente = _usar_cliente(avaliador, lambda lote: "Notas:\n" + _resposta(lote, ids=[3, 1, 2]) + "\nFim")
+
+    assert avaliador._consultar_api_lote(codigos) == [_notas(c) for c in codigos]
+    assert cliente.lotes == [codigos]
+    assert cliente.individuais == []
+
+
+def test_ids_ausentes_sao_reavaliados_e_ids_extras_ignorados(avaliador):
+    codigos = [f"def f{i}(): pass" for i in range(1, 5)]
+    cliente = _usar_cliente(
+        avaliador, lambda lote: _resposta(lote, ids=[1, 3, 4, 7]) if len(lote) == 4 else _resposta(lote)
+    )
+
+    assert avaliador._avaliar_grupo(codigos) == [_notas(c) for c in codigos]
+    assert cliente.lotes == [codigos]
+    # Só o candidato sem notas volta à API, e sozinho usa o prompt individual
+    assert cliente.individuais == [codigos[1]]
+
+
+def test_resposta_quebrada_divide_o_lote_ate_avaliacoes_individuais(avaliador):
+    codigos = [f"def f{i}(): pass" for i in range(1, 5)]
+    cliente = _usar_cliente(avaliador, lambda lote: '[{"id": 1, "eficiencia": 8')
+
+    assert avaliador._avaliar_grupo(codigos) == [_notas(c) for c in codigos]
+    assert cliente.lotes == [codigos, codigos[:2], codigos[2:]]
+    assert sorted(cliente.individuais) == codigos
+
+
+def test_resposta_quebrada_na_versao_assincrona(avaliador):
+    codigos = [f"def f{i}(): pass" for i in range(1, 10)]
+    cliente = _usar_cliente(avaliador, lambda lote: "sem json" if len(lote) > 2 else _resposta(lote))
+
+    assert asyncio.run(avaliador._consultar_api_lote_async(codigos)) == [_notas(c) for c in codigos]
+    # Grupos de 4, 4 e 1; os de 4 falham e se dividem em pares que a API responde
+    assert sorted(map(len, cliente.lotes)) == [2, 2, 2, 2, 4, 4]
+    assert cliente.individuais == [codigos[8]]
+
+
+def test_interpretar_resposta_cortada_aproveita_objetos_completos():
+    resposta = ('[{"id": 1, "eficiencia": 10, "clareza": 20, "boas_praticas": 30}, '
+                '{"id": 2, "eficiencia": "x", "clareza": 1, "boas_praticas": 1}, '
+                '{"id": 3, "eficiencia": 40, "clareza": 50}, '
+                '{"id": 4, "eficiencia": 70, "clareza": 80, "boas_praticas": 90}, '
+                '{"id": 5, "eficiencia": 1')
+
+    assert AvaliadorService._interpretar_resposta_lote(resposta, 4) == {
+        0: {"eficiencia": 10.0, "clareza": 20.0, "boas_praticas": 30.0},
+        3: {"eficiencia": 70.0, "clareza": 80.0, "boas_praticas": 90.0},
+    }
+    assert AvaliadorService._interpretar_resposta_lote("não sei avaliar", 2) == {}
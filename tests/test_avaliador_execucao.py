@@ -0,0 +1,106 @@
+import pytest
+
+from controller import avaliador_execucao
+from controller.avaliador_execucao import AvaliadorExecucao
+from controller.simulacao_controller import SimulacaoController
+from model.algoritmo import Algoritmo
+
+ORIGINAL = "def soma(lista):\n    return sum(lista)\n"
+RAPIDO = "def soma(lista):\n    total = 0\n    for x in lista:\n        total += x\n    return total\n"
+LENTO = RAPIDO.replace("total", "acumulado")
+
+
+class _PoolMedido:
+    """Pool falso com o tempo e a memória de cada código fixados pelo teste."""
+
+    def __init__(self, tempos):
+        self.tempos = tempos
+        self.execucoes = []
+
+    def executar(self, codigo, entradas, nome_funcao=None, repeticoes=1, medir_memoria=False):
+        self.execucoes.append(codigo)
+        return {"ok": True, "saidas": [("ok", None)] * len(entradas), "erros": 0,
+                "tempo": self.tempos.get(codigo, 1.0), "memoria_pico": 4096}
+
+    def fechar(self):
+        pass
+
+
+@pytest.fixture
+def diretorio_execucao(tmp_path, monkeypatch):
+    # Avaliador offline, com o original em ./utils como na simulação
+    monkeypatch.chdir(tmp_path)
+    monkeypatch.delenv("GROQ_API_KEY", raising=False)
+    monkeypatch.delenv("GROQ_CASSETE", raising=False)
+    (tmp_path / "utils").mkdir()
+    (tmp_path / "utils" / "algoritmo_original.py").write_text(ORIGINAL, encoding="utf-8")
+    return tmp_path
+
+
+def test_eficiencia_medida_substitui_a_estimada(diretorio_execucao):
+    pool = _PoolMedido({ORIGINAL: 0.02, RAPIDO: 0.01, LENTO: 0.04})
+    avaliador = AvaliadorExecucao(pool=pool)
+    algoritmo = Algoritmo(1, "Python", RAPIDO)
+
+    avaliador.avaliar(algoritmo)
+
+    # Duas vezes mais rápido que o original (75) e a mesma memória (50), com peso 0.8 no tempo
+    metricas = algoritmo.get_metricas()
+    assert metricas["eficiencia"] == 70.0
+    assert algoritmo.get_fitness() == round((70.0 + metricas["clareza"] + metricas["boas_praticas"]) / 3)
+    assert pool.execucoes == [ORIGINAL, RAPIDO]
+
+    # Em lote, o original já medido e o candidato memorizado não voltam ao pool
+    lento = Algoritmo(2, "Python", LENTO)
+    avaliador.avaliar_lote([Algoritmo(3, "Python", RAPIDO), lento])
+    assert pool.execucoes == [ORIGINAL, RAPIDO, LENTO]
+    # Duas vezes mais lento: 0.8 * 25 + 0.2 * 50
+    assert lento.get_metricas()["eficiencia"] == 30.0
+
+
+def test_medicoes_memorizadas_sao_limitadas(diretorio_execucao, monkeypatch):
+    monkeypatch.setattr(AvaliadorExecucao, "MAX_MEDICOES", 2)
+    pool = _PoolMedido({})
+    avaliador = AvaliadorExecucao(pool=pool)
+    codigos = [f"def f(x):\n    return x + {i}\n" for i in range(3)]
+
+    avaliador.medir(codigos[0], [(1,)])
+    avaliador.medir(codigos[1], [(1,)])
+    # Usar a primeira de novo a torna a mais recente: a segunda é a que sai
+    avaliador.medir(codigos[0], [(1,)])
+    avaliador.medir(codigos[2], [(1,)])
+    assert len(avaliador._medicoes) == 2
+
+    avaliador.medir(codigos[0], [(1,)])
+    avaliador.medir(codigos[1], [(1,)])
+    assert pool.execucoes == [codigos[0], codigos[1], codigos[2], codigos[1]]
+
+
+def test_sandbox_que_nao_inicia_mantem_a_eficiencia_estimada(diretorio_execucao, monkeypatch, capsys):
+    def pool_quebrado(*args, **kwargs):
+        raise RuntimeError("spawn indisponível")
+    monkeypatch.setattr(avaliador_execucao, "PoolSandbox", pool_quebrado)
+    avaliador = AvaliadorExecucao()
+    algoritmos = [Algoritmo(i, "Python", RAPIDO) for i in range(3)]
+
+    for algoritmo in algoritmos:
+        avaliador.avaliar(algoritmo)
+
+    assert all(a.get_fitness() > 1 for a in algoritmos)
+    assert avaliador.calcular_eficiencia(RAPIDO) is None
+    assert avaliador.sandbox_indisponivel
+    assert capsys.readouterr().out.count("[ERRO]") == 1
+    avaliador.fechar()
+    assert not avaliador.sandbox_indisponivel
+
+
+def test_controlador_usa_o_avaliador_por_execucao_com_o_pool_compartilhado(diretorio_execucao):
+    pool = _PoolMedido({})
+    controller = SimulacaoController(pool_sandbox=pool, caminho_checkpoint=None)
+
+    assert isinstance(controller.avaliador, AvaliadorExecucao)
+    assert controller.avaliador.pool is pool
+    assert controller.filtros[-1].pool is pool
+    # O pool recebido continua aberto depois de fechar o controlador
+    controller.fechar()
+    assert controller.avaliador.pool is pool
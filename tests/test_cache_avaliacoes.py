@@ -0,0 +1,215 @@
+import asyncio
+import threading
+import time
+
+import pytest
+
+from controller import cache_avaliacoes
+from controller.cache_avaliacoes import CacheAvaliacoes
+
+MODELO = "modelo-de-teste"
+VERSAO = 1
+
+
+class _Relogio:
+    """Substitui o módulo time no cache para controlar TTL e a ordem de acesso."""
+
+    def __init__(self):
+        self.agora = 1000.0
+
+    def time(self):
+        return self.agora
+
+
+@pytest.fixture
+def relogio(monkeypatch):
+    relogio = _Relogio()
+    monkeypatch.setattr(cache_avaliacoes, "time", relogio)
+    return relogio
+
+
+@pytest.fixture
+def cache(tmp_path, relogio):
+    cache = CacheAvaliacoes(str(tmp_path / "cache.sqlite3"), max_entradas=3, ttl_segundos=60)
+    yield cache
+    cache.fechar()
+
+
+def _contador(notas):
+    """Função de cálculo que conta as chamadas, como se cada uma fosse uma requisição à API."""
+    chamadas = []
+
+    def calcular():
+        chamadas.append(1)
+        return dict(notas)
+    return calcular, chamadas
+
+
+def test_codigo_com_outro_espacamento_acerta_o_cache(cache):
+    calcular, chamadas = _contador({"eficiencia": 80})
+
+    assert cache.obter_ou_calcular("def f():\r\n    return 1   \r\n\r\n", MODELO, VERSAO, calcular) == {"eficiencia": 80}
+    assert cache.obter_ou_calcular("\ndef f():\n    return 1\n", MODELO, VERSAO, calcular) == {"eficiencia": 80}
+    assert len(chamadas) == 1
+    # Outro modelo ou outra versão do prompt não reaproveitam a nota
+    cache.obter_ou_calcular("def f():\n    return 1", MODELO, VERSAO + 1, calcular)
+    assert len(chamadas) == 2
+    assert cache.get_estatisticas()["hits"] == 1
+
+
+def test_entrada_expirada_e_recalculada(cache, relogio):
+    calcular, chamadas = _contador({"eficiencia": 80})
+    cache.obter_ou_calcular("def f(): pass", MODELO, VERSAO, calcular)
+
+    relogio.agora += 60
+    cache.obter_ou_calcular("def f(): pass", MODELO, VERSAO, calcular)
+    assert len(chamadas) == 1
+
+    relogio.agora += 1
+    assert cache.obter(cache.gerar_chave("def f(): pass", MODELO, VERSAO)) is None
+    cache.obter_ou_calcular("def f(): pass", MODELO, VERSAO, calcular)
+    assert len(chamadas) == 2
+
+
+def test_remove_a_entrada_acessada_ha_mais_tempo(cache, relogio):
+    chaves = [cache.gerar_chave(f"def f{i}(): pass", MODELO, VERSAO) for i in range(4)]
+    for i in range(3):
+        relogio.agora += 1
+        cache.guardar(chaves[i], {"eficiencia": i})
+    # A primeira entrada é lida e deixa de ser a menos usada
+    relogio.agora += 1
+    assert cache.obter(chaves[0]) == {"eficiencia": 0}
+
+    relogio.agora += 1
+    cache.guardar(chaves[3], {"eficiencia": 3})
+    assert cache.obter(chaves[1]) is None
+    assert [cache.obter(chaves[i]) for i in (0, 2, 3)] == [{"eficiencia": 0}, {"eficiencia": 2}, {"eficiencia": 3}]
+    assert cache.get_estatisticas()["entradas"] == 3
+
+
+def test_duas_threads_com_o_mesmo_codigo_fazem_uma_chamada(cache):
+    liberar = threading.Event()
+    chamadas = []
+    resultados = [None, None]
+
+    def calcular():
+        chamadas.append(1)
+        liberar.wait(5)
+        return {"eficiencia": 70}
+
+    def consultar(i):
+        resultados[i] = cache.obter_ou_calcular("def f(): pass", MODELO, VERSAO, calcular)
+
+    lider = threading.Thread(target=consultar, args=(0,))
+    lider.start()
+    while not chamadas:
+        time.sleep(0.001)
+    seguidor = threading.Thread(target=consultar, args=(1,))
+    seguidor.start()
+    # O seguidor aguarda o cálculo em andamento em vez de chamar a API
+    while cache.get_estatisticas()["coalescidas"] == 0:
+        time.sleep(0.001)
+    liberar.set()
+    lider.join()
+    seguidor.join()
+
+    assert len(chamadas) == 1
+    assert resultados == [{"eficiencia": 70}, {"eficiencia": 70}]
+    # Cada chamador recebe a sua cópia das notas
+    assert resultados[0] is not resultados[1]
+
+
+def test_erro_do_lider_chega_a_quem_aguarda_e_nada_e_guardado(cache):
+    liberar = threading.Event()
+    erros = []
+
+    def calcular():
+        liberar.wait(5)
+        raise RuntimeError("falha da API")
+
+    def consultar():
+        try:
+            cache.obter_ou_calcular("def f(): pass", MODELO, VERSAO, calcular)
+        except RuntimeError as e:
+            erros.append(str(e))
+
+    threads = [threading.Thread(target=consultar) for _ in range(2)]
+    threads[0].start()
+    while not cache._em_andamento:
+        time.sleep(0.001)
+    threads[1].start()
+    while cache.get_estatisticas()["coalescidas"] == 0:
+        time.sleep(0.001)
+    liberar.set()
+    for thread in threads:
+        thread.join()
+
+    assert erros == ["falha da API"] * 2
+    assert cache.get_estatisticas()["entradas"] == 0
+
+
+def test_lote_calcula_apenas_os_codigos_sem_notas(cache):
+    cache.guardar(cache.gerar_chave("def a(): pass", MODELO, VERSAO), {"eficiencia": 10})
+    recebidos = []
+
+    def calcular(codigos):
+        recebidos.append(codigos)
+        return [{"eficiencia": 20}, None]
+
+    codigos = ["def a(): pass", "def b(): pass", "def b(): pass  \n", "def c(): pass"]
+    resultados = cache.obter_ou_calcular_lote(codigos, MODELO, VERSAO, calcular)
+
+    # O código repetido no lote e o já guardado não são enviados
+    assert recebidos == [["def b(): pass", "def c(): pass"]]
+    assert resultados == [{"eficiencia": 10}, {"eficiencia": 20}, {"eficiencia": 20}, None]
+    # O candidato sem notas não fica no cache
+    assert cache.obter(cache.gerar_chave("def c(): pass", MODELO, VERSAO)) is None
+    assert cache.get_estatisticas()["coalescidas"] == 1
+
+
+def test_caminhos_assincronos_usam_o_cache_e_agrupam_chamadas(cache):
+    chamadas = []
+
+    async def calcular():
+        chamadas.append(1)
+        await asyncio.sleep(0.01)
+        return {"eficiencia": 50}
+
+    async def calcular_lote(codigos):
+        chamadas.append(len(codigos))
+        return [{"eficiencia": 60} for _ in codigos]
+
+    async def executar():
+        # Duas consultas simultâneas ao mesmo código: uma chamada
+        primeira, segunda = await asyncio.gather(
+            cache.obter_ou_calcular_async("def f(): pass", MODELO, VERSAO, calcular),
+            cache.obter_ou_calcular_async("def f(): pass   \n", MODELO, VERSAO, calcular),
+        )
+        lote = await cache.obter_ou_calcular_lote_async(
+            ["def f(): pass", "def g(): pass"], MODELO, VERSAO, calcular_lote
+        )
+        return primeira, segunda, lote
+
+    primeira, segunda, lote = asyncio.run(executar())
+    assert primeira == segunda == {"eficiencia": 50}
+    assert lote == [{"eficiencia": 50}, {"eficiencia": 60}]
+    assert chamadas == [1, 1]
+    assert cache.obter(cache.gerar_chave("def g(): pass", MODELO, VERSAO)) == {"eficiencia": 60}
+
+
+def test_cancelamento_assincrono_libera_quem_aguarda(cache):
+    async def calcular():
+        await asyncio.sleep(10)
+        return {"eficiencia": 50}
+
+    async def executar():
+        lider = asyncio.create_task(cache.obter_ou_calcular_async("def f(): pass", MODELO, VERSAO, calcular))
+        await asyncio.sleep(0)
+        seguidor = asyncio.create_task(cache.obter_ou_calcular_async("def f(): pass", MODELO, VERSAO, calcular))
+        await asyncio.sleep(0)
+        lider.cancel()
+        with pytest.raises(RuntimeError):
+            await seguidor
+
+    asyncio.run(executar())
+    assert not cache._em_andamento
@@ -0,0 +1,89 @@
+import asyncio
+import gzip
+
+import pytest
+
+from controller.cassete_llm import CasseteLLM, RespostaNaoGravada
+from controller.cliente_llm import ClienteLLM, RespostaLLM
+
+MENSAGENS = [{"role": "user", "content": "Melhore o código"}]
+
+
+def _chave(mensagens=MENSAGENS, temperatura=0.7):
+    return CasseteLLM.chave(mensagens, "modelo-teste", temperatura, 300)
+
+
+def test_chave_depende_do_prompt_e_dos_parametros():
+    assert _chave() == _chave()
+    assert _chave() != _chave(temperatura=0.2)
+    assert _chave() != _chave(mensagens=[{"role": "user", "content": "Outro prompt"}])
+
+
+def test_gravar_e_reproduzir(tmp_path):
+    caminho = str(tmp_path / "cassete.jsonl.gz")
+    gravacao = CasseteLLM(caminho, modo="gravar", tamanho_bloco=2)
+    gravacao.gravar(_chave(), RespostaLLM("primeira", tokens_prompt=10, tokens_completacao=5, latencia=0.25))
+    gravacao.gravar(_chave(), RespostaLLM("segunda", interrompida=True))
+    gravacao.gravar(_chave(temperatura=0.2), RespostaLLM("outra"))
+    gravacao.descarregar()
+
+    reproducao = CasseteLLM(caminho)
+    primeira = reproducao.reproduzir(_chave())
+    assert (primeira.texto, primeira.tokens_prompt, primeira.tokens_completacao, primeira.latencia) == \
+        ("primeira", 10, 5, 0.25)
+    assert reproducao.reproduzir(_chave()).interrompida
+    # Depois da última resposta gravada, a sequência recomeça
+    assert reproducao.reproduzir(_chave()).texto == "primeira"
+    assert asyncio.run(reproducao.reproduzir_async(_chave(temperatura=0.2))).texto == "outra"
+    with pytest.raises(RespostaNaoGravada):
+        reproducao.reproduzir(_chave(temperatura=0.0))
+    assert reproducao.estatisticas()["acertos"] == 4
+    assert reproducao.estatisticas()["faltas"] == 1
+
+
+def test_descargas_acrescentam_membros_gzip(tmp_path):
+    caminho = str(tmp_path / "cassete.jsonl.gz")
+    for texto in ("a", "b"):
+        gravacao = CasseteLLM(caminho, modo="gravar")
+        gravacao.gravar(_chave(), RespostaLLM(texto))
+        gravacao.descarregar()
+
+    with gzip.open(caminho, "rt", encoding="utf-8") as arquivo:
+        # Um único cabeçalho de versão, escrito na criação do arquivo
+        assert sum('"versao"' in linha and '"chave"' not in linha for linha in arquivo) == 1
+    reproducao = CasseteLLM(caminho)
+    assert [reproducao.reproduzir(_chave()).texto for _ in range(2)] == ["a", "b"]
+
+
+def test_cassete_de_outra_versao_e_ignorado(tmp_path, monkeypatch):
+    caminho = str(tmp_path / "cassete.jsonl.gz")
+    gravacao = CasseteLLM(caminho, modo="gravar")
+    gravacao.gravar(_chave(), RespostaLLM("antiga"))
+    gravacao.descarregar()
+
+    monkeypatch.setattr(CasseteLLM, "VERSAO", CasseteLLM.VERSAO + 1)
+    reproducao = CasseteLLM(caminho)
+    with pytest.raises(RespostaNaoGravada):
+        reproducao.reproduzir(CasseteLLM.chave(MENSAGENS, "modelo-teste", 0.7, 300))
+
+
+def test_cliente_grava_e_depois_reproduz_sem_a_api(tmp_path, monkeypatch):
+    caminho = str(tmp_path / "cassete.jsonl.gz")
+    chamadas = []
+
+    def api_falsa(self, mensagens, modelo, temperatura, max_tokens, detector, operacao, extra):
+        chamadas.append(mensagens)
+        return RespostaLLM(f"resposta {len(chamadas)}", tokens_prompt=7, tokens_completacao=3)
+
+    monkeypatch.setattr(ClienteLLM, "_completar_api", api_falsa)
+    cliente = ClienteLLM(api_key="chave-de-teste")
+    cliente.cassete = CasseteLLM(caminho, modo="gravar")
+    gravadas = [cliente.completar(MENSAGENS, "modelo-teste").texto for _ in range(2)]
+    cliente.cassete.descarregar()
+
+    # A reprodução não precisa de chave nem de rede
+    reproducao = ClienteLLM(api_key=None)
+    reproducao.cassete = CasseteLLM(caminho)
+    assert reproducao.reproduzindo
+    assert [reproducao.completar(MENSAGENS, "modelo-teste").texto for _ in range(2)] == gravadas
+    assert len(chamadas) == 2
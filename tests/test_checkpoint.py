@@ -0,0 +1,110 @@
+import gzip
+import os
+import random
+
+import pytest
+
+from controller.avaliador_service import AvaliadorService
+from controller.operador_genetico import OperadorGenetico
+from model.algoritmo import Algoritmo
+from model.checkpoint import CheckpointPopulacao
+from model.historico import iterar_historico
+from model.populacao import Populacao
+
+CODIGO_BASE = "def dobro(x):\n    return 2 * x\n"
+
+
+def test_salvar_e_carregar(tmp_path):
+    checkpoint = CheckpointPopulacao(str(tmp_path / "estado" / "checkpoint.json.gz"))
+    assert not checkpoint.existe()
+    assert checkpoint.carregar() is None
+
+    checkpoint.salvar({"geracao": 2, "texto": "ação"})
+    checkpoint.salvar({"geracao": 3, "texto": "ação"})
+    assert checkpoint.carregar() == {"versao": CheckpointPopulacao.VERSAO, "geracao": 3, "texto": "ação"}
+    # A troca atômica não deixa temporários para trás
+    assert os.listdir(tmp_path / "estado") == ["checkpoint.json.gz"]
+
+    checkpoint.remover()
+    checkpoint.remover()
+    assert not checkpoint.existe()
+
+
+def test_checkpoint_corrompido_ou_de_outra_versao_e_ignorado(tmp_path, monkeypatch):
+    caminho = tmp_path / "checkpoint.json.gz"
+    checkpoint = CheckpointPopulacao(str(caminho))
+    checkpoint.salvar({"geracao": 1})
+    dados = caminho.read_bytes()
+
+    caminho.write_bytes(dados[:len(dados) // 2])
+    assert checkpoint.carregar() is None
+
+    caminho.write_bytes(gzip.compress(b"{}"))
+    assert checkpoint.carregar() is None
+
+    caminho.write_bytes(dados)
+    monkeypatch.setattr(CheckpointPopulacao, "VERSAO", CheckpointPopulacao.VERSAO + 1)
+    assert checkpoint.carregar() is None
+
+
+@pytest.fixture
+def diretorio_execucao(tmp_path, monkeypatch):
+    # A população grava o código original em ./utils; o avaliador fica offline, sem a API
+    monkeypatch.chdir(tmp_path)
+    monkeypatch.delenv("GROQ_API_KEY", raising=False)
+    monkeypatch.delenv("GROQ_CASSETE", raising=False)
+    os.makedirs("utils")
+    return tmp_path
+
+
+def _populacao(caminho_historico):
+    populacao = Populacao("Python", tamanho=4)
+    populacao.set_avaliador(AvaliadorService(caminho_historico=caminho_historico))
+    populacao.set_operador(OperadorGenetico(api_key="chave-de-teste", semente=11))
+    return populacao
+
+
+def _avaliados(avaliador, geracao, quantidade, inicio=0):
+    avaliador.set_geracao(geracao)
+    algoritmos = []
+    for i in range(inicio, inicio + quantidade):
+        algoritmo = Algoritmo(i, "Python", f"def f{i}(x):\n    return x + {i}\n")
+        avaliador.avaliar(algoritmo)
+        algoritmos.append(algoritmo)
+    avaliador.salvar_historico()
+    return algoritmos
+
+
+def test_populacao_retoma_do_checkpoint(diretorio_execucao):
+    caminho_historico = str(diretorio_execucao / "historico.jsonl")
+    checkpoint = CheckpointPopulacao(str(diretorio_execucao / "checkpoint.json.gz"))
+    original = _populacao(caminho_historico)
+    original.codigo_base = CODIGO_BASE
+    original.geracao = 2
+    original.descartes_por_geracao = {1: 3, 2: 1}
+    original.algoritmos = _avaliados(original.avaliador, 2, 4)
+    original.arquivo_pareto.atualizar(original.algoritmos, 2)
+    checkpoint.salvar(original.get_estado())
+
+    # O que os geradores produzem depois do checkpoint, e avaliações de uma geração que não chegou ao fim
+    selecao_original = original.operador.motor_selecao.selecionar_indices([1, 2, 3, 4], 2)
+    id_original = random.randint(0, 10 ** 9)
+    _avaliados(original.avaliador, 3, 2, inicio=10)
+
+    restaurada = _populacao(caminho_historico)
+    restaurada.restaurar_estado(checkpoint.carregar())
+
+    assert restaurada.geracao == 2
+    assert restaurada.codigo_base == CODIGO_BASE
+    assert restaurada.descartes_por_geracao == {1: 3, 2: 1}
+    assert [a.para_dict() for a in restaurada.algoritmos] == [a.para_dict() for a in original.algoritmos]
+    assert restaurada.arquivo_pareto.membros() == original.arquivo_pareto.membros()
+    with open("utils/algoritmo_original.py", encoding="utf-8") as arquivo:
+        assert arquivo.read() == CODIGO_BASE
+    # Os geradores continuam de onde o checkpoint parou
+    assert (restaurada.operador.motor_selecao.selecionar_indices([1, 2, 3, 4], 2) == selecao_original).all()
+    assert random.randint(0, 10 ** 9) == id_original
+    # O histórico volta ao fim da última geração concluída
+    assert [registro["geracao"] for registro in iterar_historico(caminho_historico)] == [2] * 4
+    assert len(restaurada.avaliador.historico_colunar) == 4
+    assert restaurada.avaliador.posicao_historico()["registros"] == 4
@@ -0,0 +1,150 @@
+import asyncio
+
+import groq
+import httpx
+import pytest
+
+from controller.cliente_llm import ClienteLLM, LimitadorTaxa, _converter_duracao
+
+
+class _Relogio:
+    """Relógio falso: dormir apenas avança o tempo e anota a espera."""
+
+    def __init__(self):
+        self.agora = 100.0
+        self.esperas = []
+
+    def __call__(self):
+        return self.agora
+
+    def dormir(self, segundos):
+        self.esperas.append(round(segundos, 6))
+        self.agora += segundos
+
+
+def _limitador(relogio, requisicoes_por_minuto=2, tokens_por_minuto=600):
+    return LimitadorTaxa(requisicoes_por_minuto, tokens_por_minuto, relogio=relogio, dormir=relogio.dormir)
+
+
+def _erro_429(headers):
+    requisicao = httpx.Request("POST", "https://api.groq.com/openai/v1/chat/completions")
+    resposta = httpx.Response(429, headers=headers, request=requisicao)
+    return groq.RateLimitError("limite atingido", response=resposta, body=None)
+
+
+def test_fechar_async_fecha_o_cliente_do_loop_e_esquece_o_loop():
+    cliente = ClienteLLM(api_key="chave-de-teste")
+
+    async def executar():
+        assincrono = cliente._obter_cliente_async()
+        # O mesmo loop reaproveita o cliente
+        assert cliente._obter_cliente_async() is assincrono
+        await cliente.fechar_async()
+        return assincrono
+
+    assincrono = asyncio.run(executar())
+    assert assincrono._client.is_closed
+    assert len(cliente._clientes_async) == 0
+
+
+def test_fechar_async_sem_cliente_no_loop_nao_faz_nada():
+    cliente = ClienteLLM(api_key="chave-de-teste")
+    asyncio.run(cliente.fechar_async())
+    assert len(cliente._clientes_async) == 0
+
+
+def test_balde_de_requisicoes_espera_a_recarga():
+    relogio = _Relogio()
+    limitador = _limitador(relogio)
+
+    limitador.adquirir(10)
+    limitador.adquirir(10)
+    assert relogio.esperas == []
+    # Sem requisições no balde: 2/min recarrega uma a cada 30s
+    limitador.adquirir(10)
+    assert relogio.esperas == [30.0]
+
+    relogio.agora += 15
+    limitador.adquirir(10)
+    assert relogio.esperas == [30.0, 15.0]
+
+
+def test_balde_de_tokens_espera_a_recarga_e_limita_a_capacidade():
+    relogio = _Relogio()
+    limitador = _limitador(relogio, requisicoes_por_minuto=100)
+
+    limitador.adquirir(500)
+    # Faltam 400 tokens; 600/min recarrega 10 por segundo
+    limitador.adquirir(500)
+    assert relogio.esperas == [40.0]
+    # Uma estimativa maior que o balde é limitada à capacidade, em vez de esperar para sempre
+    limitador.adquirir(10 ** 6)
+    assert relogio.esperas == [40.0, 60.0]
+    assert limitador.tokens == pytest.approx(0.0)
+
+
+def test_reembolso_e_saldo_informado_pelo_servidor():
+    relogio = _Relogio()
+    limitador = _limitador(relogio)
+
+    limitador.adquirir(500)
+    limitador.reembolsar(500, 120)
+    assert limitador.tokens == pytest.approx(480.0)
+    # O reembolso nunca passa da capacidade
+    limitador.reembolsar(500, 0)
+    assert limitador.tokens == pytest.approx(600.0)
+
+    limitador.sincronizar_tokens(50)
+    assert limitador.tokens == pytest.approx(50.0)
+    # Um saldo maior que o local não aumenta o balde
+    limitador.sincronizar_tokens(10 ** 6)
+    assert limitador.tokens == pytest.approx(50.0)
+
+
+def test_pausa_suspende_as_chamadas_ate_o_fim():
+    relogio = _Relogio()
+    limitador = _limitador(relogio)
+    limitador.pausar(7)
+    limitador.pausar(3)
+
+    limitador.adquirir(1)
+    assert relogio.esperas == [7.0]
+
+
+def test_dica_do_servidor_nos_headers():
+    ler = ClienteLLM._ler_dica_servidor
+    assert ler(httpx.Headers({"retry-after": "3"})) == 3.0
+    assert ler(httpx.Headers({"retry-after": "-1"})) == 0.0
+    # Retry-After inválido: usa o maior dos x-ratelimit-reset-*
+    assert ler(httpx.Headers({"retry-after": "depois", "x-ratelimit-reset-requests": "1m2.5s",
+                              "x-ratelimit-reset-tokens": "250ms"})) == pytest.approx(62.5)
+    assert ler(httpx.Headers({"x-ratelimit-reset-tokens": "7.66s"})) == pytest.approx(7.66)
+    assert ler(httpx.Headers({})) is None
+    assert _converter_duracao("1h") == 3600.0
+    assert _converter_duracao("logo") is None
+
+
+def test_429_pausa_o_limitador_pelo_retry_after(monkeypatch):
+    relogio = _Relogio()
+    cliente = ClienteLLM(api_key="chave-de-teste")
+    cliente.limitador = _limitador(relogio, requisicoes_por_minuto=100)
+
+    # A espera fica no limitador, para todas as chamadas, e não na tentativa
+    assert cliente._preparar_nova_tentativa(_erro_429({"retry-after": "12"}), 1) == 0.0
+    assert cliente.limitador.pausado_ate == relogio.agora + 12
+    cliente.limitador.adquirir(1)
+    assert relogio.esperas == [12.0]
+
+    # Na última tentativa, desiste
+    assert cliente._preparar_nova_tentativa(_erro_429({"retry-after": "12"}), cliente.max_tentativas) is None
+
+
+def test_headers_de_resposta_alinham_o_balde_de_tokens():
+    relogio = _Relogio()
+    cliente = ClienteLLM(api_key="chave-de-teste")
+    cliente.limitador = _limitador(relogio)
+
+    cliente._sincronizar_limites(httpx.Headers({"x-ratelimit-remaining-tokens": "75"}))
+    assert cliente.limitador.tokens == pytest.approx(75.0)
+    cliente._sincronizar_limites(httpx.Headers({"x-ratelimit-remaining-tokens": "muitos"}))
+    assert cliente.limitador.tokens == pytest.approx(75.0)
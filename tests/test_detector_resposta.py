@@ -0,0 +1,97 @@
+import pytest
+
+from controller.detector_resposta import DetectorBlocosCodigo, DetectorJSON
+
+
+def _alimentar(detector, trechos):
+    """Alimenta os trechos em ordem; retorna o índice do trecho que completou a resposta (ou None)."""
+    for indice, trecho in enumerate(trechos):
+        if detector.alimentar(trecho):
+            return indice
+    return None
+
+
+def _particoes(texto):
+    """Todas as divisões do texto em dois trechos, e a divisão caractere a caractere."""
+    yield [texto]
+    for corte in range(1, len(texto)):
+        yield [texto[:corte], texto[corte:]]
+    yield list(texto)
+
+
+JSON_COM_STRINGS = 'Aqui estão as notas: {"nota": {"texto": "fecha } e [ abre { \\" }"}, "lista": [1, {"a": 2}]} depois'
+
+
+@pytest.mark.parametrize("trechos", list(_particoes(JSON_COM_STRINGS)))
+def test_json_termina_no_fechamento_em_qualquer_divisao(trechos):
+    detector = DetectorJSON()
+    _alimentar(detector, trechos)
+
+    assert detector.completo
+    assert detector.resultado == JSON_COM_STRINGS[:JSON_COM_STRINGS.index("]}") + 2]
+
+
+def test_json_para_de_ler_assim_que_o_objeto_fecha():
+    detector = DetectorJSON("[")
+    trechos = ['[{"id": 1, "n": "]"}', ", ", '{"id": 2}]', " texto extra", "[{}]"]
+
+    assert _alimentar(detector, trechos) == 2
+    assert detector.resultado == '[{"id": 1, "n": "]"}, {"id": 2}]'
+    # Depois de completo, trechos novos são ignorados
+    assert detector.alimentar("mais")
+    assert detector.resultado == '[{"id": 1, "n": "]"}, {"id": 2}]'
+
+
+def test_json_sem_fechamento_devolve_tudo_o_que_chegou():
+    detector = DetectorJSON()
+    texto = '{"eficiencia": 80, "clareza": "sem } fim'
+    for trecho in texto:
+        assert not detector.alimentar(trecho)
+
+    assert not detector.completo
+    assert detector.resultado == texto
+
+    detector.reiniciar()
+    assert detector.alimentar('{"a": 1}')
+    assert detector.resultado == '{"a": 1}'
+
+
+def test_json_ignora_abertura_de_outro_tipo_antes_do_array():
+    detector = DetectorJSON("[")
+    assert _alimentar(detector, ['{"x": ', '1} ', '[1, 2]']) == 2
+    assert detector.resultado == '{"x": 1} [1, 2]'
+    with pytest.raises(ValueError):
+        DetectorJSON("(")
+
+
+DOIS_BLOCOS = (
+    "Variação 1:\n```python\ndef f():\n    return '```'\n```\n"
+    "Texto entre os blocos\n```\ndef g():\n    pass```\nsobra\n```\n"
+)
+
+
+@pytest.mark.parametrize("trechos", list(_particoes(DOIS_BLOCOS)))
+def test_blocos_terminam_na_cerca_de_fechamento_em_qualquer_divisao(trechos):
+    detector = DetectorBlocosCodigo(quantidade=2)
+    _alimentar(detector, trechos)
+
+    assert detector.completo
+    assert detector.resultado == DOIS_BLOCOS[:DOIS_BLOCOS.index("pass```") + len("pass```")]
+
+
+def test_blocos_so_analisam_linhas_completas():
+    detector = DetectorBlocosCodigo()
+    assert not detector.alimentar("```python\nx = 1\n``")
+    # A cerca só conta quando a linha termina
+    assert not detector.alimentar("`")
+    assert detector.alimentar("\nresto")
+    assert detector.resultado == "```python\nx = 1\n```"
+
+
+def test_blocos_sem_fechamento_devolvem_tudo_o_que_chegou():
+    detector = DetectorBlocosCodigo(quantidade=2)
+    texto = "```\na = 1\n```\n```\nb = 2\n"
+    assert _alimentar(detector, [texto[:7], texto[7:]]) is None
+
+    assert not detector.completo
+    assert detector.resultado == texto
@@ -0,0 +1,56 @@
+import pytest
+
+from controller import filtro_correcao
+from controller.filtro_correcao import FiltroCorrecao
+from model.algoritmo import Algoritmo
+
+ORIGINAL = "def dobro(x):\n    return 2 * x\n"
+
+
+class _PoolFalso:
+    """Executa o código no próprio processo, no lugar do sandbox."""
+    def executar(self, codigo, entradas, nome_funcao, **opcoes):
+        escopo = {}
+        exec(codigo, escopo)
+        return {"ok": True, "saidas": [("ok", escopo[nome_funcao](*args)) for args in entradas]}
+
+    def fechar(self):
+        pass
+
+
+@pytest.fixture
+def caminho_original(tmp_path):
+    caminho = tmp_path / "algoritmo_original.py"
+    caminho.write_text(ORIGINAL, encoding="utf-8")
+    return str(caminho)
+
+
+def test_candidato_equivalente_aprovado_e_divergente_descartado(caminho_original):
+    filtro = FiltroCorrecao(pool=_PoolFalso(), caminho_original=caminho_original)
+    equivalente = Algoritmo(1, "Python", "def dobro(x):\n    return x + x\n")
+    divergente = Algoritmo(2, "Python", "def dobro(x):\n    return 3 * x\n")
+    assert filtro.filtrar(equivalente) is equivalente
+    assert filtro.filtrar(divergente) is None
+    assert filtro.get_estatisticas()["rejeitados_por_motivo"] == {"erro": 0, "divergencia": 1}
+
+
+def test_sandbox_que_nao_inicia_deixa_os_candidatos_passarem(caminho_original, monkeypatch, capsys):
+    def pool_quebrado(*args, **kwargs):
+        raise RuntimeError("spawn indisponível")
+
+    monkeypatch.setattr(filtro_correcao, "PoolSandbox", pool_quebrado)
+    filtro = FiltroCorrecao(caminho_original=caminho_original)
+    candidatos = [Algoritmo(i, "Python", f"def dobro(x):\n    return {i} * x\n") for i in range(3)]
+
+    assert [filtro.filtrar(candidato) for candidato in candidatos] == candidatos
+    estatisticas = filtro.get_estatisticas()
+    assert estatisticas["sandbox_indisponivel"]
+    assert estatisticas["verificados"] == 0
+    # A falha é informada uma única vez
+    assert capsys.readouterr().out.count("[ERRO]") == 1
+
+    # Depois de fechar, a próxima execução tenta iniciar o sandbox de novo
+    filtro.fechar()
+    monkeypatch.setattr(filtro_correcao, "PoolSandbox", lambda *args, **kwargs: _PoolFalso())
+    assert filtro.filtrar(candidatos[2]) is candidatos[2]
+    assert filtro.filtrar(candidatos[0]) is None
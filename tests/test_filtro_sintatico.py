@@ -0,0 +1,50 @@
+from controller.filtro_sintatico import FiltroSintatico
+from controller.operador_genetico import OperadorGenetico
+from model.algoritmo import Algoritmo
+
+PROGRAMA_1 = "def a():\n    return 1\n"
+PROGRAMA_2 = "def b():\n    return 2\n"
+
+
+def extrair(texto, linguagem="Python"):
+    return FiltroSintatico.normalizar(FiltroSintatico.extrair_codigo(texto, linguagem))
+
+
+def test_fallback_de_cruzamento_mantem_so_o_primeiro_programa():
+    texto = OperadorGenetico._fallback_cruzamento(PROGRAMA_1, PROGRAMA_2)
+    assert extrair(texto) == PROGRAMA_1
+
+
+def test_fallback_de_mutacao_envolvendo_fallback_de_cruzamento():
+    # No pipeline, a mutação que falha embrulha o filho do cruzamento que falhou
+    texto = OperadorGenetico._fallback_mutacao(OperadorGenetico._fallback_cruzamento(PROGRAMA_1, PROGRAMA_2))
+    codigo = extrair(texto)
+    assert codigo == PROGRAMA_1
+    assert "# Algoritmo 2:" not in codigo
+
+
+def test_fallback_de_mutacao_remove_o_marcador():
+    assert extrair(OperadorGenetico._fallback_mutacao(PROGRAMA_1)) == PROGRAMA_1
+
+
+def test_bloco_markdown_com_texto_explicativo():
+    texto = f"Aqui está a versão otimizada:\n\n```python\n{PROGRAMA_1}```\n\nEla é mais rápida."
+    assert extrair(texto) == PROGRAMA_1
+
+
+def test_prefere_o_bloco_da_linguagem_que_compila():
+    texto = f"```js\nfunction a() {{}}\n```\n```python\ndef quebrado(:\n```\n```python\n{PROGRAMA_2}```"
+    assert extrair(texto) == PROGRAMA_2
+
+
+def test_filtrar_repara_texto_antes_do_codigo():
+    filtro = FiltroSintatico()
+    algoritmo = Algoritmo(id=1, linguagem="Python", codigo=f"Claro! Segue o código:\n{PROGRAMA_1}")
+    assert filtro.filtrar(algoritmo).codigo == PROGRAMA_1
+    assert filtro.get_estatisticas()["reparados"] == 1
+
+
+def test_filtrar_descarta_codigo_sem_conserto():
+    filtro = FiltroSintatico()
+    assert filtro.filtrar(Algoritmo(id=1, linguagem="Python", codigo="def (:\n    ???")) is None
+    assert filtro.get_estatisticas()["descartados"] == 1
@@ -0,0 +1,72 @@
+import numpy as np
+
+from controller.filtro_substituto import FiltroSubstituto
+from model.algoritmo import Algoritmo
+from model.modelo_substituto import CARACTERISTICAS, ModeloSubstituto, extrair_caracteristicas
+
+CODIGO = "def soma(a, b):\n    return a + b\n"
+
+
+def _avaliado(codigo, notas=(60, 70, 80)):
+    algoritmo = Algoritmo(1, "Python", codigo)
+    algoritmo.set_metricas(dict(zip(ModeloSubstituto.CRITERIOS, notas)))
+    return algoritmo
+
+
+def test_caracteristicas_de_codigo_que_nao_compila():
+    vetor = extrair_caracteristicas("def quebrado(:\n")
+    assert vetor.shape == (len(CARACTERISTICAS),)
+    assert vetor[0] == 1.0
+    assert vetor[1] == 0.0
+
+
+def test_rls_aprende_uma_relacao_linear():
+    gerador = np.random.default_rng(3)
+    pesos = gerador.uniform(0, 5, size=(len(CARACTERISTICAS), len(ModeloSubstituto.CRITERIOS)))
+    modelo = ModeloSubstituto(esquecimento=1.0)
+    for _ in range(200):
+        x = gerador.uniform(0, 2, size=len(CARACTERISTICAS))
+        modelo.atualizar(x, dict(zip(ModeloSubstituto.CRITERIOS, x @ pesos)))
+
+    teste = gerador.uniform(0, 2, size=(20, len(CARACTERISTICAS)))
+    esperado = np.clip(teste @ pesos, 0, 100)
+    assert modelo.amostras == 200
+    np.testing.assert_allclose(modelo.prever(teste), esperado, atol=0.5)
+    np.testing.assert_allclose(modelo.prever_fitness(teste), esperado.mean(axis=1), atol=0.5)
+
+
+def test_previsoes_limitadas_as_notas_do_avaliador():
+    modelo = ModeloSubstituto()
+    x = np.ones(len(CARACTERISTICAS))
+    for _ in range(50):
+        modelo.atualizar(x, dict.fromkeys(ModeloSubstituto.CRITERIOS, 100))
+    assert np.all(modelo.prever(2 * x) <= 100)
+
+
+def test_previsao_comparada_pelo_codigo_e_nao_pelo_objeto():
+    filtro = FiltroSubstituto(minimo_amostras=1, fracao_avaliada=1.0)
+    filtro.filtrar(Algoritmo(1, "Python", CODIGO))
+    filtro.registrar_avaliado(_avaliado(CODIGO))
+    filtro.iniciar_geracao(1)
+    assert filtro.limiar is not None
+
+    candidato = Algoritmo(2, "Python", CODIGO)
+    assert filtro.filtrar(candidato) is candidato
+    # As notas reais chegam em outro objeto com o mesmo código (ex.: clone do avaliador)
+    filtro.registrar_avaliado(_avaliado(CODIGO))
+    assert filtro.get_estatisticas()["comparacoes"] == 1
+
+
+def test_avaliacao_de_outro_codigo_nao_usa_a_previsao_do_candidato():
+    filtro = FiltroSubstituto(minimo_amostras=1, fracao_avaliada=1.0)
+    filtro.filtrar(Algoritmo(1, "Python", CODIGO))
+    filtro.registrar_avaliado(_avaliado(CODIGO))
+    filtro.iniciar_geracao(1)
+
+    candidato = Algoritmo(2, "Python", CODIGO)
+    filtro.filtrar(candidato)
+    # Mesmo objeto, mas o código mudou depois da triagem
+    candidato.codigo = "def soma(a, b):\n    return sum((a, b))\n"
+    candidato.set_metricas(dict(zip(ModeloSubstituto.CRITERIOS, (50, 50, 50))))
+    filtro.registrar_avaliado(candidato)
+    assert filtro.get_estatisticas()["comparacoes"] == 0
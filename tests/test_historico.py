@@ -0,0 +1,118 @@
+import json
+import os
+
+from model.historico import GravadorHistorico, LeitorHistorico, iterar_historico
+
+
+def _registros(geracao, quantidade, inicio=0):
+    return [{"geracao": geracao, "fitness": i, "metricas": {}} for i in range(inicio, inicio + quantidade)]
+
+
+def test_gravador_anexa_em_lotes_sem_reescrever(tmp_path):
+    caminho = str(tmp_path / "historico.jsonl")
+    gravador = GravadorHistorico(caminho, tamanho_lote=3)
+    gravador.reiniciar()
+
+    gravador.anexar(_registros(0, 2))
+    # O lote ainda não encheu: nada no arquivo
+    assert list(iterar_historico(caminho)) == []
+    gravador.anexar(_registros(1, 1))
+    assert list(iterar_historico(caminho)) == _registros(0, 2) + _registros(1, 1)
+
+    gravador.anexar(_registros(2, 1))
+    gravador.descarregar()
+    gravador.descarregar()
+    assert list(iterar_historico(caminho)) == _registros(0, 2) + _registros(1, 1) + _registros(2, 1)
+
+
+def test_leitor_le_apenas_os_registros_novos(tmp_path):
+    caminho = str(tmp_path / "historico.jsonl")
+    gravador = GravadorHistorico(caminho)
+    gravador.reiniciar()
+    leitor = LeitorHistorico(caminho)
+    assert leitor.ler_novos() == []
+
+    gravador.anexar(_registros(0, 3))
+    gravador.descarregar()
+    assert leitor.ler_novos() == _registros(0, 3)
+    assert leitor.ler_novos() == []
+
+    gravador.anexar(_registros(1, 2))
+    gravador.descarregar()
+    assert leitor.ler_novos() == _registros(1, 2)
+    assert not leitor.reiniciado
+
+
+def test_linha_incompleta_fica_para_a_proxima_leitura(tmp_path):
+    caminho = tmp_path / "historico.jsonl"
+    linha = json.dumps(_registros(0, 1, inicio=7)[0]) + "\n"
+    caminho.write_text(json.dumps(_registros(0, 1)[0]) + "\n" + linha[:10], encoding="utf-8")
+    leitor = LeitorHistorico(str(caminho))
+
+    assert leitor.ler_novos() == _registros(0, 1)
+    with open(caminho, "a", encoding="utf-8") as f:
+        f.write(linha[10:])
+    assert leitor.ler_novos() == _registros(0, 1, inicio=7)
+    assert not leitor.reiniciado
+
+
+def test_arquivo_reiniciado_e_lido_do_inicio(tmp_path):
+    caminho = str(tmp_path / "historico.jsonl")
+    gravador = GravadorHistorico(caminho)
+    gravador.anexar(_registros(0, 3))
+    gravador.descarregar()
+    leitor = LeitorHistorico(caminho)
+    leitor.ler_novos()
+
+    gravador.reiniciar()
+    gravador.anexar(_registros(0, 1, inicio=5))
+    gravador.descarregar()
+    assert leitor.ler_novos() == _registros(0, 1, inicio=5)
+    assert leitor.reiniciado
+
+
+def test_truncado_e_estendido_alem_da_posicao_e_detectado(tmp_path):
+    caminho = str(tmp_path / "historico.jsonl")
+    gravador = GravadorHistorico(caminho)
+    gravador.anexar(_registros(0, 2))
+    gravador.descarregar()
+    tamanho_checkpoint = os.path.getsize(caminho)
+    gravador.anexar(_registros(1, 2))
+    gravador.descarregar()
+    leitor = LeitorHistorico(caminho)
+    assert len(leitor.ler_novos()) == 4
+
+    # Como em retomar_historico: volta ao checkpoint e a geração é refeita com registros maiores
+    os.truncate(caminho, tamanho_checkpoint)
+    refeitos = [dict(r, metricas={"eficiencia": 100, "clareza": 100}) for r in _registros(1, 3)]
+    gravador.anexar(refeitos)
+    gravador.descarregar()
+    assert os.path.getsize(caminho) > leitor.posicao
+
+    assert leitor.ler_novos() == _registros(0, 2) + refeitos
+    assert leitor.reiniciado
+
+
+def test_arquivo_substituido_e_lido_do_inicio(tmp_path):
+    caminho = tmp_path / "historico.jsonl"
+    caminho.write_text(json.dumps(_registros(0, 1)[0]) + "\n", encoding="utf-8")
+    leitor = LeitorHistorico(str(caminho))
+    leitor.ler_novos()
+
+    # Mesmo conteúdo inicial, mas outro arquivo
+    novo = tmp_path / "novo.jsonl"
+    novo.write_text(json.dumps(_registros(0, 1)[0]) + "\n" + json.dumps(_registros(1, 1)[0]) + "\n",
+                    encoding="utf-8")
+    os.replace(novo, caminho)
+    assert leitor.ler_novos() == _registros(0, 1) + _registros(1, 1)
+    assert leitor.reiniciado
+
+
+def test_formato_antigo_em_lista_json(tmp_path):
+    caminho = tmp_path / "historico.json"
+    caminho.write_text(json.dumps(_registros(0, 3)), encoding="utf-8")
+
+    assert list(iterar_historico(str(caminho))) == _registros(0, 3)
+    leitor = LeitorHistorico(str(caminho))
+    assert leitor.ler_novos() == _registros(0, 3)
+    assert leitor.ler_novos() == []
@@ -0,0 +1,125 @@
+import math
+import random
+
+import numpy as np
+import pytest
+
+from model.historico_colunar import HistoricoColunar
+
+
+def _registros(geracoes, semente):
+    gerador = random.Random(semente)
+    registros = []
+    for geracao in geracoes:
+        metricas = {criterio: gerador.randint(0, 100) for criterio in ("eficiencia", "clareza", "boas_praticas")}
+        # Poucos valores de fitness, para haver empates no melhor de cada geração
+        registros.append({"geracao": geracao, "fitness": gerador.choice([10, 55.5, 70, 90]),
+                          "metricas": metricas, "codigo": f"def f{gerador.randint(0, 30)}(): pass"})
+    return registros
+
+
+def _adicionar(historico, registros, semente):
+    """Mistura adicionar e adicionar_registros em blocos de tamanhos variados."""
+    gerador = random.Random(semente)
+    i = 0
+    while i < len(registros):
+        bloco = registros[i:i + gerador.randint(1, 7)]
+        if len(bloco) == 1:
+            r = bloco[0]
+            historico.adicionar(r["geracao"], r["fitness"], r["metricas"], r["codigo"])
+        else:
+            historico.adicionar_registros(bloco)
+        i += len(bloco)
+
+
+def _esperado(registros):
+    """Agregados por geração calculados em Python puro, na ordem estável de chegada."""
+    por_geracao = {}
+    for r in registros:
+        por_geracao.setdefault(r["geracao"], []).append(r)
+    resultado = {}
+    for geracao, grupo in sorted(por_geracao.items()):
+        colunas = [[r["fitness"]] + [r["metricas"][c] for c in ("eficiencia", "clareza", "boas_praticas")]
+                   for r in grupo]
+        medias = [sum(coluna) / len(grupo) for coluna in zip(*colunas)]
+        desvios = [math.sqrt(sum((v - m) ** 2 for v in coluna) / len(grupo))
+                   for coluna, m in zip(zip(*colunas), medias)]
+        melhor = max(grupo, key=lambda r: r["fitness"])
+        resultado[geracao] = {
+            "contagem": len(grupo), "medias": medias, "desvios": desvios,
+            "minimos": [min(c) for c in zip(*colunas)], "maximos": [max(c) for c in zip(*colunas)],
+            "melhor_codigo": melhor["codigo"],
+        }
+    return resultado
+
+
+def _conferir(historico, registros):
+    esperado = _esperado(registros)
+    agregados = historico.agregados_por_geracao()
+
+    assert agregados["geracoes"].tolist() == list(esperado)
+    assert historico.geracoes() == list(esperado)
+    for i, (geracao, valores) in enumerate(esperado.items()):
+        assert agregados["contagens"][i] == valores["contagem"]
+        for chave in ("medias", "desvios", "minimos", "maximos"):
+            np.testing.assert_allclose(agregados[chave][i], valores[chave], atol=1e-9)
+        assert historico.codigo_da_linha(int(agregados["linha_melhor"][i])) == valores["melhor_codigo"]
+
+        metricas = historico.metricas_geracao(geracao)
+        assert metricas["num_avaliacoes"] == valores["contagem"]
+        assert metricas["media_fitness"] == round(valores["medias"][0], 2)
+        assert metricas["melhor_fitness"] == valores["maximos"][0]
+        assert metricas["melhor_codigo"] == valores["melhor_codigo"]
+
+
+def test_geracoes_em_ordem_usam_o_indice_sem_reordenar():
+    registros = _registros([g for g in range(6) for _ in range(random.Random(g).randint(1, 9))], semente=1)
+    historico = HistoricoColunar(capacidade=2)
+    _adicionar(historico, registros, semente=2)
+
+    # Cada geração ocupa uma única faixa contínua do índice; nada foi reordenado
+    assert historico._ordenado
+    _conferir(historico, registros)
+    assert historico.metricas_geracao(99) is None
+
+
+@pytest.mark.parametrize("semente", range(5))
+def test_geracoes_fora_de_ordem_sao_reordenadas(semente):
+    gerador = random.Random(semente)
+    registros = _registros([gerador.randint(0, 7) for _ in range(80)], semente=semente)
+    historico = HistoricoColunar(capacidade=3)
+    _adicionar(historico, registros, semente=semente)
+
+    _conferir(historico, registros)
+    # Depois de reordenado, o índice continua valendo para novas gerações em ordem
+    extras = _registros([8, 8, 9], semente=semente + 100)
+    _adicionar(historico, extras, semente=semente)
+    assert historico._ordenado
+    _conferir(historico, registros + extras)
+
+
+def test_vazio_e_limpar():
+    historico = HistoricoColunar()
+    agregados = historico.agregados_por_geracao()
+    assert agregados["geracoes"].size == 0 and agregados["medias"].shape == (0, 4)
+
+    registros = _registros([3, 1, 2], semente=7)
+    _adicionar(historico, registros, semente=7)
+    historico.limpar()
+    assert len(historico) == 0
+    assert historico.geracoes() == []
+
+    _adicionar(historico, registros[1:], semente=7)
+    _conferir(historico, registros[1:])
+
+
+def test_salvar_e_carregar(tmp_path):
+    registros = _registros([2, 0, 1, 0, 2, 2], semente=3)
+    historico = HistoricoColunar()
+    _adicionar(historico, registros, semente=3)
+    caminho = str(tmp_path / "historico.npz")
+    historico.salvar(caminho)
+
+    carregado = HistoricoColunar.carregar(caminho)
+    assert len(carregado) == len(registros)
+    _conferir(carregado, registros)
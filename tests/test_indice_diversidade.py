@@ -0,0 +1,86 @@
+from controller.filtro_diversidade import FiltroDiversidade
+from model.algoritmo import Algoritmo
+from model.indice_diversidade import IndiceDiversidade
+
+CODIGO = '''def maior_valor(lista):
+    """Encontra o maior valor em uma lista."""
+    if not lista:
+        return None
+    maior = lista[0]
+    for valor in lista:
+        if valor > maior:
+            maior = valor
+    return maior
+'''
+
+MESMA_AST = '''def maior_valor(lista):
+    # comentário e formatação diferentes
+    if not lista: return None
+    maior = lista[0]
+    for valor in lista:
+        if valor > maior:
+            maior = valor
+    return maior
+'''
+
+DIFERENTE = '''def ordenar(itens, chave=None):
+    resultado = sorted(itens, key=chave)
+    return [item for item in resultado if item is not None]
+'''
+
+
+def _algoritmo(codigo, id=1):
+    return Algoritmo(id, "Python", codigo)
+
+
+def test_impressao_digital_ignora_comentarios_docstrings_e_formatacao():
+    indice = IndiceDiversidade()
+    assert indice.impressao_digital(CODIGO) == indice.impressao_digital(MESMA_AST)
+    assert indice.impressao_digital(CODIGO) != indice.impressao_digital(DIFERENTE)
+
+
+def test_impressao_digital_de_codigo_invalido_usa_os_tokens():
+    indice = IndiceDiversidade()
+    assert indice.impressao_digital("def f(:\n  x") == indice.impressao_digital("def f(:  # comentário\n  x")
+
+
+def test_assinatura_estima_a_similaridade():
+    indice = IndiceDiversidade(num_permutacoes=128, num_bandas=16)
+    base = indice.assinatura(CODIGO)
+    renomeado = CODIGO.replace("maior = lista[0]", "maior = lista[-1]")
+    assert len(base) == 128
+    assert (base == indice.assinatura(CODIGO)).all()
+    assert (base == indice.assinatura(renomeado)).mean() >= 0.6
+    assert (base == indice.assinatura(DIFERENTE)).mean() < 0.2
+
+
+def test_admitir_limita_os_parecidos_da_geracao():
+    indice = IndiceDiversidade(limite_similares=2)
+    assert indice.admitir(_algoritmo(CODIGO))
+    assert indice.admitir(_algoritmo(MESMA_AST))
+    assert not indice.admitir(_algoritmo(CODIGO))
+    # Um código diferente não colide com os anteriores
+    assert indice.admitir(_algoritmo(DIFERENTE))
+
+    indice.nova_geracao()
+    assert indice.admitir(_algoritmo(CODIGO))
+
+
+def test_admitir_cresce_alem_da_capacidade_inicial():
+    indice = IndiceDiversidade(limite_similares=None)
+    for i in range(100):
+        assert indice.admitir(_algoritmo(f"def f{i}(x):\n    return x * {i} + {i * 7}\n"))
+
+
+def test_filtro_reaproveita_as_notas_de_um_gemeo_exato():
+    filtro = FiltroDiversidade()
+    avaliado = _algoritmo(CODIGO)
+    avaliado.set_fitness(72.5)
+    avaliado.set_metricas({"eficiencia": 70, "clareza": 75, "boas_praticas": 72})
+    filtro.registrar_avaliado(avaliado)
+
+    gemeo = filtro.filtrar(_algoritmo(MESMA_AST, id=2))
+    assert gemeo.fitness == 72.5
+    assert gemeo.metricas == avaliado.metricas
+    assert gemeo.metricas is not avaliado.metricas
+    assert filtro.get_estatisticas()["reaproveitados"] == 1
@@ -0,0 +1,41 @@
+import threading
+
+import pytest
+
+from model import orcamento as modulo_orcamento
+from model.orcamento import OrcamentoEsgotado, OrcamentoExecucao, obter_orcamento
+
+
+def test_reserva_recusada_esgota_o_orcamento():
+    orcamento = OrcamentoExecucao(max_requisicoes=1)
+    orcamento.reservar(100)
+    with pytest.raises(OrcamentoEsgotado):
+        orcamento.reservar(100)
+    assert orcamento.nivel() == "esgotado"
+
+
+def test_sem_execucao_retorna_orcamento_sem_limites():
+    assert not obter_orcamento().limitado
+
+
+def test_execucoes_simultaneas_consomem_cada_uma_o_seu_orcamento():
+    orcamentos = [OrcamentoExecucao(max_requisicoes=10), OrcamentoExecucao(max_requisicoes=10)]
+    barreira = threading.Barrier(2)
+
+    def executar(i):
+        modulo_orcamento.ativar(orcamentos[i])
+        try:
+            # As duas execuções ficam ativas ao mesmo tempo
+            barreira.wait()
+            for _ in range(i + 1):
+                obter_orcamento().reservar(10)
+        finally:
+            modulo_orcamento.desativar(orcamentos[i])
+
+    threads = [threading.Thread(target=executar, args=(i,)) for i in range(2)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    assert [orcamento.requisicoes for orcamento in orcamentos] == [1, 2]
+    assert not obter_orcamento().limitado
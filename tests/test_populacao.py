@@ -0,0 +1,125 @@
+import os
+import random
+
+import pytest
+
+from controller.avaliador_service import AvaliadorService
+from controller.filtro_diversidade import FiltroDiversidade
+from controller.filtro_sintatico import FiltroSintatico
+from model import orcamento as modulo_orcamento
+from model.algoritmo import Algoritmo
+from model.orcamento import OrcamentoExecucao, obter_orcamento
+from model.pipeline_evolucao import PipelineEvolucao
+from model.populacao import Populacao
+
+CODIGO_BASE = "def dobro(x):\n    return 2 * x\n"
+
+
+class _OperadorRepetitivo:
+    """Operador cujas variações, filhos e mutantes são todos quase-duplicatas do código base."""
+
+    def __init__(self):
+        self.chamadas_variacoes = 0
+        self.cruzamentos = 0
+
+    def gerar_variacoes_iniciais(self, codigo_base, linguagem, quantidade=10):
+        self.chamadas_variacoes += 1
+        return [
+            Algoritmo(random.randint(1000, 9999), linguagem, f"# Variação {i}\n{codigo_base}")
+            for i in range(quantidade)
+        ]
+
+    def selecionar(self, algoritmos, quantidade=5, estrategia=None):
+        return [random.choice(algoritmos) for _ in range(quantidade)]
+
+    def cruzar(self, pai1, pai2):
+        self.cruzamentos += 1
+        return pai1.clone(novo_codigo=f"# Filho {self.cruzamentos}\n{CODIGO_BASE}",
+                          novo_id=random.randint(1000, 9999))
+
+    def mutar(self, algoritmo):
+        return algoritmo
+
+    def get_estado_rng(self):
+        return None
+
+
+@pytest.fixture
+def diretorio_execucao(tmp_path, monkeypatch):
+    # A população grava o código original em ./utils; o avaliador fica offline, sem a API
+    monkeypatch.chdir(tmp_path)
+    monkeypatch.delenv("GROQ_API_KEY", raising=False)
+    monkeypatch.delenv("GROQ_CASSETE", raising=False)
+    os.makedirs("utils")
+    return tmp_path
+
+
+class _FiltroQueObservaOrcamento:
+    """Filtro que aprova tudo e anota o orçamento visto na thread da triagem."""
+
+    def __init__(self):
+        self.orcamentos = []
+
+    def filtrar(self, algoritmo):
+        self.orcamentos.append(obter_orcamento())
+        return algoritmo
+
+    def iniciar_geracao(self, geracao):
+        pass
+
+
+def _populacao(diretorio, tamanho):
+    populacao = Populacao("Python", tamanho=tamanho)
+    populacao.set_avaliador(AvaliadorService(caminho_historico=str(diretorio / "historico.jsonl")))
+    populacao.set_operador(_OperadorRepetitivo())
+    populacao.adicionar_filtro(FiltroSintatico())
+    populacao.adicionar_filtro(FiltroDiversidade())
+    return populacao
+
+
+def test_populacao_mantem_o_tamanho_com_variacoes_quase_duplicadas(diretorio_execucao):
+    populacao = _populacao(diretorio_execucao, tamanho=8)
+
+    populacao.gerar_populacao_inicial(CODIGO_BASE)
+    assert len(populacao.algoritmos) == 8
+    # As vagas descartadas pedem novas variações ao operador antes de recorrer a cópias
+    assert populacao.operador.chamadas_variacoes > 1
+    assert populacao.descartes_por_geracao[0] > 0
+    assert all(a.fitness is not None for a in populacao.algoritmos)
+
+    for _ in range(3):
+        populacao.evoluir(num_geracoes=1)
+        assert len(populacao.algoritmos) == 8
+    assert all(populacao.descartes_por_geracao[g] > 0 for g in (1, 2, 3))
+
+
+def test_filho_descartado_deixa_a_vaga_vazia_em_vez_do_pai(diretorio_execucao):
+    pai1 = Algoritmo(1, "Python", CODIGO_BASE)
+    pai2 = Algoritmo(2, "Python", "def dobro(x):\n    return x + x\n")
+    filtro = FiltroDiversidade()
+    filtro.iniciar_geracao(1)
+    # O filho é uma cópia de pai1, que já ocupa todas as vagas de parecidos
+    while filtro.filtrar(pai1.clone(novo_id=random.randint(1000, 9999))) is not None:
+        pass
+
+    pipeline = PipelineEvolucao(_OperadorRepetitivo(), AvaliadorService(), filtros=[filtro])
+    filhos = pipeline.processar([(pai1, pai2)])
+
+    assert filhos == [None]
+    assert pipeline.descartados == 1
+
+
+def test_triagem_em_threads_ve_o_orcamento_da_execucao(diretorio_execucao):
+    populacao = Populacao("Python", tamanho=4)
+    populacao.set_operador(_OperadorRepetitivo())
+    filtro = _FiltroQueObservaOrcamento()
+    populacao.adicionar_filtro(filtro)
+    orcamento = OrcamentoExecucao(max_requisicoes=10)
+
+    modulo_orcamento.ativar(orcamento)
+    try:
+        variacoes = populacao.operador.gerar_variacoes_iniciais(CODIGO_BASE, "Python", 4)
+        assert len(populacao._filtrar_variacoes(variacoes, CODIGO_BASE)) == 4
+    finally:
+        modulo_orcamento.desativar(orcamento)
+    assert filtro.orcamentos == [orcamento] * 4
@@ -0,0 +1,75 @@
+import asyncio
+import contextvars
+import threading
+
+from model import rastreamento
+from model.rastreamento import Rastreador, obter_rastreador
+
+
+def _em_thread(funcao):
+    resultado = []
+    thread = threading.Thread(target=lambda: resultado.append(funcao()))
+    thread.start()
+    thread.join()
+    return resultado[0]
+
+
+def test_sem_execucao_retorna_rastreador_nulo():
+    assert not isinstance(obter_rastreador(), Rastreador)
+
+
+def test_execucoes_em_threads_diferentes_nao_se_misturam():
+    rastreadores = [Rastreador(), Rastreador()]
+    vistos = [None, None]
+    barreira = threading.Barrier(2)
+
+    def executar(i):
+        rastreamento.ativar(rastreadores[i])
+        # As duas execuções ficam ativas ao mesmo tempo
+        barreira.wait()
+        vistos[i] = obter_rastreador()
+        rastreamento.desativar(rastreadores[i])
+
+    threads = [threading.Thread(target=executar, args=(i,)) for i in range(2)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    assert vistos[0] is rastreadores[0]
+    assert vistos[1] is rastreadores[1]
+
+
+def test_workers_iniciados_com_copia_do_contexto_veem_a_execucao():
+    rastreador = Rastreador()
+
+    def executar():
+        rastreamento.ativar(rastreador)
+        try:
+            contexto = contextvars.copy_context()
+            worker = _em_thread(lambda: contexto.run(obter_rastreador))
+            avulsa = _em_thread(obter_rastreador)
+            return worker, avulsa
+        finally:
+            rastreamento.desativar(rastreador)
+
+    worker, avulsa = _em_thread(executar)
+    assert worker is rastreador
+    assert avulsa is not rastreador
+
+
+def test_tarefas_e_to_thread_herdam_o_rastreador():
+    rastreador = Rastreador()
+
+    async def tarefa():
+        await asyncio.sleep(0)
+        return obter_rastreador()
+
+    async def executar():
+        rastreamento.ativar(rastreador)
+        try:
+            return await asyncio.gather(asyncio.to_thread(obter_rastreador), asyncio.create_task(tarefa()))
+        finally:
+            rastreamento.desativar(rastreador)
+
+    assert asyncio.run(executar()) == [rastreador, rastreador]
+    assert obter_rastreador() is not rastreador
@@ -0,0 +1,75 @@
+import numpy as np
+import pytest
+
+from controller.selecao import MotorSelecao
+
+FITNESS = np.array([10.0, 0.0, 50.0, 30.0, 90.0, 5.0])
+
+
+@pytest.mark.parametrize("estrategia", ["roleta", "ranking"])
+def test_estrategias_sem_reposicao_nao_repetem(estrategia):
+    motor = MotorSelecao(estrategia, semente=1)
+    for _ in range(50):
+        indices = motor.selecionar_indices(FITNESS, 4)
+        assert len(set(indices.tolist())) == len(indices) == 4
+
+
+def test_roleta_ignora_fitness_zero_e_limita_a_quantidade():
+    motor = MotorSelecao("roleta", semente=2)
+    indices = motor.selecionar_indices(FITNESS, 10)
+    assert sorted(indices.tolist()) == [0, 2, 3, 4, 5]
+
+
+def test_roleta_favorece_o_maior_fitness():
+    motor = MotorSelecao("roleta", semente=3)
+    primeiros = [motor.selecionar_indices(FITNESS, 1)[0] for _ in range(2000)]
+    contagem = np.bincount(primeiros, minlength=len(FITNESS))
+    assert contagem[1] == 0
+    # Proporcional ao fitness: 90 / 185 ≈ 0.49
+    assert abs(contagem[4] / 2000 - 90 / 185) < 0.05
+
+
+def test_sus_distribui_proporcionalmente_ao_fitness():
+    motor = MotorSelecao("sus", semente=4)
+    indices = motor.selecionar_indices([1.0, 1.0, 2.0], 4)
+    assert sorted(indices.tolist()) == [0, 1, 2, 2]
+
+
+def test_torneio_com_todos_os_competidores_escolhe_o_melhor():
+    motor = MotorSelecao("torneio", tamanho_torneio=200, semente=5)
+    assert set(motor.selecionar_indices(FITNESS, 5).tolist()) == {4}
+
+
+def test_ranking_pesos_lineares():
+    motor = MotorSelecao("ranking", pressao_ranking=2.0)
+    pesos = motor._pesos_ranking(np.array([3.0, 1.0, 2.0]))
+    np.testing.assert_allclose(pesos, [2 / 3, 0.0, 1 / 3])
+    assert pesos.sum() == pytest.approx(1.0)
+
+
+def test_nsga2_prefere_a_primeira_frente():
+    objetivos = np.array([[9, 1], [1, 9], [5, 5], [1, 1], [0, 0]])
+    motor = MotorSelecao("nsga2", semente=6)
+    indices = motor.selecionar_indices(np.zeros(5), 300, objetivos=objetivos)
+    contagem = np.bincount(indices, minlength=5)
+    # Quanto pior a frente, menos torneios vencidos; o último só vence contra si mesmo
+    assert contagem[4] < contagem[3] < contagem[:3].min()
+
+
+def test_estado_reproduz_a_selecao():
+    motor = MotorSelecao("torneio", semente=7)
+    estado = motor.get_estado()
+    primeira = motor.selecionar_indices(FITNESS, 6)
+    motor.set_estado(estado)
+    assert (motor.selecionar_indices(FITNESS, 6) == primeira).all()
+
+
+def test_entradas_invalidas_e_vazias():
+    with pytest.raises(ValueError):
+        MotorSelecao("inexistente")
+    with pytest.raises(ValueError):
+        MotorSelecao(pressao_ranking=2.5)
+    with pytest.raises(ValueError):
+        MotorSelecao().selecionar_indices(FITNESS, 2, estrategia="inexistente")
+    assert MotorSelecao().selecionar_indices([], 3).size == 0
+    assert MotorSelecao().selecionar_indices(FITNESS, 0).size == 0
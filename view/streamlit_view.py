@@ -1,5 +1,4 @@
 import streamlit as st
-import pandas as pd
 import os
 from abc import ABC, abstractmethod
 from view.visualizador import VisualizadorEvolucao
@@ -16,6 +15,11 @@ class IView(ABC):
     def exibir_resultados(self, melhor_algoritmo, estatisticas, caminho_historico):
         """Exibe os resultados da simulação."""
         pass
+    
+    @abstractmethod
+    def exibir_execucao(self, execucao):
+        """Exibe o progresso de uma simulação em segundo plano e, ao final, seus resultados."""
+        pass
 
 class StreamlitView(IView):
     """Implementação da interface de visualização usando Streamlit."""
@@ -50,8 +54,19 @@ class StreamlitView(IView):
             max_value=5,
             value=1
         )
-        
-       
+
+        retomar = st.sidebar.checkbox(
+            "Retomar execução interrompida",
+            value=False,
+            help="Continua da última geração concluída de uma simulação interrompida com o mesmo código"
+        )
+
+        with st.sidebar.expander("Orçamento da execução"):
+            st.caption("0 = sem limite. Perto do limite, a evolução deixa de cruzar os pais e pode "
+                       "terminar antes da última geração.")
+            limite_tokens = st.number_input("Tokens", min_value=0, value=0, step=1000)
+            limite_requisicoes = st.number_input("Requisições à API", min_value=0, value=0, step=10)
+            limite_segundos = st.number_input("Tempo (segundos)", min_value=0, value=0, step=30)
         
         st.header("Insira o código inicial")
         codigo_exemplo = '''
@@ -79,9 +94,71 @@ def maior_valor(lista):
             "linguagem": linguagem,
             "tamanho_populacao": tamanho_populacao,
             "geracoes": geracoes,
-            "codigo_inicial": codigo_inicial
+            "codigo_inicial": codigo_inicial,
+            "retomar": retomar,
+            "orcamento": {
+                "max_tokens": limite_tokens or None,
+                "max_requisicoes": limite_requisicoes or None,
+                "max_segundos": limite_segundos or None
+            }
         }
     
+    def exibir_execucao(self, execucao):
+        """Exibe o progresso de uma simulação em segundo plano e, ao final, seus resultados."""
+        if execucao.em_andamento:
+            self._exibir_progresso_ao_vivo(execucao)
+            return
+
+        self._exibir_progresso(execucao)
+        if execucao.cancelada:
+            st.warning("Simulação interrompida. O histórico das gerações concluídas foi mantido.")
+        elif execucao.erro:
+            st.error(f"Erro na simulação: {execucao.erro}")
+
+        resultado = execucao.resultado
+        if resultado is not None:
+            self.exibir_resultados(
+                resultado["melhor_algoritmo"], resultado["estatisticas"], resultado["caminho_historico"]
+            )
+
+    def _exibir_progresso_ao_vivo(self, execucao):
+        """Método privado que atualiza apenas o bloco de progresso enquanto a simulação roda."""
+        @st.fragment(run_every=1.0)
+        def progresso():
+            if not execucao.em_andamento:
+                # Terminou: um rerun completo reabilita os botões e mostra os resultados
+                st.rerun(scope="app")
+            self._exibir_progresso(execucao)
+
+        progresso()
+
+    def _exibir_progresso(self, execucao):
+        """Método privado que mostra as estatísticas de cada geração concluída."""
+        eventos = execucao.eventos()
+        total = execucao.parametros["geracoes"]
+        concluidas = eventos[-1]["geracao"] if eventos else 0
+
+        st.subheader("Progresso")
+        texto = f"Geração {concluidas} de {total}" if eventos else "Gerando a população inicial..."
+        st.progress(min(1.0, concluidas / total) if total else 1.0, text=texto)
+        if not eventos:
+            return
+
+        ultimo = eventos[-1]
+        col1, col2, col3, col4 = st.columns(4)
+        col1.metric("Melhor Fitness", ultimo["melhor_fitness"])
+        col2.metric("Fitness Médio", ultimo["media_fitness"])
+        col3.metric("Chamadas à API", sum(e["chamadas_api"] for e in eventos))
+        col4.metric("Tempo", f"{ultimo['tempo_decorrido']:.1f}s")
+
+        import pandas as pd
+        df = pd.DataFrame(eventos).set_index("geracao")
+        st.line_chart(
+            df[["melhor_fitness", "media_fitness"]].rename(
+                columns={"melhor_fitness": "Melhor", "media_fitness": "Média"}
+            )
+        )
+
     def exibir_resultados(self, melhor_algoritmo, estatisticas, caminho_historico):
         """Exibe os resultados da simulação."""
         if melhor_algoritmo is None:
@@ -95,7 +172,11 @@ def maior_valor(lista):
         if estatisticas:
             col1, col2, col3 = st.columns(3)
             col2.metric("Melhor Fitness", f"{estatisticas.get('melhor_fitness', 0):.2f}")
-            col3.metric("Gerações", estatisticas.get('geracoes', 0))
+            col3.metric("Gerações", estatisticas.get('geracao', 0))
+            if estatisticas.get("rastreamento"):
+                self._exibir_rastreamento(estatisticas["rastreamento"])
+            if estatisticas.get("pareto"):
+                self._exibir_pareto(estatisticas["pareto"])
         
         # Exibe o melhor algoritmo
         st.subheader("Melhor Algoritmo")
@@ -115,14 +196,10 @@ def maior_valor(lista):
         if os.path.exists(caminho_historico):
             # Carrega os dados para visualização
             if self.visualizador.carregar_dados(caminho_historico):
-                # Exporta o gráfico para um arquivo temporário
-                grafico_path = "evolucao_temp.png"
-                if self.visualizador.exportar_grafico(grafico_path):
-                    # Exibe o gráfico
-                    st.image(grafico_path)
-                    # Remove o arquivo temporário
-                    if os.path.exists(grafico_path):
-                        os.remove(grafico_path)
+                # Renderizado em memória; históricos sem mudança reaproveitam a figura
+                grafico = self.visualizador.renderizar_png()
+                if grafico is not None:
+                    st.image(grafico)
                 else:
                     st.warning("Não foi possível gerar o gráfico de evolução.")
             else:
@@ -140,4 +217,46 @@ def maior_valor(lista):
                     arquivo.write(melhor_algoritmo.codigo)
                 st.success(f"Algoritmo exportado com sucesso para {nome_arquivo}")
             except Exception as e:
-                st.error(f"Erro ao exportar algoritmo: {str(e)}")
\ No newline at end of file
+                st.error(f"Erro ao exportar algoritmo: {str(e)}")
+
+    def _exibir_rastreamento(self, rastreamento):
+        """Método privado que mostra onde foram o tempo e a cota da API."""
+        st.subheader("Tempo e Consumo da API")
+        llm = rastreamento["llm"]
+        col1, col2, col3 = st.columns(3)
+        col1.metric("Tempo Total", f"{rastreamento['tempo_total_s']:.1f}s")
+        col2.metric("Chamadas à API", llm["chamadas"], f"{llm['novas_tentativas']} novas tentativas",
+                    delta_color="off")
+        col3.metric("Tokens", llm["tokens_prompt"] + llm["tokens_completacao"],
+                    f"{llm['tokens_completacao']} de resposta", delta_color="off")
+
+        import pandas as pd
+        fases = pd.DataFrame.from_dict(rastreamento["fases"], orient="index")
+        st.dataframe(fases.sort_values("total_s", ascending=False))
+
+    def _exibir_pareto(self, pareto):
+        """Método privado que mostra o arquivo de Pareto: os melhores compromissos entre os critérios."""
+        st.subheader("Frente de Pareto")
+        st.caption("Algoritmos que nenhum outro supera ao mesmo tempo em eficiência, clareza e boas práticas.")
+
+        import pandas as pd
+        tabela = pd.DataFrame([
+            {
+                "id": membro["id"],
+                "geracao": membro["geracao"],
+                "fitness": membro["fitness"],
+                "eficiencia": membro["metricas"]["eficiencia"],
+                "clareza": membro["metricas"]["clareza"],
+                "boas_praticas": membro["metricas"]["boas_praticas"]
+            }
+            for membro in pareto
+        ])
+        st.scatter_chart(tabela, x="eficiencia", y="clareza", color="boas_praticas")
+        st.dataframe(tabela, hide_index=True)
+
+        posicao = st.selectbox(
+            "Código do membro", range(len(pareto)),
+            format_func=lambda i: f"#{pareto[i]['id']} (geração {pareto[i]['geracao']}, fitness {pareto[i]['fitness']})"
+        )
+        membro = pareto[posicao]
+        st.code(membro["codigo"], language=membro["linguagem"].lower())
@@ -1,135 +1,239 @@
-import seaborn as sns
-import json
-import pandas as pd
-import matplotlib.pyplot as plt
+import hashlib
+import io
+import threading
 from abc import ABC, abstractmethod
+from collections import OrderedDict
+
+import numpy as np
+
+from model.historico import LeitorHistorico
+from model.historico_colunar import HistoricoColunar
+
+# Z da distribuição normal para o intervalo de confiança de 95%
+_Z_95 = 1.96
+
+# Figuras já renderizadas, compartilhadas entre sessões: digest → PNG
+_cache_figuras = OrderedDict()
+_cache_lock = threading.Lock()
+_CACHE_MAX_FIGURAS = 32
+
+# (coluna do histórico, título, rótulo, cor) de cada gráfico
+_GRAFICOS = (
+    ("fitness", "Evolução do Fitness", "Fitness", "black"),
+    ("eficiencia", "Evolução da Eficiência", "Eficiência", "orange"),
+    ("clareza", "Evolução da Clareza", "Clareza", "green"),
+    ("boas_praticas", "Evolução das Boas Práticas", "Boas Práticas", "blue"),
+)
 
 class IVisualizador(ABC):
     """Interface para visualizadores de dados."""
-    
+
     @abstractmethod
     def carregar_dados(self, caminho_arquivo):
         """Carrega os dados de um arquivo."""
         pass
-    
+
     @abstractmethod
     def visualizar(self):
         """Visualiza os dados."""
         pass
 
 class VisualizadorEvolucao(IVisualizador):
-    """Visualizador de evolução de algoritmos genéticos."""
-    
-    def __init__(self):
-        self.df = None
-        
-    def carregar_dados(self, caminho_arquivo="./utils/historico_avaliacoes.json"):
-        """Carrega os dados de um arquivo JSON."""
+    """Visualizador de evolução de algoritmos genéticos.
+
+    Responsabilidades:
+    - Ler o histórico de forma incremental para um armazenamento colunar
+    - Resumir cada geração em média, mínimo, máximo e intervalo de confiança
+    - Agrupar gerações quando o histórico é longo, mantendo o custo do gráfico constante
+    - Renderizar o gráfico em memória, reaproveitando figuras de históricos idênticos
+    """
+
+    def __init__(self, max_pontos=400):
+        self.max_pontos = max(2, max_pontos)
+        self.historico = HistoricoColunar()
+        self._leitor = None
+        self._agregados = None
+
+    def carregar_dados(self, caminho_arquivo="./utils/historico_avaliacoes.jsonl"):
+        """Carrega os dados do histórico, lendo apenas os registros novos desde a última chamada."""
         try:
-            with open(caminho_arquivo, 'r', encoding='utf-8') as arquivo:
-                historico_avaliacoes = json.load(arquivo)
-                self.df = pd.json_normalize(historico_avaliacoes)
-                
-                self.df.rename(columns={
-                    'metricas.eficiencia': 'Eficiencia',
-                    'metricas.clareza': 'Clareza',
-                    'metricas.boas_praticas': 'BoasPraticas'
-                }, inplace=True)
-                
-                return True
+            if self._leitor is None or self._leitor.caminho != caminho_arquivo:
+                self._leitor = LeitorHistorico(caminho_arquivo)
+                self._reiniciar()
+
+            novos = self._leitor.ler_novos()
+            if self._leitor.reiniciado:
+                # O arquivo foi reiniciado por uma nova execução
+                self._reiniciar()
+
+            if novos:
+                self.historico.adicionar_registros(novos)
+                self._agregados = None
+
+            return True
         except Exception as e:
             print(f"Erro ao carregar dados: {str(e)}")
             return False
-    
+
+    @property
+    def df(self):
+        """Resumo por geração como DataFrame (uma linha por geração ou grupo de gerações)."""
+        agregados = self.agregados()
+        if agregados is None:
+            return None
+        import pandas as pd
+        dados = {"geracao": agregados["geracoes"], "num_avaliacoes": agregados["contagens"]}
+        for i, coluna in enumerate(HistoricoColunar.COLUNAS):
+            dados[f"{coluna}_media"] = agregados["medias"][:, i]
+            dados[f"{coluna}_min"] = agregados["minimos"][:, i]
+            dados[f"{coluna}_max"] = agregados["maximos"][:, i]
+            dados[f"{coluna}_ic"] = agregados["ic"][:, i]
+        return pd.DataFrame(dados)
+
+    def agregados(self):
+        """Retorna os agregados por geração, já reduzidos a no máximo `max_pontos` pontos.
+
+        Chaves: geracoes, contagens, medias, minimos, maximos e ic (meia largura do
+        intervalo de 95%); as colunas seguem HistoricoColunar.COLUNAS.
+        """
+        if len(self.historico) == 0:
+            return None
+        if self._agregados is None:
+            self._agregados = self._reduzir(self.historico.agregados_por_geracao())
+        return self._agregados
+
+    def renderizar_png(self, largura=12, altura=8, dpi=100):
+        """Renderiza o gráfico de evolução e retorna os bytes PNG, ou None sem dados."""
+        agregados = self.agregados()
+        if agregados is None:
+            return None
+
+        chave = self._digest(agregados, largura, altura, dpi)
+        with _cache_lock:
+            png = _cache_figuras.get(chave)
+            if png is not None:
+                _cache_figuras.move_to_end(chave)
+                return png
+
+        # Importado só ao desenhar: o matplotlib é a dependência mais lenta de carregar
+        from matplotlib.figure import Figure
+        figura = Figure(figsize=(largura, altura), dpi=dpi)
+        self._desenhar(figura, agregados)
+        buffer = io.BytesIO()
+        figura.savefig(buffer, format="png")
+        png = buffer.getvalue()
+
+        with _cache_lock:
+            _cache_figuras[chave] = png
+            while len(_cache_figuras) > _CACHE_MAX_FIGURAS:
+                _cache_figuras.popitem(last=False)
+        return png
+
     def visualizar(self):
         """Visualiza os dados de evolução em gráficos."""
-        if self.df is None or self.df.empty:
+        agregados = self.agregados()
+        if agregados is None:
             print("Não há dados para visualizar.")
             return False
-            
-        sns.set_theme(style="darkgrid")
-        plt.figure(figsize=(12, 8))
-
-        # Gráfico de fitness
-        plt.subplot(2, 2, 1)
-        sns.lineplot(data=self.df, x='geracao', y='fitness', color="black", marker='o')
-        plt.title('Evolução do Fitness')
-        plt.xlabel('Geração')
-        plt.ylabel('Fitness')
-
-        # Gráfico de eficiência
-        plt.subplot(2, 2, 2)
-        sns.lineplot(data=self.df, x='geracao', y='Eficiencia', color="orange", marker='o')
-        plt.title('Evolução da Eficiência')
-        plt.xlabel('Geração')
-        plt.ylabel('Eficiência')
-
-        # Gráfico de clareza
-        plt.subplot(2, 2, 3)
-        sns.lineplot(data=self.df, x='geracao', y='Clareza', color="green", marker='o')
-        plt.title('Evolução da Clareza')
-        plt.xlabel('Geração')
-        plt.ylabel('Clareza')
-
-        # Gráfico de boas práticas
-        plt.subplot(2, 2, 4)
-        sns.lineplot(data=self.df, x='geracao', y='BoasPraticas', color="blue", marker='o')
-        plt.title('Evolução das Boas Práticas')
-        plt.xlabel('Geração')
-        plt.ylabel('Boas Práticas')
-
-        plt.tight_layout()
+
+        import matplotlib.pyplot as plt
+        figura = plt.figure(figsize=(12, 8))
+        self._desenhar(figura, agregados)
         plt.show()
         return True
-        
+
     def exportar_grafico(self, caminho_arquivo="evolucao.png"):
         """Exporta o gráfico para um arquivo de imagem."""
-        if self.df is None or self.df.empty:
-            print("Não há dados para exportar.")
-            return False
-            
         try:
-            sns.set_theme(style="darkgrid")
-            plt.figure(figsize=(12, 8))
-
-            # Gráfico de fitness
-            plt.subplot(2, 2, 1)
-            sns.lineplot(data=self.df, x='geracao', y='fitness', color="black", marker='o')
-            plt.title('Evolução do Fitness')
-            plt.xlabel('Geração')
-            plt.ylabel('Fitness')
-
-            # Gráfico de eficiência
-            plt.subplot(2, 2, 2)
-            sns.lineplot(data=self.df, x='geracao', y='Eficiencia', color="orange", marker='o')
-            plt.title('Evolução da Eficiência')
-            plt.xlabel('Geração')
-            plt.ylabel('Eficiência')
-
-            # Gráfico de clareza
-            plt.subplot(2, 2, 3)
-            sns.lineplot(data=self.df, x='geracao', y='Clareza', color="green", marker='o')
-            plt.title('Evolução da Clareza')
-            plt.xlabel('Geração')
-            plt.ylabel('Clareza')
-
-            # Gráfico de boas práticas
-            plt.subplot(2, 2, 4)
-            sns.lineplot(data=self.df, x='geracao', y='BoasPraticas', color="blue", marker='o')
-            plt.title('Evolução das Boas Práticas')
-            plt.xlabel('Geração')
-            plt.ylabel('Boas Práticas')
-
-            plt.tight_layout()
-            plt.savefig(caminho_arquivo)
-            plt.close()
+            png = self.renderizar_png()
+            if png is None:
+                print("Não há dados para exportar.")
+                return False
+            with open(caminho_arquivo, "wb") as f:
+                f.write(png)
             return True
         except Exception as e:
             print(f"Erro ao exportar gráfico: {str(e)}")
             return False
 
+    def _reiniciar(self):
+        """Método privado que descarta os dados carregados."""
+        self.historico = HistoricoColunar()
+        self._agregados = None
+
+    def _reduzir(self, brutos):
+        """Método privado que calcula o IC e agrupa gerações vizinhas se houver pontos demais."""
+        geracoes = brutos["geracoes"]
+        contagens = brutos["contagens"].astype(np.float64)
+        medias = brutos["medias"]
+        somas = medias * contagens[:, None]
+        quadrados = (brutos["desvios"] ** 2 + medias ** 2) * contagens[:, None]
+        minimos = brutos["minimos"]
+        maximos = brutos["maximos"]
+
+        if len(geracoes) > self.max_pontos:
+            # Grupos de gerações consecutivas; somas e extremos se combinam sem perda
+            inicios = np.linspace(0, len(geracoes), self.max_pontos, endpoint=False).astype(np.intp)
+            inicios = np.unique(inicios)
+            contagens = np.add.reduceat(contagens, inicios)
+            somas = np.add.reduceat(somas, inicios, axis=0)
+            quadrados = np.add.reduceat(quadrados, inicios, axis=0)
+            minimos = np.minimum.reduceat(minimos, inicios, axis=0)
+            maximos = np.maximum.reduceat(maximos, inicios, axis=0)
+            # Cada grupo é representado pela geração central
+            fins = np.r_[inicios[1:], len(geracoes)]
+            geracoes = (geracoes[inicios] + geracoes[fins - 1]) / 2
+
+        n = contagens[:, None]
+        medias = somas / n
+        # Variância amostral a partir das somas; zero quando há uma única avaliação
+        variancias = np.maximum(quadrados - n * medias ** 2, 0.0) / np.maximum(n - 1, 1)
+        ic = _Z_95 * np.sqrt(variancias / n)
+
+        return {
+            "geracoes": geracoes,
+            "contagens": contagens.astype(np.int64),
+            "medias": medias,
+            "minimos": minimos,
+            "maximos": maximos,
+            "ic": ic
+        }
+
+    @staticmethod
+    def _desenhar(figura, agregados):
+        """Método privado que desenha os quatro gráficos a partir dos agregados."""
+        x = agregados["geracoes"]
+        marcador = "o" if len(x) <= 50 else None
+        for i, (_, titulo, rotulo, cor) in enumerate(_GRAFICOS):
+            eixo = figura.add_subplot(2, 2, i + 1)
+            eixo.set_facecolor("#EAEAF2")
+            eixo.grid(color="white")
+            eixo.set_axisbelow(True)
+
+            media = agregados["medias"][:, i]
+            ic = agregados["ic"][:, i]
+            eixo.fill_between(x, agregados["minimos"][:, i], agregados["maximos"][:, i],
+                              color=cor, alpha=0.08, linewidth=0, label="Mín–máx")
+            eixo.fill_between(x, media - ic, media + ic, color=cor, alpha=0.25, linewidth=0, label="IC 95%")
+            eixo.plot(x, media, color=cor, marker=marcador, label="Média")
+
+            eixo.set_title(titulo)
+            eixo.set_xlabel("Geração")
+            eixo.set_ylabel(rotulo)
+        figura.axes[0].legend(loc="lower right", fontsize="small")
+        figura.tight_layout()
+
+    @staticmethod
+    def _digest(agregados, largura, altura, dpi):
+        """Método privado que identifica o conteúdo do gráfico."""
+        hash_ = hashlib.blake2b(digest_size=16)
+        for chave in ("geracoes", "contagens", "medias", "minimos", "maximos", "ic"):
+            hash_.update(np.ascontiguousarray(agregados[chave]).tobytes())
+        hash_.update(f"{largura}x{altura}@{dpi}".encode("utf-8"))
+        return hash_.hexdigest()
+
 # Exemplo de uso
 if __name__ == "__main__":
     visualizador = VisualizadorEvolucao()
     if visualizador.carregar_dados():
-        visualizador.visualizar()
\ No newline at end of file
+        visualizador.visualizar()